@@ -21,6 +21,10 @@ from .plot import ASC
 from .plot import DESC
 from .distribution import Distribution
 from .tree import Tree
+from .tree_table import TreeTable
+from .tree_table import TreeRow
+from .tree_table import TreeValues
+from .context import SimulationContext
 from .search.search_criteria import SearchCriteria
 from .search.order_criteria import OrderCriteria
 from .search.search_criteria import EQUAL
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from util import Tools
+from data.general import Area, Model, Warnings
+from data.variables import TREE_VARS, PLOT_VARS
+
+import copy
+import importlib
+import sys
+import threading
+
+
+CONTEXT_CLASSES = [Area, Model, Warnings]  # classes whose attributes are written by the models for the whole simulation
+CONTEXT_LOCK = threading.RLock()  # the contexts share the module variables, so only one of them can be active at the same time
+
+MODULE_GLOBALS = dict()  # (module name, variable) -> initial value of the module variables registered with register_global
+
+
+def get_class_values(context_class) -> dict:
+    """
+    Function that returns the attributes of a class that the models can replace (properties included, because
+    i.e. Plot.from_plot_to_area replaces Area properties by dictionaries).
+    """
+
+    return {name: value for name, value in vars(context_class).items()
+            if not name.startswith('__') and not callable(value) and not isinstance(value, (staticmethod, classmethod))}
+
+
+def set_class_values(context_class, values: dict):
+
+    for name in get_class_values(context_class).keys() - values.keys():  # attributes added by other context
+        delattr(context_class, name)
+
+    for name, value in values.items():
+        setattr(context_class, name, value)
+
+
+def copy_value(value):
+    return value if isinstance(value, property) else copy.deepcopy(value)
+
+
+def register_global(module_name: str, *names):
+    """
+    Function used by the modules with global variables that change during the simulation (i.e. the number of plots
+    of the step), to save them on each SimulationContext. The value at the moment of the registration is the initial one.
+    """
+
+    module = sys.modules[module_name]
+
+    for name in names:
+        MODULE_GLOBALS[(module_name, name)] = copy.deepcopy(getattr(module, name))
+
+
+def get_globals() -> dict:
+    """
+    Function that returns the current values of the variables saved by the contexts.
+    """
+
+    return {'PLOT_VARS': PLOT_VARS[:], 'TREE_VARS': TREE_VARS[:],
+            'classes': {context_class.__name__: get_class_values(context_class) for context_class in CONTEXT_CLASSES},
+            'modules': {key: getattr(sys.modules[key[0]], key[1]) for key in MODULE_GLOBALS}}
+
+
+def set_globals(values: dict):
+    """
+    Function that sets the values returned by get_globals. The lists keep being the same objects, because the modules
+    import them by reference.
+    """
+
+    PLOT_VARS[:] = values['PLOT_VARS']
+    TREE_VARS[:] = values['TREE_VARS']
+
+    for context_class in CONTEXT_CLASSES:
+        set_class_values(context_class, values['classes'][context_class.__name__])
+
+    for key, initial in MODULE_GLOBALS.items():  # modules registered after the context was created start with their initial value
+        setattr(sys.modules[key[0]], key[1], values['modules'][key] if key in values['modules'] else copy.deepcopy(initial))
+
+
+INITIAL_VALUES = {'PLOT_VARS': PLOT_VARS[:], 'TREE_VARS': TREE_VARS[:],
+                  'classes': {context_class.__name__: get_class_values(context_class) for context_class in CONTEXT_CLASSES}}
+
+
+class SimulationContext:
+    """
+    Variables of one simulation that the simulator keeps as module globals: PLOT_VARS and TREE_VARS (reduced by the models),
+    Area, Model and Warnings attributes, and the module variables registered with register_global.
+    Each context has its own copy of them, and they are set on the modules while the context is active (with context: ...),
+    so several simulations can be run on the same process without importing everything again; the context switches
+    are protected by a lock, so simulations on different threads run their operations one by one.
+    The engines, Simulation (steps and writers) and PlotStreaming run their code inside the context they receive.
+    """
+
+    __imports = dict()  # module path -> (PLOT_VARS, TREE_VARS) removed by the module when it was executed
+
+    def __init__(self):
+
+        self.__values = {'PLOT_VARS': INITIAL_VALUES['PLOT_VARS'][:], 'TREE_VARS': INITIAL_VALUES['TREE_VARS'][:],
+                         'classes': {name: {key: copy_value(value) for key, value in values.items()}
+                                     for name, values in INITIAL_VALUES['classes'].items()},
+                         'modules': {key: copy.deepcopy(initial) for key, initial in MODULE_GLOBALS.items()}}
+        self.__modules = set()  # modules imported by the context
+        self.__saved = None  # values of the modules before the context was activated
+        self.__depth = 0
+
+    @property
+    def plot_vars(self):
+        return PLOT_VARS if self.active else self.__values['PLOT_VARS']
+
+    @property
+    def tree_vars(self):
+        return TREE_VARS if self.active else self.__values['TREE_VARS']
+
+    @property
+    def active(self):
+        return self.__depth > 0
+
+    def get_class_value(self, context_class, name: str):
+        """
+        Function that returns the value of an attribute of Area, Model or Warnings on the context.
+        """
+
+        if self.active:
+            return getattr(context_class, name)
+        return self.__values['classes'][context_class.__name__][name]
+
+    def get_global(self, module_name: str, name: str):
+
+        if self.active:
+            return getattr(sys.modules[module_name], name)
+        return self.__values['modules'].get((module_name, name), MODULE_GLOBALS.get((module_name, name)))
+
+    def __getstate__(self):
+        """
+        Function used by pickle (i.e. a Simulation sent to dask workers). Properties of the classes can't be pickled,
+        so they are not copied; they are set again from the initial values when the copy is activated.
+        """
+
+        state = self.__dict__.copy()
+        values = dict(self.__values)
+        values['classes'] = {name: {key: value for key, value in class_values.items() if not isinstance(value, property)}
+                             for name, class_values in values['classes'].items()}
+        state['_SimulationContext__values'] = values
+        state['_SimulationContext__saved'] = None
+        state['_SimulationContext__depth'] = 0
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        for name, class_values in INITIAL_VALUES['classes'].items():
+            for key, value in class_values.items():
+                if isinstance(value, property):
+                    self.__values['classes'][name].setdefault(key, value)
+
+    def __enter__(self):
+
+        CONTEXT_LOCK.acquire()
+
+        if self.__depth == 0:
+            self.__saved = get_globals()
+            set_globals(self.__values)
+
+        self.__depth += 1
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.__depth -= 1
+
+        if self.__depth == 0:
+            self.__values = get_globals()
+            set_globals(self.__saved)
+            self.__saved = None
+
+        CONTEXT_LOCK.release()
+
+        return False
+
+    def import_module(self, class_name, class_path, configuration=None):
+        """
+        Function that creates a model as Tools.import_module, inside the context.
+        Models remove their variables from PLOT_VARS and TREE_VARS when their module is executed, that is done only once
+        on the process, so the removed variables are saved to remove them from the lists of the other contexts.
+        """
+
+        with self:
+
+            if class_path not in SimulationContext.__imports:
+
+                plot_vars, tree_vars = PLOT_VARS[:], TREE_VARS[:]
+
+                if class_path in sys.modules:  # imported out of any context, it's executed again to know its changes
+                    importlib.reload(sys.modules[class_path])
+
+                model = Tools.import_module(class_name, class_path, configuration)
+                SimulationContext.__imports[class_path] = ([var for var in plot_vars if var not in PLOT_VARS],
+                                                           [var for var in tree_vars if var not in TREE_VARS])
+
+            else:
+
+                model = Tools.import_module(class_name, class_path, configuration)
+
+                if class_path not in self.__modules:
+                    plot_vars, tree_vars = SimulationContext.__imports[class_path]
+                    PLOT_VARS[:] = [var for var in PLOT_VARS if var not in plot_vars]
+                    TREE_VARS[:] = [var for var in TREE_VARS if var not in tree_vars]
+
+            self.__modules.add(class_path)
+
+        return model
@@ -16,11 +16,18 @@
 # ==============================================================================
 
 from .tree import Tree
+from .tree import FIRST_NEW_TREE_ID
+from .tree_table import TreeTable
+from .sort_index import SortIndex
+from .plot_aggregates import AGGREGATE_VARS
+from .plot_aggregates import get_plot_aggregates
 from .general import Area, Model, Warnings
+from .context import register_global
 from util import Tools
 from openpyxl import Workbook
 from openpyxl.styles import Alignment, Border, Side, Color, PatternFill, Font
 from .search.order_criteria import OrderCriteria
+from .search.search_criteria import SearchCriteria
 from data.variables import *  
 from data.inventory_translations.es import ES_PLOT
 from data.inventory_translations.gl import GL_PLOT
@@ -56,6 +63,10 @@ class Plot:
         self.__dead_trees = dict()  # dictionary useful to basic_engine calculations about dead trees
         self.__cut_trees = dict()  # dictionary useful to basic_engine calculations about cut trees
         self.__ingrowth_trees = dict()  # dictionary useful to basic_engine calculations about ingrowth trees
+        self.__tree_table = None  # inventory TreeTable where the trees of the plot are saved (see build_tree_table)
+        self.__tree_rows = None  # rows of the TreeTable used by each group of trees (alive, dead, cut, ingrowth)
+        self.__sort_index = SortIndex()  # sorted lists of trees used on the step (see get_sorted_trees)
+        self.__last_tree_id = FIRST_NEW_TREE_ID  # code of the last tree created by the ingrowth function on the plot
 
         if data is None:  # at the first time, when variables are uploaded to the simulator...
             Tools.print_log_line("No data info. The Plot has been created empty.", logging.WARNING)
@@ -121,6 +132,9 @@ class Plot:
         It is activated by basic_engine file, using apply_tree_model function.
         """
 
+        self.__tree_rows = None  # the trees of the plot are not the same as the saved on the TreeTable
+        self.__sort_index.clear()
+
         if tree.get_value('status') is None:  # No status indicates that the tree is alive
             self.__trees[tree.id] = tree
         elif tree.get_value('status') == 'M':  # M status indicates that the tree is dead
@@ -136,6 +150,9 @@ class Plot:
         It is activated by basic_engine file, using apply_tree_model function.
         """
 
+        self.__tree_rows = None
+        self.__sort_index.clear()
+
         for tree in trees:
 
             if tree.get_value('status') is None or tree.get_value('status') == '':  # No status indicates that the tree is alive
@@ -147,6 +164,19 @@ class Plot:
             elif tree.get_value('status') == 'I':  # I status indicates that the tree is new (incorporated to the stand)
                 self.__ingrowth_trees[tree.id] = tree
 
+    def replace_trees(self, trees: list):
+        """
+        That function replaces the alive trees of the plot by a new list of trees (i.e. after merging some of them).
+        It is activated by basic_engine file, using apply_tree_model function.
+        """
+
+        self.__tree_rows = None
+        self.__sort_index.clear()
+
+        self.__trees.clear()
+        for tree in trees:
+            self.__trees[tree.id] = tree
+
 
     def get_tree(self, id: int):
         return self.__trees[id] if id in self.__trees.keys() else None
@@ -180,6 +210,101 @@ class Plot:
     def get_number_trees(self):
         return len(self.__trees)
 
+    def get_trees_by_status(self, status=None):
+        """
+        Function that returns the trees of a group: alive (None or ''), dead ('M'), cut ('C') or ingrowth ('I').
+        """
+
+        if status is None or status == '':
+            return self.__trees.values()
+        elif status == 'M':
+            return self.__dead_trees.values()
+        elif status == 'C':
+            return self.__cut_trees.values()
+        elif status == 'I':
+            return self.__ingrowth_trees.values()
+        return None
+
+    @property
+    def tree_table(self):
+        return self.__tree_table
+
+    @property
+    def tree_rows(self):
+        return self.__tree_rows
+
+    def bind_tree_table(self, table, rows: dict):
+        """
+        Function used by Inventory to link the plot with the rows of the TreeTable where its trees are saved.
+        rows is a dict {status: slice of the table}, with the same keys as get_trees_by_status.
+        """
+
+        self.__tree_table = table
+        self.__tree_rows = rows
+
+    def __getstate__(self):
+        """
+        Function used by pickle. The link with the TreeTable is not saved, as the trees are copied by themselves,
+        and neither the sorted lists of trees, as the changes of the variables are counted by each process.
+        """
+
+        state = self.__dict__.copy()
+        state['_Plot__tree_table'] = None
+        state['_Plot__tree_rows'] = None
+        state['_Plot__sort_index'] = SortIndex()
+        return state
+
+    @property
+    def last_tree_id(self):
+        return self.__last_tree_id
+
+    def new_tree_id(self):
+        """
+        Function that returns the code of a new tree created by the ingrowth function on the plot.
+        The codes follow a sequence of each plot, which is kept by the plots cloned from it on the next steps, so they
+        are the same whatever the order of the plots is (i.e. on the parallel engines).
+        """
+
+        self.__last_tree_id += 1
+
+        return self.__last_tree_id
+
+    def get_column(self, variable: str, status=None, dtype=None):
+        """
+        Function that returns the values of a tree variable for a group of trees of the plot as a NumPy array.
+        If the plot trees are saved on a TreeTable, the values are read directly from its column.
+        """
+
+        if self.__tree_rows is not None and self.__tree_table.valid:
+            key = None if status == '' else status
+            return self.__tree_table.column(variable, self.__tree_rows[key], dtype)
+
+        return TreeTable.from_trees(self.get_trees_by_status(status)).column(variable, dtype=dtype)
+
+    def get_columns(self, variables: list, status=None, dtype=np.float64):
+        """
+        Function that returns several tree variables of a group of trees as a dict of NumPy arrays (see get_column).
+        Variables that the trees don't have are returned as NaN values.
+        """
+
+        if self.__tree_rows is not None and self.__tree_table.valid:
+            table = self.__tree_table
+            rows = np.arange(len(table))[self.__tree_rows[None if status == '' else status]]
+        else:
+            table = TreeTable.from_trees(self.get_trees_by_status(status))
+            rows = None
+
+        size = len(table) if rows is None else len(rows)
+        columns = dict()
+
+        for variable in variables:
+            if size > 0 and table.has_column(variable):
+                columns[variable] = table.column(variable, rows, dtype)
+            else:
+                columns[variable] = np.full(size, np.nan)
+
+        return columns
+
     def get_trees_array(self):
         tmp = list()
         for tree in self.__trees.values():
@@ -193,10 +318,45 @@ class Plot:
         return tmp
 
     def short_trees_on_list(self, variable: str, order: int = DESC):
-        if order == DESC:
-            return sorted(self.__trees.values(), key=lambda tree: tree.get_value(variable), reverse=True)
+        return self.get_sorted_trees(variable, None, order == DESC)
+
+    @property
+    def sort_index(self):
+        return self.__sort_index
+
+    def get_sorted_trees(self, variable: str, status=None, reverse: bool = False):
+        """
+        Function that returns the trees of a group (see get_trees_by_status) sorted by a variable.
+        The order is saved on the plot and used again until the trees of the plot or the values of the variable change.
+        """
+
+        return self.__sort_index.get_trees(self.get_trees_by_status(status), variable, status, reverse)
+
+    def get_trees_by_order(self, order_criteria: OrderCriteria, status=None):
+        """
+        Function that returns the trees of a group in the order of order_criteria, as Tree.get_sord_and_order_tree_list does.
+        """
+
+        if order_criteria.len() > 1:
+            return order_criteria.sort(self.get_trees_by_status(status))
+        return self.get_sorted_trees(order_criteria.get_first(), status, order_criteria.reverse)
+
+    def get_trees_by_criteria(self, search_criteria: SearchCriteria = None, order_criteria: OrderCriteria = None,
+                              status=None):
+        """
+        Function that returns the trees of a group that pass search_criteria, in the order of order_criteria.
+        The sorted lists of the plot are used again, and the criteria are evaluated at once over the columns of the trees.
+        """
+
+        if order_criteria is not None:
+            trees = self.get_trees_by_order(order_criteria, status)
         else:
-            return sorted(self.__trees.values(), key=lambda tree: tree.get_value(variable), reverse=False)
+            trees = list(self.get_trees_by_status(status))
+
+        if search_criteria is not None:
+            trees = search_criteria.select(trees)
+
+        return trees
 
     def add_value(self, variable, value):
         """
@@ -1986,7 +2146,11 @@ class Plot:
         for variable in PLOT_VARS:
             self.__values[variable] = plot.get_value(variable)
 
+        self.__last_tree_id = plot.last_tree_id
+
         if full:
+            self.__tree_rows = None
+            self.__sort_index.clear()
             for tree in plot.trees:
                 tmp_tree = Tree()
                 tmp_tree.clone(tree)
@@ -1994,8 +2158,10 @@ class Plot:
 
     def clone_by_variable(self, plot, variable: str, value):
 
+        self.__sort_index.clear()
         for variable in PLOT_VARS:
             self.__values[variable] = plot.get_value(variable)
+        self.__last_tree_id = plot.last_tree_id
         for tree in plot.trees:
             if tree.get_value(variable) == value:
                 tmp_tree = Tree()
@@ -2076,71 +2242,21 @@ class Plot:
         """
         Function necessary to recalculate the plot variables.
         It is used when tree and plot variables are updated after an execution. Only alive trees are used inside that function.
+        The values are calculated from the columns of the trees (see data/plot_aggregates.py).
         """
 
-        tree_expansion: float = 0.0
-
-        order_criteria = OrderCriteria(ASC)
-        order_criteria.add_criteria('dbh')
-
-        expansion_trees = Tree.get_sord_and_order_tree_list(self.__trees.values(), order_criteria=order_criteria)
-        selection_trees = list()
-
-        for tree in expansion_trees:  # select 100 taller trees
-            if tree_expansion < 100:
-                tree_expansion += tree.expan
-                selection_trees.append(tree)
-            else:
-                break
-
-
-        plot_expan = plot_expan_2 = plot_ba = plot_dbh = plot_dbh2 = max_dbh = max_h = max_ba = plot_h = 0
-        min_dbh = min_ba = min_h = 9999
-
-        for tree in self.__trees.values():
-
-            if tree.height == 0 and tree.bal == 0 and tree.vol == 0 and tree.dbh != 0:  # skip trees created on ingrowth function
-                continue
-
-            plot_expan += tree.expan
-            plot_ba += tree.basal_area*tree.expan
-            plot_dbh += tree.dbh*tree.expan
-            plot_dbh2 += math.pow(tree.dbh, 2)*tree.expan
-            
-            if tree.height != 0 and tree.height != '':  # condition to avoid lack of tree height information
-                plot_h += tree.height*tree.expan
-                plot_expan_2 += tree.expan  
-            
-                max_h = tree.height if tree.height > max_h else max_h
-                min_h = tree.height if tree.height < min_h else min_h
-
-            max_dbh = tree.dbh if tree.dbh > max_dbh else max_dbh
-            min_dbh = tree.dbh if tree.dbh < min_dbh else min_dbh
+        return self.set_aggregates(get_plot_aggregates(self.get_columns(AGGREGATE_VARS)))
 
-            max_ba = tree.basal_area if tree.basal_area > max_ba else max_ba
-            min_ba = tree.basal_area if tree.basal_area < min_ba else min_ba
-
-        self.__values['DENSITY'] = plot_expan
-
-        self.__values['DOMINANT_DBH'] = self.get_dominant_diameter(selection_trees)
-        if plot_expan != 0:
-            self.__values['MEAN_DBH'] = plot_dbh/plot_expan
-            self.__values['QM_DBH'] = math.sqrt(plot_dbh2/plot_expan)     
-        self.__values['DBH_MAX'] = max_dbh
-        self.__values['DBH_MIN'] = min_dbh
+    def set_aggregates(self, aggregates: dict):
+        """
+        Function that saves the values calculated by get_plot_aggregates, and the variables that are calculated from them.
+        It is used by recalculate, and by Inventory.recalculate with the values of all the plots.
+        """
 
-        self.__values['DOMINANT_H'] = self.get_dominant_height(selection_trees)
-        if plot_expan_2 != 0:
-            self.__values['MEAN_H'] = plot_h/plot_expan_2      
-        self.__values['H_MAX'] = max_h
-        self.__values['H_MIN'] = min_h
+        for variable, value in aggregates.items():
+            self.__values[variable] = value
 
-        self.__values['DOMINANT_SECTION'] = self.get_dominant_section(selection_trees)        
-        self.__values['BASAL_AREA'] = plot_ba/10000
-        if plot_expan != 0:
-            self.__values['MEAN_BA'] = plot_ba/plot_expan
-        self.__values['BA_MAX'] = max_ba
-        self.__values['BA_MIN'] = min_ba
+        plot_expan = self.__values['DENSITY']
 
         if self.dominant_dbh != '' and self.dominant_dbh != 0:
             self.__values['SLENDERNESS_DOM'] = self.dominant_h*100/self.dominant_dbh
@@ -3089,7 +3205,7 @@ class Plot:
             order_criteria = OrderCriteria(DESC)  # we stablish the criteria to order the trees at the output
             order_criteria.add_criteria('TREE_ID')  # we stablish the order of the output trees by id
 
-            alive_trees: Tree = Tree.get_sord_and_order_tree_list(self.__trees.values(), order_criteria=order_criteria)  
+            alive_trees: Tree = self.get_trees_by_order(order_criteria)  
             for tree in alive_trees:  # print alive trees
                 row += 1
                 tree_n += 1
@@ -3099,7 +3215,7 @@ class Plot:
                 tree.to_xslt(ws_node, row, decimals)
 
 
-            dead_trees: Tree = Tree.get_sord_and_order_tree_list(self.__dead_trees.values(), order_criteria=order_criteria)
+            dead_trees: Tree = self.get_trees_by_order(order_criteria, 'M')
             for tree in dead_trees:  # print dead trees
                 row += 1
                 tree_n += 1
@@ -3108,7 +3224,7 @@ class Plot:
                         self.cell_color(ws_node, tree_n + 1)
                 tree.to_xslt(ws_node, row, decimals)
 
-            cut_trees: Tree = Tree.get_sord_and_order_tree_list(self.__cut_trees.values(), order_criteria=order_criteria)
+            cut_trees: Tree = self.get_trees_by_order(order_criteria, 'C')
             for tree in cut_trees:  # print cut trees
                 row += 1
                 tree_n += 1
@@ -3117,7 +3233,7 @@ class Plot:
                         self.cell_color(ws_node, tree_n + 1)
                 tree.to_xslt(ws_node, row, decimals)
 
-            ingrowth_trees: Tree = Tree.get_sord_and_order_tree_list(self.__ingrowth_trees.values(), order_criteria=order_criteria)
+            ingrowth_trees: Tree = self.get_trees_by_order(order_criteria, 'I')
             for tree in ingrowth_trees:  # print added trees
                 row += 1
                 tree_n += 1
@@ -3171,7 +3287,7 @@ class Plot:
             order_criteria = OrderCriteria(DESC)  # we stablish the criteria to order the trees at the output
             order_criteria.add_criteria('TREE_ID')  # we stablish the order of the output trees by id
 
-            alive_trees: Tree = Tree.get_sord_and_order_tree_list(self.__trees.values(), order_criteria=order_criteria)  
+            alive_trees: Tree = self.get_trees_by_order(order_criteria)  
             for tree in alive_trees:  # print alive trees
                 row += 1
                 tree_n += 1
@@ -3181,7 +3297,7 @@ class Plot:
                 tree.to_xslt(ws_node, row, decimals)
 
 
-            dead_trees: Tree = Tree.get_sord_and_order_tree_list(self.__dead_trees.values(), order_criteria=order_criteria)
+            dead_trees: Tree = self.get_trees_by_order(order_criteria, 'M')
             for tree in dead_trees:  # print dead trees
                 row += 1
                 tree_n += 1
@@ -3190,7 +3306,7 @@ class Plot:
                         self.cell_color(ws_node, tree_n + 1)
                 tree.to_xslt(ws_node, row, decimals)
 
-            cut_trees: Tree = Tree.get_sord_and_order_tree_list(self.__cut_trees.values(), order_criteria=order_criteria)
+            cut_trees: Tree = self.get_trees_by_order(order_criteria, 'C')
             for tree in cut_trees:  # print cut trees
                 row += 1
                 tree_n += 1
@@ -3199,7 +3315,7 @@ class Plot:
                         self.cell_color(ws_node, tree_n + 1)
                 tree.to_xslt(ws_node, row, decimals)
 
-            ingrowth_trees: Tree = Tree.get_sord_and_order_tree_list(self.__ingrowth_trees.values(), order_criteria=order_criteria)
+            ingrowth_trees: Tree = self.get_trees_by_order(order_criteria, 'I')
             for tree in ingrowth_trees:  # print added trees
                 row += 1
                 tree_n += 1
@@ -3303,4 +3419,6 @@ class Plot:
 
 global initial_scenario_age, last_row_on_tree_sheet
 initial_scenario_age = 0
-last_row_on_tree_sheet = 1
\ No newline at end of file
+last_row_on_tree_sheet = 1
+
+register_global(__name__, 'initial_scenario_age', 'last_row_on_tree_sheet')
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import numpy as np
+import math
+
+
+DOMINANT_EXPAN = 100  # number of trees per hectare used to calculate the dominant values (the bigger trees by dbh)
+
+AGGREGATE_VARS = ['expan', 'dbh', 'height', 'basal_area', 'bal', 'vol']  # tree variables needed by get_plot_aggregates
+
+MIN_CANDIDATES = 16  # first number of candidates of the partial sort used to find the dominant trees
+
+
+def sequential_sum(values):
+    """
+    Function that sums the values one by one, in order. The result is the same (to the last bit) as the one of the loops
+    over the trees of the plot, so the outputs of the simulator don't change. An empty array sums 0.
+    """
+
+    if len(values) == 0:
+        return 0
+    return float(np.cumsum(values)[-1])
+
+
+def get_used_trees(dbh, height, bal, vol):
+    """
+    Function that returns which trees are used by the plot variables: the trees created by the ingrowth function on the
+    step (dbh without height, bal and vol values yet) are not used.
+    """
+
+    return ~((height == 0) & (bal == 0) & (vol == 0) & (dbh != 0))
+
+
+def get_max(values, initial):
+    """
+    Function that returns the maximum of the values bigger than initial, or initial if there aren't. NaN values are not used.
+    """
+
+    values = values[values > initial]
+    return initial if len(values) == 0 else float(values.max())
+
+
+def get_min(values, initial):
+    """
+    Function that returns the minimum of the values smaller than initial, or initial if there aren't. NaN values are not used.
+    """
+
+    values = values[values < initial]
+    return initial if len(values) == 0 else float(values.min())
+
+
+def get_dbh_order(dbh, rows):
+    """
+    Function that returns the rows sorted by dbh, from the bigger to the smaller one. Trees with the same dbh keep their order,
+    as the sorted lists of the plot (empty dbh values are sorted as 0).
+    """
+
+    key = np.nan_to_num(dbh[rows], nan=0.0)
+    return rows[np.lexsort((rows, -key))]
+
+
+def get_dominant_count(expan):
+    """
+    Function that returns how many trees (sorted by dbh) are the dominant ones: trees are added while the expan of the
+    previous ones is smaller than DOMINANT_EXPAN.
+    """
+
+    sums = np.cumsum(expan)
+    full = np.flatnonzero(~(sums < DOMINANT_EXPAN))  # first tree that completes the dominant expan (NaN stops as well)
+    return len(expan) if len(full) == 0 else int(full[0]) + 1
+
+
+def get_dominant_rows(dbh, expan):
+    """
+    Function that returns the rows of the dominant trees, sorted by dbh.
+    Only the bigger trees are sorted (partial sort): the number of candidates is doubled until their expan is enough.
+    """
+
+    size = len(dbh)
+    candidates = min(size, MIN_CANDIDATES)
+
+    while True:
+
+        if candidates < size:
+            key = np.nan_to_num(dbh, nan=0.0)
+            threshold = np.partition(key, size - candidates)[size - candidates]
+            rows = np.flatnonzero(key >= threshold)  # trees with the same dbh as the last candidate are included too
+        else:
+            rows = np.arange(size)
+
+        rows = get_dbh_order(dbh, rows)
+        count = get_dominant_count(expan[rows])
+
+        if count < len(rows) or len(rows) == size:
+            return rows[:count]
+
+        candidates *= 2
+
+
+def get_dominant_mean(values, expan):
+    """
+    Function that returns the mean of the values of the dominant trees, weighted by their expan.
+    The last tree only uses the part of its expan needed to complete DOMINANT_EXPAN.
+    It gives the same result as get_dominant_diameter/get_dominant_height/get_dominant_section of Plot.
+    """
+
+    if len(values) == 0:
+        return 0
+
+    sums = np.cumsum(expan)
+    full = np.flatnonzero(~(sums < DOMINANT_EXPAN))
+
+    if len(full) == 0:
+        accumulate = float(sums[-1])  # the output only rounds python float values
+        products = values * expan
+    else:
+        last = int(full[0])
+        before = sums[last - 1] if last > 0 else 0
+        accumulate = DOMINANT_EXPAN
+        products = np.append(values[:last] * expan[:last], (DOMINANT_EXPAN - before) * values[last])
+
+    if accumulate != 0:
+        return sequential_sum(products) / accumulate
+    return 0
+
+
+def get_dominant_values(columns: dict, rows):
+    """
+    Function that returns the dominant dbh, height and section of the trees of rows (the dominant trees, sorted by dbh).
+    """
+
+    expan, height = columns['expan'][rows], columns['height'][rows]
+    with_height = (height != 0) & ~np.isnan(height)  # trees without height values are not used
+
+    return {'DOMINANT_DBH': get_dominant_mean(columns['dbh'][rows], expan),
+            'DOMINANT_H': get_dominant_mean(height[with_height], expan[with_height]),
+            'DOMINANT_SECTION': get_dominant_mean(columns['basal_area'][rows], expan)}
+
+
+def get_mean_values(columns: dict):
+    """
+    Function that returns the sums, maximum and minimum values of the trees of a plot, not using the trees
+    created by the ingrowth function on the step.
+    """
+
+    expan, dbh, height, basal_area = columns['expan'], columns['dbh'], columns['height'], columns['basal_area']
+
+    used = get_used_trees(dbh, height, columns['bal'], columns['vol'])
+    expan, dbh, height, basal_area = expan[used], dbh[used], height[used], basal_area[used]
+    with_height = (height != 0) & ~np.isnan(height)
+
+    plot_expan = sequential_sum(expan)
+    plot_expan_2 = sequential_sum(expan[with_height])
+    plot_ba = sequential_sum(basal_area * expan)
+    plot_dbh = sequential_sum(dbh * expan)
+    plot_dbh2 = sequential_sum(dbh * dbh * expan)
+    plot_h = sequential_sum(height[with_height] * expan[with_height])
+
+    values = {'DENSITY': plot_expan,
+              'DBH_MAX': get_max(dbh, 0), 'DBH_MIN': get_min(dbh, 9999),
+              'H_MAX': get_max(height[with_height], 0), 'H_MIN': get_min(height[with_height], 9999),
+              'BASAL_AREA': plot_ba / 10000,
+              'BA_MAX': get_max(basal_area, 0), 'BA_MIN': get_min(basal_area, 9999)}
+
+    if plot_expan != 0:
+        values['MEAN_DBH'] = plot_dbh / plot_expan
+        values['QM_DBH'] = math.sqrt(plot_dbh2 / plot_expan)
+        values['MEAN_BA'] = plot_ba / plot_expan
+    if plot_expan_2 != 0:
+        values['MEAN_H'] = plot_h / plot_expan_2
+
+    return values
+
+
+def get_plot_aggregates(columns: dict):
+    """
+    Function that calculates the plot variables of Plot.recalculate from the columns of the alive trees (AGGREGATE_VARS
+    as float arrays, empty values as NaN). MEAN_* and QM_DBH are not returned if they can't be calculated.
+    """
+
+    values = get_mean_values(columns)
+    values.update(get_dominant_values(columns, get_dominant_rows(columns['dbh'], columns['expan'])))
+
+    return values
+
+
+def get_plots_aggregates(columns: dict, plot_index, n_plots: int):
+    """
+    Function that calculates the values of get_plot_aggregates for several plots at once.
+    columns are the alive trees of all the plots, and plot_index the position of the plot of each tree (0 to n_plots - 1).
+    The trees are sorted by plot and dbh only once, and the sums are made by plot with bincount (one by one, in order).
+    """
+
+    plot_index = np.asarray(plot_index, dtype=np.int64)
+    expan, dbh, height, basal_area = columns['expan'], columns['dbh'], columns['height'], columns['basal_area']
+
+    used = get_used_trees(dbh, height, columns['bal'], columns['vol'])
+    with_height = used & (height != 0) & ~np.isnan(height)
+
+    def sum_by_plot(values, mask):
+        sums = np.bincount(plot_index[mask], weights=values[mask], minlength=n_plots)
+        counts = np.bincount(plot_index[mask], minlength=n_plots)
+        return [float(value) if count > 0 else 0 for value, count in zip(sums.tolist(), counts.tolist())]
+
+    def extreme_by_plot(values, mask, initial, function):
+        result = np.full(n_plots, np.nan)
+        selected = mask & (values > initial if function is np.fmax else values < initial)
+        function.at(result, plot_index[selected], values[selected])
+        return [initial if np.isnan(value) else value for value in result.tolist()]
+
+    plot_expan = sum_by_plot(expan, used)
+    plot_expan_2 = sum_by_plot(expan, with_height)
+    plot_ba = sum_by_plot(basal_area * expan, used)
+    plot_dbh = sum_by_plot(dbh * expan, used)
+    plot_dbh2 = sum_by_plot(dbh * dbh * expan, used)
+    plot_h = sum_by_plot(height * expan, with_height)
+
+    dbh_max, dbh_min = extreme_by_plot(dbh, used, 0, np.fmax), extreme_by_plot(dbh, used, 9999, np.fmin)
+    h_max, h_min = extreme_by_plot(height, with_height, 0, np.fmax), extreme_by_plot(height, with_height, 9999, np.fmin)
+    ba_max, ba_min = extreme_by_plot(basal_area, used, 0, np.fmax), extreme_by_plot(basal_area, used, 9999, np.fmin)
+
+    rows = np.arange(len(plot_index))
+    order = rows[np.lexsort((rows, -np.nan_to_num(dbh, nan=0.0), plot_index))]
+    bounds = np.searchsorted(plot_index[order], np.arange(n_plots + 1))
+
+    aggregates = list()
+
+    for plot in range(n_plots):
+
+        values = {'DENSITY': plot_expan[plot],
+                  'DBH_MAX': dbh_max[plot], 'DBH_MIN': dbh_min[plot],
+                  'H_MAX': h_max[plot], 'H_MIN': h_min[plot],
+                  'BASAL_AREA': plot_ba[plot] / 10000,
+                  'BA_MAX': ba_max[plot], 'BA_MIN': ba_min[plot]}
+
+        if plot_expan[plot] != 0:
+            values['MEAN_DBH'] = plot_dbh[plot] / plot_expan[plot]
+            values['QM_DBH'] = math.sqrt(plot_dbh2[plot] / plot_expan[plot])
+            values['MEAN_BA'] = plot_ba[plot] / plot_expan[plot]
+        if plot_expan_2[plot] != 0:
+            values['MEAN_H'] = plot_h[plot] / plot_expan_2[plot]
+
+        plot_rows = order[bounds[plot]:bounds[plot + 1]]
+        values.update(get_dominant_values(columns, plot_rows[:get_dominant_count(expan[plot_rows])]))
+
+        aggregates.append(values)
+
+    return aggregates
@@ -15,6 +15,9 @@
 # limitations under the License.
 # ==============================================================================
 
+from ..sort_index import sort_trees
+
+
 DESC = 1
 ASC = 2
 
@@ -33,6 +36,10 @@ class OrderCriteria:
     def criterion(self):
         return self.__criterion
 
+    @property
+    def reverse(self):
+        return self.__type != DESC  # DESC sorts from lower to bigger values
+
     def add_criteria(self, variable: str):
         self.__criterion.append(variable)
 
@@ -46,3 +53,11 @@ class OrderCriteria:
 
     def len(self):
         return len(self.criterion)
+
+    def sort(self, trees: list):
+        """
+        Function that returns a new list with the trees sorted by all the criteria (the first one is the main one).
+        The values are sorted at once with np.lexsort, and the trees with the same values keep their order.
+        """
+
+        return sort_trees(trees, self.__criterion, self.reverse)
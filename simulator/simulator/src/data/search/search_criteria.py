@@ -15,12 +15,21 @@
 # limitations under the License.
 # ==============================================================================
 
+from ..sort_index import FLOAT_INT_MAX
+from ..tree_table import TreeTable
+
+import numpy as np
+
+
 EQUAL = 1
 LESS = 2
 GREATER = 3
 LESSEQUAL = 4
 GREATEREQUAL = 5
 
+COMPARISONS = {EQUAL: np.equal, LESS: np.less, GREATER: np.greater, LESSEQUAL: np.less_equal,
+               GREATEREQUAL: np.greater_equal}
+
 
 class Criteria:
 
@@ -54,6 +63,33 @@ class Criteria:
         if self.__comparison == GREATEREQUAL:
             return value >= self.__value
 
+    def is_vectorized(self, values: np.ndarray):
+        """
+        Function that checks if the criteria can be compared at once over a numeric array, with the same results as is_valid.
+        Numeric arrays have the empty values ('') as NaN, and ('' < value) is an error, so then the values are compared one by one.
+        """
+
+        if type(self.__value) not in (int, float) or abs(self.__value) > FLOAT_INT_MAX:
+            return False
+        if values.dtype == np.float64:
+            return not np.isnan(values).any()
+        return len(values) == 0 or int(np.abs(values).max()) <= FLOAT_INT_MAX
+
+    def get_mask(self, values):
+        """
+        Function that evaluates the criteria over the values of n trees at once, returning a boolean array.
+        Object arrays (None, str...) are compared value by value by NumPy, as is_valid does.
+        """
+
+        values = np.asarray(values)
+        comparison = COMPARISONS.get(self.__comparison)
+
+        if comparison is None:
+            return np.zeros(len(values), dtype=bool)
+
+        with np.errstate(invalid='ignore'):
+            return np.asarray(comparison(values, self.__value), dtype=bool)
+
 
 class SearchCriteria:
 
@@ -66,3 +102,30 @@ class SearchCriteria:
 
     def add_criteria(self, variable, valor, comparison):
         self.__criterios.append(Criteria(variable, valor, comparison))
+
+    def get_mask(self, table: TreeTable):
+        """
+        Function that returns which trees of a TreeTable pass all the criteria, as a boolean array.
+        The columns of the table are compared at once; the empty values of the numeric columns are compared one by one.
+        """
+
+        mask = np.ones(len(table), dtype=bool)
+
+        for criteria in self.__criterios:
+            values = table.column(criteria.variable)
+            if values.dtype != object and not criteria.is_vectorized(values):
+                values = np.empty(len(table), dtype=object)
+                values[:] = [tree.get_value(criteria.variable) for tree in table.trees] if table.trees is not None \
+                    else [table.get_row_value(row, criteria.variable) for row in range(len(table))]
+            mask &= criteria.get_mask(values)
+
+        return mask
+
+    def select(self, trees: list):
+        """
+        Function that returns a new list with the trees that pass all the criteria, in the same order.
+        """
+
+        trees = list(trees)
+        mask = self.get_mask(TreeTable.from_trees(trees))
+        return [tree for tree, valid in zip(trees, mask.tolist()) if valid]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import numpy as np
+
+
+FLOAT_INT_MAX = 2 ** 53  # int values saved exactly on a float array
+
+VERSIONS = {None: 0}  # number of changes of each tree variable (on any tree); None counts the changes of all the variables at once
+
+
+def set_changed(variable=None):
+    """
+    Function that records a change of a tree variable, so the sorted lists using it are calculated again.
+    If variable is None, all the sorted lists are calculated again.
+    """
+
+    VERSIONS[variable] = VERSIONS.get(variable, 0) + 1
+
+
+def sort_key(*variables: str):
+    """
+    Function that returns the key used to sort the trees by one or more variables. Empty values (None) are sorted as 0.
+    """
+
+    def key(tree):
+        value = tree.get_value(variables[0])
+        return 0.0 if value is None else value
+
+    def keys(tree):
+        values = [tree.get_value(variable) for variable in variables]
+        return tuple(0.0 if value is None else value for value in values)
+
+    return key if len(variables) == 1 else keys
+
+
+def get_sort_key(values: list):
+    """
+    Function that returns the values of a variable as an array, to sort the trees with NumPy. Empty values (None) are 0.
+    It returns None if the values can not be sorted as numbers (str, NaN...), so the trees must be sorted by sort_key.
+    """
+
+    values = [0.0 if value is None else value for value in values]
+    types = set(type(value) for value in values)
+
+    if not types <= {int, float}:
+        return None
+    if int in types and any(abs(value) > FLOAT_INT_MAX for value in values if type(value) is int):
+        return None  # int values saved exactly only as python values
+
+    key = np.array(values, dtype=np.float64 if float in types else np.int64)
+    if float in types and np.isnan(key).any():
+        return None  # NaN values have no order
+
+    return key
+
+
+def get_sort_order(keys: list, reverse: bool = False):
+    """
+    Function that returns the order of the rows sorted by some keys (the first one is the main one), using np.lexsort.
+    The sort is stable, as sorted() also when reverse is True: rows with the same keys keep their order.
+    """
+
+    if len(keys) == 0 or len(keys[0]) == 0:
+        return np.arange(0)
+
+    if not reverse:
+        return np.lexsort(keys[::-1])
+
+    size = len(keys[0])
+    return (size - 1 - np.lexsort([key[::-1] for key in keys[::-1]]))[::-1]  # the rows are reversed to keep the ties
+
+
+def sort_trees(trees, variables: list, reverse: bool = False):
+    """
+    Function that returns a new list with the trees sorted by some variables, as sorted() does with sort_key.
+    """
+
+    trees = list(trees)
+    keys = [get_sort_key([tree.get_value(variable) for tree in trees]) for variable in variables]
+
+    if any(key is None for key in keys):
+        return sorted(trees, key=sort_key(*variables), reverse=reverse)
+
+    return [trees[row] for row in get_sort_order(keys, reverse).tolist()]
+
+
+class SortIndex:
+    """
+    Sorted lists of the trees of a plot, one for each variable, group of trees (status) and order.
+    A list is used again until the trees of the plot or the values of its variable change, so all the functions
+    that need the same order on a step (recalculate, bal, harvest models...) sort the trees only once.
+    """
+
+    def __init__(self):
+        self.__lists = dict()  # (variable, status, reverse) -> (versions of the variable, sorted trees)
+        self.__requests = 0
+        self.__sorts = 0
+        self.__changes = 0  # times that the trees of the plot changed, used by other indexes of the trees (i.e. SpatialIndex)
+
+    @property
+    def requests(self):
+        return self.__requests
+
+    @property
+    def sorts(self):
+        return self.__sorts
+
+    @property
+    def changes(self):
+        return self.__changes
+
+    def get_trees(self, trees, variable: str, status=None, reverse: bool = False):
+        """
+        Function that returns a new list with the trees sorted by the variable, as sorted() does.
+        trees must be the trees of the group (status) of the plot.
+        """
+
+        self.__requests += 1
+
+        key = (variable, None if status == '' else status, reverse)
+        version = (VERSIONS[None], VERSIONS.get(variable, 0))
+        saved = self.__lists.get(key)
+
+        if saved is None or saved[0] != version:
+            saved = (version, sort_trees(trees, [variable], reverse))
+            self.__lists[key] = saved
+            self.__sorts += 1
+
+        return list(saved[1])
+
+    def clear(self):
+        """
+        Function used when the trees of the plot change.
+        """
+
+        self.__lists.clear()
+        self.__changes += 1
@@ -16,7 +16,9 @@
 # ==============================================================================
 
 from util import Tools
-from .search.order_criteria import DESC
+from .tree_table import TreeRow
+from .tree_table import TreeValues
+from .sort_index import set_changed
 from data.variables import TREE_VARS
 from data.variables import TREE_VARS_ORIGINAL
 from data.inventory_translations.es import ES_TREE
@@ -35,12 +37,15 @@ STR_VALUES = ['status']  # status value of the trees (M-> die, C-> harvested, I-
 
 JSON_STR_VALUES = ['PLOT_ID', 'TREE_ID', 'specie']  # json variables list
 
+FIRST_NEW_TREE_ID = 1000000  # the trees created by the ingrowth function on each plot are coded from the next value (see Plot.new_tree_id)
+
 
 class Tree:
 
-    # variable to count new trees added by the ingrowth function
-    global new_ingrowth_tree
-    new_ingrowth_tree = 1000000
+    __ingrowth = False  # True for the trees created by the ingrowth function (see create_new_from_clone)
+
+    __clone_vars = (None, None)  # (TREE_VARS, variables of the trees made by clone_on_write) of the last clone
+    __clone_original = (None, None)  # (TREE_VARS_ORIGINAL, node 0 values of the trees made by clone_on_write)
 
     def __init__(self, data=None):
 
@@ -180,6 +185,8 @@ class Tree:
         Function neccesary to add a value to a tree variable by sustitution from the past value.
         """
 
+        set_changed(var)  # sorted lists of trees by var are not valid anymore
+
         try:
             if value is None:
                 self.__values[var] = value
@@ -198,6 +205,8 @@ class Tree:
         Function neccesary to add a value to a plot variable by sustitution from the past value. Is the same as add_value.
         """
 
+        set_changed(var)
+
         try:
             if var in STR_VALUES:
                 self.__values[var] = str(value)
@@ -214,6 +223,8 @@ class Tree:
         Function neccesary to sum a value to a plot variable.
         """
 
+        set_changed(var)
+
         try:
             if var in IDS_VALUES:
                 self.__values[var] = value  # as it can be a str value, we cannot sum/sub it
@@ -228,6 +239,8 @@ class Tree:
         Function neccesary to subtrack a value to a plot variable.
         """
 
+        set_changed(var)
+
         try:
             if var in IDS_VALUES:
                 self.__values[var] = value  # as it can be a str value, we cannot sum/sub it
@@ -254,6 +267,10 @@ class Tree:
         #else:
         return self.__values['TREE_ID']
 
+    @property
+    def ingrowth(self):
+        return self.__ingrowth
+
     def get_array(self):
         tmp = list()
         for key, value in self.__values.iteritems():
@@ -1031,6 +1048,7 @@ class Tree:
 
 
     def set_status(self, value):
+        set_changed('status')
         self.__values['status'] = value
 
     def clone(self, tree):
@@ -1042,34 +1060,119 @@ class Tree:
         for var_name in TREE_VARS:
             self.__values[var_name] = tree.get_value(var_name)
 
-    def create_new_from_clone(self, tree, n_code):
+        self.__ingrowth = tree.ingrowth
+
+    def create_new_from_clone(self, tree, tree_id):
         """
         Function used to create a new tree from a clone of a real tree information.
-        It is used on basic_engine file.
+        The new tree is marked as created by the ingrowth function (ingrowth = True).
+        It is used on engine/ingrowth.py file.
         Args.:
-            - self: list of trees (alive/ingrowth)
+            - self: new tree (alive/ingrowth)
             - tree: tree information to clone
-            - n_code: flag to know if a new tree should have a new code or not (each new tree is created twice, with status = 'I' and '')
+            - tree_id: code of the new tree, given by its plot (each new tree is created twice, with status = 'I' and '', with the same code)
         """
 
         for var_name in TREE_VARS:
 
-            # I just give to the tree a new label, the rest of variables are calculated on basic_engine
+            # I just give to the tree a new label, the rest of variables are calculated on engine/ingrowth.py
             if var_name == 'TREE_ID':
+                self.__values[var_name] = tree_id
+            else:
+                self.__values[var_name] = tree.get_value(var_name)
 
-                # global variable to don't repeat new codes
-                global new_ingrowth_tree
-                if n_code == 'new':
-                    new_ingrowth_tree += 1
+        self.__ingrowth = True
 
-                self.__values[var_name] = new_ingrowth_tree
+    @staticmethod
+    def clone_on_write(tree):
+        """
+        Function used to clone the tree information, with the same result as Tree() + clone(tree).
+        The new tree doesn't copy the values: it reads them from tree until they are changed (copy-on-write),
+        so the trees that are not modified on a step don't use new memory. From here, tree saves its changes apart too.
+        It is used on basic_engine file and harvest models.
+        """
 
-            else:
-                self.__values[var_name] = tree.get_value(var_name)
+        variables = Tree.__get_clone_vars()
+        values = tree.get_values()
+
+        if isinstance(values, TreeValues):
+            base = values.base
+            changes = {var_name: value for var_name, value in values.changes.items() if var_name in variables}
+        else:
+            tree.bind_values(TreeValues(values, owner=isinstance(values, TreeRow)), tree.get_values_original())
+            base = values
+            changes = dict()
+
+        changes['status'] = None
+
+        new_tree = Tree.__new__(Tree)
+        new_tree.__values = TreeValues(base, changes, variables)
+        new_tree.__values_original = TreeValues(Tree.__get_clone_original())
+        if tree.ingrowth:
+            new_tree.__ingrowth = True
+        return new_tree
+
+    @staticmethod
+    def __get_clone_vars():
+        """
+        Function that returns the variables of a cloned tree (TREE_VARS and status), as the keys of a dict.
+        """
+
+        tree_vars, variables = Tree.__clone_vars
+
+        if tree_vars != TREE_VARS:
+            tree_vars, variables = TREE_VARS[:], dict.fromkeys(TREE_VARS + ['status'])
+            Tree.__clone_vars = (tree_vars, variables)
 
+        return variables
+
+    @staticmethod
+    def __get_clone_original():
+        """
+        Function that returns the node 0 values of Tree(), shared by the trees made by clone_on_write.
+        """
+
+        tree_vars, values = Tree.__clone_original
+
+        if tree_vars != TREE_VARS_ORIGINAL:
+            tree_vars, values = TREE_VARS_ORIGINAL[:], dict.fromkeys(TREE_VARS_ORIGINAL, 0)
+            values['status'] = None
+            Tree.__clone_original = (tree_vars, values)
+
+        return values
+
+    def get_values(self):
+        """
+        Function that returns the mapping where the tree values are saved (a dict or a TreeRow view of a TreeTable).
+        """
+        return self.__values
+
+    def get_values_original(self):
+        """
+        Function that returns the mapping where the tree values of node 0 are saved.
+        """
+        return self.__values_original
+
+    def bind_values(self, values, values_original):
+        """
+        Function used by TreeTable to move the tree values into a row of the table.
+        """
+
+        self.__values = values
+        self.__values_original = values_original
+
+    def __getstate__(self):
+        """
+        Function used by pickle. The values of a tree saved on a TreeTable are copied as dicts.
+        """
+
+        state = self.__dict__.copy()
+        state['_Tree__values'] = dict(self.__values)
+        state['_Tree__values_original'] = dict(self.__values_original)
+        return state
 
     def json(self, tree):
-        return json.dumps(self.__values)
+        return json.dumps(dict(self.__values))
 
     @staticmethod
     def sum_tree_list(trees: list, variable: str):
@@ -1090,13 +1193,9 @@ class Tree:
         """
         Function neccesary to set an order of the trees in a plot.
         It is used in multiple files, models included.
+        The criteria are evaluated at once over the columns of the trees (see SearchCriteria.select and OrderCriteria.sort).
         """
 
-        def sort_key(element: Tree):
-            if element.get_value(order_criteria.get_first()) is None:
-                return 0.0
-            return element.get_value(order_criteria.get_first())
-
         if isinstance(input, dict):
             data = input.values()
         elif isinstance(input, list) or isinstance(input, {}.values().__class__):
@@ -1105,23 +1204,13 @@ class Tree:
             Tools.print_log_line('Input list must be list and dict', logging.WARNING)
             return None
 
-        tmp = list()
-
         if search_criteria is not None:
-            for tree in data:
-                valid = 0
-                for criteria in search_criteria.criterion:
-                    if criteria.is_valid(tree.get_value(criteria.variable)):
-                        valid += 1
-
-                if valid == len(search_criteria.criterion):
-                    tmp.append(tree)
+            tmp = search_criteria.select(data)
         else:
-            for tree in data:
-                tmp.append(tree)
+            tmp = list(data)
 
         if order_criteria is not None:
-            tmp = sorted(tmp, key=sort_key, reverse=False if order_criteria.type == DESC else True)
+            tmp = order_criteria.sort(tmp)
 
         return tmp
 
@@ -1131,6 +1220,8 @@ class Tree:
         Actually it is not working, is a simple translation from the last Simanfor
         """
 
+        set_changed()
+
         self.__values['expan'] = plot.density
         self.__values['height'] = plot.dominant_h
         self.__values['basal_area'] = plot.basal_area * 10000 / self.__values['expan']
@@ -1205,4 +1296,3 @@ class Tree:
         for key in self.__values_original.keys():
             column += 1
             sheet.cell(row=row, column=column).value = self.print_value_original(key, decimals)
-
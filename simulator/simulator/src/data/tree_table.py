@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from collections.abc import MutableMapping
+from .sort_index import set_changed
+
+import numpy as np
+
+
+INT_COLUMN = 'i'  # column stored as int64 values
+FLOAT_COLUMN = 'f'  # column stored as float64 values
+OBJECT_COLUMN = 'o'  # column stored as python objects (str, None, mixed types...)
+
+INT_MIN = -(2 ** 63)
+INT_MAX = 2 ** 63 - 1
+FLOAT_INT_MAX = 2 ** 53  # int values saved exactly on a float column
+
+STATUS = 'status'
+
+PLOT_STATUS = {None: None, '': None, 'M': 'M', 'C': 'C', 'I': 'I'}  # tree status -> plot group (None is alive)
+
+
+class TreeColumn:
+    """
+    One tree variable stored as a NumPy array.
+    Integer and float columns keep a mask for the empty values ('') of the inventories.
+    Values written with a different python type promote the column to objects, so the values read from
+    the column are always the same (type included) as the written ones.
+    """
+
+    def __init__(self, values: list):
+
+        kind = INT_COLUMN
+        empty = False
+        mixed = False
+
+        for value in values:
+            value_type = type(value)
+            if value_type is int:
+                if value < INT_MIN or value > INT_MAX:
+                    kind = OBJECT_COLUMN
+                    break
+                if abs(value) > FLOAT_INT_MAX:
+                    mixed = True  # it only fits on an int column
+            elif value_type is float:
+                kind = FLOAT_COLUMN if kind == INT_COLUMN else kind
+            elif value_type is str and value == '':
+                empty = True
+            else:
+                kind = OBJECT_COLUMN
+                break
+
+        if kind == FLOAT_COLUMN and mixed:
+            kind = OBJECT_COLUMN
+
+        self.__kind = kind
+        self.__empty = None  # mask of the empty values ('')
+        self.__integer = None  # mask of the int values saved on a float column
+
+        if kind == OBJECT_COLUMN:
+            self.__data = np.empty(len(values), dtype=object)
+            self.__data[:] = values
+            return
+
+        if empty:
+            self.__empty = np.array([type(value) is str for value in values], dtype=bool)
+            values = [0 if type(value) is str else value for value in values]
+
+        if kind == FLOAT_COLUMN:
+            integer = np.array([type(value) is int for value in values], dtype=bool)
+            if integer.any():
+                self.__integer = integer
+
+        self.__data = np.array(values, dtype=np.int64 if kind == INT_COLUMN else np.float64)
+
+    @property
+    def kind(self):
+        return self.__kind
+
+    def __len__(self):
+        return len(self.__data)
+
+    def get(self, row: int):
+        """
+        Function neccesary to obtain the python value stored on a row.
+        """
+
+        if self.__kind == OBJECT_COLUMN:
+            return self.__data[row]
+        if self.__empty is not None and self.__empty[row]:
+            return ''
+        if self.__integer is not None and self.__integer[row]:
+            return int(self.__data[row])
+        return self.__data.item(row)
+
+    def set(self, row: int, value):
+        """
+        Function neccesary to store a python value on a row. The column is promoted to objects if needed.
+        """
+
+        value_type = type(value)
+        kind = self.__kind
+
+        if kind == FLOAT_COLUMN and value_type is float:
+            self.__data[row] = value
+            if self.__integer is not None:
+                self.__integer[row] = False
+        elif kind == FLOAT_COLUMN and value_type is int and -FLOAT_INT_MAX <= value <= FLOAT_INT_MAX:
+            self.__data[row] = value
+            if self.__integer is None:
+                self.__integer = np.zeros(len(self.__data), dtype=bool)
+            self.__integer[row] = True
+        elif kind == INT_COLUMN and value_type is int and INT_MIN <= value <= INT_MAX:
+            self.__data[row] = value
+        elif kind == INT_COLUMN and value_type is float:
+            self.__to_float()
+            self.set(row, value)
+            return
+        elif kind != OBJECT_COLUMN and value_type is str and value == '':
+            if self.__empty is None:
+                self.__empty = np.zeros(len(self.__data), dtype=bool)
+            self.__empty[row] = True
+            return
+        else:
+            if kind != OBJECT_COLUMN:
+                self.__to_object()
+            self.__data[row] = value
+            return
+
+        if self.__empty is not None:
+            self.__empty[row] = False
+
+    def __to_float(self):
+
+        if (np.abs(self.__data) > FLOAT_INT_MAX).any():
+            self.__to_object()
+            return
+        self.__integer = np.ones(len(self.__data), dtype=bool)  # the old values keep being int
+        self.__data = self.__data.astype(np.float64)
+        self.__kind = FLOAT_COLUMN
+
+    def __to_object(self):
+
+        data = np.empty(len(self.__data), dtype=object)
+        if self.__kind == FLOAT_COLUMN and self.__integer is not None:
+            data[:] = [int(value) if integer else value
+                       for value, integer in zip(self.__data.tolist(), self.__integer.tolist())]
+        else:
+            data[:] = self.__data.tolist()
+        if self.__empty is not None:
+            data[self.__empty] = ''
+        self.__data = data
+        self.__empty = None
+        self.__integer = None
+        self.__kind = OBJECT_COLUMN
+
+    def values(self, rows=None):
+        """
+        Function that returns the column as a NumPy array.
+        Empty values ('') are returned as NaN on numeric columns; object columns are returned without conversion.
+        """
+
+        data = self.__data if rows is None else self.__data[rows]
+
+        if self.__kind == OBJECT_COLUMN:
+            return data.copy() if rows is None else data
+
+        empty = None
+        if self.__empty is not None:
+            empty = self.__empty if rows is None else self.__empty[rows]
+            if not empty.any():
+                empty = None
+
+        if empty is None:
+            return data.copy() if rows is None else data
+
+        data = data.astype(np.float64)
+        data[empty] = np.nan
+        return data
+
+    def put(self, rows, values):
+        """
+        Function that writes float values on the selected rows of the column.
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+
+        if self.__kind == INT_COLUMN:
+            self.__to_float()
+
+        if self.__kind == FLOAT_COLUMN:
+            self.__data[rows] = values
+            if self.__empty is not None:
+                self.__empty[rows] = False
+            if self.__integer is not None:
+                self.__integer[rows] = False
+            return
+
+        selected = np.arange(len(self.__data))[rows]
+        for row, value in zip(selected.tolist(), np.broadcast_to(values, selected.shape).tolist()):
+            self.__data[row] = value
+
+    def nbytes(self):
+
+        size = self.__data.nbytes
+        for mask in (self.__empty, self.__integer):
+            if mask is not None:
+                size += mask.nbytes
+        return size
+
+
+class TreeTable:
+    """
+    Inventory-wide columnar store of trees (struct of arrays).
+    Each tree variable is one TreeColumn, and two extra columns keep the plot index and the status of each tree.
+    Trees can be bound to the table; then their values are a TreeRow view, so the Tree accessors keep working.
+    """
+
+    def __init__(self):
+
+        self.__size = 0
+        self.__columns = dict()  # variable name -> TreeColumn
+        self.__keys = list()  # variable names of each row (shared tuples, in the same order as the old dicts)
+        self.__layouts = dict()  # interned tuples of variable names
+        self.__plot_index = np.empty(0, dtype=np.int64)
+        self.__original = None  # companion table with the node 0 values of the trees
+        self.__trees = None  # trees used to gather the columns on demand (see from_trees)
+        self.__valid = True
+
+    @staticmethod
+    def from_values(values: list, plot_index=None):
+        """
+        Function that builds a table from a list of mappings (one per tree).
+        """
+
+        table = TreeTable()
+        table.__size = len(values)
+
+        names = dict()
+        for row in values:
+            keys = table.__layout(tuple(row.keys()))
+            table.__keys.append(keys)
+            for name in keys:
+                names[name] = None
+
+        for name in names:
+            filler = next(row[name] for row in values if name in row)  # rows without the variable never read it
+            table.__columns[name] = TreeColumn([row[name] if name in row else filler for row in values])
+
+        if plot_index is None:
+            table.__plot_index = np.zeros(table.__size, dtype=np.int64)
+        else:
+            table.__plot_index = np.asarray(plot_index, dtype=np.int64)
+
+        return table
+
+    @staticmethod
+    def from_trees(trees: list, plot_index=None, bind: bool = False):
+        """
+        Function that builds a table from a list of trees.
+        If bind is True, the values of the trees are moved into the table (and to a companion table for the node 0 values).
+        If bind is False, the columns are gathered from the trees only when they are requested, so it is cheap
+        to use it to run vectorized equations over the trees of a plot.
+        """
+
+        if not bind:
+            table = TreeTable()
+            table.__size = len(trees)
+            table.__trees = list(trees)
+            table.__plot_index = np.zeros(table.__size, dtype=np.int64) if plot_index is None \
+                else np.asarray(plot_index, dtype=np.int64)
+            return table
+
+        table = TreeTable.from_values([tree.get_values() for tree in trees], plot_index)
+        table.__original = TreeTable.from_values([tree.get_values_original() for tree in trees], plot_index)
+
+        for row, tree in enumerate(trees):
+            values = tree.get_values()
+            if isinstance(values, TreeValues) and values.owner:
+                values = values.base
+            if isinstance(values, TreeRow) and values.table is not table:
+                values.table.invalidate()  # the tree leaves its old table, so its rows are not valid anymore
+            tree.bind_values(TreeRow(table, row), TreeRow(table.__original, row))
+
+        return table
+
+    def __layout(self, keys: tuple):
+
+        layout = self.__layouts.get(keys)
+        if layout is None:
+            self.__layouts[keys] = keys
+            layout = keys
+        return layout
+
+    def __len__(self):
+        return self.__size
+
+    @property
+    def valid(self):
+        return self.__valid
+
+    def invalidate(self):
+        """
+        Function used when the trees of the table are bound to other table. Views of the plots are not valid after it.
+        """
+        self.__valid = False
+
+    @property
+    def original(self):
+        return self.__original
+
+    @property
+    def plot_index(self):
+        return self.__plot_index
+
+    @property
+    def trees(self):
+        return self.__trees
+
+    @property
+    def variables(self):
+        return list(self.__columns.keys())
+
+    def has_column(self, name: str):
+
+        if self.__trees is not None:
+            return self.__size == 0 or name in self.__trees[0].get_values()
+        return name in self.__columns
+
+    def column(self, name: str, rows=None, dtype=None):
+        """
+        Function that returns one variable of the trees as a NumPy array (see TreeColumn.values).
+        If dtype is set, the array is converted to it, and empty values ('' or None) are returned as NaN.
+        """
+
+        if name not in self.__columns and self.__trees is not None:
+            self.__columns[name] = TreeColumn([tree.get_value(name) for tree in self.__trees])
+        values = self.__columns[name].values(rows)
+
+        if dtype is not None and values.dtype != dtype:
+            if values.dtype == object:
+                values = np.array([np.nan if value is None or value == '' else value for value in values], dtype=dtype)
+            else:
+                values = values.astype(dtype)
+
+        return values
+
+    def set_column(self, name: str, values, rows=None):
+        """
+        Function that writes a float variable on the selected rows (all of them by default).
+        If the table gathers its values from trees, they are updated by using their own add_value.
+        """
+
+        if self.__trees is not None:
+            selected = self.__trees if rows is None else [self.__trees[i] for i in np.arange(self.__size)[rows]]
+            values = np.broadcast_to(np.asarray(values, dtype=np.float64), (len(selected),))
+            for tree, value in zip(selected, values.tolist()):
+                tree.add_value(name, value)
+            self.__columns.pop(name, None)
+            return
+
+        set_changed(name)
+        rows = slice(None) if rows is None else rows
+        self.__columns[name].put(rows, values)
+
+    def status(self):
+        """
+        Function that returns the status column (None -> alive, M -> dead, C -> cut, I -> ingrowth).
+        """
+        return self.column(STATUS)
+
+    def select(self, plot: int = None, status=False):
+        """
+        Function that returns the row indexes of the trees of a plot (plot index) and/or with a status.
+        """
+
+        mask = np.ones(self.__size, dtype=bool)
+
+        if plot is not None:
+            mask &= self.__plot_index == plot
+        if status is not False:
+            group = PLOT_STATUS[status]
+            mask &= np.array([PLOT_STATUS.get(value) == group for value in self.status()], dtype=bool)
+
+        return np.flatnonzero(mask)
+
+    def nbytes(self):
+        """
+        Function that returns the memory used by the columns (node 0 values included).
+        """
+
+        size = self.__plot_index.nbytes
+        for column in self.__columns.values():
+            size += column.nbytes()
+        if self.__original is not None:
+            size += self.__original.nbytes()
+        return size
+
+    def get_row_keys(self, row: int):
+        return self.__keys[row]
+
+    def get_row_value(self, row: int, name: str):
+
+        if name not in self.__keys[row]:
+            raise KeyError(name)
+        return self.__columns[name].get(row)
+
+    def set_row_value(self, row: int, name: str, value):
+
+        keys = self.__keys[row]
+
+        if name not in keys:
+            if name not in self.__columns:
+                self.__columns[name] = TreeColumn([value] * self.__size)
+            self.__keys[row] = self.__layout(keys + (name,))
+
+        self.__columns[name].set(row, value)
+
+    def del_row_value(self, row: int, name: str):
+
+        keys = self.__keys[row]
+        if name not in keys:
+            raise KeyError(name)
+        self.__keys[row] = self.__layout(tuple(key for key in keys if key != name))
+
+
+class TreeRow(MutableMapping):
+    """
+    Lightweight view of one row of a TreeTable. It behaves as the dict used by Tree to save its values.
+    """
+
+    __slots__ = ('__table', '__row')
+
+    def __init__(self, table: TreeTable, row: int):
+        self.__table = table
+        self.__row = row
+
+    @property
+    def table(self):
+        return self.__table
+
+    @property
+    def row(self):
+        return self.__row
+
+    def __getitem__(self, key):
+        return self.__table.get_row_value(self.__row, key)
+
+    def __setitem__(self, key, value):
+        self.__table.set_row_value(self.__row, key, value)
+
+    def __delitem__(self, key):
+        self.__table.del_row_value(self.__row, key)
+
+    def __contains__(self, key):
+        return key in self.__table.get_row_keys(self.__row)
+
+    def __iter__(self):
+        return iter(self.__table.get_row_keys(self.__row))
+
+    def __len__(self):
+        return len(self.__table.get_row_keys(self.__row))
+
+    def keys(self):
+        return self.__table.get_row_keys(self.__row)
+
+    def copy(self):
+        """
+        Function that returns the values of the row as a dict.
+        """
+
+        table = self.__table
+        row = self.__row
+        return {key: table.get_row_value(row, key) for key in table.get_row_keys(row)}
+
+    def __repr__(self):
+        return 'TreeRow(' + repr(self.copy()) + ')'
+
+
+class TreeValues(MutableMapping):
+    """
+    Copy-on-write view of the values of a tree. The values are read from a mapping shared with other trees (a dict or a TreeRow)
+    until they are changed, and the changed values are saved only on this view, so the shared mapping is never modified.
+    """
+
+    __slots__ = ('__base', '__changes', '__keys', '__owner')
+
+    def __init__(self, base, changes: dict = None, keys: dict = None, owner: bool = False):
+        self.__base = base
+        self.__changes = dict() if changes is None else changes
+        self.__keys = keys  # variables of the tree (as dict keys) when they are not the same as the base ones
+        self.__owner = owner  # the view belongs to the tree that saved the values on the base TreeRow
+
+    @property
+    def base(self):
+        return self.__base
+
+    @property
+    def changes(self):
+        return self.__changes
+
+    @property
+    def owner(self):
+        return self.__owner
+
+    def __getitem__(self, key):
+
+        changes = self.__changes
+        if key in changes:
+            return changes[key]
+        return self.__base[key]
+
+    def __setitem__(self, key, value):
+
+        if self.__owner:
+            self.__base.table.invalidate()  # the row of the table is not the value of the tree anymore
+            self.__owner = False
+
+        self.__changes[key] = value
+
+    def __delitem__(self, key):
+
+        if key not in self:
+            raise KeyError(key)
+
+        self.__changes = {name: self[name] for name in self if name != key}  # values are copied, the base is not changed
+        self.__base = dict()
+        self.__keys = None
+
+    def __contains__(self, key):
+        return key in self.__changes or key in (self.__base if self.__keys is None else self.__keys)
+
+    def __iter__(self):
+
+        keys = self.__base if self.__keys is None else self.__keys
+
+        for key in keys:
+            yield key
+        for key in self.__changes:
+            if key not in keys:
+                yield key
+
+    def __len__(self):
+
+        keys = self.__base if self.__keys is None else self.__keys
+        return len(keys) + sum(1 for key in self.__changes if key not in keys)
+
+    def copy(self):
+        """
+        Function that returns the values of the view as a dict.
+        """
+
+        return {key: self[key] for key in self}
+
+    def __repr__(self):
+        return 'TreeValues(' + repr(self.copy()) + ')'
@@ -21,5 +21,7 @@ from .engine_factory import EngineFactory
 from .engine_factory import MACHINE
 from .engine_factory import CLUSTER
 from .engine_factory import SUPER
+from .engine_factory import PARALLEL
 from engine.engines.basic_engine import BasicEngine
 from engine.engines.dask_engine import DaskEngine
+from engine.engines.parallel_engine import ParallelEngine
@@ -17,6 +17,7 @@
 
 from abc import ABCMeta
 from abc import abstractmethod
+from data import SimulationContext
 from simulation.inventory import Inventory
 from models import TreeModel
 from models import HarvestModel
@@ -32,18 +33,43 @@ DEFAULT_CONFIG = {
     "processes": False,
     "threads_per_worker": 1,
     "num_workers": 1,
-    "memory_limit": "1GB"
+    "memory_limit": "1GB",
+    "chunk_size": None  # plots sent to a worker on each task, None to share the plots in equal parts
 }
 
 
 class Engine(metaclass=ABCMeta):
 
-    def apply_model(self, model, operation: Operation, inventory: Inventory = None):
+    @staticmethod
+    def get_config_value(configuration, key: str, default=None):
+        """
+        Function that reads a value of the engine configuration, which can be a dictionary or a ConfigHandler (-c file).
+        When the value is not in the configuration, DEFAULT_CONFIG value is used.
+        """
+
+        value = None
+
+        if isinstance(configuration, dict):
+            value = configuration.get(key)
+        elif configuration is not None:
+            value = configuration.get_feature(key)
+
+        if value is None:
+            value = DEFAULT_CONFIG.get(key) if default is None else default
+
+        return value
+
+    def apply_model(self, model, operation: Operation, inventory: Inventory = None, context: SimulationContext = None):
         """
         Function that links the operation selected on the scenario with the order to execute it at the simulator.
         That orders are developed at the basic_engine file.
+        If a SimulationContext is received, the operation runs with the variables of that simulation.
         """
 
+        if context is not None:
+            with context:
+                return self.apply_model(model, operation, inventory)
+
         new_inventory: Inventory = None
         
         print('####################################################################################################')
@@ -17,6 +17,7 @@
 
 from engine.engines.basic_engine import BasicEngine
 from engine.engines.dask_engine import DaskEngine
+from engine.engines.parallel_engine import ParallelEngine
 from util import Tools
 
 import platform
@@ -25,8 +26,9 @@ import logging
 MACHINE = 0
 CLUSTER = 1
 SUPER = 2
+PARALLEL = 3
 
-ENGINES = enumerate(['MACHINE', 'CLUSTER', 'SUPER'])
+ENGINES = ['MACHINE', 'CLUSTER', 'SUPER', 'PARALLEL']
 
 
 class EngineFactory:
@@ -36,7 +38,7 @@ class EngineFactory:
 
         engine = -1
 
-        for key, value in ENGINES:
+        for key, value in enumerate(ENGINES):
             if key == type_engine:
                 engine = key
 
@@ -53,4 +55,11 @@ class EngineFactory:
             else:
                 return DaskEngine(configuration)
 
+        if engine == 3:
+            if platform.system() == 'Windows':
+                Tools.print_log_line('Windows os system does not support fork processes, using default engine', logging.WARNING)
+                return BasicEngine(configuration)
+            else:
+                return ParallelEngine(configuration)
+
         return BasicEngine(configuration)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from concurrent.futures import ProcessPoolExecutor
+from engine import Engine
+from engine.engines.basic_engine import BasicEngine
+from scenario import Operation
+
+from data.context import CONTEXT_CLASSES, copy_value, get_class_values, get_globals
+from data.variables import TREE_VARS, PLOT_VARS
+
+import contextlib
+import math
+import multiprocessing
+import os
+import sys
+import threading
+
+
+task = None  # (function, plots, model, operation) of the running map_plots, inherited by the workers when they are forked
+task_lock = threading.Lock()  # tasks running as threads of the same process share the global information, so they can't run at the same time
+
+
+def get_class_state() -> dict:
+    """
+    Function that returns a copy of the attributes of the classes of the simulation context (see data.context).
+    """
+
+    return {(context_class.__name__, name): copy_value(value)
+            for context_class in CONTEXT_CLASSES for name, value in get_class_values(context_class).items()}
+
+
+def get_global_state():
+    """
+    Function that returns the global information needed by a worker that is not a fork of the main process:
+    variables lists, context classes and the module variables of the simulation (i.e. the volume integration method).
+    The attributes of the classes that are still properties are not sent, because the workers have them.
+    """
+
+    values = get_globals()
+    values['classes'] = {(class_name, name): value for class_name, class_values in values['classes'].items()
+                         for name, value in class_values.items() if not isinstance(value, property)}
+
+    return values
+
+
+def set_global_state(state: dict):
+    """
+    Function that sets on a worker the global information returned by get_global_state.
+    """
+
+    PLOT_VARS[:] = state['PLOT_VARS']
+    TREE_VARS[:] = state['TREE_VARS']
+    set_class_changes(state['classes'])
+
+    for (module_name, name), value in state['modules'].items():
+        if module_name in sys.modules:  # the modules of the models are imported when the tasks are received
+            setattr(sys.modules[module_name], name, value)
+
+
+def set_class_changes(changes: dict):
+    """
+    Function that copies the values of the context classes modified by a worker.
+    Dictionaries (i.e. Area values by plot) are updated, so the values of other workers are not lost.
+    """
+
+    classes = {context_class.__name__: context_class for context_class in CONTEXT_CLASSES}
+
+    for (class_name, name), value in changes.items():
+        current = vars(classes[class_name]).get(name)
+        if isinstance(current, dict) and isinstance(value, dict):
+            current.update(value)
+        else:
+            setattr(classes[class_name], name, value)
+
+
+def is_same_value(value, other) -> bool:
+
+    try:
+        return type(value) is type(other) and bool(value == other)
+    except Exception:  # values that can not be compared (i.e. arrays) are considered as changed
+        return False
+
+
+def run_plots(function, plots: list, model, operation: Operation, state: dict = None, lock: bool = False):
+    """
+    Function executed by the workers. It applies the function of one plot to the plots received, in order.
+    function can be the name of a BasicEngine function, for workers that don't have the engine of the main process.
+    For each plot it returns the plot returned by the function, and a flag to know if it is the input plot, so
+    map_plots copies it on the plot of the main process. The functions of one plot work on a clone of the input plot,
+    so the input plot is not sent back when the function returns a new one.
+    The changes of the context classes are returned too, to be copied on the main process.
+    lock must be True when other tasks can run on threads of the same process, so the tasks run one by one; a process
+    that runs one task at a time (i.e. the forked workers of ParallelEngine) doesn't need it.
+    """
+
+    if isinstance(function, str):
+        function = getattr(BasicEngine(None), function)
+
+    with task_lock if lock else contextlib.nullcontext():
+
+        if state is not None:
+            set_global_state(state)
+
+        class_state = get_class_state()
+        results = list()
+
+        for plot in plots:
+
+            new_plot = function(plot, model, operation)  # the codes of the new trees are given by each plot
+
+            results.append((new_plot, new_plot is plot))
+
+        changes = dict()
+        for key, value in get_class_state().items():
+            if key not in class_state or not is_same_value(class_state[key], value):
+                changes[key] = value
+
+    return results, changes
+
+
+def run_chunk(positions: list):
+    """
+    Function executed by the forked workers of ParallelEngine, with the plots of the positions received.
+    """
+
+    function, plots, model, operation = task
+
+    return run_plots(function, [plots[position] for position in positions], model, operation)
+
+
+class ParallelEngine(BasicEngine):
+    """
+    Engine that shares the plots of the inventory between a pool of processes.
+    The calculations of each plot are the same as BasicEngine, and the plots are added to the new inventory in the same order.
+    Configuration values (-c file):
+        - num_workers: number of processes, by default the number of cpus
+        - chunk_size: number of plots sent to a process on each task, by default the plots are shared in equal parts
+    """
+
+    def __init__(self, configuration):
+
+        super().__init__(configuration)
+
+        self.__num_workers = Engine.get_config_value(configuration, 'num_workers', os.cpu_count()) if configuration is not None else os.cpu_count()
+        self.__chunk_size = Engine.get_config_value(configuration, 'chunk_size')
+
+    @property
+    def num_workers(self):
+        return self.__num_workers
+
+    @property
+    def chunk_size(self):
+        return self.__chunk_size
+
+    def get_chunks(self, n_plots: int):
+        """
+        Function that splits the positions of the plots on consecutive groups, one for each task.
+        """
+
+        chunk_size = self.__chunk_size if self.__chunk_size else math.ceil(n_plots / self.num_workers)
+
+        return [list(range(start, min(start + chunk_size, n_plots))) for start in range(0, n_plots, chunk_size)]
+
+    def run_chunks(self, function, plots: list, chunks: list, model, operation: Operation):
+        """
+        Function that runs the groups of plots on the workers and returns the result of run_plots for each group, in order.
+        """
+
+        global task
+
+        task = (function, plots, model, operation)
+
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.num_workers, len(chunks)),
+                                     mp_context=multiprocessing.get_context('fork')) as executor:
+                return list(executor.map(run_chunk, chunks))
+        finally:
+            task = None
+
+    def map_plots(self, function, plots, model, operation: Operation):
+        """
+        Function that applies the calculations of one plot to all the plots, sharing them between the workers.
+        The global information modified by the workers (context classes) is copied on the main process following the order
+        of the plots, so the result is the same as BasicEngine.
+        """
+
+        plots = list(plots)
+
+        if self.num_workers <= 1 or len(plots) <= 1:
+            return super().map_plots(function, plots, model, operation)
+
+        chunks = self.get_chunks(len(plots))
+        chunk_results = self.run_chunks(function, plots, chunks, model, operation)
+
+        new_plots = list()
+
+        for chunk, (results, changes) in zip(chunks, chunk_results):
+
+            for position, (new_plot, same_plot) in zip(chunk, results):
+
+                plot = plots[position]
+
+                if same_plot and new_plot is not plot:  # the changes made by the worker on the input plot are copied on the original object
+                    vars(plot).update(vars(new_plot))
+                    new_plot = plot
+
+                new_plots.append(new_plot)
+
+            set_class_changes(changes)
+
+        return new_plots
@@ -0,0 +1,433 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from data import Tree
+from data import TreeTable
+from data.context import register_global
+from data.general import Model
+from data.plot_aggregates import sequential_sum, get_used_trees
+from data.tree import IDS_VALUES, STR_VALUES
+from data.variables import TREE_VARS, PLOT_VARS, MODEL_VARS
+
+import math
+import numpy as np
+
+
+ING_VARS = ['ING_DENSITY', 'ING_BA', 'ING_VOL', 'ING_WT']  # plot variables of the trees added by ingrowth
+
+DEFAULT_DBH_TOLERANCE = 1  # maximum difference of dbh (cm) between the cohorts merged by compact_cohorts
+DEFAULT_HEIGHT_TOLERANCE = 0.5  # maximum difference of height (m) between the cohorts merged by compact_cohorts
+
+compaction_configuration = None  # (dbh tolerance, height tolerance) of the running simulation, None if cohorts are not compacted
+
+
+def get_model_trees(plot, species):
+    """
+    Function that returns which trees are of the species of the model, and if the model is of only 1 specie.
+    Trees of other species don't receive ingrowth. Species codes are compared as integers.
+    :param plot: Plot object, with the species 1 and 2 of the models of more than 1 specie
+    :param species: array with the IFN code of the species of the trees
+    """
+
+    species = np.trunc(np.asarray(species, dtype=np.float64))
+
+    if 'SPECIE_IFN_ID' in MODEL_VARS and Model.specie_ifn_id != '':  # models of only 1 specie
+        return species == int(Model.specie_ifn_id), True
+
+    if 'ID_SP1' in PLOT_VARS and 'ID_SP2' in PLOT_VARS and plot.id_sp1 != '' and plot.id_sp2 != '':  # models of more than 1 specie
+        return (species == int(plot.id_sp1)) | (species == int(plot.id_sp2)), False
+
+    return np.zeros(len(species), dtype=bool), False
+
+
+def get_class_index(dbh, distribution):
+    """
+    Function that bins the trees into the diametric classes of the ingrowth distribution with np.searchsorted.
+    A tree is in the class k when k[0] <= dbh < k[1]; the classes can't overlap. It returns the class of each tree,
+    with -1 if its dbh is not in any class.
+    :param dbh: array with the dbh of the trees (cm)
+    :param distribution: list of diametric classes, [dbh minimum, dbh maximum, basal area to add (m2/ha)]
+    """
+
+    dbh = np.asarray(dbh, dtype=np.float64)
+    if len(distribution) == 0:
+        return np.full(len(dbh), -1, dtype=np.int64)
+
+    lower = np.array([k[0] for k in distribution], dtype=np.float64)
+    upper = np.array([k[1] for k in distribution], dtype=np.float64)
+
+    order = np.argsort(lower, kind='stable')
+    position = np.searchsorted(lower[order], dbh, side='right') - 1  # last class which minimum is <= dbh
+    classes = order[np.maximum(position, 0)]
+
+    return np.where((position >= 0) & (dbh < upper[classes]), classes, -1)
+
+
+def get_class_expan(distribution, classes, expan, basal_area):
+    """
+    Function that calculates the ingrowth of each diametric class, shared between its trees by their expan.
+    The expan and basal area of each class are added with np.bincount, tree by tree in the order of the list as the
+    former loops did, and the expan to add to the class is (N_cd / G_cd) * G_to_add.
+    It returns an array with the ratio to multiply the expan of the trees of each class (0 if the class has no expan).
+    :param distribution: list of diametric classes, [dbh minimum, dbh maximum, basal area to add (m2/ha)]
+    :param classes: array with the class of each tree (see get_class_index), -1 for the trees without ingrowth
+    :param expan: array with the expansion factor of the trees
+    :param basal_area: array with the basal area of the trees (cm2)
+    """
+
+    inside = classes >= 0
+    n_classes = len(distribution)
+
+    sum_n = np.bincount(classes[inside], weights=expan[inside], minlength=n_classes)  # N_cd
+    sum_g = np.bincount(classes[inside], weights=expan[inside] * basal_area[inside] / 10000, minlength=n_classes)  # G_cd (m2/ha)
+
+    area = np.array([k[2] for k in distribution], dtype=np.float64)  # G_to_add
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n_add = np.where(sum_g != 0, (sum_n / sum_g) * area, 0)  # N_to_add
+        return np.where(sum_n != 0, n_add / sum_n, 0)
+
+
+def new_class_tree(tree, k, status, tree_id):
+    """
+    Function that creates the tree of a diametric class without trees where ingrowth must be added. The tree is cloned
+    from the template tree, with a new code, the mean dbh of the class and the expan of the basal area to add.
+    :param tree: tree used as a template
+    :param k: diametric class, [dbh minimum, dbh maximum, basal area to add (m2/ha)]
+    :param status: status of the new tree ('I' for ingrowth trees, '' for alive trees)
+    :param tree_id: code of the new tree (see Plot.new_tree_id)
+    """
+
+    new_tree = Tree()
+    new_tree.create_new_from_clone(tree, tree_id)
+
+    # TODO: los cálculos con este ingrowth no van a salir bien, creo que no se contabilizará WT y V añadido
+    new_tree.add_value('status', status)
+    new_tree.add_value('dbh', (k[0] + k[1])/2)
+    new_tree.add_value('basal_area', math.pi * (new_tree.dbh / 2) ** 2)
+    new_tree.add_value('expan', (1/new_tree.basal_area) * k[2] * 10000)
+
+    new_tree.add_value('height', 0)
+    new_tree.add_value('bal', 0)  # set bal value as 0
+    new_tree.add_value('ba_ha', new_tree.expan*new_tree.basal_area/10000)  # update g/ha value
+    new_tree.add_value('vol', 0)
+    new_tree.add_value('vol_ha', 0)  # update vol/ha value
+
+    return new_tree
+
+
+def set_ingrowth_expan(trees, expan):
+    """
+    Function that clones the trees that receive ingrowth as trees with status = I, with the expan of the ingrowth,
+    and updates their g/ha and vol/ha values at once.
+    :param trees: list of Tree objects that receive ingrowth
+    :param expan: array with the expan of the ingrowth of each tree
+    """
+
+    new_trees = list()
+    for tree in trees:
+        new_tree = Tree.clone_on_write(tree)  # trees that will be shown with status = I
+        new_tree.add_value('status', 'I')
+        new_tree.add_value('bal', 0)  # set bal value as 0
+        new_trees.append(new_tree)
+
+    if len(new_trees) > 0:
+        table = TreeTable.from_trees(new_trees)
+        expan = np.asarray(expan, dtype=np.float64)
+        table.set_column('expan', expan)
+        table.set_column('ba_ha', expan * table.column('basal_area', dtype=np.float64) / 10000)  # update g/ha value
+        table.set_column('vol_ha', expan * table.column('vol', dtype=np.float64) / 1000)  # update vol/ha value
+
+    return new_trees
+
+
+def add_expan(trees, expan):
+    """
+    Function that clones the alive trees adding the expan of the ingrowth to their expan.
+    :param trees: list of Tree objects
+    :param expan: array with the expan of the ingrowth of each tree
+    """
+
+    new_trees = [Tree.clone_on_write(tree) for tree in trees]  # alive trees modified by survival and growth functions
+
+    if len(new_trees) > 0:
+        table = TreeTable.from_trees(new_trees)
+        table.set_column('expan', np.asarray(expan, dtype=np.float64) + table.column('expan', dtype=np.float64))
+
+    return new_trees
+
+
+def get_ingrowth_values(ingrowth_trees):
+    """
+    Function that calculates the plot values of the ingrowth trees (ING_DENSITY, ING_BA, ING_VOL and ING_WT).
+    The empty basal area, volume and biomass of the trees are set to 0, and the values are added one by one in the
+    order of the list, so they are the same as the ones of the former tree by tree loop.
+    :param ingrowth_trees: list of Tree objects with status = I
+    """
+
+    ing_n = ing_ba = ing_vol = ing_wt = 0
+
+    if len(ingrowth_trees) > 0:
+
+        table = TreeTable.from_trees(ingrowth_trees)
+        expan = table.column('expan', dtype=np.float64)
+
+        def get_column(variable):
+            values = table.column(variable, dtype=np.float64)
+            empty = np.isnan(values)
+            if empty.any():
+                table.set_column(variable, 0, empty)
+                values = np.where(empty, 0, values)
+            return values
+
+        ing_n = sequential_sum(expan)  # expan accumulated ingrowth
+        ing_ba = sequential_sum(expan * get_column('basal_area'))  # basal area accumulated ingrowth in cm2
+        if 'vol' in TREE_VARS:
+            ing_vol = sequential_sum(expan * get_column('vol'))  # volume accumulated ingrowth in dm3
+        if 'wt' in TREE_VARS:
+            ing_wt = sequential_sum(expan * get_column('wt'))  # biomass accumulated ingrowth in kg
+
+    return {'ING_DENSITY': ing_n, 'ING_BA': ing_ba/10000, 'ING_VOL': ing_vol/1000, 'ING_WT': ing_wt/1000}
+
+
+def apply_ingrowth(plot, new_area_basimetrica, distribution, tree_ingrowth, tree_alive_ing):
+    """
+    Function that adds the ingrowth basal area to the trees of the plot.
+    - if there is not an ingrowth distribution (None), ingrowth expan will be shared between all the trees of the plot
+    - if there is an ingrowth distribution, ingrowth expan will be shared at the % stablished on the model for each
+    diameter class; the trees are binned into the classes only once (see get_class_index)
+    It returns the list of trees with status = I, the list of alive trees with their new expan, and the plot values of
+    the ingrowth (see get_ingrowth_values).
+    :param plot: Plot object, which gives the codes of the new trees
+    :param new_area_basimetrica: ingrowth basal area (m2/ha)
+    :param distribution: list of diametric classes, [dbh minimum, dbh maximum, basal area to add (m2/ha)], or None
+    :param tree_ingrowth: trees with the original expan but with the dbh modified by growth, sorted by dbh
+    :param tree_alive_ing: trees after survival and growth functions, in the same order as tree_ingrowth
+    """
+
+    table = TreeTable.from_trees(tree_ingrowth)
+    model_trees, single_specie = get_model_trees(plot, table.column('specie', dtype=np.float64))
+    expan = table.column('expan', dtype=np.float64)
+    basal_area = table.column('basal_area', dtype=np.float64)
+
+    rows = np.flatnonzero(model_trees)
+    trees = [tree_ingrowth[row] for row in rows.tolist()]
+    alive_trees = [tree_alive_ing[row] for row in rows.tolist()]
+
+    if distribution is None:
+
+        trees_expan = sequential_sum(expan[rows])  # we calculate density...
+        trees_ba = sequential_sum(basal_area[rows] * expan[rows] / 10000)  # ... and basal area
+
+        expan_add = new_area_basimetrica*trees_expan/trees_ba  # we calculate the amount of expan to add
+        ingrowth_expan = (expan_add/plot.density) * expan[rows]
+
+        ingrowth_trees = set_ingrowth_expan(trees, ingrowth_expan)
+        alive_ing_trees = add_expan(alive_trees, ingrowth_expan)
+
+    else:
+
+        classes = get_class_index(table.column('dbh', dtype=np.float64)[rows], distribution)
+        ratio = get_class_expan(distribution, classes, expan[rows], basal_area[rows])
+
+        inside = np.flatnonzero(classes >= 0)
+        ingrowth_expan = ratio[classes[inside]] * expan[rows][inside]
+
+        ingrowth_trees = set_ingrowth_expan([trees[n] for n in inside.tolist()], ingrowth_expan)
+        alive_ing_trees = add_expan([alive_trees[n] for n in inside.tolist()], ingrowth_expan)
+        alive_ing_trees += [alive_trees[n] for n in np.flatnonzero(classes < 0).tolist()]  # trees out of the classes
+
+        if single_specie and len(trees) > 0:
+
+            # the classes without trees where ingrowth must be added receive a new tree, cloned from the smaller tree
+            available = np.bincount(classes[classes >= 0], minlength=len(distribution)) > 0
+            new_classes = [index for index, k in enumerate(distribution) if not available[index] and k[2] != 0]
+
+            new_ingrowth_trees, new_alive_trees = list(), list()
+            for index in new_classes:  # each tree is created twice, with status = I and '' and the same code
+                tree_id = plot.new_tree_id()
+                new_ingrowth_trees.append(new_class_tree(trees[0], distribution[index], 'I', tree_id))
+                new_alive_trees.append(new_class_tree(trees[0], distribution[index], '', tree_id))
+
+            # the new trees are added at the position of their class around the ingrowth tree of the smaller tree
+            if classes[0] >= 0:
+                first = sum(1 for index in new_classes if index < classes[0])
+                ingrowth_trees = new_ingrowth_trees[:first] + ingrowth_trees[:1] + new_ingrowth_trees[first:] + ingrowth_trees[1:]
+            else:
+                ingrowth_trees = new_ingrowth_trees + ingrowth_trees
+            alive_ing_trees = new_alive_trees + alive_ing_trees
+
+    return ingrowth_trees, alive_ing_trees, get_ingrowth_values(ingrowth_trees)
+
+
+def configure_compaction(enabled: bool, dbh_tolerance: float = DEFAULT_DBH_TOLERANCE,
+                         height_tolerance: float = DEFAULT_HEIGHT_TOLERANCE):
+    """
+    Function that enables the compaction of the ingrowth cohorts for the running simulation (ingrowth_compaction).
+    """
+
+    global compaction_configuration
+
+    compaction_configuration = (float(dbh_tolerance), float(height_tolerance)) if enabled else None
+
+
+def get_compaction_configuration():
+    return compaction_configuration
+
+
+def is_ingrowth_cohort(tree):
+    """
+    Function that checks if an alive tree was created by the ingrowth function (see new_class_tree).
+    """
+
+    return tree.ingrowth and tree.status in ('', None)
+
+
+def get_cohort_groups(kind, species, dbh, height, dbh_tolerance, height_tolerance):
+    """
+    Function that groups the cohorts by kind, species and bins of dbh and height of the size of the tolerances, so the
+    cohorts of a group differ less than the tolerances. The groups are sorted with np.lexsort, keeping the order of the
+    cohorts inside them; it returns the group of each cohort, numbered from 0.
+    :param kind: array with the kind of each cohort, only cohorts of the same kind are merged
+    :param species: array with the IFN code of the species of the cohorts
+    :param dbh: array with the dbh (cm) of the cohorts
+    :param height: array with the height (m) of the cohorts
+    """
+
+    keys = np.stack((kind, species, np.floor(dbh / dbh_tolerance), np.floor(height / height_tolerance)))
+    order = np.lexsort(keys[::-1])  # kind and species, then dbh and height bins
+
+    sorted_keys = keys[:, order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = np.any(sorted_keys[:, 1:] != sorted_keys[:, :-1], axis=0)
+
+    groups = np.empty(len(order), dtype=np.int64)
+    groups[order] = np.cumsum(starts) - 1
+
+    return groups
+
+
+def compact_cohorts(trees, dbh_tolerance: float = DEFAULT_DBH_TOLERANCE, height_tolerance: float = DEFAULT_HEIGHT_TOLERANCE):
+    """
+    Function that merges the alive trees created by the ingrowth function whose species is the same and whose dbh and
+    height differ less than the tolerances. The trees are only merged with the ones of the same status (the engine only
+    grows the trees with status None) that are used by the plot variables in the same way (the trees created on the
+    step are not used yet, see get_used_trees). Each group is kept as its first tree, cloned with:
+    - expan and the per hectare variables (*_ha) summed, so density and the per hectare totals of the plot don't change
+    - basal_area and the rest of numeric variables as the mean weighted by expan, so the basal area of the plot doesn't
+    change, and dbh as the quadratic mean diameter of the group
+    The cohorts without dbh, height or expan, and the rest of trees, are kept as they were, in the same order.
+    It returns the list of trees and a report with the number of trees merged ('merged', trees removed from the list)
+    and the biggest difference between a merged tree and its new dbh ('dbh_error', cm) and height ('height_error', m),
+    which bound the change of the plot statistics calculated from the dbh and height of the trees.
+    :param trees: list of Tree objects
+    :param dbh_tolerance: size (cm) of the dbh bins
+    :param height_tolerance: size (m) of the height bins
+    """
+
+    report = {'merged': 0, 'dbh_error': 0, 'height_error': 0}
+
+    cohorts = [n for n, tree in enumerate(trees) if is_ingrowth_cohort(tree)]
+    if len(cohorts) < 2:
+        return trees, report
+
+    table = TreeTable.from_trees([trees[n] for n in cohorts])
+    species = table.column('specie', dtype=np.float64)
+    dbh = table.column('dbh', dtype=np.float64)
+    height = table.column('height', dtype=np.float64)
+    expan = table.column('expan', dtype=np.float64)
+
+    valid = np.flatnonzero(np.isfinite(species) & np.isfinite(dbh) & np.isfinite(height) & np.isfinite(expan) & (expan > 0))
+    if len(valid) < 2:
+        return trees, report
+
+    bal, vol = [table.column(name, dtype=np.float64) if table.has_column(name) else np.full(len(cohorts), np.nan)
+                for name in ('bal', 'vol')]
+    status = np.array([tree.status is None for tree in table.trees])
+    kind = 2 * status + get_used_trees(dbh, height, bal, vol)
+    groups = get_cohort_groups(kind[valid], species[valid], dbh[valid], height[valid], dbh_tolerance, height_tolerance)
+    n_groups = groups.max() + 1
+    if n_groups == len(valid):
+        return trees, report
+
+    first = np.full(n_groups, len(valid), dtype=np.int64)
+    np.minimum.at(first, groups, np.arange(len(valid)))  # the first tree of each group keeps the values of the group
+    sizes = np.bincount(groups, minlength=n_groups)
+    merged = np.flatnonzero(sizes > 1)
+
+    expan = expan[valid]
+    sum_n = np.bincount(groups, weights=expan, minlength=n_groups)
+
+    def get_sum(values):
+        return np.bincount(groups, weights=values, minlength=n_groups)[merged]
+
+    variables = [name for name in TREE_VARS if name not in IDS_VALUES + STR_VALUES + ['specie', 'expan', 'dbh']
+                 and table.has_column(name)]
+    if 'height' not in variables:
+        return trees, report
+
+    values = dict()
+    for name in variables:
+        try:
+            column = table.column(name, dtype=np.float64)[valid]
+        except (TypeError, ValueError):
+            continue  # text variables are kept as the ones of the first tree
+        empty = np.bincount(groups, weights=np.isnan(column), minlength=n_groups)[merged] > 0
+        column = np.where(np.isnan(column), 0, column)
+        if name.endswith('_ha'):
+            value = get_sum(column)
+        else:
+            value = get_sum(column * expan) / sum_n[merged]
+        values[name] = (value, empty)  # variables with empty values on the group are kept as the ones of the first tree
+
+    values['expan'] = (sum_n[merged], np.zeros(len(merged), dtype=bool))
+    if 'basal_area' in values:
+        basal_area = values['basal_area'][0]
+        new_dbh = np.sqrt(basal_area * 4 / math.pi)  # quadratic mean diameter of the group
+    else:
+        new_dbh = np.sqrt(get_sum(dbh[valid] ** 2 * expan) / sum_n[merged])
+    values['dbh'] = (new_dbh, np.zeros(len(merged), dtype=bool))
+
+    # error bound: biggest difference between the trees of a group and the new tree
+    in_merged = sizes[groups] > 1
+    position = np.searchsorted(merged, groups[in_merged])
+    new_height = values['height'][0]
+    report['merged'] = int(len(valid) - n_groups)
+    report['dbh_error'] = float(np.max(np.abs(dbh[valid][in_merged] - new_dbh[position])))
+    report['height_error'] = float(np.max(np.abs(height[valid][in_merged] - new_height[position])))
+
+    # the first tree of each merged group is replaced by a clone with the values of the group
+    new_trees = list(trees)
+    rows = valid[first[merged]]
+    group_trees = list()
+    for row in rows.tolist():
+        new_tree = Tree.clone_on_write(trees[cohorts[row]])
+        new_tree.add_value('status', trees[cohorts[row]].status)
+        new_trees[cohorts[row]] = new_tree
+        group_trees.append(new_tree)
+
+    group_table = TreeTable.from_trees(group_trees)
+    for name, (value, empty) in values.items():
+        if empty.all():
+            continue
+        group_table.set_column(name, value[~empty], ~empty)
+
+    removed = set(cohorts[row] for row in valid[(sizes[groups] > 1) & (np.arange(len(valid)) != first[groups])].tolist())
+
+    return [tree for n, tree in enumerate(new_trees) if n not in removed], report
+
+
+register_global(__name__, 'compaction_configuration')  # each SimulationContext has its own configuration
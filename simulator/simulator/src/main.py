@@ -22,15 +22,46 @@ import os
 from util.tools import Tools
 from scenario.scenario import Scenario
 from simulation.inventory import Inventory
+from engine import Engine
 from engine import EngineFactory
 from engine import MACHINE
 from engine import CLUSTER
 from engine import SUPER
+from engine import PARALLEL
 from simulation import Simulation
+from simulation.plot_streaming import PlotStreaming
+from simulation.step_store import DEFAULT_MEMORY_LIMIT
+from util import ConfigHandler
+from data import SimulationContext
+from models.trees.equations_tree_integration import VolumeIntegration, SIMPSON
+from models.trees.equations_tree_tables import TreeTables, BICUBIC, DEFAULT_MAX_ERROR
+from engine.ingrowth import configure_compaction, DEFAULT_DBH_TOLERANCE, DEFAULT_HEIGHT_TOLERANCE
 
 # import time
 
 
+def generate_results(simulation: Simulation, scenario: Scenario, engine: int):
+
+    if engine in [MACHINE, PARALLEL]:
+        simulation.generate_results(
+            scenario.name,
+            scenario.file_name,            
+            scenario.output_path,
+            scenario.modelo,
+            scenario.ext,
+            scenario.zip_compression,
+            scenario.decimal_numbers)
+    elif engine in [CLUSTER, SUPER]:
+        simulation.generate_results_parallel(
+            scenario.name,
+            scenario.file_name,
+            scenario.output_path,
+            scenario.modelo,
+            scenario.ext,
+            scenario.zip_compression,
+            scenario.decimal_numbers)        
+
+
 def main():
         
     # start = time.time()
@@ -91,44 +122,50 @@ def main():
     Tools.load_logger_config(args.logging_config_file, level=args.v)
 
     inventory: Inventory = None
-    configuration = None
+    configuration = ConfigHandler(args.c) if args.c is not None else None
 
     scenario: Scenario = Scenario(args.s)
-    simulation = Simulation()
 
     engine = EngineFactory.load_engine(args.e, configuration)
-    step = 1
+    memory_limit = Engine.get_config_value(configuration, 'step_memory_limit', DEFAULT_MEMORY_LIMIT)
+    directory = Engine.get_config_value(configuration, 'step_directory')
+    plot_batch_size = Engine.get_config_value(configuration, 'plot_batch_size')
+    context = SimulationContext()  # variables changed by the models during the simulation
 
-    for operation in scenario.operations:
+    with context:
+        VolumeIntegration.set_method(Engine.get_config_value(configuration, 'volume_integration', SIMPSON))
+        TreeTables.configure(Engine.get_config_value(configuration, 'tree_tables', False),
+                             Engine.get_config_value(configuration, 'tree_tables_interpolation', BICUBIC),
+                             Engine.get_config_value(configuration, 'tree_tables_max_error', DEFAULT_MAX_ERROR),
+                             Engine.get_config_value(configuration, 'tree_tables_directory'))
+        configure_compaction(Engine.get_config_value(configuration, 'ingrowth_compaction', False),
+                             Engine.get_config_value(configuration, 'ingrowth_compaction_dbh', DEFAULT_DBH_TOLERANCE),
+                             Engine.get_config_value(configuration, 'ingrowth_compaction_height', DEFAULT_HEIGHT_TOLERANCE))
 
-        Tools.print_log_line('Executing operation: ' + operation.name, logging.INFO, name='logger_dev')
-        model = Tools.import_module(operation.model_class, operation.model_path, operation.variables)
-        inventory = engine.apply_model(model, operation, inventory)
-        simulation.add_step(step, inventory, operation, model)
+    if plot_batch_size is not None:  # plot-major execution, the results of each batch of plots are written when it finishes
 
-        step += 1
+        streaming = PlotStreaming(engine, plot_batch_size, memory_limit, directory, context)
+        streaming.run(scenario.operations, lambda simulation: generate_results(simulation, scenario, args.e))
 
-    # mid = time.time()
-    # print("Models executions finished after", (mid - start), "seconds.")
+    else:
 
-    if args.e == MACHINE:
-        simulation.generate_results(
-            scenario.name,
-            scenario.file_name,            
-            scenario.output_path,
-            scenario.modelo,
-            scenario.ext,
-            scenario.zip_compression,
-            scenario.decimal_numbers)
-    elif args.e in [CLUSTER, SUPER]:
-        simulation.generate_results_parallel(
-            scenario.name,
-            scenario.file_name,
-            scenario.output_path,
-            scenario.modelo,
-            scenario.ext,
-            scenario.zip_compression,
-            scenario.decimal_numbers)        
+        simulation = Simulation(memory_limit=memory_limit, directory=directory, context=context)
+        step = 1
+
+        for operation in scenario.operations:
+
+            Tools.print_log_line('Executing operation: ' + operation.name, logging.INFO, name='logger_dev')
+            model = context.import_module(operation.model_class, operation.model_path, operation.variables)
+            inventory = engine.apply_model(model, operation, inventory, context)
+            simulation.add_step(step, inventory, operation, model)
+
+            step += 1
+
+        # mid = time.time()
+        # print("Models executions finished after", (mid - start), "seconds.")
+
+        generate_results(simulation, scenario, args.e)
+        simulation.close()
 
     engine.close()
 
@@ -65,6 +65,10 @@ class CutDownType(metaclass=ABCMeta):
     def accumulator(self, tree: Tree):
         return
 
+    @abstractmethod
+    def accumulator_values(self, table):
+        return
+
     @abstractmethod
     def compute_expan(self, tree: Tree, accumulator: float, cut_discriminator: float):
         return
@@ -21,6 +21,7 @@ from data.tree import Tree
 from util import Tools
 
 import logging
+import numpy as np
 
 
 class Volumen(CutDownType):
@@ -48,6 +49,13 @@ class Volumen(CutDownType):
 
         return tree.vol*tree.expan
 
+    def accumulator_values(self, table):
+        """
+        Function used by the harvest models, that returns the value of the accumulator function for all the trees of a TreeTable.
+        """
+
+        return table.column('vol', dtype=np.float64)*table.column('expan', dtype=np.float64)
+
     def compute_expan(self, tree: Tree, accumulator: float, cut_discriminator: float):
         """
         Function that calculate, for the last tree alive, the amount of expan that will continue alive and the part that will be cut.
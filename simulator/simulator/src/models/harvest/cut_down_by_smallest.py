@@ -56,10 +56,6 @@ class CutDownBySmallest(HarvestModel):
 
         CutDownSupport.check_time(time)
 
-        # set needed variables
-        accumulator = 0
-        cut_all_the_rest = False  # flag variable
-
         # get plot and trees data selecting according to ingrowth function results
         new_plot, trees = CutDownSupport.plot_data_selection(plot, order=ASC)
 
@@ -72,41 +68,6 @@ class CutDownBySmallest(HarvestModel):
         # I decided to skip this step
         #TreeEquations.null_growth(trees)  # stablish growth on harvest process as 0
 
-        for tree in trees:  # for each tree of the plot...
-
-            accumulator += self.type.accumulator(tree)  # get and sum the value for each tree to the cut criteria file
-
-            if not cut_all_the_rest:  # while flag variable is not activated...
-
-                new_tree = Tree()
-                new_tree.clone(tree)  # we clone the tree
-
-                if accumulator >= cut_discriminator:  # once the sum pf trees is higher or equal to the discriminator
-
-                    cut_all_the_rest = True  # flag is activated
-                    new_expan = self.type.compute_expan(tree, accumulator, cut_discriminator)  # we calculate the amount of expan of the last tree that must continue alive
-
-                    if new_expan <= 0:  # if the last tree has no expan alive, all the tree change to dead
-                        new_tree.add_value('expan', new_expan)
-                        new_tree.add_value('status', 'C')
-                    else:  # if not...
-                        cut_tree = Tree()
-                        cut_tree.clone(tree)  # we clone again the tree
-                        cut_tree.add_value('status', 'C')  # set 'C' status to the part of the expan that will be cut
-                        cut_tree.add_value('expan', new_expan)  # and assign the expan
-
-                        if cut_tree.expan > 0:
-                            new_plot.add_tree(cut_tree)  # and the cut tree is added to the list
-
-                        new_tree.sub_value('expan', new_expan)  # the part of cut expan is take away from the initial expan
-                        new_tree.add_value('status', None)
-
-                new_plot.add_tree(new_tree)  # and we add it to the list of trees
-
-            else:  # once the flag is activated, all the trees and expan must be cut
-                new_tree = Tree()
-                new_tree.clone(tree)
-                new_tree.add_value('status', 'C')
-                new_plot.add_tree(new_tree)
-
-        return new_plot
+        # trees are kept alive until the discriminator is reached, and the rest are cut
+        values = CutDownSupport.accumulator_values(self.type, trees)
+        return CutDownSupport.harvest(new_plot, trees, self.type, values, start=cut_discriminator)
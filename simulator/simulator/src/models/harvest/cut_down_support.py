@@ -28,9 +28,19 @@ from data.search import ASC
 from data.search import DESC
 from util import Tools
 from models.trees.equations_tree_models import TreeEquations
+from data import TreeTable
 
 import logging
 import i18n
+import numpy as np
+
+
+# kind of each tree on a harvest (see CutDownSupport.harvest)
+KEEP = 0  # the tree continues alive
+CUT = 1  # all the expan of the tree is cut
+SHARE = 2  # the same % of the expan of the tree is cut
+START = 3  # tree where the harvest starts, split into cut and alive part
+FINISH = 4  # tree where the harvest finishes, split into cut and alive part
 
 class CutDownSupport(HarvestModel):
 
@@ -97,8 +107,7 @@ class CutDownSupport(HarvestModel):
         search_criteria.add_criteria('status', None, EQUAL)  # Cuts only are done over alive trees
 
         # get list of trees (temporally)
-        trees = Tree.get_sord_and_order_tree_list(plot.trees, search_criteria=search_criteria,
-                                                  order_criteria=order_criteria)  # import tree information
+        trees = plot.get_trees_by_criteria(search_criteria, order_criteria)  # import tree information, sorted by the plot
 
         # ingrowth flag: it will be activated if ingrowth function had included new trees on the plot
         ingrowth_flag = False
@@ -106,7 +115,7 @@ class CutDownSupport(HarvestModel):
         # for each tree...
         for tree in trees:
             # check if the tree was created by the ingrowth function of the simulator
-            if isinstance(tree.tree_id, int) and tree.tree_id >= 1000000:
+            if tree.ingrowth:
                 # if any tree was created by the ingrowth function, then the flag is activated
                 ingrowth_flag = True
                 break
@@ -120,3 +129,140 @@ class CutDownSupport(HarvestModel):
         # the correct plot information and the tree list is the result of the function
         return new_plot, trees
 
+
+    def accumulator_values(cut_type, trees):
+        """
+        Returns the value of the accumulator function of the cut criteria (N, G or V) for each tree of the list.
+        Args.:
+            - cut_type: cut criteria of the harvest model (models/cuts)
+            - trees: list of trees, as given by plot_data_selection
+        """
+
+        return np.asarray(cut_type.accumulator_values(TreeTable.from_trees(trees)), dtype=np.float64)
+
+
+    def species_mask(trees, species):
+        """
+        Returns which trees of the list are of the species selected at the scenario, or None if no species was selected.
+        Args.:
+            - trees: list of trees, as given by plot_data_selection
+            - species: species code provided by the user on the scenario ('' for all the species)
+        """
+
+        if species == '':
+            return None
+
+        return np.trunc(TreeTable.from_trees(trees).column('specie', dtype=np.float64)) == int(species)
+
+
+    def harvest(new_plot, trees, cut_type, values, start=None, finish=None, value=None, mask=None, first_reach=True,
+                clamp=False):
+        """
+        Harvest kernel used by all the harvest models. The trees are walked in order accumulating the cut criteria
+        (N, G or V), and each harvest model is a configuration of the points where the harvest starts and finishes.
+        The trees not selected by the mask are preserved, and they are accumulated before the rest.
+        The kind of each tree is computed at once, using the accumulated values (np.cumsum) and the position of the
+        start and finish points on them (np.searchsorted):
+            - trees before the start point are preserved, and the tree that reaches it is split
+            - trees between the start and finish points are cut (value None) or harvested by the same % (value)
+            - the tree that reaches the finish point is split, and the trees after it are preserved
+        The new trees are added to new_plot, in the same order as they were processed tree by tree.
+        Args.:
+            - new_plot: plot where the trees are added, as given by plot_data_selection
+            - trees: list of trees, as given by plot_data_selection
+            - cut_type: cut criteria of the harvest model (models/cuts)
+            - values: value of the accumulator function for each tree (see accumulator_values), None if not needed
+            - start: accumulated value where the harvest starts (None to start at the first tree)
+            - finish: accumulated value where the harvest finishes (None to finish at the last tree)
+            - value: % of expan to harvest of each tree between the points (None to cut all of it)
+            - mask: trees that can be harvested (None for all of them)
+            - first_reach: the first tree reaching the start point is split, even if the trees before reached it too
+            - clamp: the expan cut on the start tree is limited to the expan of the tree
+        """
+
+        values = np.zeros(len(trees)) if values is None else np.asarray(values, dtype=np.float64)
+
+        if mask is None:
+            rows = np.arange(len(trees))
+            kept = 0
+        else:
+            mask = np.asarray(mask, dtype=bool)
+            rows = np.concatenate((np.flatnonzero(~mask), np.flatnonzero(mask)))  # preserved trees are processed before
+            kept = len(rows) - int(np.count_nonzero(mask))
+
+        size = len(rows)
+        accumulator = np.cumsum(values[rows])  # summed one by one, as the loop over the trees
+        before = np.concatenate(([0.0], accumulator[:-1]))  # accumulator before each tree
+        harvested = accumulator[kept:]
+
+        kinds = np.full(size, CUT if value is None else SHARE, dtype=np.int64)
+        kinds[:kept] = KEEP
+
+        begin = kept  # first tree after the start point
+        if start is not None:
+            first = kept + int(np.searchsorted(harvested, start, side='left'))  # first tree reaching the start point
+            kinds[kept:first] = KEEP
+            begin = first
+            if first < size and (first_reach or before[first] < start):
+                kinds[first] = START
+                begin = first + 1
+
+        if finish is not None:
+            last = kept + int(np.searchsorted(harvested, finish, side='left'))  # first tree reaching the finish point
+            kinds[max(begin, last):] = KEEP
+            if begin <= last < size and before[last] < finish:
+                kinds[last] = FINISH
+
+        expan = TreeTable.from_trees([trees[row] for row in rows]).column('expan', dtype=np.float64)
+        share = np.zeros(size)
+        if value is not None:
+            share = expan * ((100 - value) / 100)  # alive tree expan is reduced, all the trees at the same proportion
+
+        for n, (row, kind) in enumerate(zip(rows.tolist(), kinds.tolist())):
+
+            tree = trees[row]
+            new_tree = Tree.clone_on_write(tree)
+
+            if kind == CUT:
+                new_tree.add_value('status', 'C')
+
+            elif kind == SHARE:
+                new_tree.add_value('expan', float(share[n]))
+                new_tree.add_value('status', None)
+
+                cut_tree = Tree.clone_on_write(tree)
+                cut_tree.add_value('status', 'C')
+                cut_tree.add_value('expan', float(expan[n] - share[n]))  # a clone with 'C' status, with the expan cut
+
+                if cut_tree.expan > 0:  # cut trees will appear at the output only if the cut expan exists
+                    new_plot.add_tree(cut_tree)
+
+            elif kind != KEEP:
+                # amount of expan of the tree to cut
+                if kind == START:
+                    new_expan = cut_type.compute_expan(tree, float(accumulator[n]), start)
+                else:
+                    new_expan = cut_type.compute_expan(tree, finish, float(before[n]))
+                cut_expan = new_expan if kind == START or value is None else new_expan * (value / 100)
+
+                if new_expan <= 0:  # if the tree has no expan alive, all the tree change to dead
+                    new_tree.add_value('expan', cut_expan)
+                    new_tree.add_value('status', 'C')
+                else:
+                    # avoid impossible expan values by reducing the harvest intensity if it is not possible to apply
+                    if clamp and kind == START and cut_expan > tree.expan:
+                        cut_expan = tree.expan
+
+                    cut_tree = Tree.clone_on_write(tree)
+                    cut_tree.add_value('status', 'C')  # set 'C' status to the part of the expan that will be cut
+                    cut_tree.add_value('expan', cut_expan)
+
+                    if cut_tree.expan > 0:
+                        new_plot.add_tree(cut_tree)
+
+                    new_tree.sub_value('expan', cut_expan)  # the part of cut expan is take away from the initial expan
+                    new_tree.add_value('status', None)
+
+            new_plot.add_tree(new_tree)
+
+        return new_plot
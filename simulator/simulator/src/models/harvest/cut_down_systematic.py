@@ -62,21 +62,5 @@ class CutDownSystematics(HarvestModel):
         # I decided to skip this step
         #TreeEquations.null_growth(trees)  # establish growth on harvest process as 0
 
-        for tree in trees:  # for each tree of the plot...
-
-            new_tree = Tree()
-            new_tree.clone(tree)  # tree is cloned
-
-            new_tree.add_value('expan', tree.expan * ((100 - value) / 100))  # alive tree expan is reduced, all the trees at the same proportion
-            new_tree.add_value('status', None)
-            new_plot.add_tree(new_tree)
-
-            cut_tree = Tree()
-            cut_tree.clone(tree)
-            cut_tree.add_value('status', 'C')
-            cut_tree.add_value('expan', tree.expan - new_tree.expan)  # a clone with 'C' status is created to print it at the output, with the expan cut
-
-            if cut_tree.expan > 0:  # cut trees will appear at the output only if the cut expan exists
-                new_plot.add_tree(cut_tree)
-
-        return new_plot
+        # alive tree expan is reduced, all the trees at the same proportion
+        return CutDownSupport.harvest(new_plot, trees, self.type, None, value=value)
@@ -27,6 +27,7 @@ from data.search import DESC
 from util import Tools
 from models.trees.equations_tree_models import TreeEquations
 from models.harvest.cut_down_support import CutDownSupport
+from data.plot_aggregates import sequential_sum
 
 import logging
 
@@ -62,41 +63,13 @@ class CutDownSystematics(HarvestModel):
         # I decided to skip this step
         #TreeEquations.null_growth(trees)  # stablish growth on harvest process as 0
 
-        trees_harvest = list()  # list of trees to harvest
-        trees_not_harvest = list()  # list of trees to not harvest
-        accumulator = 0  # accumulator variable
-        full_accumulator = 0  # accumulator variable
+        mask = CutDownSupport.species_mask(trees, species)  # trees of the species selected at the scenario, that will be harvested
 
-
-        # split trees into harvest and not harvest trees
-        for tree in trees:  # for each tree of the plot, split list into harvest and not harvest trees
-
-            full_accumulator += self.type.accumulator(tree)  # get and sum the value for each tree to the cut criteria file
-
-            if species == '' or (species != '' and int(tree.specie) == int(species)):  # if the tree is the species selected at the scenario...
-                trees_harvest.append(tree)
-            else:
-                trees_not_harvest.append(tree)
-
-
-        # manage trees to not harvest
-        for tree in trees_not_harvest:  # for each tree of the plot that will be not harvested...
-
-            # Note: that trees are processed before to avoid mistakes on the accumulator value
-            accumulator += self.type.accumulator(tree)  # get and sum the value for each tree to the cut criteria file
-
-            # preserve trees
-            new_tree = Tree()
-            new_tree.clone(tree)
-            new_plot.add_tree(new_tree)
-
-
-        # calculate cut_discriminator depending on the harvest intensity is applied over plot or species values
-        if volume_target in ['species', 'especie']:  # if the volume target is referred to the species in the plot
-            # get the % of expan to cut by species, according to the accumulator value
-            value = value
-
-        else:  # if the volume target is referred to the plot
+        # calculate the % of expan to cut depending on the harvest intensity is applied over plot or species values
+        if volume_target not in ['species', 'especie']:  # if the volume target is referred to the plot
+            values = CutDownSupport.accumulator_values(self.type, trees)  # value of each tree to the cut criteria file
+            full_accumulator = sequential_sum(values)
+            accumulator = 0 if mask is None else sequential_sum(values[~mask])  # trees that will be not harvested
             value = value * full_accumulator / 100
             value = (value / (full_accumulator - accumulator)) * 100
 
@@ -104,23 +77,5 @@ class CutDownSystematics(HarvestModel):
         if value > 100:
             value = 100
 
-
-        # manage trees to harvest
-        for tree in trees_harvest:  # for each tree of the plot...
-
-            new_tree = Tree()
-            new_tree.clone(tree)  # tree is cloned
-
-            new_tree.add_value('expan', tree.expan * ((100 - value) / 100))  # alive tree expan is reduced, all the trees at the same proportion
-            new_tree.add_value('status', None)
-            new_plot.add_tree(new_tree)
-
-            cut_tree = Tree()
-            cut_tree.clone(tree)
-            cut_tree.add_value('status', 'C')
-            cut_tree.add_value('expan', tree.expan - new_tree.expan)  # a clone with 'C' status is created to print it at the output, with the expan cut
-
-            if cut_tree.expan > 0:  # cut trees will appear at the output only if the cut expan exists
-                new_plot.add_tree(cut_tree)
-
-        return new_plot
+        # trees of other species are preserved, and the rest are harvested at the same proportion
+        return CutDownSupport.harvest(new_plot, trees, self.type, None, value=value, mask=mask)
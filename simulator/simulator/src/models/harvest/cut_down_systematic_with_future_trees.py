@@ -27,6 +27,7 @@ from data.search import DESC
 from util import Tools
 from models.trees.equations_tree_models import TreeEquations
 from models.harvest.cut_down_support import CutDownSupport
+from data.plot_aggregates import sequential_sum
 
 import logging
 
@@ -66,14 +67,9 @@ class CutDownSystematics(HarvestModel):
         preserve = preserve_trees / 100
         harvest = 1 - preserve
 
-        # variable to control which trees should not be harvested
-        accumulator = full_accumulator = 0
-
         # get the stand value of the criteria variable (N, G, V)
-        for tree in trees:
-
-            # get and sum the value for each tree to the cut criteria file
-            full_accumulator += self.type.accumulator(tree)
+        values = CutDownSupport.accumulator_values(self.type, trees)
+        full_accumulator = sequential_sum(values)
 
         # set the finish point of the harvest
         cut_discriminator_finish = full_accumulator * harvest
@@ -82,66 +78,5 @@ class CutDownSystematics(HarvestModel):
         value = ((value * full_accumulator) / 100)
         value = (value / cut_discriminator_finish) * 100
 
-        # harvest preserving trees with higher dbh
-        for tree in trees:
-
-            # create variables for accumulator without and with the tree, and the tree accumulator (N, G, V)
-            accumulator_before_my_tree = accumulator
-            accumulator += self.type.accumulator(tree)  # get and sum the value for each tree to the cut criteria file
-            # my_tree_accumulator = accumulator - accumulator_before_my_tree
-
-            # trees to harvest using the new harvest value
-            if accumulator < cut_discriminator_finish:
-
-                # divide the tree into alive and harvested part
-                new_tree = Tree()
-                new_tree.clone(tree)  # tree is cloned
-
-                new_tree.add_value('expan', tree.expan * ((100 - value) / 100))  # alive tree expan is reduced, all the trees at the same proportion
-                new_tree.add_value('status', None)
-
-                cut_tree = Tree()
-                cut_tree.clone(tree)
-                cut_tree.add_value('status', 'C')
-                cut_tree.add_value('expan', tree.expan - new_tree.expan)  # a clone with 'C' status is created to print it at the output, with the expan cut
-
-                if cut_tree.expan > 0:  # cut trees will appear at the output only if the cut expan exists
-                    new_plot.add_tree(cut_tree)
-
-            # tree that must be divided into harvested and alive before to apply the harvest to just one part
-            elif accumulator >= cut_discriminator_finish and accumulator_before_my_tree < cut_discriminator_finish:
-
-                # divide the tree into alive and harvested part
-                new_tree = Tree()
-                new_tree.clone(tree)  # tree is cloned
-
-                # we calculate the amount of expan of the last tree that must continue alive
-                expan_to_harvest = self.type.compute_expan(tree, cut_discriminator_finish, accumulator_before_my_tree)
-
-                if expan_to_harvest <= 0:  # if the last tree has no expan alive, all the tree change to dead
-
-                    new_tree.add_value('expan', expan_to_harvest * (value / 100))
-                    new_tree.add_value('status', 'C')
-
-                else:  # if not...
-
-                    cut_tree = Tree()
-                    cut_tree.clone(tree)  # we clone again the tree
-                    cut_tree.add_value('status', 'C')  # set 'C' status to the part of the expan that will be cut
-                    cut_tree.add_value('expan', expan_to_harvest * (value / 100))  # and assign the expan
-
-                    if cut_tree.expan > 0:
-                        new_plot.add_tree(cut_tree)  # and the cut tree is added to the list
-
-                    new_tree.sub_value('expan', expan_to_harvest * (value / 100))  # the part of cut expan is take away from the initial expan
-                    new_tree.add_value('status', None)
-
-            # trees to preserve without changes
-            else:
-
-                new_tree = Tree()
-                new_tree.clone(tree)  # tree is cloned
-
-            new_plot.add_tree(new_tree)
-
-        return new_plot
+        # trees until the finish point are harvested using the new harvest value, and the bigger ones are preserved
+        return CutDownSupport.harvest(new_plot, trees, self.type, values, finish=cut_discriminator_finish, value=value)
@@ -71,8 +71,7 @@ class Debark(HarvestModel):
 
         for tree in trees:  # for each tree of the plot...
 
-            new_tree = Tree()
-            new_tree.clone(tree)  # tree is cloned
+            new_tree = Tree.clone_on_write(tree)  # tree is cloned
 
             if new_tree.dbh > dbh_min:  # if tree diameter is higher than the minimum stablished
 
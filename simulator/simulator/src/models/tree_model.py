@@ -20,11 +20,16 @@ from abc import ABCMeta
 from abc import abstractmethod
 from data import Tree
 from data import Plot
+from data import TreeTable
 from util import Tools
 from scipy import integrate
 from models.trees import *
 from data.general import Area
 from data.variables import TREE_VARS
+from models.trees.equations_tree_taper import TreeTaper
+from models.trees.equations_tree_merch import MerchantableVolume
+from models.trees.equations_tree_tables import TreeTables
+from models.trees.equations_tree_competition import TreeCompetition, SpatialIndex, EDGE_NONE, EDGE_WEIGHT
 
 import logging
 import math
@@ -40,6 +45,8 @@ class TreeModel(metaclass=ABCMeta):
 
         Tools.print_log_line("Loading model " + str(self.name) + "(" + str(self.version) + ")", logging.INFO)
 
+        TreeTables.attach(self)  # vol and biomass are interpolated on tables if they are enabled (tree_tables)
+
     def catch_model_exception(self):  # that function catch errors and show the line where they are
         exc_type, exc_obj, exc_tb = sys.exc_info()
         fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
@@ -85,6 +92,40 @@ class TreeModel(metaclass=ABCMeta):
     def update_model(self, years: int, plot: Plot, trees: list):
         return
 
+    def survival_batch(self, years: int, plot: Plot, trees_table):
+        """
+        Optional vectorized version of survival, used by basic_engine instead of calling survival tree by tree.
+        trees_table is a TreeTable with the alive trees of the plot (see data/tree_table.py).
+        It must return a NumPy array with the survival ratio of each tree (NaN to use survival on that tree),
+        or None if the model has not a vectorized survival.
+        """
+        return None
+
+    def growth_batch(self, years: int, plot: Plot, trees_table):
+        """
+        Optional vectorized version of growth, used by basic_engine instead of calling growth tree by tree.
+        It must return a dict {variable: NumPy array} with the increments (dbh, height...) of each tree of trees_table,
+        or None if the model has not a vectorized growth. Trees with a NaN increment are calculated by using growth.
+        Variables that are not increments (i.e. dbh_i) can be written on the valid trees by using trees_table.set_column.
+        Once the increments are added to a tree, update_after_growth is executed with it.
+        """
+        return None
+
+    def update_after_growth(self, years: int, plot: Plot, tree: Tree):
+        """
+        Function executed with each tree after adding the increments of growth_batch,
+        to update the variables that depend on them (basal area, volume...).
+        """
+        return
+
+    def fang_over_bark(self, tree: Tree, plot: Plot = None):
+        """
+        Optional function that returns the coefficients (ao, a1, a2, b1, b2, b3, p1, p2) of the Fang taper equation used by
+        taper_over_bark for the tree, or None if the model uses another taper equation.
+        The coefficients are passed to VolumeIntegration and MerchantableVolume, that integrate the segments of the equation.
+        """
+        return None
+
     @staticmethod
     def simps(a, b, epsilon, tree, f):
         """
@@ -125,65 +166,17 @@ class TreeModel(metaclass=ABCMeta):
         """
         Function needed to calculate the merchantable volumen of the different wood uses.
         That function must be activated by using merchantable function on the model, and it will need his taper_over_bark function to calculate it
+        It returns the usage dictionary and the list of volumes calculated by MerchantableVolume.
         """
 
-        try:
+        usage, merch_list = dict(), list()
 
-            ht = tree.height  # the total height as ht to simplify
-  
-            global usage  # share that dictionary to give access in other functions
-            usage = {}  # that dictionary will obtain the values of usage acceptability for each tree
+        try:
 
-            if 'stump_h' in TREE_VARS:
-                if tree.stump_h != 0 and tree.stump_h != '':   
-                    hro = tree.stump_h / ht  # initial height = stump height
-                else:
-                    hro = 0.20 / ht  # initial height = stump height
-            else:
-                hro = 0.20 / ht  # initial height = stump height
-   
-            counter = -1
-            for k in class_conditions:  # for each list (usage+conditions) on class_conditions...
-                counter += 1
-                if (class_conditions[counter][1] + hro) <= 1:
-                    usage[class_conditions[counter][0]] = True  # if stump + log <= 1 (total relative height), then the use is accepted
-                else:
-                    usage[class_conditions[counter][0]] = False  # if not, the use is rejected
-
-            count = -1
-            global merch_list  # share that list to give access in other functions
-            merch_list = []  # that list will obtain the results of calculate the different log volumes
-            
-            for k, i in usage.items():  # for each usage defined before...
-
-                if 'stump_h' in TREE_VARS:
-                    if tree.stump_h != 0 and tree.stump_h != '':   
-                        hro = tree.stump_h / ht  # initial height = stump height
-                    else:
-                        hro = 0.20 / ht  # initial height = stump height
-                else:
-                    hro = 0.20 / ht  # initial height = stump height
-
-                vol = 0
-                count += 1  # that variable allow us to go over the lists
-                if i == True:  # if the log satisfy the restrictions...
-                    dr = model().taper_over_bark(tree, hro)  # diameter of tree at the stump height
-                    while dr > class_conditions[count][3] and (hro + 0.05/ht <= 1):  # if the diameter > dmax, and hr <= 1...
-                        hro += 0.05 / ht  # we go over the log looking for the part with diameter <= dmax for that usage
-                        dr = model().taper_over_bark(tree, hro)  # we calculate the diameter on the next point, to verify the conditions
-                    while dr >= class_conditions[count][2] and (hro + class_conditions[count][1] <= 1):  # satisfying dmax, if diameter > dmin and hro is between integration limits (0-1)...
-                        hro += class_conditions[count][1]  # from the start point on the tree, we add the length of a log with the usage specifications
-                        dr = model().taper_over_bark(tree, hro)  # we again calculate the diameter at this point; the second while condition has sense in here, to not get over 1 integration limit
-                        if dr >= class_conditions[count][2] and hro <= 1:  # as taper equation reduce the diameter, it is not needed to check it
-                        # if the log diameter > dmin, and hro doesn't overpass 1 (integration limit)
-                            hr = np.arange((hro - class_conditions[count][1]), hro, 0.001)  # integration conditions for taper equation
-                            d = model().taper_over_bark(tree, hr)  # we get the taper equation with the previous conditions
-                            f = (d / 20) ** 2  # to calculate the volume (dm3), we change the units of the result and calculate the radius^2 (instead of diameter)
-                            vol += math.pi * ht * 10 * (integrate.simps(f, hr))  # volume calculation, using the previous information
-                    if i == True:  # once the tree finish all the while conditions, it comes here, because it continues verifying that condition
-                        merch_list.append(vol)  # once we have the total volume for each usage, we add the value to that list
-                else:  # if the tree is not useful for one usage, it comes here
-                    merch_list.append(0)  # as it is not useful, we add 0 value to that usage
+            instance = model()
+            taper = instance.taper_over_bark
+            usage, merch_list = MerchantableVolume.calculate(tree, class_conditions, lambda hr: taper(tree, hr),
+                                                             values=instance.fang_over_bark(tree))
 
         except Exception:
             TreeModel.catch_model_exception()
@@ -197,63 +190,14 @@ class TreeModel(metaclass=ABCMeta):
         That function must be activated by using merchantable function on the model, and it will need his taper_over_bark function to calculate it
         """
 
+        usage, merch_list = dict(), list()
+
         try:
 
-            ht = tree.height  # the total height as ht to simplify
-  
-            global usage  # share that dictionary to give access in other functions
-            usage = {}  # that dictionary will obtain the values of usage acceptability for each tree
-                
-            if 'stump_h' in TREE_VARS:
-                if tree.stump_h != 0 and tree.stump_h != '':   
-                    hro = tree.stump_h / ht  # initial height = stump height
-                else:
-                    hro = 0.20 / ht  # initial height = stump height
-            else:
-                hro = 0.20 / ht  # initial height = stump height
-   
-            counter = -1
-            for k in class_conditions:  # for each list (usage+conditions) on class_conditions...
-                counter += 1
-                if (class_conditions[counter][1] + hro) <= 1:
-                    usage[class_conditions[counter][0]] = True  # if stump + log <= 1 (total relative height), then the use is accepted
-                else:
-                    usage[class_conditions[counter][0]] = False  # if not, the use is rejected
-
-            count = -1
-            global merch_list  # share that list to give access in other functions
-            merch_list = []  # that list will obtain the results of calculate the different log volumes
-
-            for k, i in usage.items():  # for each usage defined before...
-
-                if 'stump_h' in TREE_VARS:
-                    if tree.stump_h != 0 and tree.stump_h != '':   
-                        hro = tree.stump_h / ht  # initial height = stump height
-                    else:
-                        hro = 0.20 / ht  # initial height = stump height
-                else:
-                    hro = 0.20 / ht  # initial height = stump height
-
-                vol = 0
-                count += 1  # that variable allow us to go over the lists
-                if i == True:  # if the log satisfy the restrictions...
-                    dr = model().taper_over_bark(tree, plot, hro)  # diameter of tree at the stump height
-                    while dr > class_conditions[count][3] and (hro + 0.05/ht <= 1):  # if the diameter > dmax, and hr <= 1...
-                        hro += 0.05 / ht  # we go over the log looking for the part with diameter <= dmax for that usage
-                        dr = model().taper_over_bark(tree, plot, hro)  # we calculate the diameter on the next point, to verify the conditions
-                    while dr >= class_conditions[count][2] and (hro + class_conditions[count][1] <= 1):  # satisfying dmax, if diameter > dmin and hro is between integration limits (0-1)...
-                        hro += class_conditions[count][1]  # from the start point on the tree, we add the length of a log with the usage specifications
-                        dr = model().taper_over_bark(tree, plot, hro)  # we again calculate the diameter at this point; the second while condition has sense in here, to not get over 1 integration limit
-                        if dr >= class_conditions[count][2] and hro <= 1:  # as taper equation reduce the diameter, it is not needed to check it
-                        # if the log diameter > dmin, and hro doesn't overpass 1 (integration limit)
-                            hr = np.arange((hro - class_conditions[count][1]), hro, 0.001)  # integration conditions for taper equation
-                            d = model().taper_over_bark(tree, plot, hr)  # we get the taper equation with the previous conditions
-                            f = (d / 20) ** 2  # to calculate the volume (dm3), we change the units of the result and calculate the radius^2 (instead of diameter)
-                            vol += math.pi * ht * 10 * (integrate.simps(f, hr))  # volume calculation, using the previous information
-                    if i == True:  # once the tree finish all the while conditions, it comes here, because it continues verifying that condition
-                        merch_list.append(vol)  # once we have the total volume for each usage, we add the value to that list
-                else:  # if the tree is not useful for one usage, it comes here
-                    merch_list.append(0)  # as it is not useful, we add 0 value to that usage
+            instance = model()
+            taper = instance.taper_over_bark
+            usage, merch_list = MerchantableVolume.calculate(tree, class_conditions, lambda hr: taper(tree, plot, hr),
+                                                             values=instance.fang_over_bark(tree, plot))
 
         except Exception:
             TreeModel.catch_model_exception()
@@ -267,63 +211,31 @@ class TreeModel(metaclass=ABCMeta):
         That function must be activated by using merchantable function on the model, and it will need his taper_over_bark function to calculate it
         """
 
-        ht = tree.height  # the total height as ht to simplify
+        return MerchantableVolume.calculate(tree, class_conditions, lambda hr: model.taper_over_bark(self, tree, plot, hr),
+                                            values=model.fang_over_bark(self, tree, plot))
 
-        global usage  # share that dictionary to give access in other functions
-        usage = {}  # that dictionary will obtain the values of usage acceptability for each tree
 
-        if 'stump_h' in TREE_VARS:
-            if tree.stump_h != 0 and tree.stump_h != '':   
-                hro = tree.stump_h / ht  # initial height = stump height
-            else:
-                hro = 0.20 / ht  # initial height = stump height
-        else:
-            hro = 0.20 / ht  # initial height = stump height
+    def merch_calculation_all_species_batch(trees: list, class_conditions: list, model):
+        """
+        Function needed to calculate the merchantable volumen of the different wood uses of several trees at once.
+        That function must be activated by using merchantable function on the all species model, and it will need his taper_over_bark function to calculate it
+        It returns a list with (usage, merch_list) for each tree.
+        """
 
-        counter = -1
-        for k in class_conditions:  # for each list (usage+conditions) on class_conditions...
-            counter += 1
-            if (class_conditions[counter][1] + hro) <= 1:
-                usage[class_conditions[counter][0]] = True  # if stump + log <= 1 (total relative height), then the use is accepted
-            else:
-                usage[class_conditions[counter][0]] = False  # if not, the use is rejected
+        results = [(dict(), list()) for tree in trees]
 
-        count = -1
-        global merch_list  # share that list to give access in other functions
-        merch_list = []  # that list will obtain the results of calculate the different log volumes
+        try:
 
-        for k, i in usage.items():  # for each usage defined before...
+            instance = model()
+            taper = instance.taper_over_bark_Fang
+            values = [instance.fang_over_bark(tree) for tree in trees]  # False if the species has not Fang taper equation
+            results = MerchantableVolume.calculate_batch(trees, class_conditions, [lambda hr, tree=tree: taper(tree, hr) for tree in trees],
+                                                         values=[tree_values if isinstance(tree_values, tuple) else None for tree_values in values])
 
-            if 'stump_h' in TREE_VARS:
-                if tree.stump_h != 0 and tree.stump_h != '':   
-                    hro = tree.stump_h / ht  # initial height = stump height
-                else:
-                    hro = 0.20 / ht  # initial height = stump height
-            else:
-                hro = 0.20 / ht  # initial height = stump height
-
-            vol = 0
-            count += 1  # that variable allow us to go over the lists
-            if i == True:  # if the log satisfy the restrictions...
-                dr = model.taper_over_bark(self, tree, plot, hro)  # diameter of tree at the stump height
-                while dr > class_conditions[count][3] and (hro + 0.05/ht <= 1):  # if the diameter > dmax, and hr <= 1...
-                    hro += 0.05 / ht  # we go over the log looking for the part with diameter <= dmax for that usage
-                    dr = model.taper_over_bark(self, tree, plot, hro)  # we calculate the diameter on the next point, to verify the conditions
-                while dr >= class_conditions[count][2] and (hro + class_conditions[count][1] <= 1):  # satisfying dmax, if diameter > dmin and hro is between integration limits (0-1)...
-                    hro += class_conditions[count][1]  # from the start point on the tree, we add the length of a log with the usage specifications
-                    dr = model.taper_over_bark(self, tree, plot, hro)  # we again calculate the diameter at this point; the second while condition has sense in here, to not get over 1 integration limit
-                    if dr >= class_conditions[count][2] and hro <= 1:  # as taper equation reduce the diameter, it is not needed to check it
-                    # if the log diameter > dmin, and hro doesn't overpass 1 (integration limit)
-                        hr = np.arange((hro - class_conditions[count][1]), hro, 0.001)  # integration conditions for taper equation
-                        d = model.taper_over_bark(self, tree, plot, hr)  # we get the taper equation with the previous conditions
-                        f = (d / 20) ** 2  # to calculate the volume (dm3), we change the units of the result and calculate the radius^2 (instead of diameter)
-                        vol += math.pi * ht * 10 * (integrate.simps(f, hr))  # volume calculation, using the previous information
-                if i == True:  # once the tree finish all the while conditions, it comes here, because it continues verifying that condition
-                    merch_list.append(vol)  # once we have the total volume for each usage, we add the value to that list
-            else:  # if the tree is not useful for one usage, it comes here
-                merch_list.append(0)  # as it is not useful, we add 0 value to that usage
+        except Exception:
+            TreeModel.catch_model_exception()
 
-        return usage, merch_list
+        return results
 
 
     def merch_calculation_all_species(tree: Tree, class_conditions, model):
@@ -332,68 +244,7 @@ class TreeModel(metaclass=ABCMeta):
         That function must be activated by using merchantable function on the all species model, and it will need his taper_over_bark function to calculate it
         """
 
-        try:
-
-            ht = tree.height  # the total height as ht to simplify
-  
-            global usage  # share that dictionary to give access in other functions
-            usage = {}  # that dictionary will obtain the values of usage acceptability for each tree
-
-            if 'stump_h' in TREE_VARS:
-                if tree.stump_h != 0 and tree.stump_h != '':   
-                    hro = tree.stump_h / ht  # initial height = stump height
-                else:
-                    hro = 0.20 / ht  # initial height = stump height
-            else:
-                hro = 0.20 / ht  # initial height = stump height
-   
-            counter = -1
-            for k in class_conditions:  # for each list (usage+conditions) on class_conditions...
-                counter += 1
-                if (class_conditions[counter][1] + hro) <= 1:
-                    usage[class_conditions[counter][0]] = True  # if stump + log <= 1 (total relative height), then the use is accepted
-                else:
-                    usage[class_conditions[counter][0]] = False  # if not, the use is rejected
-
-            count = -1
-            global merch_list  # share that list to give access in other functions
-            merch_list = []  # that list will obtain the results of calculate the different log volumes
-            
-            for k, i in usage.items():  # for each usage defined before...
-
-                if 'stump_h' in TREE_VARS:
-                    if tree.stump_h != 0 and tree.stump_h != '':   
-                        hro = tree.stump_h / ht  # initial height = stump height
-                    else:
-                        hro = 0.20 / ht  # initial height = stump height
-                else:
-                    hro = 0.20 / ht  # initial height = stump height
-
-                vol = 0
-                count += 1  # that variable allow us to go over the lists
-                if i == True:  # if the log satisfy the restrictions...
-                    dr = model().taper_over_bark_Fang(tree, hro)  # diameter of tree at the stump height
-                    while dr > class_conditions[count][3] and (hro + 0.05/ht <= 1):  # if the diameter > dmax, and hr <= 1...
-                        hro += 0.05 / ht  # we go over the log looking for the part with diameter <= dmax for that usage
-                        dr = model().taper_over_bark_Fang(tree, hro)  # we calculate the diameter on the next point, to verify the conditions
-                    while dr >= class_conditions[count][2] and (hro + class_conditions[count][1] <= 1):  # satisfying dmax, if diameter > dmin and hro is between integration limits (0-1)...
-                        hro += class_conditions[count][1]  # from the start point on the tree, we add the length of a log with the usage specifications
-                        dr = model().taper_over_bark_Fang(tree, hro)  # we again calculate the diameter at this point; the second while condition has sense in here, to not get over 1 integration limit
-                        if dr >= class_conditions[count][2] and hro <= 1:  # as taper equation reduce the diameter, it is not needed to check it
-                        # if the log diameter > dmin, and hro doesn't overpass 1 (integration limit)
-                            hr = np.arange((hro - class_conditions[count][1]), hro, 0.001)  # integration conditions for taper equation
-                            d = model().taper_over_bark_Fang(tree, hr)  # we get the taper equation with the previous conditions
-                            f = (d / 20) ** 2  # to calculate the volume (dm3), we change the units of the result and calculate the radius^2 (instead of diameter)
-                            vol += math.pi * ht * 10 * (integrate.simps(f, hr))  # volume calculation, using the previous information
-                    if i == True:  # once the tree finish all the while conditions, it comes here, because it continues verifying that condition
-                        merch_list.append(vol)  # once we have the total volume for each usage, we add the value to that list
-                else:  # if the tree is not useful for one usage, it comes here
-                    merch_list.append(0)  # as it is not useful, we add 0 value to that usage
-
-        except Exception:
-            TreeModel.catch_model_exception()
-
-        return usage, merch_list
+        return TreeModel.merch_calculation_all_species_batch([tree], [class_conditions], model)[0]
 
 
     def choose_martonne(plot_id, year, list_years):
@@ -489,6 +340,8 @@ class TreeModel(metaclass=ABCMeta):
         """ 
         Hegyi index calculation. Another variables related with bal, basal area and density inside the Hegyi subplot are caltulated.
         That function is activated from the initialize and the update_model functions of the models which need it.
+        The neighbours are searched on the spatial index of the plot, built only once (see get_spatial_index);
+        to calculate all the trees of a plot at once, use hegyi_plot.
         Source: 
             Doc.: Hegyi F (1974). A simulation model for managing jack-pine stands simulation. RoyalColl. For, Res. Notes, 30, 74-90    
         """
@@ -498,92 +351,53 @@ class TreeModel(metaclass=ABCMeta):
             if radius_limit == 0 or radius_limit == '':  # create the radius_limit value as default
                 radius_limit = tree_i.height*0.25
 
-            TreeModel.check_plot_coordinates(plot)  # check if the plot position information is available
-            TreeModel.calculate_coordinates_all_trees(plot, plot_trees)  # calculate tree coordinates if it is needed
-
+            index = TreeModel.get_spatial_index(plot, plot_trees)  # tree coordinates are calculated if it is needed
 
             if "coord_x" in TREE_VARS and "coord_y" in TREE_VARS and tree_i.coord_x != '' and tree_i.coord_y != '':  # if position variable exists...
 
-                # lists needed
-                neighbours_i = list()
-                individual_hegyi = list()
-
-                bal = bal_intrasp = bal_intersp = g_intrasp = g_intersp = N_intrasp = N_intersp = 0  # variables needed to other calculations
-
-
-                for tree_j in plot_trees:  # tree that we want to know if is a neighbour or not from tree_i
-
-                    if tree_i.tree_id != tree_j.tree_id:  # do not include a tree as neighbour of himself
-
-                        x_diff = tree_i.coord_x - tree_j.coord_x  # distance on x axis
-                        y_diff = tree_i.coord_y - tree_j.coord_y  # distance on y axis
-                        dist_ij = math.sqrt((x_diff**2) + (y_diff**2))  # distance between i and j tree (hypotenuse)
-
-                        if dist_ij <= radius_limit:  # if the tree is inside the limit radius...
-
-                            neighbours_i.append(tree_j)  # the tree is added to a list
-
-                            hegyi_ij = tree_i.dbh/(tree_j.dbh*(dist_ij + 1))  # hegyi index calculation
-                            individual_hegyi.append(hegyi_ij)  # add hegyi index value to a list
-
-                        
-                            #------------------------ BAL, N and G -----------------------------#
-
-                            if int(tree_i.specie) == int(tree_j.specie):  # intraspecific condition                            
-
-                                bal_intrasp += tree_j.basal_area*tree_j.expan/10000  # accumulator to calculate that plot variable
-                                N_intrasp += tree_j.expan  # accumulator to calculate density per specie (trees/ha)
-                                g_intrasp += tree_j.basal_area*tree_j.expan/10000  # accumulator to calculate that plot variable (m2/ha)
-                           
-                            else:  # interspecific condition                            
-
-                                bal_intersp += tree_j.basal_area*tree_j.expan/10000  # accumulator to calculate that plot variable
-                                N_intersp += tree_j.expan  # accumulator to calculate density per specie (trees/ha)
-                                g_intersp += tree_j.basal_area*tree_j.expan/10000  # accumulator to calculate that plot variable (m2/ha)
-                        
-                    else:  # for the tree_i, data is needed to be included on the next variables
-                 
-                        N_intrasp += tree_j.expan  # accumulator to calculate density per specie (trees/ha)
-                        g_intrasp += tree_j.basal_area*tree_j.expan/10000  # accumulator to calculate that plot variable (m2/ha)
-
-
-
-                hegyi_index = sum(individual_hegyi)  # sum the individual hegyi index to get the final hegyi value
-                tree_i.add_value('hegyi', hegyi_index)  # add the value to the tree
-
-                tree_i.add_value("bal_intrasp_hegyi", bal_intrasp)  # intraspecific bal (m2/ha) inside hegyi subplot of each tree
-                tree_i.add_value("bal_intersp_hegyi", bal_intersp)  # interspecific bal (m2/ha) inside hegyi subplot of each tree
-                if bal_intrasp > 0:
-                    tree_i.add_value("bal_ratio_intrasp_hegyi", bal_intrasp/(bal_intrasp + bal_intersp))  # intraspecific bal ratio (0 to 1) inside hegyi subplot of each tree
-                else:
-                    tree_i.add_value("bal_ratio_intrasp_hegyi", 0)  # intraspecific bal ratio (0 to 1) inside hegyi subplot of each tree                   
-                if bal_intersp > 0:
-                    tree_i.add_value("bal_ratio_intersp_hegyi", bal_intersp/(bal_intrasp + bal_intersp))  # interspecific bal ratio (0 to 1) inside hegyi subplot of each tree
-                else:
-                    tree_i.add_value("bal_ratio_intersp_hegyi", 0)  # interspecific bal ratio (0 to 1) inside hegyi subplot of each tree
-                tree_i.add_value("bal_total_hegyi", bal_intrasp + bal_intersp)  # total bal (m2/ha) inside hegyi subplot of each tree
-                tree_i.add_value("g_intrasp_hegyi", g_intrasp)  # intraspecific basal area (m2/ha) inside hegyi subplot of each tree
-                tree_i.add_value("g_intersp_hegyi", g_intersp)  # interspecific basal area (m2/ha) inside hegyi subplot of each tree
-                if g_intrasp > 0:                
-                    tree_i.add_value("g_ratio_intrasp_hegyi", g_intrasp/(g_intrasp + g_intersp))  # intraspecific basal area ratio (0 to 1) inside hegyi subplot of each tree
-                else:
-                    tree_i.add_value("g_ratio_intrasp_hegyi", 0)
-                if g_intersp > 0:
-                    tree_i.add_value("g_ratio_intersp_hegyi", g_intersp/(g_intrasp + g_intersp))  # intraspecific basal area ratio (0 to 1) inside hegyi subplot of each tree
-                else:
-                    tree_i.add_value("g_ratio_intersp_hegyi", 0)
-                tree_i.add_value("g_total_hegyi", g_intrasp + g_intersp)  # total basal area (m2/ha) inside hegyi subplot of each tree
-                tree_i.add_value("n_intrasp_hegyi", N_intrasp)  # intraspecific density (trees/ha) inside hegyi subplot of each tree
-                tree_i.add_value("n_intersp_hegyi", N_intersp)  # interspecific density (trees/ha) inside hegyi subplot of each tree
-                if N_intrasp > 0:
-                    tree_i.add_value("n_ratio_intrasp_hegyi", N_intrasp/(N_intrasp + N_intersp))  # intraspecific density ratio (0 to 1) inside hegyi subplot of each tree
-                else:
-                    tree_i.add_value("n_ratio_intrasp_hegyi", 0)
-                if N_intersp > 0:
-                    tree_i.add_value("n_ratio_intersp_hegyi", N_intersp/(N_intrasp + N_intersp))  # interspecific density ratio (0 to 1) inside hegyi subplot of each tree
-                else:
-                    tree_i.add_value("n_ratio_intersp_hegyi", 0)
-                tree_i.add_value("n_total_hegyi", N_intrasp + N_intersp)  # total density (trees/ha) inside hegyi subplot of each tree
+                TreeCompetition.set_hegyi(index, [tree_i], radius_limit)
+
+            else:
+
+                print("Hegyi index was not possible to calculate due to the lack of position tree information.")
+
+        except Exception:
+            TreeModel.catch_model_exception()
+
+
+    def hegyi_plot(plot, plot_trees, radius_limit = 0, edge = EDGE_NONE, plot_radius = None, subjects = None):
+        """
+        Hegyi index calculation for all the trees of the plot at once (see hegyi), answering all the neighbourhood
+        queries in bulk on the spatial index of the plot. If subjects is a list of trees of plot_trees, only their index
+        is calculated (the neighbours are all the plot_trees).
+        If edge is EDGE_WEIGHT, the neighbours of the trees near the edge of the plot are weighted by the inverse of the part
+        of their Hegyi subplot inside the plot, a circle of plot_radius (m) around the plot coordinates (by default, the
+        distance to the farthest tree).
+        """
+
+        try:
+
+            index = TreeModel.get_spatial_index(plot, plot_trees)  # tree coordinates are calculated if it is needed
+
+            if "coord_x" in TREE_VARS and "coord_y" in TREE_VARS:
+
+                subjects = plot_trees if subjects is None else subjects
+                table = TreeTable.from_trees(subjects)
+
+                if radius_limit == 0 or radius_limit == '':  # create the radius_limit value as default
+                    radius_limit = table.column('height', dtype=np.float64)*0.25
+
+                fraction = None
+                if edge == EDGE_WEIGHT:
+                    x = table.column('coord_x', dtype=np.float64)
+                    y = table.column('coord_y', dtype=np.float64)
+                    center_x, center_y = Area.longitude[plot.plot_id], Area.latitude[plot.plot_id]
+                    if plot_radius is None:
+                        plot_radius = np.nanmax(np.sqrt((x - center_x)**2 + (y - center_y)**2))
+                    fraction = TreeCompetition.get_edge_fraction(x, y, np.broadcast_to(radius_limit, x.shape), center_x,
+                                                                 center_y, plot_radius)
+
+                TreeCompetition.set_hegyi(index, subjects, radius_limit, fraction)
 
             else:
 
@@ -593,6 +407,24 @@ class TreeModel(metaclass=ABCMeta):
             TreeModel.catch_model_exception()
 
 
+    def get_spatial_index(plot, plot_trees):
+        """
+        Function that returns the spatial index (KD-tree) of the trees of the plot. It is built only once, calculating
+        the coordinates of the trees if it is needed, and used again while the trees of the plot are the same.
+        """
+
+        index = SpatialIndex.get(plot, plot_trees)
+
+        if index is None:
+
+            TreeModel.check_plot_coordinates(plot)  # check if the plot position information is available
+            TreeModel.calculate_coordinates_all_trees(plot, plot_trees)  # calculate tree coordinates if it is needed
+
+            index = SpatialIndex.build(plot, plot_trees)
+
+        return index
+
+
     def calculate_coordinates(plot, tree_i):
         """
         Function that calculates the coordinates of one single tree by using the bearing and distance
@@ -677,66 +509,7 @@ class TreeModel(metaclass=ABCMeta):
 
         if type(values) != bool:  # if it is an equation available...            
 
-            ao = values[0]
-            a1 = values[1]
-            a2 = values[2]
-            b1 = values[3]
-            b2 = values[4]
-            b3 = values[5]
-            p1 = values[6]
-            p2 = values[7]
-
-            hst = 0.0  # stump height (m) --> 0.2 on merchantable function
-            ht = tree.height
-            h = ht - hst  # height from stump to comercial diameter (m)
-            dbh = tree.dbh
-            k = math.pi / 40000
-            alpha1 = (1 - p1) ** (((b2 - b1) * k) / (b1 * b2))
-            alpha2 = (1 - p2) ** (((b3 - b2) * k) / (b2 * b3))
-
-            if isinstance(hr, float) == False:  # on the cases where hr is an array...
-                I1 = []  # we create two lists of values
-                I2 = []
-                for i in hr:  # for each hr value, we calculate the values of the other 2 parameters
-                    if p1 <= i and i <= p2:
-                        a = 1
-                    else:
-                        a = 0
-                    if p2 <= i and i <= 1:
-                        b = 1
-                    else:
-                        b = 0
-                    I1.append(a)  # we add the parameters to the lists
-                    I2.append(b)
-                I1 = np.array(I1)  # when the lists are full, we transform the list into an array to simplify the following calculations
-                I2 = np.array(I2)
-            else:  # on the case we have only 1 value to hr, we add the values to the parameters directly
-                if p1 <= hr and hr <= p2:
-                    I1 = 1
-                else:
-                    I1 = 0
-                if p2 <= hr and hr <= 1:
-                    I2 = 1
-                else:
-                    I2 = 0
-
-
-            beta = (b1 ** (1 - (I1 + I2))) * (b2 ** I1) * (b3 ** I2)
-            ro = (1 - hst / ht) ** (k / b1)
-            r1 = (1 - p1) ** (k / b1)
-            r2 = (1 - p2) ** (k / b2)
-            c1 = math.sqrt((ao * (dbh ** a1) * (h ** (a2 - (k / b1))) / (b1 * (ro - r1) + b2 * (r1 - alpha1 * r2) + b3 * alpha1 * r2)))
-
-            if isinstance(hr, float) == False:  # on the cases where hr is an array...    
-                dob = []
-                counter = 0
-                for x in hr:  # for each hr value, we calculate the values of dob
-                    d = (c1 * (math.sqrt(ht ** ((k - b1) / b1) * (1 - hr[counter]) ** ((k - beta[counter]) / beta[counter]) * alpha1 ** (I1[counter] + I2[counter]) * alpha2 ** (I2[counter]))))
-                    dob.append(d)  # we add the value to a list
-                    counter += 1
-                dob = np.array(dob)  # and transform the list to an array 
-            else:  # on the case we have only 1 value to hr, we calculate dob directly
-                dob = (c1 * (math.sqrt(ht ** ((k - b1) / b1) * (1 - hr) ** ((k - beta) / beta) * alpha1 ** (I1 + I2) * alpha2 ** (I2))))
+            dob = TreeTaper.fang(tree.dbh, tree.height, hr, values)  # values: (ao, a1, a2, b1, b2, b3, p1, p2)
     
 
         else:  # if it is not an equation available...
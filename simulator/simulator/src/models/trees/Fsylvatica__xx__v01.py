@@ -27,6 +27,8 @@ from scipy import integrate
 from util import Tools
 from data.variables import TREE_VARS, PLOT_VARS, AREA_VARS, MODEL_VARS, WARNING_VARS
 from data.variables import Variables
+from models.trees.equations_tree_taper import TreeTaper
+from models.trees.equations_tree_integration import VolumeIntegration
 
 import math
 import sys
@@ -298,6 +300,25 @@ class FagusSylvatica(TreeModel):
             self.catch_model_exception()
 
 
+    def fang_over_bark(self, tree: Tree, plot: Plot = None):
+        """
+        Coefficients of the Fang taper equation over bark function.
+        A function that returns the coefficients (ao, a1, a2, b1, b2, b3, p1, p2) of the Fang taper equation used by
+        taper_over_bark, so the volume functions can integrate each segment of the equation.
+        """
+
+        ao = 0.000120
+        a1 = 2.036193
+        a2 = 0.799343
+        b1 = 0.000015
+        b2 = 0.000033
+        b3 = 0.005194
+        p1 = 0.074439
+        p2 = 0.873445
+
+        return ao, a1, a2, b1, b2, b3, p1, p2
+
+
     def taper_over_bark(self, tree: Tree, hr: float):
         """
         Taper equation over bark function.
@@ -323,66 +344,7 @@ class FagusSylvatica(TreeModel):
             
             # b) Fang model
 
-            ao = 0.000120
-            a1 = 2.036193
-            a2 = 0.799343
-            b1 = 0.000015
-            b2 = 0.000033
-            b3 = 0.005194
-            p1 = 0.074439
-            p2 = 0.873445
-
-            hst = 0.0  # stump height (m) --> 0.2 on merchantable function
-            ht = tree.height
-            h = ht - hst  # height from stump to comercial diameter (m)
-            dbh = tree.dbh
-            k = math.pi / 40000
-            alpha1 = (1 - p1) ** (((b2 - b1) * k) / (b1 * b2))
-            alpha2 = (1 - p2) ** (((b3 - b2) * k) / (b2 * b3))
-
-            if isinstance(hr, float) == False:  # on the cases where hr is an array...
-                I1 = []  # we create two lists of values
-                I2 = []
-                for i in hr:  # for each hr value, we calculate the values of the other 2 parameters
-                    if p1 <= i and i <= p2:
-                        a = 1
-                    else:
-                        a = 0
-                    if p2 <= i and i <= 1:
-                        b = 1
-                    else:
-                        b = 0
-                    I1.append(a)  # we add the parameters to the lists
-                    I2.append(b)
-                I1 = np.array(I1)  # when the lists are full, we transform the list into an array to simplify the following calculations
-                I2 = np.array(I2)
-            else:  # on the case we have only 1 value to hr, we add the values to the parameters directly
-                if p1 <= hr and hr <= p2:
-                    I1 = 1
-                else:
-                    I1 = 0
-                if p2 <= hr and hr <= 1:
-                    I2 = 1
-                else:
-                    I2 = 0
-
-
-            beta = (b1 ** (1 - (I1 + I2))) * (b2 ** I1) * (b3 ** I2)
-            ro = (1 - hst / ht) ** (k / b1)
-            r1 = (1 - p1) ** (k / b1)
-            r2 = (1 - p2) ** (k / b2)
-            c1 = math.sqrt((ao * (dbh ** a1) * (h ** (a2 - (k / b1))) / (b1 * (ro - r1) + b2 * (r1 - alpha1 * r2) + b3 * alpha1 * r2)))
-
-            if isinstance(hr, float) == False:  # on the cases where hr is an array...    
-                dob = []
-                counter = 0
-                for x in hr:  # for each hr value, we calculate the values of dob
-                    d = (c1 * (math.sqrt(ht ** ((k - b1) / b1) * (1 - hr[counter]) ** ((k - beta[counter]) / beta[counter]) * alpha1 ** (I1[counter] + I2[counter]) * alpha2 ** (I2[counter]))))
-                    dob.append(d)  # we add the value to a list
-                    counter += 1
-                dob = np.array(dob)  # and transform the list to an array 
-            else:  # on the case we have only 1 value to hr, we calculate dob directly
-                dob = (c1 * (math.sqrt(ht ** ((k - b1) / b1) * (1 - hr) ** ((k - beta) / beta) * alpha1 ** (I1 + I2) * alpha2 ** (I2))))
+            dob = TreeTaper.fang(tree.dbh, tree.height, hr, self.fang_over_bark(tree))  # Fang taper equation for one tree
     
         except Exception:
             self.catch_model_exception()
@@ -514,13 +476,8 @@ class FagusSylvatica(TreeModel):
 
         try:  # errors inside that construction will be announced
 
-            hr = np.arange(0, 1, 0.001)  # that line establish the integrated conditions for volume calculation
-            dob = self.taper_over_bark(tree, hr)  # diameter over bark using taper equation (cm)
-            # dub = self.taper_under_bark(tree, hr)  # diameter under/without bark using taper equation (cm)
-            fwb = (dob / 20) ** 2  # radius^2 using dob (dm2)
-            # fub = (dub / 20) ** 2  # radius^2 using dub (dm2)
-            tree.add_value('vol', math.pi * tree.height * 10 * integrate.simps(fwb, hr))  # volume over bark using simpson integration (dm3)
-            # tree.add_value('bole_vol', math.pi * tree.height * 10 * integrate.simps(fub, hr))  # volume under bark using simpson integration (dm3)
+            tree.add_value('vol', VolumeIntegration.fang_volume(tree.dbh, tree.height, self.fang_over_bark(tree)))  # volume over bark (dm3)
+            # tree.add_value('bole_vol', VolumeIntegration.taper_volume(lambda hr: self.taper_under_bark(tree, hr), tree.height))  # volume under bark (dm3)
             # tree.add_value('bark_vol', tree.vol - tree.bole_vol)  # bark volume (dm3)
 
         except Exception:
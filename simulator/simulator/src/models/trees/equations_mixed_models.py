@@ -20,10 +20,13 @@ from abc import ABCMeta
 from abc import abstractmethod
 from data import Tree
 from data import Plot
+from data import TreeTable
 from data.general import Area, Model, Warnings
 from util import Tools
 from scipy import integrate
 from models.trees.equations_tree_models import TreeEquations
+from models.trees.equations_tree_species import SpeciesCoefficients, MIXED_BAI, MIXED_HD, SDI_BASIC, SDI_CLIM
+from models.trees.equations_tree_competition import TreeCompetition
 from data.general import Area
 from data.variables import TREE_VARS
 
@@ -86,37 +89,8 @@ class MixedEquations(metaclass=ABCMeta):
             - plot: plot data needed to check the species codes
         """
 
-        bal = bal_sp1 = bal_sp2 = bal_sp3 = 0  # bigger tree in the plot
-
-        for tree in list_of_trees: # for each tree...
-
-            if int(tree.specie) == int(plot.id_sp1):  # species 1 condition
-                # TODO: preguntar a Felipe si debo meter especies externas en interspecifico o no
-                tree.add_value('bal', bal)  # bal value without consider species (m2/ha)
-                tree.add_value('bal_intrasp', bal_sp1)  # bal value for species 1 (m2/ha)
-                tree.add_value('bal_intersp', bal_sp2 + bal_sp3)  # bal value for other species (m2/ha)
-
-                bal += tree.basal_area*tree.expan/10000  # then, that value is accumulated
-                bal_sp1 += tree.basal_area*tree.expan/10000  # accumulator to calculate that plot variables
-
-
-            elif int(tree.specie) == int(plot.id_sp2):  # species 2 condition
-
-                tree.add_value('bal', bal)  # bal value without consider species (m2/ha)
-                tree.add_value('bal_intrasp', bal_sp2)  # bal value for species 1 (m2/ha)
-                tree.add_value('bal_intersp', bal_sp1 + bal_sp3)  # bal value for other species (m2/ha)
-
-                bal += tree.basal_area*tree.expan/10000  # then, that value is accumulated
-                bal_sp2 += tree.basal_area*tree.expan/10000  # accumulator to calculate that plot variables
-
-            else:
-
-                tree.add_value('bal', bal)  # bal value without consider species (m2/ha)
-                tree.add_value('bal_intrasp', bal_sp3)  # bal value for species 1 (m2/ha)
-                tree.add_value('bal_intersp', bal_sp1 + bal_sp2)  # bal value for other species (m2/ha)
-
-                bal += tree.basal_area*tree.expan/10000  # that value is accumulated
-                bal_sp3 += tree.basal_area*tree.expan/10000  # accumulator to calculate that plot variables
+        # TODO: preguntar a Felipe si debo meter especies externas en interspecifico o no
+        TreeCompetition.set_bal(list_of_trees, plot, by_species=True)
 
 
     def get_stand_by_sp(list_of_trees, plot, M):
@@ -383,12 +357,10 @@ class MixedEquations(metaclass=ABCMeta):
         return plot_combi, plot_combi_reverse
 
 
-    def apply_survival_model(tree, plot):
+    def is_RPrado_2022_plot(plot):
         """
-        Check the species combination of the plot and applies the correct survival model.
-        It includes/rewrite the result on the corresponding tree or stand variable.
+        Function that checks if the species combination of the plot follows the model structure of Rodríguez de Prado (2022).
         Args.:
-            - tree: is the information of the tree over the one we want to apply the survival model
             - plot: plot data needed to check the species codes
         """
 
@@ -398,1013 +370,292 @@ class MixedEquations(metaclass=ABCMeta):
         # get species combi of the plot
         plot_combi, plot_combi_reverse = MixedEquations.get_plot_combis(plot.id_sp1, plot.id_sp2)
 
+        return plot_combi in mix_species_combis or plot_combi_reverse in mix_species_combis
+
+
+    def get_mixed_parameters(family, specie, plot):
+        """
+        Function that returns the parameters of a model of Rodríguez de Prado (2022) for one species of the plot mixture,
+        as a dictionary, or an empty dictionary if the species has no equation.
+        The parameters are saved on coefficients/<family>.csv, one row for each species and the other species of the mixture.
+        Args.:
+            - family: MIXED_BAI (growth model) or MIXED_HD (height-diameter model)
+            - specie: SFNI/IFN code of the species
+            - plot: plot data needed to check the species codes
+        """
+
+        if int(specie) == int(plot.id_sp1):
+            mixture = int(plot.id_sp2)
+        elif int(specie) == int(plot.id_sp2):
+            mixture = int(plot.id_sp1)
+        else:
+            return {}
+
+        for row in SpeciesCoefficients.load(family).get_rows(specie):
+            if row['mixture'] == mixture:
+                return row
+
+        return {}
+
+
+    def get_survival_batch(plot, species):
+        """
+        Check the species combination of the plot and applies the correct survival model to a group of trees.
+        It returns an array with the survival ratio of each tree, with NaN on the trees without ratio (other species
+        of the mixtures of Rodríguez de Prado (2022)).
+        Args.:
+            - plot: plot data needed to check the species codes
+            - species: array with the SFNI/IFN code of the species of the trees
+        """
+
+        species = np.asarray(species, dtype=np.float64)
+        survival = np.ones(len(species))  # not mortality equation available
+
         # if the combination is in Rodríguez de Prado (2022)
-        if plot_combi in mix_species_combis or plot_combi_reverse in mix_species_combis:
+        if MixedEquations.is_RPrado_2022_plot(plot):
 
-            if int(tree.specie) == int(plot.id_sp1):  # species 1 condition
-                if plot.reineke_sp1 > plot.reineke_max_sp1:  # SDI condition
-                    return 0.98  # reduce a 2% of the tree expan (2% of the total plot density)
-                else:
-                    return 1  # the tree survives
+            survival[:] = np.nan
 
-            elif int(tree.specie) == int(plot.id_sp2):  # species 2 condition
-                if plot.reineke_sp2 > plot.reineke_max_sp2:  # SDI condition
-                    return 0.98  # reduce a 2% of the tree expan
+            for specie, reineke, reineke_max in ((plot.id_sp1, plot.reineke_sp1, plot.reineke_max_sp1),
+                                                 (plot.id_sp2, plot.reineke_sp2, plot.reineke_max_sp2)):
+                if reineke > reineke_max:  # SDI condition
+                    survival[species == int(specie)] = 0.98  # reduce a 2% of the tree expan (2% of the total plot density)
                 else:
-                    return 1  # the tree survives
+                    survival[species == int(specie)] = 1  # the tree survives
 
-        elif plot_combi == '41_72' or plot_combi_reverse == '41_72':  # Qrobur x Csativa
-            # TODO: *irene* mete aquí tus ecuaaciones de supervivencia silenciadas y ya vemos como montarlas
-            # if int(old_tree.specie) == TreeEquations.get_ifn_id('Qrobur'):
-            #   sup = {'int':5.5768506,'N':0.0003787,'porcentageN':-1.4679638,
-            #          'Dg':-0.0551673,'SDI':0.0019533,'Ho':-0.0553423,
-            #          'HartB41':0.0017837}
-            # elif int(old_tree.specie) == TreeEquations.get_ifn_id('Csativa'):
-            #   sup = {'int':5.6830108,'G':0.0305657,'N':0.0003909,
-            #           'porcentageG':0.8007021,'porcentageN':1.3059975,
-            #           'Dg':-0.0551673,'Ho':-0.0643203,'Ho72':-0.0987610,
-            #           'HartB72':-0.0202069}
-            return 1
+        # Qrobur x Csativa
+        # TODO: *irene* mete aquí tus ecuaciones de supervivencia silenciadas y ya vemos como montarlas
+        # if int(old_tree.specie) == TreeEquations.get_ifn_id('Qrobur'):
+        #   sup = {'int':5.5768506,'N':0.0003787,'porcentageN':-1.4679638,
+        #          'Dg':-0.0551673,'SDI':0.0019533,'Ho':-0.0553423,
+        #          'HartB41':0.0017837}
+        # elif int(old_tree.specie) == TreeEquations.get_ifn_id('Csativa'):
+        #   sup = {'int':5.6830108,'G':0.0305657,'N':0.0003909,
+        #           'porcentageG':0.8007021,'porcentageN':1.3059975,
+        #           'Dg':-0.0551673,'Ho':-0.0643203,'Ho72':-0.0987610,
+        #           'HartB72':-0.0202069}
 
-        # if the combination is different...
-        else:
-            return 1  # not mortality equation available
+        return survival
 
 
-    def apply_growth_model(time, plot, old_tree, new_tree):
+    def apply_survival_model(tree, plot):
         """
-        Check the species combination of the plot and applies the correct growth model.
-        It includes/rewrite the result on the corresponding tree or stand variable.
+        Check the species combination of the plot and applies the correct survival model.
+        It returns the survival ratio of the tree, or None if the tree has no ratio (see get_survival_batch).
         Args.:
-            - time: projection time. It must be the time needed for the projection
+            - tree: is the information of the tree over the one we want to apply the survival model
             - plot: plot data needed to check the species codes
-            - old_tree: is the information of the tree over the one we want to apply the growth model; data before projection
-            - new_tree: is the information of the tree over the one we want to apply the growth model; data after projection
         """
 
-        # update tree age; if tree_age is empty, the value will remain empty
-        new_tree.sum_value('tree_age', time)
+        survival = MixedEquations.get_survival_batch(plot, [tree.specie])[0]
 
-        # time is automatically updated after the execution process, but new_year will be used if needed
-        new_year = plot.year + time
+        return None if math.isnan(survival) else float(survival)
 
-        # get Martonne index to the corresponding year (period between before and after the projection)
-        M = TreeEquations.choose_martonne(plot.plot_id, plot.year, (2020, 2040, 2060, 2080, 2100))  # TODO: list of years temporal
 
-        # get species combis for mixed models
-        mix_species_combis = MixedEquations.get_RPrado_2022_combis('simple')
+    def get_growth_batch(plot, trees_table, M):
+        """
+        Check the species combination of the plot and applies the correct growth model to a group of trees.
+        It returns a dictionary with the new values of the trees (basal_area, basal_area_i, dbh, dbh_i, height, height_i),
+        with NaN on the trees whose values can't be calculated, and a boolean array with the trees that have a growth equation.
+        Args.:
+            - plot: plot data needed to check the species codes
+            - trees_table: TreeTable with the information of the trees before projection (see data/tree_table.py)
+            - M: Martonne Aridity Index
+        """
 
-        # get species combi of the plot
-        plot_combi, plot_combi_reverse = MixedEquations.get_plot_combis(plot.id_sp1, plot.id_sp2)
+        n_trees = len(trees_table)
+        species = trees_table.column('specie', dtype=np.float64)
 
-        p_bai = {}  # create an empty dictionary to store the parameters of the model
+        bai5 = np.full(n_trees, np.nan)
+        equation = np.zeros(n_trees, dtype=bool)
 
         # if the combination is in Rodríguez de Prado (2022)
-        if plot_combi in mix_species_combis or plot_combi_reverse in mix_species_combis:
-
-        # TODO: tener cuidado, si hacen falta datos de old_tree entonces hay que buscar la manera de copiarlos antes, se sobreescriben
-
-            # check species combination
-            if plot_combi == '21_25' or plot_combi_reverse == '21_25':  # Psylvestris x Pnigra
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_bai = {'int': -1.3287, 'd': -0.044, 'logd': 2.2713, 'h': 0, 'dg': -0.0382, 'ba': 0,
-                             'baintra': -0.0181, 'bainter': -0.0218, 'bal': 0,
-                             'balintra': -0.0018, 'balinter': -0.008, 'm': 0.0081}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                    p_bai = {'int': -1.7176, 'd': -0.0495, 'logd': 2.3873, 'h': 0.0187, 'dg': -0.0464, 'ba': 0,
-                             'baintra': -0.0255, 'bainter': -0.0095, 'bal': 0,
-                             'balintra': 0, 'balinter': -0.0087, 'm': 0.0158}
-
-            # check species combination
-            elif plot_combi == '21_26' or plot_combi_reverse == '21_26':  # Psylvestris x Ppinaster
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_bai = {'int': -1.4576, 'd': -0.0393, 'logd': 2.3275, 'h': 0.0225, 'dg': -0.0441, 'ba': 0,
-                             'baintra': -0.0205, 'bainter': -0.013, 'bal': 0,
-                             'balintra': -0.0016, 'balinter': 0, 'm': 0.01}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                     p_bai = {'int': -0.6012, 'd': -0.0249, 'logd': 2.1674, 'h': 0, 'dg': -0.0419, 'ba': -0.0149,
-                         'baintra': 0, 'bainter': 0, 'bal': 0, 'balintra': -0.0033, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '21_71' or plot_combi_reverse == '21_71':  # Psylvestris x Fsylvatica
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_bai = {'int': -1.9057, 'd': -0.0366, 'logd': 2.2551, 'h': 0.0173, 'dg': -0.0224, 'ba': 0,
-                         'baintra': -0.0162, 'bainter': -0.0305, 'bal': 0, 'balintra': 0, 'balinter': 0, 'm': 0.0083}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Fsylvatica'):
-                     p_bai = {'int': -3.0448, 'd': -0.0378, 'logd': 2.3552, 'h': 0.0421, 'dg': -0.0159, 'ba': 0,
-                         'baintra': -0.0361, 'bainter': -0.0214, 'bal': 0, 'balintra': 0, 'balinter': 0, 'm': 0.0178}
-
-            # check species combination
-            elif plot_combi == '24_25' or plot_combi_reverse == '24_25':  # Phalepensis x Pnigra
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                    p_bai = {'int': -2.1909, 'd': -0.0399, 'logd': 2.0757, 'h': 0.0334, 'dg': -0.0291, 'ba': 0,
-                              'baintra': -0.0208, 'bainter': -0.0325, 'bal': 0,
-                              'balintra': 0, 'balinter': 0, 'm': 0.0347}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                    p_bai = {'int': 2.7944, 'd': 0.0522, 'logd': 0, 'h': 0.0725, 'dg': -0.029, 'ba': 0,
-                                  'baintra': -0.0344, 'bainter': 0, 'bal': 0, 'balintra': 0, 'balinter': 0, 'm': 0.0131}
-
-            # check species combination
-            elif plot_combi == '24_26' or plot_combi_reverse == '24_26':  # Phalepensis x Ppinaster
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                    p_bai = {'int': -1.6673, 'd': -0.0363, 'logd': 1.9709, 'h': 0, 'dg': -0.0252, 'ba': 0,
-                            'baintra': -0.0181, 'bainter': -0.0283, 'bal': -0.0063,
-                            'balintra': 0, 'balinter': 0, 'm': 0.0581}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                    p_bai = {'int': -1.0381, 'd': -0.0373, 'logd': 1.9721, 'h': 0.0262, 'dg': -0.0205, 'ba': 0,
-                            'baintra': -0.0343, 'bainter': 0, 'bal': 0, 'balintra': 0, 'balinter': 0,
-                            'm': 0.0238}
-
-            # check species combination
-            elif plot_combi == '23_24' or plot_combi_reverse == '23_24':  # Phalepensis x Ppinea
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinea'):
-                    p_bai = {'int': 0.8052, 'd': 0, 'logd': 1.2766, 'h': 0, 'dg': -0.0335, 'ba': 0,
-                            'baintra': -0.0154, 'bainter': 0, 'bal': 0,
-                            'balintra': 0, 'balinter': -0.0266, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                    p_bai = {'int': -1.4508, 'd': -0.047, 'logd': 2.4045, 'h': 0.0573, 'dg': -0.0449, 'ba': 0,
-                            'baintra': -0.0348, 'bainter': 0, 'bal': 0, 'balintra': 0, 'balinter': 0,
-                            'm': 0}
-
-            # check species combination
-            elif plot_combi == '25_26' or plot_combi_reverse == '25_26':  # Pnigra x Ppinaster
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                    p_bai = {'int': -1.1313, 'd': -0.0323, 'logd': 2.0101, 'h': 0, 'dg': -0.0308, 'ba': 0,
-                            'baintra': -0.016, 'bainter': -0.0257, 'bal': 0,
-                            'balintra': -0.0051, 'balinter': 0, 'm': 0.0314}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                    p_bai = {'int': -2.3026, 'd': -0.0365, 'logd': 2.3215, 'h': 0, 'dg': -0.0466, 'ba': 0,
-                            'baintra': -0.0234, 'bainter': -0.0127, 'bal': 0, 'balintra': 0, 'balinter': 0,
-                            'm': 0.0448}
-
-            # check species combination
-            elif plot_combi == '23_26' or plot_combi_reverse == '23_26':  # Ppinea x Ppinaster
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                    p_bai = {'int': -1.2902, 'd': -0.044, 'logd': 2.3163, 'h': 0, 'dg': -0.0148, 'ba': -0.0154,
-                            'baintra': 0, 'bainter': 0, 'bal': 0,
-                            'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinea'):
-                    p_bai = {'int': 1.8982, 'd': 0, 'logd': 1.1735, 'h': 0, 'dg': -0.0185, 'ba': 0,
-                            'baintra': -0.0329, 'bainter': 0, 'bal': 0, 'balintra': 0, 'balinter': 0,
-                            'm': -0.0261}
-
-            # check species combination
-            elif plot_combi == '21_22' or plot_combi_reverse == '21_22':  # Psylvestris x Puncinata
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Puncinata'):
-                    p_bai = {'int': -0.7357, 'd': -0.0236, 'logd': 1.627, 'h': 0, 'dg': -0.0178, 'ba': 0,
-                            'baintra': -0.0183, 'bainter': -0.023, 'bal': 0,
-                            'balintra': 0, 'balinter': 0, 'm': 0.0088}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_bai = {'int': -0.4978, 'd': -0.0257, 'logd': 1.6305, 'h': 0.0151, 'dg': -0.019, 'ba': 0,
-                            'baintra': -0.0175, 'bainter': -0.0134, 'bal': 0, 'balintra': 0, 'balinter': 0,
-                            'm': 0.0106}
-
-            # check species combination
-            elif plot_combi == '71_42' or plot_combi_reverse == '71_42':  # Fsylvatica x Qpetraea
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qpetraea'):
-                    p_bai = {'int': -1.439, 'd': -0.0205, 'logd': 1.7953, 'h': 0.0428, 'dg': 0, 'ba': -0.0191,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Fsylvatica'):
-                    p_bai = {'int': -2.2101, 'd': -0.0266, 'logd': 2.0872, 'h': 0.0434, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0339, 'bainter': -0.0117, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '71_43' or plot_combi_reverse == '71_43':  # Fsylvatica x Qpyrenaica
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                    p_bai = {'int': -2.8565, 'd': -0.0519, 'logd': 2.3692, 'h': 0.06, 'dg': -0.0218, 'ba': 0,
-                             'baintra': -0.0243, 'bainter': -0.0404, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0158}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Fsylvatica'):
-                    p_bai = {'int': -1.3884, 'd': -0.0199, 'logd': 1.9848, 'h': 0.0309, 'dg': -0.0194, 'ba': 0,
-                             'baintra': -0.0282, 'bainter': 0, 'bal': 0,
-                             'balintra': -0.0045, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '71_41' or plot_combi_reverse == '71_41':  # Fsylvatica x Qrobur
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qrobur'):
-                    p_bai = {'int': -3.0948, 'd': -0.0385, 'logd': 2.8737, 'h': 0, 'dg': 0, 'ba': -0.0482,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Fsylvatica'):
-                    p_bai = {'int': -3.3249, 'd': -0.0386, 'logd': 2.8025, 'h': 0.0148, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0423, 'bainter': 0, 'bal': -0.0057,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi =='44_45' or plot_combi_reverse == '44_45':  # Qfaginea x Qilex
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                    p_bai = {'int': -1.8672, 'd': -0.0319, 'logd': 1.7637, 'h': 0.0652, 'dg': 0, 'ba': -0.0161,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0114}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Qfaginea'):
-                    p_bai = {'int': -2.2426, 'd': -0.0361, 'logd': 1.8621, 'h': 0.0827, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0292, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0129}
-
-            # check species combination
-            elif plot_combi == '43_45' or plot_combi_reverse == '43_45':  # Qpyrenaica x Qilex
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                    p_bai = {'int': -1.3431, 'd': -0.0425, 'logd': 1.7239, 'h': 0.1162, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0433, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': -0.0414, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                    p_bai = {'int': -0.2648, 'd': 0, 'logd': 1.3493, 'h': 0, 'dg': 0, 'ba': -0.0275,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '46_45' or plot_combi_reverse == '46_45':  # Qsuber x Qilex
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qsuber'):
-                    p_bai = {'int': 0.1117, 'd': -0.0093, 'logd': 0.9492, 'h': 0.0924, 'dg': 0.0185, 'ba': 0,
-                             'baintra': -0.0296, 'bainter': -0.0141, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                    p_bai = {'int': -0.8205, 'd': -0.0294, 'logd': 1.3885, 'h': 0.1355, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0364, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '41_43' or plot_combi_reverse == '41_43':  # Qpyrenaica x Qrobur
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qrobur'):
-                    p_bai = {'int': -1.3817, 'd': -0.0311, 'logd': 2.1817, 'h': 0, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0433, 'bainter': -0.0319, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                    p_bai = {'int': 0.1827, 'd': -0.0209, 'logd': 1.4183, 'h': 0, 'dg': 0, 'ba': -0.0284,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '24_44' or plot_combi_reverse == '24_44':  # Phalepensis x Qfaginea
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qfaginea'):
-                    p_bai = {'int': -3.3523, 'd': -0.0824, 'logd': 2.9723, 'h': 0, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0523, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': -0.043, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                    p_bai = {'int': -1.91, 'd': -0.0545, 'logd': 2.2627, 'h': 0.0505, 'dg': -0.036, 'ba': 0,
-                             'baintra': -0.0232, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0296}
-
-            # check species combination
-            elif plot_combi == '24_45' or plot_combi_reverse == '24_45':  # Phalepensis x Qilex
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                    p_bai = {'int': -1.1688, 'd': 0, 'logd': 1.0882, 'h': 0.1416, 'dg': -0.0232, 'ba': 0,
-                             'baintra': -0.0405, 'bainter': -0.0133, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0289}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                    p_bai = {'int': -1.7286, 'd': -0.0513, 'logd': 2.3588, 'h': 0.0469, 'dg': -0.0382, 'ba': 0,
-                             'baintra': -0.0284, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0114}
-
-            # check species combination
-            elif plot_combi == '25_44' or plot_combi_reverse == '25_44':  # Pnigra x Qfaginea
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qfaginea'):
-                    p_bai = {'int': -1.7441, 'd': -0.0312, 'logd': 1.7971, 'h': 0.098, 'dg': 0, 'ba': -0.0269,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                    p_bai = {'int': -2.5009, 'd': -0.0607, 'logd': 2.4259, 'h': 0.0389, 'dg': -0.0421, 'ba': 0,
-                             'baintra': -0.0305, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0325}
-
-            # check species combination
-            elif plot_combi == '25_45' or plot_combi_reverse == '25_45':  # Pnigra x Qilex
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                    p_bai = {'int': -1.2536, 'd': -0.0288, 'logd': 1.5467, 'h': 0.0988, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0411, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                    p_bai = {'int': -2.1206, 'd': -0.0559, 'logd': 2.518, 'h': 0.0217, 'dg': -0.0268, 'ba': -0.022,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': -0.0052, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '26_45' or plot_combi_reverse == '26_45':  # Ppinaster x Qilex
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                    p_bai = {'int': -1.6101, 'd': -0.0381, 'logd': 1.5558, 'h': 0.1836, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0227, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                    p_bai = {'int': -0.7777, 'd': -0.0245, 'logd': 1.7932, 'h': 0, 'dg': 0, 'ba': 0,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': -0.0055, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '26_43' or plot_combi_reverse == '26_43':  # Ppinaster x Qpyrenaica
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                    p_bai = {'int': -2.7258, 'd': -0.0527, 'logd': 2.7721, 'h': 0, 'dg': -0.0139, 'ba': 0,
-                             'baintra': -0.035, 'bainter': -0.0204, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': -0.0059}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                    p_bai = {'int': -0.597, 'd': -0.0404, 'logd': 2.1635, 'h': 0, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0255, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '26_46' or plot_combi_reverse == '26_46':  # Ppinaster x Qsuber
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qsuber'):
-                    p_bai = {'int': 0.2845, 'd': 0, 'logd': 0.9688, 'h': 0.0612, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0234, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': -0.026, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                    p_bai = {'int': -0.9839, 'd': -0.0287, 'logd': 2.1165, 'h': 0, 'dg': -0.0184, 'ba': 0,
-                             'baintra': -0.0285, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0136}
-
-            # check species combination
-            elif plot_combi == '23_45' or plot_combi_reverse == '23_45':  # Ppinea x Qilex
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                    p_bai = {'int': -1.053, 'd': -0.0315, 'logd': 1.4928, 'h': 0.1113, 'dg': 0, 'ba': -0.023,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinea'):
-                    p_bai = {'int': 0.4764, 'd': 0, 'logd': 1.5955, 'h': -0.0449, 'dg': -0.0236, 'ba': -0.032,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '23_46' or plot_combi_reverse == '23_46':  # Ppinea x Qsuber
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qsuber'):
-                    p_bai = {'int': 0.9728, 'd': 0, 'logd': 0.811, 'h': 0.1237, 'dg': 0, 'ba': -0.0282,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': -0.0244}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Ppinea'):
-                    p_bai = {'int': 0.6606, 'd': 0, 'logd': 1.3249, 'h': 0, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0427, 'bainter': -0.0187, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '21_44' or plot_combi_reverse == '21_44':  # Psylvestris x Qfaginea
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qfaginea'):
-                    p_bai = {'int': -2.2906, 'd': -0.045, 'logd': 1.9224, 'h': 0.078, 'dg': 0, 'ba': -0.0232,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.0149}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_bai = {'int': -1.4388, 'd': -0.0384, 'logd': 1.9542, 'h': 0.015, 'dg': -0.0237, 'ba': 0,
-                             'baintra': -0.0207, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0.019}
-
-
-            # check species combination
-            elif plot_combi == '21_45' or plot_combi_reverse == '21_45':  # Psylvestris x Qilex
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                    p_bai = {'int': -0.8542, 'd': -0.0239, 'logd': 1.3615, 'h': 0.1229, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0315, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': -0.0206, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_bai = {'int': -0.7816, 'd': -0.0299, 'logd': 1.7776, 'h': 0.0202, 'dg': 0, 'ba': -0.0199,
-                             'baintra': 0, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '21_42' or plot_combi_reverse == '21_42':  # Psylvestris x Qpetraea
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qpetraea'):
-                    p_bai = {'int': -1.5479, 'd': -0.0401, 'logd': 1.8118, 'h': 0.0827, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0522, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_bai = {'int': -0.0273, 'd': 0, 'logd': 1.2849, 'h': 0.0264, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0158, 'bainter': 0, 'bal': 0,
-                             'balintra': 0, 'balinter': 0, 'm': 0}
-
-            # check species combination
-            elif plot_combi == '21_43' or plot_combi_reverse == '21_43':  # Psylvestris x Qpyrenaica
-
-                # check tree species
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-
-                    p_bai = {'int': -2.2915, 'd': -0.0568, 'logd': 2.3202, 'h': 0.0671, 'dg': 0, 'ba': 0,
-                             'baintra': -0.0258, 'bainter': -0.0174, 'bal': 0,
-                             'balintra': 0, 'balinter': -0.0132, 'm': 0}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_bai = {'int': -1.1121, 'd': -0.0374, 'logd': 2.2161, 'h': 0.0191, 'dg': -0.0447, 'ba': 0,
-                             'baintra': -0.0206, 'bainter': 0, 'bal': 0,
-                             'balintra': -0.0024, 'balinter': 0, 'm': 0.0133}
-
-            else:  # other mixtures
-                p_bai = {}
+        if n_trees > 0 and MixedEquations.is_RPrado_2022_plot(plot):
 
-            # if species is in Rodríguez de Prado (2022)
-            if len(p_bai) != 0:
+            dbh = trees_table.column('dbh', dtype=np.float64)
+            height = trees_table.column('height', dtype=np.float64)
+            basal_area_intrasp = trees_table.column('basal_area_intrasp', dtype=np.float64)
+            basal_area_intersp = trees_table.column('basal_area_intersp', dtype=np.float64)
+            bal_intrasp = trees_table.column('bal_intrasp', dtype=np.float64)
+            bal_intersp = trees_table.column('bal_intersp', dtype=np.float64)
+
+            for specie in (plot.id_sp1, plot.id_sp2):
+
+                p_bai = MixedEquations.get_mixed_parameters(MIXED_BAI, specie, plot)
+                rows = species == int(specie)
+
+                # if species is in Rodríguez de Prado (2022)
+                if len(p_bai) != 0 and rows.any():
+
+                    equation |= rows
+
+                    # calculate bai growth
+                    with np.errstate(all='ignore'):
+                        bai5[rows] = np.exp(p_bai['int'] + p_bai['d'] * dbh[rows] + p_bai['logd'] *
+                            np.log(dbh[rows]) + p_bai['h'] * height[rows] + p_bai['dg'] * plot.qm_dbh +
+                            p_bai['ba'] * plot.basal_area + p_bai['baintra'] * basal_area_intrasp[rows] + p_bai['bainter'] *
+                            basal_area_intersp[rows] + p_bai['balintra'] * bal_intrasp[rows] + p_bai['balinter'] *
+                            bal_intersp[rows] + p_bai['m'] * M)
+
+        # Qrobur x Csativa
+        # TODO: *irene* mete aquí tus ecuaciones de crecimiento silenciadas y ya vemos como montarlas
+        # if int(old_tree.specie) == TreeEquations.get_ifn_id('Qrobur'):
+        #     p_bai = {'int': -1801.601, 'dbh':7.933, 'slenderness':13.574, 'dg': 5.043, 'G': -3.374,
+        #              'porcentajeG': -397.132, 'dummyF': -141.588}
+        # elif int(old_tree.specie) == TreeEquations.get_ifn_id('Csativa'):
+        #     p_bai = {'int': -2184.86, 'dbh':14.39,'slenderness': 31.36, 'hartB': -13.1, 'G': -20.32,
+        #              'BAL':-15.68, 'BALTotal': 22.04, 'height':-145.5, 'dummyF':257.74}
+
+        values = {'basal_area_i': bai5}
+
+        if equation.any():
 
-                # calculate bai growth
-                bai5 = math.exp(p_bai['int'] + p_bai['d'] * old_tree.dbh + p_bai['logd'] *
-                    math.log(old_tree.dbh) + p_bai['h'] * old_tree.height + p_bai['dg'] * plot.qm_dbh +
-                    p_bai['ba'] * plot.basal_area + p_bai['baintra'] * old_tree.basal_area_intrasp + p_bai['bainter'] *
-                    old_tree.basal_area_intersp + p_bai['balintra'] * old_tree.bal_intrasp + p_bai['balinter'] *
-                    old_tree.bal_intersp + p_bai['m'] * M)
+            old_dbh = trees_table.column('dbh', dtype=np.float64)
+            old_height = trees_table.column('height', dtype=np.float64)
+
+            with np.errstate(all='ignore'):
 
                 # add bai growth (cm2)
-                new_tree.sum_value("basal_area", bai5)
-                new_tree.add_value("basal_area_i", bai5)
+                values['basal_area'] = trees_table.column('basal_area', dtype=np.float64) + bai5
 
                 # update dbh (cm)
-                old_dbh = old_tree.dbh
-                new_tree.add_value('dbh', 2 * math.sqrt(new_tree.basal_area / math.pi))
-                new_tree.add_value('dbh_i', new_tree.dbh - old_dbh)
+                values['dbh'] = 2 * np.sqrt(values['basal_area'] / math.pi)
+                values['dbh_i'] = values['dbh'] - old_dbh
 
                 # upload height (m)
-                old_height = old_tree.height
-                new_height = MixedEquations.apply_hd_model(plot, new_tree)
-                new_tree.add_value("height", new_height)
-                new_tree.add_value("height_i", new_height - old_height)
+                values['height'] = MixedEquations.get_hd_batch(plot, species, values['dbh'],
+                                                               trees_table.column('bal', dtype=np.float64), M)
+                values['height_i'] = values['height'] - old_height
 
         else:
+            for variable in ('basal_area', 'dbh', 'dbh_i', 'height', 'height_i'):
+                values[variable] = np.full(n_trees, np.nan)
 
-            if plot_combi == '41_72' or plot_combi_reverse == '41_72':  # Qrobur x Csativa
-                # TODO: *irene* mete aquí tus ecuaciones de crecimiento silenciadas y ya vemos como montarlas
-                if int(old_tree.specie) == TreeEquations.get_ifn_id('Qrobur'):
-                    p_bai = {'int': -1801.601, 'dbh':7.933, 'slenderness':13.574, 'dg': 5.043, 'G': -3.374,
-                             'porcentajeG': -397.132, 'dummyF': -141.588}
-
-                elif int(old_tree.specie) == TreeEquations.get_ifn_id('Csativa'):
-                    p_bai = {'int': -2184.86, 'dbh':14.39,'slenderness': 31.36, 'hartB': -13.1, 'G': -20.32,
-                             'BAL':-15.68, 'BALTotal': 22.04, 'height':-145.5, 'dummyF':257.74}
-
+        return values, equation
 
 
-    def apply_hd_model(plot, new_tree):
+    def apply_growth_model(time, plot, old_tree, new_tree):
         """
-        Check the species combination of the plot and applies the correct height-diameter model.
+        Check the species combination of the plot and applies the correct growth model.
         It includes/rewrite the result on the corresponding tree or stand variable.
         Args.:
+            - time: projection time. It must be the time needed for the projection
             - plot: plot data needed to check the species codes
+            - old_tree: is the information of the tree over the one we want to apply the growth model; data before projection
             - new_tree: is the information of the tree over the one we want to apply the growth model; data after projection
         """
 
+        # update tree age; if tree_age is empty, the value will remain empty
+        new_tree.sum_value('tree_age', time)
+
         # get Martonne index to the corresponding year (period between before and after the projection)
         M = TreeEquations.choose_martonne(plot.plot_id, plot.year, (2020, 2040, 2060, 2080, 2100))  # TODO: list of years temporal
 
-        # get species combis for mixed models
-        mix_species_combis = MixedEquations.get_RPrado_2022_combis('simple')
+        values, equation = MixedEquations.get_growth_batch(plot, TreeTable.from_trees([old_tree]), M)
 
-        # get species combi of the plot
-        plot_combi, plot_combi_reverse = MixedEquations.get_plot_combis(plot.id_sp1, plot.id_sp2)
+        if equation[0]:
+            for variable in ('basal_area', 'basal_area_i', 'dbh', 'dbh_i', 'height', 'height_i'):
+                value = values[variable][0]
+                if math.isnan(value):  # the equations can't be calculated with the tree values
+                    break
+                new_tree.add_value(variable, float(value))
 
-        p_h = {}  # create an empty dictionary to store the parameters of the model
 
-        # if the combination is in Rodríguez de Prado (2022)
-        if plot_combi in mix_species_combis or plot_combi_reverse in mix_species_combis:
-
-            # check species combination
-            if plot_combi == '21_25' or plot_combi_reverse == '21_25':  # Psylvestris x Pnigra
-
-                # check tree species
-                if int(new_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                    p_h = {'model': 'M5', 'form': 'A', 'int': 0.8792, 'bal': -0.0068, 'dg': 0.0465,
-                           'dgi': 0, 'mi': 0, 'm': 0, 'ho': 0,
-                           'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-                elif int(new_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                    p_h = {'model': 'M1', 'form': 'A', 'int': 1.4454, 'bal': -0.0137, 'dg': 0.0474,
-                           'dgi': 0, 'mi': 0, 'm': 0, 'ho': 0,
-                           'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '24_25' or plot_combi_reverse == '24_25':  # Phalepensis x Pnigra
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                   p_h = {'model': 'M3', 'form': 'A', 'int': 0.8740, 'bal': -0.0097, 'dg': 0,
-                          'dgi': -0.0092, 'mi': 0.1385, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': -5.6254}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                   p_h = {'model': 'M5', 'form': 'A', 'int': 0.9181, 'bal': -0.0168, 'dg': 0.0797,
-                          'dgi': 0, 'mi': 0, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '24_26' or plot_combi_reverse == '24_26':  # Phalepensis x Ppinaster
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 1.213, 'bal': -0.0402, 'dg': 0,
-                          'dgi': 0.0431, 'mi': 0, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0, 'bal': -0.0173, 'dg': 0.0734,
-                          'dgi': 0, 'mi': 1.5235, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '23_24' or plot_combi_reverse == '23_24':  # Phalepensis x Ppinea
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0, 'bal': -0.0125, 'dg': 0,
-                          'dgi': 0.0390, 'mi': 1.2598, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinea'):
-                   p_h = {'model': 'M5', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0.0997, 'mi': 0, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '24_44' or plot_combi_reverse == '24_44':  # Phalepensis x Qfaginea
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0.0294, 'mi': 1.0935, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qfaginea'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.2481, 'mi': 0, 'm': 0, 'ho': 0,
-                          'hoi': 1.3855, 'beta0': 0, 'beta1': -4.2707}
-
-            # check species combination
-            elif plot_combi == '24_45' or plot_combi_reverse == '24_45':  # Phalepensis x Qilex
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Phalepensis'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 1.3583, 'bal': -0.0151, 'dg': 0,
-                          'dgi': -0.02, 'mi': 1.4876, 'm': -0.0307, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.2772, 'mi': -0.0425, 'm': 0.1651, 'ho': 0,
-                          'hoi': 1.1925, 'beta0': 0, 'beta1': -6.0763}
-
-            # check species combination
-            elif plot_combi == '25_26' or plot_combi_reverse == '25_26':  # Pnigra x Ppinaster
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 1.0318, 'bal': -0.0112, 'dg': 0.0440,
-                          'dgi': 0, 'mi': 0.6216, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 1.88, 'bal': -0.0183, 'dg': 0.0499,
-                          'dgi': 0, 'mi': 0, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '25_44' or plot_combi_reverse == '25_44':  # Pnigra x Qfaginea
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0.7447, 'bal': 0, 'dg': 0,
-                          'dgi': -0.0319, 'mi': 2.1911, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qfaginea'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.3677, 'mi': 0, 'm': 0.2853, 'ho': 0,
-                          'hoi': 1.1564, 'beta0': 0, 'beta1': -7.0128}
-
-            # check species combination
-            elif plot_combi == '25_45' or plot_combi_reverse == '25_45':  # Pnigra x Qilex
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Pnigra'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0, 'bal': -0.0068, 'dg': 0,
-                          'dgi': -0.0209, 'mi': 2.8952, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.3333, 'mi': 0, 'm': 0.1989, 'ho': 0,
-                          'hoi': 1.2466, 'beta0': 0, 'beta1': -6.5164}
-
-            # check species combination
-            elif plot_combi == '26_23' or plot_combi_reverse == '26_23':  # Ppinaster x Ppinea
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                   p_h = {'model': 'M1', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0.2314 ,'mi': 0.3722 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinea'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 4.0383 , 'bal': -0.0221, 'dg': 0,
-                          'dgi': 0, 'mi': 1.5266, 'm': -0.1198, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '26_21' or plot_combi_reverse == '26_21':  # Ppinaster x Psylvestris
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 2.7801, 'bal': -0.0132, 'dg': -0.0203,
-                          'dgi': 0 ,'mi': 0 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                   p_h = {'model': 'M3', 'form': 'A', 'int': 0.1674 , 'bal': 0, 'dg': 0,
-                          'dgi': 0, 'mi': -0.0846, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 5.7848}
-
-            # check species combination
-            elif plot_combi == '26_45' or plot_combi_reverse == '26_45':  # Ppinaster x Qilex
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                   p_h = {'model': 'M1', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0 ,'mi': 2.8266 , 'm': 0.3382, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0 , 'bal': 0, 'dg': 0,
-                          'dgi': -0.1802, 'mi': 0, 'm': 0.1547, 'ho': 0,
-                          'hoi': 1.0835, 'beta0': 0, 'beta1': -5.9781}
-
-            # check species combination
-            elif plot_combi == '26_43' or plot_combi_reverse == '26_43':  # Ppinaster x Qpyrenaica
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0, 'bal': -0.0104, 'dg': 0,
-                          'dgi': 0.0319 ,'mi': 1.6618 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0 , 'bal': -0.0368, 'dg': 0.1155,
-                          'dgi': 0, 'mi': 0, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '26_46' or plot_combi_reverse == '26_46':  # Ppinaster x Qsuber
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinaster'):
-                   p_h = {'model': 'M3', 'form': 'A', 'int': -0.6969, 'bal': 0, 'dg': 0,
-                          'dgi': 0.0137 ,'mi': 0.1964 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 13.9493}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qsuber'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0 , 'bal': -0.0332, 'dg': 0,
-                          'dgi': 0, 'mi': 2.6535, 'm': 0.0252, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '23_45' or plot_combi_reverse == '23_45':  # Ppinea x Qilex
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinea'):
-                   p_h = {'model': 'M3', 'form': 'A', 'int': 1.3421, 'bal': 0, 'dg': 0,
-                          'dgi': -0.0162 ,'mi': 0 , 'm': -0.0079, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': -8.4247}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0 , 'bal': 0, 'dg': 0,
-                          'dgi': -0.1910, 'mi': 0, 'm': 0.1413, 'ho': 0,
-                          'hoi': 1.1488, 'beta0': 0, 'beta1': -6.6968}
-
-            # check species combination
-            elif plot_combi == '23_46' or plot_combi_reverse == '23_46':  # Ppinea x Qsuber
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Ppinea'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 2.1130, 'bal': -0.0258, 'dg': 0,
-                          'dgi': -0.0460 ,'mi': 1.2023 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qsuber'):
-                   p_h = {'model': 'M1', 'form': 'M', 'int': 0 , 'bal': 0, 'dg': 0,
-                          'dgi': 0.3620, 'mi': 0.8264, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '21_71' or plot_combi_reverse == '21_71':  # Psylvestris x Fsylvatica
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                   p_h = {'model': 'M3', 'form': 'A', 'int': -0.1063, 'bal': 0, 'dg': 0,
-                          'dgi': 0 ,'mi': 0 , 'm': 0.0037, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 7.1987}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Fsylvatica'):
-                   p_h = {'model': 'M5', 'form': 'A', 'int': 0 , 'bal': -0.0049, 'dg': 0,
-                          'dgi': 0.0243, 'mi': 0.6819, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '21_22' or plot_combi_reverse == '21_22':  # Psylvestris x Puncinata
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                   p_h = {'model': 'M5', 'form': 'A', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0 ,'mi': 0 , 'm': 0.0271, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Puncinata'):
-                   p_h = {'model': 'M5', 'form': 'A', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0 ,'mi': 0 , 'm': 0.0244, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '21_44' or plot_combi_reverse == '21_44':  # Psylvestris x Qfaginea
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                   p_h = {'model': 'M5', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0.1286,'mi': 0.6005, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qfaginea'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.3601, 'mi': 0, 'm': 0.3284, 'ho': 0,
-                          'hoi': 1.0817, 'beta0': 0, 'beta1': -8.4275}
-
-            # check species combination
-            elif plot_combi == '21_45' or plot_combi_reverse == '21_45':  # Psylvestris x Qilex
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': -1.1988, 'bal': -0.0104, 'dg': 0,
-                          'dgi': 0.0241 ,'mi': 1.6356 , 'm': 0.0178, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.3877 ,'mi': -0.0143 , 'm': 0.2363, 'ho': 0,
-                          'hoi': 1.2026, 'beta0': 0, 'beta1': -6.3941}
-
-            # check species combination
-            elif plot_combi == '21_42' or plot_combi_reverse == '21_42':  # Psylvestris x Qpetraea
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                   p_h = {'model': 'M5', 'form': 'A', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0, 'mi': 0, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 1.3877, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qpetraea'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.3962, 'mi': 0, 'm': 0.3045, 'ho': 0,
-                          'hoi': 1.1671, 'beta0': 0, 'beta1': -9.1325}
-
-            # check species combination
-            elif plot_combi == '21_43' or plot_combi_reverse == '21_43':  # Psylvestris x Qpyrenaica
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Psylvestris'):
-                   p_h = {'model': 'M3', 'form': 'A', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0 ,'mi': 0 , 'm': 0.0038, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 4.3652}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0, 'bal': -0.0091, 'dg': 0,
-                          'dgi': 0.0163 ,'mi': 1.2693 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '71_42' or plot_combi_reverse == '71_42':  # Fsylvatica x Qpetraea
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Fsylvatica'):
-                   p_h = {'model': 'M5', 'form': 'A', 'int': 0.9408, 'bal': -0.0066, 'dg': 0.0184,
-                          'dgi': 0 ,'mi': 0 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qpetraea'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.2111 ,'mi': -0.0364 , 'm': 0.1916, 'ho': 0,
-                          'hoi': 1.0490, 'beta0': 0, 'beta1': -7.3359}
-
-            # check species combination
-            elif plot_combi == '71_43' or plot_combi_reverse == '71_43':  # Fsylvatica x Qpyrenaica
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Fsylvatica'):
-                   p_h = {'model': 'M1', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0.3293 ,'mi': 0.5965 , 'm': -0.2352, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                   p_h = {'model': 'M1', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0.1170,
-                          'dgi': 0 ,'mi': 0 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '71_41' or plot_combi_reverse == '71_41':  # Fsylvatica x Qrobur
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Fsylvatica'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': -0.1038,
-                          'dgi': 0 ,'mi': -0.0509 , 'm': 0.1244, 'ho': 1.0300,
-                          'hoi': 0, 'beta0': 0, 'beta1': -9.4827}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qrobur'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.2329,'mi': 0 , 'm': 0.3245, 'ho': 0,
-                          'hoi': 0.9650, 'beta0': 0, 'beta1': -11.7381}
-
-            # check species combination
-            elif plot_combi == '44_45' or plot_combi_reverse == '44_45':  # Qfaginea  x Qilex
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Qfaginea'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0.7578, 'bal': 0, 'dg': 0,
-                          'dgi': 0 ,'mi': 0.8303 , 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 0, 'bal': -0.0282, 'dg': 0,
-                          'dgi': 0 ,'mi': 1.1636 , 'm': 0.0407, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '45_43' or plot_combi_reverse == '45_43':  # Qilex x Qpyrenaica
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.2510 ,'mi': 0 , 'm': 0, 'ho': 0,
-                          'hoi': 1.4862, 'beta0': 0, 'beta1': -6.8655}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                   p_h = {'model': 'M5', 'form': 'A', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': 0 ,'mi': 1.4330, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '45_46' or plot_combi_reverse == '45_46':  # Qilex x Qsuber
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Qilex'):
-                   p_h = {'model': 'M12', 'form': 'A', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.2571 ,'mi': -0.0324 , 'm': 0.2214, 'ho': 0,
-                          'hoi': 1.0963, 'beta0': 0, 'beta1': -7.2568}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qsuber'):
-                   p_h = {'model': 'M1', 'form': 'A', 'int': 1.4835, 'bal': -0.0386, 'dg': 0.0578,
-                          'dgi': 0 ,'mi': 0.8232, 'm': 0, 'ho': 0,
-                          'hoi': 0, 'beta0': 0, 'beta1': 0}
-
-            # check species combination
-            elif plot_combi == '43_41' or plot_combi_reverse == '43_41':  # Qpyrenaica x Qrobur
-
-               # check tree species
-               if int(new_tree.specie) == TreeEquations.get_ifn_id('Qpyrenaica'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.2799 ,'mi': 0 , 'm': 0.2404, 'ho': 0,
-                          'hoi': 1.0418, 'beta0': 0, 'beta1': -7.7023}
-
-               elif int(new_tree.specie) == TreeEquations.get_ifn_id('Qrobur'):
-                   p_h = {'model': 'M12', 'form': 'M', 'int': 0, 'bal': 0, 'dg': 0,
-                          'dgi': -0.2167,'mi': 0 , 'm': 0.1838, 'ho': 0,
-                          'hoi': 1.0630, 'beta0': 0, 'beta1': -8.1876}
+    def get_hd_batch(plot, species, dbh, bal, M):
+        """
+        Check the species combination of the plot and applies the correct height-diameter model to a group of trees.
+        It returns an array with the height (m) of each tree, 0 if the tree species has no equation.
+        Args.:
+            - plot: plot data needed to check the species codes
+            - species: array with the SFNI/IFN code of the species of the trees
+            - dbh: array with the dbh (cm) of the trees
+            - bal: array with the bal (m2/ha) of the trees
+            - M: Martonne Aridity Index
+        """
 
-            else:  # other mixtures
+        species = np.asarray(species, dtype=np.float64)
+        dbh = np.asarray(dbh, dtype=np.float64)
+        bal = np.asarray(bal, dtype=np.float64)
 
-                p_h = {}
+        # initialize height
+        height = np.zeros(len(species))
 
-        else: # if species are not in Rodríguez de Prado (2022)
-
-            # TODO: desviar el cálculo de la altura a función aparte para cada especie y comprobar que funciona
-            p_h = {}
+        # if the combination is not in Rodríguez de Prado (2022)
+        # TODO: desviar el cálculo de la altura a función aparte para cada especie y comprobar que funciona
+        if not MixedEquations.is_RPrado_2022_plot(plot):
+            return height
 
+        for specie, proportion in ((plot.id_sp1, plot.sp1_proportion), (plot.id_sp2, plot.sp2_proportion)):
 
-        # initialize height
-        height = 0
+            p_h = MixedEquations.get_mixed_parameters(MIXED_HD, specie, plot)
+            rows = species == int(specie)
 
-        # if species is in Rodríguez de Prado (2022)
-        if len(p_h) != 0:
+            # if species is in Rodríguez de Prado (2022)
+            if len(p_h) == 0 or not rows.any():
+                continue
 
-            # get beta0 value
-            beta0 = MixedEquations.hd_model_form(p_h, plot, new_tree, M)
+            d = dbh[rows]
 
-            # TODO: comprobar esto
-            # for one species beta0 value is provided
-            if (plot_combi == "21_42" or plot_combi_reverse == "21_42") and new_tree.specie == TreeEquations.get_ifn_id('Psylvestris'):
+            with np.errstate(all='ignore'):
 
-                beta0 = p_h['beta0']
+                # get beta0 value
+                beta0 = MixedEquations.hd_model_form(p_h, plot, bal[rows], proportion, M)
 
-            # equation selection for each species and species combination
-            # Note: models not used were not programmed
-            if p_h['model'] == 'M1':
+                # TODO: comprobar esto
+                # for one species beta0 value is provided (Psylvestris in Psylvestris x Qpetraea)
+                if p_h['beta0'] != 0:
+                    beta0 = p_h['beta0']
 
-                # h-d equation M1: Cañadas et al. (1999) in Rodríguez de Prado (2022)
-                if beta0 == '':
-                    height = new_tree.height
-                else:
-                    height = 1.3 + (beta0 * (1 / new_tree.dbh - 1 / plot.dominant_dbh) + ((1 / (plot.dominant_h - 1.3))
+                # equation selection for each species and species combination
+                # Note: models not used were not programmed
+                if p_h['model'] == 'M1':
+
+                    # h-d equation M1: Cañadas et al. (1999) in Rodríguez de Prado (2022)
+                    height[rows] = 1.3 + (beta0 * (1 / d - 1 / plot.dominant_dbh) + ((1 / (plot.dominant_h - 1.3))
                          ** 0.5)) ** (-2)
 
-            elif p_h['model'] == 'M3':
+                elif p_h['model'] == 'M3':
 
-                # h-d equation M3: Gaffrey (1988) modified by Diéguez et al. (2005) in Rodríguez de Prado (2022)
-                if beta0 == '':
-                    height = new_tree.height
-                else:
-                    height = 1.3 + (plot.dominant_h - 1.3) * math.exp(beta0 * (1 - plot.dominant_dbh / new_tree.dbh) +
-                             p_h['beta1'] * (1 / plot.dominant_dbh - 1 / new_tree.dbh))
+                    # h-d equation M3: Gaffrey (1988) modified by Diéguez et al. (2005) in Rodríguez de Prado (2022)
+                    height[rows] = 1.3 + (plot.dominant_h - 1.3) * np.exp(beta0 * (1 - plot.dominant_dbh / d) +
+                             p_h['beta1'] * (1 / plot.dominant_dbh - 1 / d))
 
-            elif p_h['model'] == 'M5':
+                elif p_h['model'] == 'M5':
 
-                # h-d equation M5: Monnes (1982) in Rodríguez de Prado (2022)
-                if beta0 == '':
-                    height = new_tree.height
-                else:
-                    height = 1.3 + (beta0 * (1 / new_tree.dbh - 1 / plot.dominant_dbh) + ((1 / (plot.dominant_h - 1.3)) **
+                    # h-d equation M5: Monnes (1982) in Rodríguez de Prado (2022)
+                    height[rows] = 1.3 + (beta0 * (1 / d - 1 / plot.dominant_dbh) + ((1 / (plot.dominant_h - 1.3)) **
                          (1 / 3))) ** (-3)
 
-            elif p_h['model'] == 'M12':
+                elif p_h['model'] == 'M12':
 
-                # h-d equation M12: Schumacher (1939) in Rodríguez de Prado (2022)
-                if beta0 == '':
-                    height = new_tree.height
-                else:
-                    height = 1.3 + beta0 * math.exp(p_h['beta1'] / new_tree.dbh)
+                    # h-d equation M12: Schumacher (1939) in Rodríguez de Prado (2022)
+                    height[rows] = 1.3 + beta0 * np.exp(p_h['beta1'] / d)
 
         return height
 
 
-    def hd_model_form(p_h, plot, new_tree, M):
+    def apply_hd_model(plot, new_tree):
+        """
+        Check the species combination of the plot and applies the correct height-diameter model.
+        It returns the height (m) of the tree, 0 if the tree species has no equation.
+        Args.:
+            - plot: plot data needed to check the species codes
+            - new_tree: is the information of the tree over the one we want to apply the growth model; data after projection
         """
-        Support function to the applu_hd_model function. It returns the beta0 value for the h-d equation.
+
+        # get Martonne index to the corresponding year (period between before and after the projection)
+        M = TreeEquations.choose_martonne(plot.plot_id, plot.year, (2020, 2040, 2060, 2080, 2100))  # TODO: list of years temporal
+
+        return float(MixedEquations.get_hd_batch(plot, [new_tree.specie], [new_tree.dbh], [new_tree.bal], M)[0])
+
+
+    def hd_model_form(p_h, plot, bal, proportion, M):
+        """
+        Support function to the get_hd_batch function. It returns the beta0 value for the h-d equation.
+        :param p_h: parameters of the h-d equation
         :param plot: plot information
-        :param new_tree: tree information
+        :param bal: bal (m2/ha) of the trees, a value or an array
+        :param proportion: proportion by area of the species of the trees
         :param M: Martonne Aridity Index
         :return: beta0 value used on the h-d equation
         """
@@ -1412,42 +663,17 @@ class MixedEquations(metaclass=ABCMeta):
         # beta0 for equation with form A
         if p_h['form'] == 'A':
 
-            # species condition needed to assign the correct species proportion by area
-            if int(new_tree.specie) == int(plot.id_sp1):
-                beta0 = p_h['int'] + p_h['bal'] * new_tree.bal + p_h['dg'] * plot.qm_dbh + p_h['mi'] * \
-                        plot.sp1_proportion + p_h['m'] * M + p_h['ho'] * plot.dominant_h
-
-            elif int(new_tree.specie) == int(plot.id_sp2):
-                beta0 = p_h['int'] + p_h['bal'] * new_tree.bal + p_h['dg'] * plot.qm_dbh + p_h['mi'] * \
-                        plot.sp2_proportion + p_h['m'] * M + p_h['ho'] * plot.dominant_h
-
-            else:
-                beta0 = ''
+            beta0 = p_h['int'] + p_h['bal'] * bal + p_h['dg'] * plot.qm_dbh + p_h['mi'] * \
+                    proportion + p_h['m'] * M + p_h['ho'] * plot.dominant_h
 
         # beta0 for equation with form M
         elif p_h['form'] == 'M':
 
-            # species condition needed to assign the correct species proportion by area
-            if int(new_tree.specie) == int(plot.id_sp1):
+            # avoid mistakes when multiplying
+            intercept = 1 if p_h['int'] == 0 else p_h['int']
 
-                # avoid mistakes when multiplying
-                if p_h['int'] == 0:
-                    p_h['int'] = 1
-
-                beta0 = p_h['int'] * (new_tree.bal ** p_h['bal']) * (plot.qm_dbh ** p_h['dg']) * \
-                        (plot.sp1_proportion ** p_h['mi']) * (M ** p_h['m']) * (plot.dominant_h ** p_h['ho'])
-
-            elif int(new_tree.specie) == int(plot.id_sp2):
-
-                # avoid mistakes when multiplying
-                if p_h['int'] == 0:
-                    p_h['int'] = 1
-
-                beta0 = p_h['int'] * (new_tree.bal ** p_h['bal']) * (plot.qm_dbh ** p_h['dg']) * \
-                        (plot.sp2_proportion ** p_h['mi']) * (M ** p_h['m']) * (plot.dominant_h ** p_h['ho'])
-
-            else:
-                beta0 = ''
+            beta0 = intercept * (bal ** p_h['bal']) * (plot.qm_dbh ** p_h['dg']) * \
+                    (proportion ** p_h['mi']) * (M ** p_h['m']) * (plot.dominant_h ** p_h['ho'])
 
         # other situations
         else:
@@ -1540,33 +766,7 @@ class MixedEquations(metaclass=ABCMeta):
             variables in Mediterranean mixed forests in the present context of climate change. Doctoral dissertation.
         """
 
-        # get parameters for each species
-        params1 = MixedEquations.SDI_params_basic(plot.id_sp1)
-        params2 = MixedEquations.SDI_params_basic(plot.id_sp2)
-
-        # using the previous parameters for each species, SDImax is calculated
-        if len(params1) != 0:
-
-            plot.add_value('REINEKE_MAX_SP1', math.exp(params1['alpha0'] + params1['beta0'] * math.log(25)))
-
-            if plot.qm_dbh_sp1 != 0:  # skip ZeroDivision Error
-                plot.add_value('REINEKE_SP1', math.exp(params1['alpha0'] + params1['beta0'] * math.log(plot.qm_dbh_sp1)))
-
-        if len(params2) != 0:
-
-            plot.add_value('REINEKE_MAX_SP2', math.exp(params2['alpha0'] + params2['beta0'] * math.log(25)))
-
-            if plot.qm_dbh_sp2 != 0:  # skip ZeroDivision Error
-                plot.add_value('REINEKE_SP2',
-                               math.exp(params2['alpha0'] + params2['beta0'] * math.log(plot.qm_dbh_sp2)))
-
-        # get species proportion based on area (Rodriguez de Prado, 2022)
-        if len(params1) != 0 and len(params2) != 0:
-
-            if plot.qm_dbh_sp1 != 0 and plot.qm_dbh_sp2 != 0:
-
-                plot.add_value('SP1_PROPORTION', plot.reineke_sp1 / (plot.reineke_sp1 + plot.reineke_sp2))
-                plot.add_value('SP2_PROPORTION', plot.reineke_sp2 / (plot.reineke_sp1 + plot.reineke_sp2))
+        TreeCompetition.set_sdi_plots([plot])
 
 
     def SDI_params_basic(species):
@@ -1577,39 +777,9 @@ class MixedEquations(metaclass=ABCMeta):
             - species: species code to request parameters
         """
 
-        # get parameters for each species
-        if species == TreeEquations.get_ifn_id('Psylvestris'):
-            params = {'alpha0': 12.685, 'alpha1': 0, 'beta0': -1.7524, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Puncinata'):
-            params = {'alpha0': 12.519, 'alpha1': 0, 'beta0': -1.7336, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Pnigra'):
-            params = {'alpha0': 12.756, 'alpha1': 0, 'beta0': -1.8346, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Pcanariensis'):
-            params = {'alpha0': 12.672, 'alpha1': 0, 'beta0': -1.8226, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Phalepensis'):
-            params = {'alpha0': 11.982, 'alpha1': 0, 'beta0': -1.7760, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Ppinaster'):
-            params = {'alpha0': 13.096, 'alpha1': 0, 'beta0': -1.9063, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Ppinea'):
-            params = {'alpha0': 13.562, 'alpha1': 0, 'beta0': -2.1855, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Pradiata'):
-            params = {'alpha0': 12.947, 'alpha1': 0, 'beta0': -1.8254, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Fsylvatica'):
-            params = {'alpha0': 13.170, 'alpha1': 0, 'beta0': -1.9471, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Qfaginea'):
-            params = {'alpha0': 12.097, 'alpha1': 0, 'beta0': -1.7055, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Qilex'):
-            params = {'alpha0': 12.508, 'alpha1': 0, 'beta0': -2.0951, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Qpetraea'):
-            params = {'alpha0': 12.277, 'alpha1': 0, 'beta0': -1.6777, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Qpyrenaica'):
-            params = {'alpha0': 12.271, 'alpha1': 0, 'beta0': -1.7203, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Qrobur'):
-            params = {'alpha0': 12.043, 'alpha1': 0, 'beta0': -1.6698, 'beta1': 0}
-        elif species == TreeEquations.get_ifn_id('Qsuber'):
-            params = {'alpha0': 12.704, 'alpha1': 0, 'beta0': -1.9674, 'beta1': 0}
-        else:  # if no parameters available for the species
-            params = {}
+        # get parameters for each species, on coefficients/sdi_basic.csv
+        rows = SpeciesCoefficients.load(SDI_BASIC).get_rows(species)
+        params = {name: rows[0][name] for name in ('alpha0', 'alpha1', 'beta0', 'beta1')} if rows else {}
 
         return params
 
@@ -1671,53 +841,9 @@ class MixedEquations(metaclass=ABCMeta):
             - species: species code to request parameters
         """
 
-        # get parameters for each species
-        if species == TreeEquations.get_ifn_id('Psylvestris'):
-            params = {'alpha0': 66.470, 'alpha1': -9.442, 'beta0': -1.7478, 'beta1': 0}
-            var = 'TAR'
-        elif species == TreeEquations.get_ifn_id('Puncinata'):
-            params = {'alpha0': 12.918, 'alpha1': 0, 'beta0': -1.6378, 'beta1': -0.0031}
-            var = 'PET3'
-        elif species == TreeEquations.get_ifn_id('Pnigra'):
-            params = {'alpha0': 140.953, 'alpha1': -22.536, 'beta0': -1.9324, 'beta1': 0}
-            var = 'MXT3'
-        elif species == TreeEquations.get_ifn_id('Pcanariensis'):
-            params = {'alpha0': 3.639, 'alpha1': 2.448, 'beta0': -2.0891, 'beta1': 0}
-            var = 'P1'
-        elif species == TreeEquations.get_ifn_id('Phalepensis'):
-            params = {'alpha0': 9.241, 'alpha1': 0.886, 'beta0': -1.5559, 'beta1': -0.0095}
-            var = 'M'
-        elif species == TreeEquations.get_ifn_id('Ppinaster'):
-            params = {'alpha0': 13.446, 'alpha1': 0, 'beta0': 4.1770, 'beta1': -0.0213}
-            var = 'MXT'
-        elif species == TreeEquations.get_ifn_id('Ppinea'):
-            params = {'alpha0': 15.072, 'alpha1': -0.460, 'beta0': -2.4379, 'beta1': 0.0093}
-            var = 'P4'
-        elif species == TreeEquations.get_ifn_id('Pradiata'):
-            params = {'alpha0': 110.968, 'alpha1': -21.507, 'beta0': -8.0490, 'beta1': 0.0652}
-            var = 'PET3'
-        elif species == TreeEquations.get_ifn_id('Fsylvatica'):
-            params = {'alpha0': 12.870, 'alpha1': 0, 'beta0': 2.0880, 'beta1': -0.0137}
-            var = 'MXT3'
-        elif species == TreeEquations.get_ifn_id('Qfaginea'):
-            params = {'alpha0': 247.037, 'alpha1': -41.233, 'beta0': -1.7874, 'beta1': 0}
-            var = 'MXTWM'
-        elif species == TreeEquations.get_ifn_id('Qilex'):
-            params = {'alpha0': 11.777, 'alpha1': 0, 'beta0': -1.3094, 'beta1': -0.0044}
-            var = 'PET3'
-        elif species == TreeEquations.get_ifn_id('Qpetraea'):
-            params = {'alpha0': -489.861, 'alpha1': 88.759, 'beta0': 36.5003, 'beta1': -0.1334}
-            var = 'MXT'
-        elif species == TreeEquations.get_ifn_id('Qpyrenaica'):
-            params = {'alpha0': -187.581, 'alpha1': 35.255, 'beta0': 17.946, 'beta1': -0.0679}
-            var = 'T4'
-        elif species == TreeEquations.get_ifn_id('Qrobur'):
-            params = {'alpha0': -795.789, 'alpha1': 143.317, 'beta0': 49.1578, 'beta1': -0.1812}
-            var = 'MNT3'
-        elif species == TreeEquations.get_ifn_id('Qsuber'):
-            params = {'alpha0': 11.948, 'alpha1': 0, 'beta0': -1.2349, 'beta1': -0.0043}
-            var = 'PET3'
-        else:  # if no parameters available for the species
-            params = {}
+        # get parameters for each species, on coefficients/sdi_clim.csv
+        rows = SpeciesCoefficients.load(SDI_CLIM).get_rows(species)
+        params = {name: rows[0][name] for name in ('alpha0', 'alpha1', 'beta0', 'beta1')} if rows else {}
+        var = rows[0]['var'] if rows else None
 
         return params, var
\ No newline at end of file
@@ -20,10 +20,12 @@ from abc import ABCMeta
 from abc import abstractmethod
 from data import Tree
 from data import Plot
+from data import TreeTable
 from data.general import Area, Model, Warnings
 from util import Tools
 from scipy import integrate
 from models.trees import *
+from models.trees.equations_tree_species import SpeciesRegistry, CARBON
 from data.general import Area
 from data.variables import AREA_VARS, PLOT_VARS, TREE_VARS
 
@@ -35,6 +37,19 @@ import collections
 import itertools
 
 
+# biomass (kg) and carbon (kg) variables of a tree, in the order they are written
+BIOMASS_VARS = ['wsw', 'wsb', 'wswb', 'w_cork', 'wthickb', 'wstb', 'wb2_7', 'wb2_t', 'wthinb', 'wb05',
+                'wb05_7', 'wb0_2', 'wdb', 'wl', 'wtbl', 'wbl0_7', 'ws', 'wb', 'wr', 'wt',
+                'carbon_heartwood', 'carbon_sapwood', 'carbon_bark', 'carbon_stem', 'carbon_branches',
+                'carbon_roots', 'carbon']
+
+# variables added by species to the plot (_SP1, _SP2 and _SP3)
+SPECIES_VARS = ['ws', 'wb', 'wr', 'wt', 'carbon_stem', 'carbon_branches', 'carbon_roots', 'carbon']
+
+# components calculated by the equations of each species (the rest are sums of them)
+COMPONENT_VARS = BIOMASS_VARS[:16] + ['wr', 'carbon_heartwood', 'carbon_sapwood', 'carbon_bark']
+
+
 class TreeBiomass(metaclass=ABCMeta):
 
     def __init__(self, configuration=None):
@@ -46,11 +61,13 @@ class TreeBiomass(metaclass=ABCMeta):
         print('Oops! You made a mistake: ', exc_type, ' check inside ', fname, ' model, line', exc_tb.tb_lineno)
 
 
-    def set_w_carbon_trees(tree):
+    def get_w_specie(specie, dbh, height):
         """
-        Function to calculate biomass and carbon variables for each tree.
-        It assigns the values to the tree object for the corresponding features available, returning '' if not available.
-        :param tree: Tree object
+        Function that calculates the biomass components of a group of trees of the same species.
+        It returns a dictionary with the components of COMPONENT_VARS, as arrays or 0 if the species has no equation for them.
+        :param specie: IFN code of the species
+        :param dbh: array with the dbh (cm) of the trees
+        :param height: array with the height (m) of the trees
         Source:
             Doc.: Castaño-Santamaría, J., Bravo, F. Variation in carbon concentration and basic density along stems of sessile oak (Quercus petraea (Matt.) Liebl.) and Pyrenean oak (Quercus pyrenaica Willd.) in the Cantabrian Range (NW Spain). Annals of Forest Science 69, 663–672 (2012). https://doi.org/10.1007/s13595-012-0183-6
             Ref.: Castaño-Santamaría and Bravo, 2012
@@ -66,647 +83,602 @@ class TreeBiomass(metaclass=ABCMeta):
             Ref.: Telmo et al., 2010
         """
 
-        try:
+        # TODO: to explore/include:
+        # https://www.fs.usda.gov/research/nrs/news/highlights/how-much-carbon-tree-biomass#publications
+        # https://github.com/mdoraisami/glowcad/tree/main
+
+
+        # define variables
+        wsw = wsb = wswb = w_cork = wthickb = wstb = wb2_7 = wb2_t = wthinb = wb05 = 0
+        wb05_7 = wb0_2 = wdb = wl = wtbl = wbl0_7 = wr = 0
+        carbon_heartwood = carbon_sapwood = carbon_bark = 0
+
+        # elif specie == 17:  # Cedrus atlantica
+
+            # carbon = 50.3*wt
+            # Telmo et al., 2010
+
+        if specie == 21:  # Pinus sylvestris
+
+            # España
+            wsw = 0.0154 * (dbh ** 2) * height
+            Z = np.where(dbh <= 37.5, 0, 1)
+            wthickb = (0.540 * ((dbh - 37.5) ** 2) - 0.0119 * ((dbh - 37.5) ** 2) * height) * Z
+            wb2_7 = 0.0295 * (dbh ** 2.742) * (height ** (-0.899))
+            wtbl = 0.530 * (dbh ** 2.199) * (height ** (-1.153))
+            wr = 0.130 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2011
+
+            # Galicia
+            # wswb = 0.02321*(dbh**2.708)
+            # wthickb = 3.7e-7*(dbh**4.804)
+            # wb2_7 = 0.02036*(dbh**2.141)
+            # wb0_2 = 0.1432*(dbh**1.510)
+            # wl = 0.1081*(dbh**1.510)
+            # wr = 0.01089*(dbh**2.628)
+            # Diéguez-Aranda et al. 2009
+
+        elif specie == 22:  # Pinus uncinata
+
+            wsw = 0.0203 * (dbh ** 2) * height
+            wb2_t = 0.0379 * (dbh ** 2)
+            wtbl = 2.740 * dbh - 2.641 * height
+            wr = 0.193 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2011
+
+        elif specie == 23:  # Pinus pinea
+
+            wsw = 0.0224 * (dbh ** 1.923) * (height ** 1.0193)
+            Z = np.where(dbh <= 22.5, 0, 1)
+            wthickb = (0.247 * ((dbh - 22.5) ** 2)) * Z
+            wb2_7 = 0.0525 * (dbh ** 2)
+            wtbl = 21.927 + 0.0707 * (dbh ** 2) - 2.827 * height
+            wr = 0.117 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2011
+
+        elif specie == 24:  # Pinus halepensis
+
+            wsw = 0.0139 * (dbh ** 2) * height
+            Z = np.where(dbh <= 27.5, 0, 1)
+            wthickb = (3.926 * (dbh - 27.5)) * Z
+            wb2_7 = 4.257 + 0.00506 * (dbh ** 2) * height - 0.0722 * dbh * height
+            wtbl = 6.197 + 0.00932 * (dbh ** 2) * height - 0.0686 * dbh * height
+            wr = 0.0785 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2011
+
+        elif specie == 25:  # Pinus nigra
+
+            wsw = 0.0403 * (dbh ** 1.838) * (height ** 0.945)  # Stem wood (kg)
+            Z = np.where(dbh <= 32.5, 0, 1)
+            wthickb = (0.228 * ((dbh - 32.5) ** 2)) * Z  # wthickb = branches > 7 cm biomass (kg)
+            wb2_7 = 0.0521 * (dbh ** 2)  # wb2_7 = branches (2-7 cm) biomass (kg)
+            wtbl = 0.0720 * (dbh ** 2)  # Thin branches + Leaves (<2 cm) biomass (kg)
+            wr = 0.0189 * (dbh ** 2.445)  # Roots biomass (kg)
+            # Ruiz-Peinado et al, 2011
+
+        elif specie == 26:  # Pinus pinaster
+
+            # España
+            wsw = 0.0278 * (dbh ** 2.115) * (height ** 0.618)
+            wb2_t = 0.000381 * (dbh ** 3.141)
+            wtbl = 0.0129 * (dbh ** 2.320)
+            wr = 0.00444 * (dbh ** 2.804)
+            # Ruiz-Peinado et al, 2011
+
+            # Galicia
+            # wstb = 0.3882 + 0.01149*(dbh**2)*height
+            # wsb = 0.0079*(dbh**2.098)*(height**0.466)
+            # wb2_7 = 3.202 - 0.01484*(dbh**2) - 0.4228*height + 0.00279*(dbh**2)*height
+            # wthinb = 0.09781*(dbh**2.288)*(height**(-0.9648))
+            # wb05 = 0.00188*(dbh**2.154)
+            # wl = 0.005*(dbh**2.383)
+            # Diéguez-Aranda et al. 2009
+
+            # c_value = 0.484
+            # Telmo et al., 2010
+
+        elif specie == 27:  # Pinus canariensis
+
+            wsw = 0.0249 * ((dbh ** 2) * height) ** 0.975
+            Z = np.where(dbh <= 32.5, 0, 1)
+            wthickb = (0.634 * ((dbh - 32.5) ** 2)) * Z
+            wb2_7 = 0.00162 * (dbh ** 2) * height
+            wtbl = 0.0844 * (dbh ** 2) - 0.0731 * (height ** 2)
+            wr = 0.155 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2011
+
+        elif specie == 28:  # Pinus radiata
+
+            # España
+            wstb = 0.01230 * (dbh ** 1.604) * (height ** 1.413)
+            wsb = 0.003600 * (dbh ** 2.656)
+            wb2_7 = 1.938 + 0.001065 * (dbh ** 2) * height
+            wthinb = 0.03630 * (dbh ** 2.609) * (height ** (-0.9417))
+            wb05 = 0.007800 * (dbh ** 1.961)
+            wl = 0.04230 * (dbh ** 1.714)
+            wr = 0.06174 * (dbh ** 2.144)
+
+            # Galicia
+            # wstb = 0.01230*(dbh**1.604)*(height**1.413)
+            # wsb = 0.003600*(dbh**2.656)
+            # wb2_7 = 1.938 + 0.001065*(dbh**2)*height
+            # wthinb = 0.03630*(dbh**2.609)*(height**(-0.9417))
+            # wb05 = 0.007800*(dbh**1.961)
+            # wl = 0.04230*(dbh**1.714)
+            # wr = 0.06174*(dbh**2.144)
+            # Diéguez-Aranda et al. 2009
+
+        elif specie == 31:  # Abies alba
+
+            wsw = 0.0189 * (dbh ** 2) * height
+            wb2_t = 0.0584 * (dbh ** 2)
+            wtbl = 0.0371 * (dbh ** 2) + 0.968 * height
+            wr = 0.101 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2011
+
+        elif specie == 32:  # Abies pinsapo
+
+            wsw = 0.00960 * (dbh ** 2) * height
+            Z = np.where(dbh <= 32.5, 0, 1)
+            wthickb = ((1.637 * ((dbh - 32.5) ** 2) - 0.0719 * (dbh - 32.5) ** 2) * height) * Z
+            w2_7 = 0.00344 * (dbh ** 2) * height
+            wtbl = 0.131 * dbh * height
+            # Ruiz-Peinado et al, 2011
+
+        # elif specie == 34:  # Pseudotsuga menziesii
+
+            # c_value = 0.476
+            # Telmo et al., 2010
+
+        elif specie == 38:  # Juniperus thurifera
+
+            wsw = 0.32 * (dbh ** 2) * height + 0.217 * dbh * height
+            Z = np.where(dbh <= 22.5, 0, 1)
+            wthickb = (0.107 * ((dbh - 22.5) ** 2)) * Z
+            wb2_7 = 0.00792 * (dbh ** 2) * height
+            wtbl = 0.273 * dbh * height
+            wr = 0.0767 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2011
+
+        elif specie == 41:  # Quercus robur
+
+            # Galicia
+            # wsw = -5.714 + 0.01823*(dbh**2)*height
+            # wsb = -1.5 + 0.03154*(dbh**2) + 0.00111*(dbh**2)*height
+            # wthickb = 3.427e-9*((dbh**2)*height)**2.310
+            # wb2_7 = 4.268 + 0.003410*(dbh**2)*height
+            # wthinb = 0.03851*(dbh**1.784)
+            # wb05 = 1.379 + 0.00024*(dbh**2)*height
+            # wl = 0.01985*((dbh**2)*height)**0.7375
+            # wr = 0.01160*((dbh**2)*height)**0.9625
+            # Diéguez-Aranda et al. 2009
+
+            # España
+            wsw = -5.714 + 0.01823 * (dbh ** 2) * height
+            wsb = -1.500 + 0.03154 * (dbh ** 2) + 0.001110 * (dbh ** 2) * height
+            wthickb = 3.427e-9 * (((dbh ** 2) * height) ** 2.310)
+            wb2_7 = 4.268 + 0.003410 * (dbh ** 2) * height
+            wthinb = 0.03851 * (dbh ** 1.784) + 1.379
+            wb05 = 0.00024 * (dbh ** 2) * height
+            wl = 0.01985 * (((dbh ** 2) * height) ** 0.7375)
+            wr = 0.01160 * ((dbh ** 2) * height) ** 0.9625
+
+        elif specie == 42:  # Quercus petraea
+
+            wstb = 0.001333 * (dbh ** 2) * height
+            wb2_7 = 0.006531 * (dbh ** 2) * height - 0.07298 * dbh * height
+            wthinb = 0.023772 * (dbh ** 2) * height
+            # Ruiz-Peinado et al, 2012
+
+            # carbon_heartwood = wt * (0.2732 * 0.4601)  # heartwood
+            # carbon_sapwood = wt * (0.5427 * 0.4549)  # sapwood
+            # carbon_bark = wt * (0.1841 * 0.4686)  # bark
+            # carbon = wt*(0.1841*0.4686 + 0.5427*0.4549 + 0.2732*0.4601)  # bark, sapwood and heartwood proportions
+            # Castaño-Santamaría and Bravo, 2012
+            # they used wt before it was calculated, so they were always 0
+
+        elif specie == 43:  # Quercus pyrenaica
+
+            wstb = 0.0261 * (dbh ** 2) * height
+            wb2_7 = - 0.0260 * (dbh ** 2) + 0.536 * height + 0.00538 * (dbh ** 2) * height
+            wthinb = 0.898 * dbh - 0.445 * height
+            wr = 0.143 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+            # carbon_heartwood = wt * (0.2732 * 0.4582)  # heartwood
+            # carbon_sapwood = wt * (0.5427 * 0.4558)  # sapwood
+            # carbon_bark = wt * (0.1841 * 0.4578)  # bark
+            # carbon = wt*(0.1841*0.4578 + 0.5427*0.4558 + 0.2732*0.4582)  # bark, sapwood and heartwood proportions
+            # Castaño-Santamaría and Bravo, 2012
+            # they used wt before it was calculated, so they were always 0
+
+        elif specie == 44:  # Quercus faginea
+
+            wsw = 0.154 * (dbh ** 2)
+            wthickb = 0.0861 * (dbh ** 2)
+            wb2_7 = 0.127 * (dbh ** 2) - 0.00598 * (dbh ** 2) * height
+            wtbl = 0.0726 * (dbh ** 2) - 0.00275 * (dbh ** 2) * height
+            wr = 0.169 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+        elif specie == 45:  # Quercus ilex
+
+            wsw = 0.143 * (dbh ** 2)
+            Z = np.where(dbh <= 12.5, 0, 1)
+            wthickb = (0.0684 * ((dbh - 12.5) ** 2) * height) * Z
+            wb2_7 = 0.0898 * (dbh ** 2)
+            wtbl = 0.0824 * (dbh ** 2)
+            wr = 0.254 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+        elif specie == 46:  # Quercus suber
+
+            wsw = 0.00525 * (dbh ** 2) * height + 0.278 * dbh * height
+            wthickb = 0.0135 * (dbh ** 2) * height
+            wb2_7 = 0.127 * dbh * height
+            wtbl = 0.0463 * dbh * height
+            wr = 0.0829 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+            # TODO: check before use
+            # if 'h_debark' in TREE_VARS and 'dbh_oc' in TREE_VARS and 'nb' in TREE_VARS:
+            #
+            #     if isinstance(tree.h_debark, float) and isinstance(dbh_oc, float) and isinstance(tree.nb, float):
+            #
+            #         pbhoc = (dbh_oc * math.pi) / 100  # perimeter at breast height outside cork (m)
+            #         pbhic = tree.normal_circumference / 100  # perimeter at breast height inside cork (m)
+            #         shs = tree.h_debark  # stripped height in the stem (m)
+            #         nb = tree.nb + 1  # number of stripped main bough + 1
+            #
+            #         if tree.cork_cycle == 0:  # To use inmediately before the stripping process
+            #             if nb == 1 and shs != 0:
+            #                 tree.add_value('w_cork', np.exp(2.3665 + 2.2722 * math.log(pbhoc) + 0.4473 * math.log(shs)))
+            #             elif nb != 1 and shs != 0:
+            #                 tree.add_value('w_cork', np.exp(
+            #                     2.1578 + 1.5817 * math.log(pbhoc) + 0.5062 * math.log(nb) + 0.6680 * math.log(shs)))
+            #             else:
+            #                 tree.add_value('w_cork', 0)
+            #
+            #         elif tree.cork_cycle == 1:  # To use after the stripping process or in a intermediate age of the cork cycle production
+            #             if nb == 1 and shs != 0:
+            #                 tree.add_value('w_cork', np.exp(2.7506 + 1.9174 * math.log(pbhic) + 0.4682 * math.log(shs)))
+            #             elif nb != 1 and shs != 0:
+            #                 tree.add_value('w_cork', np.exp(2.2137 + 0.9588 * math.log(shs) + 0.6546 * math.log(nb)))
+            #             else:
+            #                 tree.add_value('w_cork', 0)
+            #         else:
+            #             tree.add_value('w_cork', 0)
+            #
+            #     elif isinstance(tree.h_debark, float) and isinstance(dbh_oc, float) and not isinstance(tree.nb, float):
+            #
+            #         pbhoc = (dbh_oc * math.pi) / 100  # perimeter at breast height outside cork (m)
+            #         pbhic = tree.normal_circumference / 100  # perimeter at breast height inside cork (m)
+            #         shs = tree.h_debark  # stripped height in the stem (m)
+            #         nb = 1  # number of stripped main bough + 1
+            #
+            #         if tree.cork_cycle == 0 and shs != 0:  # To use inmediately before the stripping process
+            #             tree.add_value('w_cork', np.exp(2.3665 + 2.2722 * math.log(pbhoc) + 0.4473 * math.log(shs)))
+            #         elif tree.cork_cycle == 1 and shs != 0:  # To use after the stripping process or in a intermediate age of the cork cycle production
+            #             tree.add_value('w_cork', np.exp(2.7506 + 1.9174 * math.log(pbhic) + 0.4682 * math.log(shs)))
+            #         else:
+            #             tree.add_value('w_cork', 0)
+            #
+            #     else:
+            #
+            #         tree.add_value('w_cork', 0)
+
+        elif specie == 47:  # Quercus canariensis
+
+            wsw = 0.0126 * (dbh ** 2) * height
+            wthickb = 0.103 * (dbh ** 2)
+            wbl0_7 = 0.167 * dbh * height
+            wr = 0.135 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+        elif specie == 54:  # Alnus glutinosa
+
+            wsw = 0.0191 * (dbh ** 2) * height
+            wb2_t = 0.0512 * (dbh ** 2)
+            wtbl = 0.0567 * dbh * height
+            wr = 0.214 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+        elif specie == 55:  # Fraxinus angustifolia
+
+            wsw = 0.0296 * (dbh ** 2) * height
+            Z = np.where(dbh <= 12.5, 0, 1)
+            wthickb = (0.231 * ((dbh - 12.5) ** 2)) * Z
+            wb2_7 = 0.0925 * (dbh ** 2)
+            wthinb = 2.005 * dbh
+            wr = 0.359 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+        elif specie == 61:  # Eucalyptus globulus
+
+            # Galicia
+            wstb = 0.01308 * (dbh ** 1.870) * (height ** 1.172)
+            wsb = 0.01010 * (dbh ** 2.484)
+            wb05_7 = 0.003685 * (dbh ** 2.654)
+            wb05 = 0.01258 * (dbh ** 1.705)
+            wl = 0.02949 * (dbh ** 1.917)
+            # Diéguez-Aranda et al. 2009
+
+            # España
+            # wstb = 0.0221*(dbh**2)*height
+            # wb2_7 = 0.154*(dbh**1.668)
+            # wtbl = 0.180*(((dbh**2)*height)**0.587)
+            # Ruiz-Peinado et al, 2012
+
+        elif specie == 64:  # Eucalyptus nittens
+
+            # Sin ecuaciones de copa
+            wstb = 0.0094 * (dbh ** 2.033) * (height ** 1.056)
+            wsb = 0.01342 * (dbh ** 2.361)
+            wb2_7 = 0.000059 * (dbh ** 3.760)
+            wthinb = 0.01280 * (dbh ** 1.858)
+            wb05 = 0.000922 * (dbh ** 2.632)
+            wl = 0.0053 * (dbh ** 2.393)
+            wdb = 0.1451 * (dbh ** 1.403)
+            # Diéguez-Aranda et al. 2009
+
+            # Con ecuaciones de copa
+            # wstb = 0.1495*(dbh**2.052)*(height**0.8946)
+            # wsb = 0.03190*(dbh**2.108)
+            # wb2_7 = 0.000822*(dbh**2.644)*(tree.lcw**0.7627)
+            # wthinb = 0.03005*(dbh**1.590)
+            # wb05 = 0.006230*(dbh**1.949)*(tree.lcw**0.2189)
+            # wl = 0.0168*(dbh**1.516)*((height - tree.hcb)**0.7747)
+            # wdb = 0.007933*(dbh**1.279)*(tree.hbc**1.254)
+            # Diéguez-Aranda et al. 2009
+
+        elif specie == 66:  # Olea europaea
+
+            wsw = 0.0114 * (dbh ** 2) * height
+            wthickb = 0.0108 * (dbh ** 2) * height
+            wb2_7 = 1.672 * dbh
+            wtbl = 0.0354 * (dbh ** 2) + 1.187 * height
+            wr = 0.147 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+        elif specie == 67:  # Ceratonia siliqua
+
+            wsw = 0.142 * (dbh ** 1.974)
+            wthickb = 0.104 * (dbh ** 2)
+            wb2_7 = 0.0538 * (dbh ** 2)
+            wtbl = 0.151 * (dbh ** 2) - 0.00740 * (dbh ** 2) * height
+            wr = 0.335 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
+
+        elif specie == 71:  # Fagus sylvatica
+
+            wsw = 0.0676 * (dbh ** 2) + 0.0182 * (dbh ** 2) * height
+            Z = np.where(dbh <= 22.5, 0, 1)
+            wthickb = (0.830 * ((dbh - 22.5) ** 2) - 0.0248 * ((dbh - 22.5) ** 2) * height) * Z
+            wb2_7 = 0.0792 * (dbh ** 2)
+            wthinb = 0.0930 * (dbh ** 2) - 0.00226 * (dbh ** 2) * height
+            wr = 0.106 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
 
-            # TODO: to explore/include:
-            # https://www.fs.usda.gov/research/nrs/news/highlights/how-much-carbon-tree-biomass#publications
-            # https://github.com/mdoraisami/glowcad/tree/main
-
-
-            # define variables
-            wsw = wsb = wswb = w_cork = wthickb = wstb = wb2_7 = wb2_t = wthinb = wb05 = 0
-            wb05_7 = wb0_2 = wdb = wl = wtbl = wbl0_7 = ws = wb = wr = wt = 0
-            carbon_heartwood = carbon_sapwood = carbon_bark = c_value = 0
-
-            # elif tree.specie == 17:  # Cedrus atlantica
-
-                # carbon = 50.3*wt
-                # Telmo et al., 2010
-
-            if tree.specie == 21:  # Pinus sylvestris
-
-                # España
-                wsw = 0.0154 * (tree.dbh ** 2) * tree.height
-                if tree.dbh <= 37.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.540 * ((tree.dbh - 37.5) ** 2) - 0.0119 * ((tree.dbh - 37.5) ** 2) * tree.height) * Z
-                wb2_7 = 0.0295 * (tree.dbh ** 2.742) * (tree.height ** (-0.899))
-                wtbl = 0.530 * (tree.dbh ** 2.199) * (tree.height ** (-1.153))
-                wr = 0.130 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2011
-
-                # Galicia
-                # wswb = 0.02321*(tree.dbh**2.708)
-                # wthickb = 3.7e-7*(tree.dbh**4.804)
-                # wb2_7 = 0.02036*(tree.dbh**2.141)
-                # wb0_2 = 0.1432*(tree.dbh**1.510)
-                # wl = 0.1081*(tree.dbh**1.510)
-                # wr = 0.01089*(tree.dbh**2.628)
-                # Diéguez-Aranda et al. 2009
-
-                c_value = 0.459
-                # Herrero et al., 2011
-
-            elif tree.specie == 22:  # Pinus uncinata
-
-                wsw = 0.0203 * (tree.dbh ** 2) * tree.height
-                wb2_t = 0.0379 * (tree.dbh ** 2)
-                wtbl = 2.740 * tree.dbh - 2.641 * tree.height
-                wr = 0.193 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2011
-
-            elif tree.specie == 23:  # Pinus pinea
-
-                wsw = 0.0224 * (tree.dbh ** 1.923) * (tree.height ** 1.0193)
-                if tree.dbh <= 22.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.247 * ((tree.dbh - 22.5) ** 2)) * Z
-                wb2_7 = 0.0525 * (tree.dbh ** 2)
-                wtbl = 21.927 + 0.0707 * (tree.dbh ** 2) - 2.827 * tree.height
-                wr = 0.117 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2011
-
-            elif tree.specie == 24:  # Pinus halepensis
-
-                wsw = 0.0139 * (tree.dbh ** 2) * tree.height
-                if tree.dbh <= 27.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (3.926 * (tree.dbh - 27.5)) * Z
-                wb2_7 = 4.257 + 0.00506 * (tree.dbh ** 2) * tree.height - 0.0722 * tree.dbh * tree.height
-                wtbl = 6.197 + 0.00932 * (tree.dbh ** 2) * tree.height - 0.0686 * tree.dbh * tree.height
-                wr = 0.0785 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2011
-
-            elif tree.specie == 25:  # Pinus nigra
-
-                wsw = 0.0403 * (tree.dbh ** 1.838) * (tree.height ** 0.945)  # Stem wood (kg)
-                if tree.dbh <= 32.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.228 * ((tree.dbh - 32.5) ** 2)) * Z  # wthickb = branches > 7 cm biomass (kg)
-                wb2_7 = 0.0521 * (tree.dbh ** 2)  # wb2_7 = branches (2-7 cm) biomass (kg)
-                wtbl = 0.0720 * (tree.dbh ** 2)  # Thin branches + Leaves (<2 cm) biomass (kg)
-                wr = 0.0189 * (tree.dbh ** 2.445)  # Roots biomass (kg)
-                # Ruiz-Peinado et al, 2011
-
-                c_value = 0.464
-                # Herrero et al., 2011
-
-            elif tree.specie == 26:  # Pinus pinaster
-
-                # España
-                wsw = 0.0278 * (tree.dbh ** 2.115) * (tree.height ** 0.618)
-                wb2_t = 0.000381 * (tree.dbh ** 3.141)
-                wtbl = 0.0129 * (tree.dbh ** 2.320)
-                wr = 0.00444 * (tree.dbh ** 2.804)
-                # Ruiz-Peinado et al, 2011
-
-                # Galicia
-                # wstb = 0.3882 + 0.01149*(tree.dbh**2)*tree.height
-                # wsb = 0.0079*(tree.dbh**2.098)*(tree.height**0.466)
-                # wb2_7 = 3.202 - 0.01484*(tree.dbh**2) - 0.4228*tree.height + 0.00279*(tree.dbh**2)*tree.height
-                # wthinb = 0.09781*(tree.dbh**2.288)*(tree.height**(-0.9648))
-                # wb05 = 0.00188*(tree.dbh**2.154)
-                # wl = 0.005*(tree.dbh**2.383)
-                # Diéguez-Aranda et al. 2009
-
-                c_value = 0.468
-                # Herrero et al., 2011
-
-                # c_value = 0.484
-                # Telmo et al., 2010
-
-            elif tree.specie == 27:  # Pinus canariensis
-
-                wsw = 0.0249 * ((tree.dbh ** 2) * tree.height) ** 0.975
-                if tree.dbh <= 32.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.634 * ((tree.dbh - 32.5) ** 2)) * Z
-                wb2_7 = 0.00162 * (tree.dbh ** 2) * tree.height
-                wtbl = 0.0844 * (tree.dbh ** 2) - 0.0731 * (tree.height ** 2)
-                wr = 0.155 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2011
-
-            elif tree.specie == 28:  # Pinus radiata
-
-                # España
-                wstb = 0.01230 * (tree.dbh ** 1.604) * (tree.height ** 1.413)
-                wsb = 0.003600 * (tree.dbh ** 2.656)
-                wb2_7 = 1.938 + 0.001065 * (tree.dbh ** 2) * tree.height
-                wthinb = 0.03630 * (tree.dbh ** 2.609) * (tree.height ** (-0.9417))
-                wb05 = 0.007800 * (tree.dbh ** 1.961)
-                wl = 0.04230 * (tree.dbh ** 1.714)
-                wr = 0.06174 * (tree.dbh ** 2.144)
-
-                # Galicia
-                # wstb = 0.01230*(tree.dbh**1.604)*(tree.height**1.413)
-                # wsb = 0.003600*(tree.dbh**2.656)
-                # wb2_7 = 1.938 + 0.001065*(tree.dbh**2)*tree.height
-                # wthinb = 0.03630*(tree.dbh**2.609)*(tree.height**(-0.9417))
-                # wb05 = 0.007800*(tree.dbh**1.961)
-                # wl = 0.04230*(tree.dbh**1.714)
-                # wr = 0.06174*(tree.dbh**2.144)
-                # Diéguez-Aranda et al. 2009
-
-            elif tree.specie == 31:  # Abies alba
-
-                wsw = 0.0189 * (tree.dbh ** 2) * tree.height
-                wb2_t = 0.0584 * (tree.dbh ** 2)
-                wtbl = 0.0371 * (tree.dbh ** 2) + 0.968 * tree.height
-                wr = 0.101 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2011
-
-            elif tree.specie == 32:  # Abies pinsapo
-
-                wsw = 0.00960 * (tree.dbh ** 2) * tree.height
-                if tree.dbh <= 32.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = ((1.637 * ((tree.dbh - 32.5) ** 2) - 0.0719 * (tree.dbh - 32.5) ** 2) * tree.height) * Z
-                w2_7 = 0.00344 * (tree.dbh ** 2) * tree.height
-                wtbl = 0.131 * tree.dbh * tree.height
-                # Ruiz-Peinado et al, 2011
-
-            # elif tree.specie == 34:  # Pseudotsuga menziesii
-
-                # c_value = 0.476
-                # Telmo et al., 2010
-
-            elif tree.specie == 38:  # Juniperus thurifera
-
-                wsw = 0.32 * (tree.dbh ** 2) * tree.height + 0.217 * tree.dbh * tree.height
-                if tree.dbh <= 22.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.107 * ((tree.dbh - 22.5) ** 2)) * Z
-                wb2_7 = 0.00792 * (tree.dbh ** 2) * tree.height
-                wtbl = 0.273 * tree.dbh * tree.height
-                wr = 0.0767 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2011
-
-            elif tree.specie == 41:  # Quercus robur
-
-                # Galicia
-                # wsw = -5.714 + 0.01823*(tree.dbh**2)*tree.height
-                # wsb = -1.5 + 0.03154*(tree.dbh**2) + 0.00111*(tree.dbh**2)*tree.height
-                # wthickb = 3.427e-9*((tree.dbh**2)*tree.height)**2.310
-                # wb2_7 = 4.268 + 0.003410*(tree.dbh**2)*tree.height
-                # wthinb = 0.03851*(tree.dbh**1.784)
-                # wb05 = 1.379 + 0.00024*(tree.dbh**2)*tree.height
-                # wl = 0.01985*((tree.dbh**2)*tree.height)**0.7375
-                # wr = 0.01160*((tree.dbh**2)*tree.height)**0.9625
-                # Diéguez-Aranda et al. 2009
-
-                # España
-                wsw = -5.714 + 0.01823 * (tree.dbh ** 2) * tree.height
-                wsb = -1.500 + 0.03154 * (tree.dbh ** 2) + 0.001110 * (tree.dbh ** 2) * tree.height
-                wthickb = 3.427e-9 * (((tree.dbh ** 2) * tree.height) ** 2.310)
-                wb2_7 = 4.268 + 0.003410 * (tree.dbh ** 2) * tree.height
-                wthinb = 0.03851 * (tree.dbh ** 1.784) + 1.379
-                wb05 = 0.00024 * (tree.dbh ** 2) * tree.height
-                wl = 0.01985 * (((tree.dbh ** 2) * tree.height) ** 0.7375)
-                wr = 0.01160 * ((tree.dbh ** 2) * tree.height) ** 0.9625
-
-                c_value = 0.472
-                # Telmo et al., 2010
-
-            elif tree.specie == 42:  # Quercus petraea
-
-                wstb = 0.001333 * (tree.dbh ** 2) * tree.height
-                wb2_7 = 0.006531 * (tree.dbh ** 2) * tree.height - 0.07298 * tree.dbh * tree.height
-                wthinb = 0.023772 * (tree.dbh ** 2) * tree.height
-                # Ruiz-Peinado et al, 2012
-
-                carbon_heartwood = wt * (0.2732 * 0.4601)  # heartwood
-                carbon_sapwood = wt * (0.5427 * 0.4549)  # sapwood
-                carbon_bark = wt * (0.1841 * 0.4686)  # bark
-                # carbon = wt*(0.1841*0.4686 + 0.5427*0.4549 + 0.2732*0.4601)  # bark, sapwood and heartwood proportions
-                # Castaño-Santamaría and Bravo, 2012
-
-            elif tree.specie == 43:  # Quercus pyrenaica
-
-                wstb = 0.0261 * (tree.dbh ** 2) * tree.height
-                wb2_7 = - 0.0260 * (tree.dbh ** 2) + 0.536 * tree.height + 0.00538 * (tree.dbh ** 2) * tree.height
-                wthinb = 0.898 * tree.dbh - 0.445 * tree.height
-                wr = 0.143 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-                carbon_heartwood = wt * (0.2732 * 0.4582)  # heartwood
-                carbon_sapwood = wt * (0.5427 * 0.4558)  # sapwood
-                carbon_bark = wt * (0.1841 * 0.4578)  # bark
-                # carbon = wt*(0.1841*0.4578 + 0.5427*0.4558 + 0.2732*0.4582)  # bark, sapwood and heartwood proportions
-                # Castaño-Santamaría and Bravo, 2012
-
-            elif tree.specie == 44:  # Quercus faginea
-
-                wsw = 0.154 * (tree.dbh ** 2)
-                wthickb = 0.0861 * (tree.dbh ** 2)
-                wb2_7 = 0.127 * (tree.dbh ** 2) - 0.00598 * (tree.dbh ** 2) * tree.height
-                wtbl = 0.0726 * (tree.dbh ** 2) - 0.00275 * (tree.dbh ** 2) * tree.height
-                wr = 0.169 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-            elif tree.specie == 45:  # Quercus ilex
-
-                wsw = 0.143 * (tree.dbh ** 2)
-                if tree.dbh <= 12.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.0684 * ((tree.dbh - 12.5) ** 2) * tree.height) * Z
-                wb2_7 = 0.0898 * (tree.dbh ** 2)
-                wtbl = 0.0824 * (tree.dbh ** 2)
-                wr = 0.254 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-            elif tree.specie == 46:  # Quercus suber
-
-                wsw = 0.00525 * (tree.dbh ** 2) * tree.height + 0.278 * tree.dbh * tree.height
-                wthickb = 0.0135 * (tree.dbh ** 2) * tree.height
-                wb2_7 = 0.127 * tree.dbh * tree.height
-                wtbl = 0.0463 * tree.dbh * tree.height
-                wr = 0.0829 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-                # TODO: check before use
-                # if 'h_debark' in TREE_VARS and 'dbh_oc' in TREE_VARS and 'nb' in TREE_VARS:
-                #
-                #     if isinstance(tree.h_debark, float) and isinstance(tree.dbh_oc, float) and isinstance(tree.nb, float):
-                #
-                #         pbhoc = (tree.dbh_oc * math.pi) / 100  # perimeter at breast height outside cork (m)
-                #         pbhic = tree.normal_circumference / 100  # perimeter at breast height inside cork (m)
-                #         shs = tree.h_debark  # stripped height in the stem (m)
-                #         nb = tree.nb + 1  # number of stripped main bough + 1
-                #
-                #         if tree.cork_cycle == 0:  # To use inmediately before the stripping process
-                #             if nb == 1 and shs != 0:
-                #                 tree.add_value('w_cork', math.exp(2.3665 + 2.2722 * math.log(pbhoc) + 0.4473 * math.log(shs)))
-                #             elif nb != 1 and shs != 0:
-                #                 tree.add_value('w_cork', math.exp(
-                #                     2.1578 + 1.5817 * math.log(pbhoc) + 0.5062 * math.log(nb) + 0.6680 * math.log(shs)))
-                #             else:
-                #                 tree.add_value('w_cork', 0)
-                #
-                #         elif tree.cork_cycle == 1:  # To use after the stripping process or in a intermediate age of the cork cycle production
-                #             if nb == 1 and shs != 0:
-                #                 tree.add_value('w_cork', math.exp(2.7506 + 1.9174 * math.log(pbhic) + 0.4682 * math.log(shs)))
-                #             elif nb != 1 and shs != 0:
-                #                 tree.add_value('w_cork', math.exp(2.2137 + 0.9588 * math.log(shs) + 0.6546 * math.log(nb)))
-                #             else:
-                #                 tree.add_value('w_cork', 0)
-                #         else:
-                #             tree.add_value('w_cork', 0)
-                #
-                #     elif isinstance(tree.h_debark, float) and isinstance(tree.dbh_oc, float) and not isinstance(tree.nb, float):
-                #
-                #         pbhoc = (tree.dbh_oc * math.pi) / 100  # perimeter at breast height outside cork (m)
-                #         pbhic = tree.normal_circumference / 100  # perimeter at breast height inside cork (m)
-                #         shs = tree.h_debark  # stripped height in the stem (m)
-                #         nb = 1  # number of stripped main bough + 1
-                #
-                #         if tree.cork_cycle == 0 and shs != 0:  # To use inmediately before the stripping process
-                #             tree.add_value('w_cork', math.exp(2.3665 + 2.2722 * math.log(pbhoc) + 0.4473 * math.log(shs)))
-                #         elif tree.cork_cycle == 1 and shs != 0:  # To use after the stripping process or in a intermediate age of the cork cycle production
-                #             tree.add_value('w_cork', math.exp(2.7506 + 1.9174 * math.log(pbhic) + 0.4682 * math.log(shs)))
-                #         else:
-                #             tree.add_value('w_cork', 0)
-                #
-                #     else:
-                #
-                #         tree.add_value('w_cork', 0)
-
-            elif tree.specie == 47:  # Quercus canariensis
-
-                wsw = 0.0126 * (tree.dbh ** 2) * tree.height
-                wthickb = 0.103 * (tree.dbh ** 2)
-                wbl0_7 = 0.167 * tree.dbh * tree.height
-                wr = 0.135 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-            elif tree.specie == 54:  # Alnus glutinosa
-
-                wsw = 0.0191 * (tree.dbh ** 2) * tree.height
-                wb2_t = 0.0512 * (tree.dbh ** 2)
-                wtbl = 0.0567 * tree.dbh * tree.height
-                wr = 0.214 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-            elif tree.specie == 55:  # Fraxinus angustifolia
-
-                wsw = 0.0296 * (tree.dbh ** 2) * tree.height
-                if tree.dbh <= 12.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.231 * ((tree.dbh - 12.5) ** 2)) * Z
-                wb2_7 = 0.0925 * (tree.dbh ** 2)
-                wthinb = 2.005 * tree.dbh
-                wr = 0.359 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-                c_value = 0.477
-                # Telmo et al., 2010
-
-            elif tree.specie == 61:  # Eucalyptus globulus
-
-                # Galicia
-                wstb = 0.01308 * (tree.dbh ** 1.870) * (tree.height ** 1.172)
-                wsb = 0.01010 * (tree.dbh ** 2.484)
-                wb05_7 = 0.003685 * (tree.dbh ** 2.654)
-                wb05 = 0.01258 * (tree.dbh ** 1.705)
-                wl = 0.02949 * (tree.dbh ** 1.917)
-                # Diéguez-Aranda et al. 2009
-
-                # España
-                # wstb = 0.0221*(tree.dbh**2)*tree.height
-                # wb2_7 = 0.154*(tree.dbh**1.668)
-                # wtbl = 0.180*(((tree.dbh**2)*tree.height)**0.587)
-                # Ruiz-Peinado et al, 2012
-
-                c_value = 0.462
-                # Telmo et al., 2010
-
-            elif tree.specie == 64:  # Eucalyptus nittens
-
-                # Sin ecuaciones de copa
-                wstb = 0.0094 * (tree.dbh ** 2.033) * (tree.height ** 1.056)
-                wsb = 0.01342 * (tree.dbh ** 2.361)
-                wb2_7 = 0.000059 * (tree.dbh ** 3.760)
-                wthinb = 0.01280 * (tree.dbh ** 1.858)
-                wb05 = 0.000922 * (tree.dbh ** 2.632)
-                wl = 0.0053 * (tree.dbh ** 2.393)
-                wdb = 0.1451 * (tree.dbh ** 1.403)
-                # Diéguez-Aranda et al. 2009
-
-                # Con ecuaciones de copa
-                # wstb = 0.1495*(tree.dbh**2.052)*(tree.height**0.8946)
-                # wsb = 0.03190*(tree.dbh**2.108)
-                # wb2_7 = 0.000822*(tree.dbh**2.644)*(tree.lcw**0.7627)
-                # wthinb = 0.03005*(tree.dbh**1.590)
-                # wb05 = 0.006230*(tree.dbh**1.949)*(tree.lcw**0.2189)
-                # wl = 0.0168*(tree.dbh**1.516)*((tree.height - tree.hcb)**0.7747)
-                # wdb = 0.007933*(tree.dbh**1.279)*(tree.hbc**1.254)
-                # Diéguez-Aranda et al. 2009
-
-            elif tree.specie == 66:  # Olea europaea
-
-                wsw = 0.0114 * (tree.dbh ** 2) * tree.height
-                wthickb = 0.0108 * (tree.dbh ** 2) * tree.height
-                wb2_7 = 1.672 * tree.dbh
-                wtbl = 0.0354 * (tree.dbh ** 2) + 1.187 * tree.height
-                wr = 0.147 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-            elif tree.specie == 67:  # Ceratonia siliqua
-
-                wsw = 0.142 * (tree.dbh ** 1.974)
-                wthickb = 0.104 * (tree.dbh ** 2)
-                wb2_7 = 0.0538 * (tree.dbh ** 2)
-                wtbl = 0.151 * (tree.dbh ** 2) - 0.00740 * (tree.dbh ** 2) * tree.height
-                wr = 0.335 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-            elif tree.specie == 71:  # Fagus sylvatica
-
-                wsw = 0.0676 * (tree.dbh ** 2) + 0.0182 * (tree.dbh ** 2) * tree.height
-                if tree.dbh <= 22.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.830 * ((tree.dbh - 22.5) ** 2) - 0.0248 * ((tree.dbh - 22.5) ** 2) * tree.height) * Z
-                wb2_7 = 0.0792 * (tree.dbh ** 2)
-                wthinb = 0.0930 * (tree.dbh ** 2) - 0.00226 * (tree.dbh ** 2) * tree.height
-                wr = 0.106 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
-
-                c_value = 0.467
-                # Telmo et al., 2010
-
-            elif tree.specie == 72:  # Castanea sativa
-
-                wsw = 0.0142 * (tree.dbh ** 2) * tree.height
-                if tree.dbh <= 12.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.223 * ((tree.dbh - 12.5) ** 2)) * Z
-                wb2_7 = 0.230 * tree.dbh * tree.height
-                wthinb = 0.221 * tree.dbh * tree.height
-                wr = 0.0211 * (tree.dbh ** 2.804)
-                # Ruiz-Peinado et al, 2012
-
-                c_value = 0.471
-                # Telmo et al., 2010
-
-            # elif tree.specie == 95:  # Prunus avium
+        elif specie == 72:  # Castanea sativa
 
-                # c_value = 0.486
-                # Telmo et al., 2010
+            wsw = 0.0142 * (dbh ** 2) * height
+            Z = np.where(dbh <= 12.5, 0, 1)
+            wthickb = (0.223 * ((dbh - 12.5) ** 2)) * Z
+            wb2_7 = 0.230 * dbh * height
+            wthinb = 0.221 * dbh * height
+            wr = 0.0211 * (dbh ** 2.804)
+            # Ruiz-Peinado et al, 2012
 
-            elif tree.specie == 258:  # Populus x canadensis/euroamericana
+        # elif specie == 95:  # Prunus avium
 
-                wsw = 0.0130 * (tree.dbh ** 2) * tree.height
-                if tree.dbh <= 22.5:
-                    Z = 0
-                else:
-                    Z = 1
-                wthickb = (0.538 * ((tree.dbh - 22.5) ** 2) - 0.0130 * ((tree.dbh - 22.5) ** 2) * tree.height) * Z
-                wb2_7 = 0.385 * (tree.dbh ** 2)
-                wtbl = 0.0774 * (tree.dbh ** 2) - 0.00198 * (tree.dbh ** 2) * tree.height
-                wr = 0.122 * (tree.dbh ** 2)
-                # Ruiz-Peinado et al, 2012
+            # c_value = 0.486
+            # Telmo et al., 2010
 
-                c_value = 0.478
-                # Telmo et al., 2010
+        elif specie == 258:  # Populus x canadensis/euroamericana
 
-            elif tree.specie == 273:  # Betula alba
+            wsw = 0.0130 * (dbh ** 2) * height
+            Z = np.where(dbh <= 22.5, 0, 1)
+            wthickb = (0.538 * ((dbh - 22.5) ** 2) - 0.0130 * ((dbh - 22.5) ** 2) * height) * Z
+            wb2_7 = 0.385 * (dbh ** 2)
+            wtbl = 0.0774 * (dbh ** 2) - 0.00198 * (dbh ** 2) * height
+            wr = 0.122 * (dbh ** 2)
+            # Ruiz-Peinado et al, 2012
 
-                wsw = 0.1485 * (tree.dbh ** 2.223)
-                wsb = 0.03010 * (tree.dbh ** 2.186)
-                wthickb = 1.515 * math.exp(0.09040 * tree.dbh)
-                wb2_7 = 0.1374 * (tree.dbh ** 1.760)
-                wthinb = 0.05 * (tree.dbh ** 1.618)
-                wb05 = 0.03720 * (tree.dbh ** 1.581)
-                wl = 0.03460 * (tree.dbh ** 1.645)
-                wr = 1.042 * (tree.dbh ** 1.254)
-                # Diéguez-Aranda et al. 2009
+        elif specie == 273:  # Betula alba
 
-            # elif tree.specie == 475:  # Salix babylonica
+            wsw = 0.1485 * (dbh ** 2.223)
+            wsb = 0.03010 * (dbh ** 2.186)
+            wthickb = 1.515 * np.exp(0.09040 * dbh)
+            wb2_7 = 0.1374 * (dbh ** 1.760)
+            wthinb = 0.05 * (dbh ** 1.618)
+            wb05 = 0.03720 * (dbh ** 1.581)
+            wl = 0.03460 * (dbh ** 1.645)
+            wr = 1.042 * (dbh ** 1.254)
+            # Diéguez-Aranda et al. 2009
 
-                # c_value = 0.472
-                # Telmo et al., 2010
+        # elif specie == 475:  # Salix babylonica
 
-            # elif tree.specie == 576:  # Acer pseudoplatanus
+            # c_value = 0.472
+            # Telmo et al., 2010
 
-                # c_value = 0.468
-                # Telmo et al., 2010
+        # elif specie == 576:  # Acer pseudoplatanus
 
-            # elif tree.specie == ---:  # Chlorophora excelsa
+            # c_value = 0.468
+            # Telmo et al., 2010
 
-                # c_value = 0.507
-                # Telmo et al., 2010
+        # elif specie == ---:  # Chlorophora excelsa
 
-            # elif tree.specie == ---:  # Entandrophragma cylindricum
+            # c_value = 0.507
+            # Telmo et al., 2010
 
-                # c_value = 0.478
-                # Telmo et al., 2010
+        # elif specie == ---:  # Entandrophragma cylindricum
 
-            # elif tree.specie == ---:  # Gossweilerodendron balsamiferum
+            # c_value = 0.478
+            # Telmo et al., 2010
 
-                # c_value = 0.504
-                # Telmo et al., 2010
+        # elif specie == ---:  # Gossweilerodendron balsamiferum
 
-            # elif tree.specie == ---:  # Bowdichia nitida
+            # c_value = 0.504
+            # Telmo et al., 2010
 
-                # c_value = 0.523
-                # Telmo et al., 2010
+        # elif specie == ---:  # Bowdichia nitida
 
-            # elif tree.specie == ---:  # Hymenaea courbaril
+            # c_value = 0.523
+            # Telmo et al., 2010
 
-                # c_value = 0.483
-                # Telmo et al., 2010
+        # elif specie == ---:  # Hymenaea courbaril
 
+            # c_value = 0.483
+            # Telmo et al., 2010
 
-            # biomass and carbon by compartments
-            ws = wsw + wsb + wswb + w_cork + wstb
-            wb = wthickb + wb2_7 + wb2_t + wthinb + wb05 + wb05_7 + wb0_2 + wdb + wl + wtbl + wbl0_7
-            wt = ws + wb + wr
 
-            carbon_stem = ws * c_value
-            carbon_branches = wb * c_value
-            carbon_roots = wr * c_value
-            carbon = carbon_stem + carbon_branches + carbon_roots
 
-            # cases when carbon is calculated by types of wood instead of a c_value
-            if carbon_bark != 0 and carbon_heartwood != 0 and carbon_sapwood != 0:
-                carbon = carbon_bark + carbon_heartwood + carbon_sapwood
+        return {'wsw': wsw, 'wsb': wsb, 'wswb': wswb, 'w_cork': w_cork, 'wthickb': wthickb, 'wstb': wstb,
+                'wb2_7': wb2_7, 'wb2_t': wb2_t, 'wthinb': wthinb, 'wb05': wb05, 'wb05_7': wb05_7, 'wb0_2': wb0_2,
+                'wdb': wdb, 'wl': wl, 'wtbl': wtbl, 'wbl0_7': wbl0_7, 'wr': wr,
+                'carbon_heartwood': carbon_heartwood, 'carbon_sapwood': carbon_sapwood, 'carbon_bark': carbon_bark}
 
 
-            # define features and values as tuples
-            features_and_values = [
-                ('wsw', wsw),
-                ('wsb', wsb),
-                ('wswb', wswb),
-                ('w_cork', w_cork),
-                ('wthickb', wthickb),
-                ('wstb', wstb),
-                ('wb2_7', wb2_7),
-                ('wb2_t', wb2_t),
-                ('wthinb', wthinb),
-                ('wb05', wb05),
-                ('wb05_7', wb05_7),
-                ('wb0_2', wb0_2),
-                ('wdb', wdb),
-                ('wl', wl),
-                ('wtbl', wtbl),
-                ('wbl0_7', wbl0_7),
-                ('ws', ws),
-                ('wb', wb),
-                ('wr', wr),
-                ('wt', wt),
-                ('carbon_heartwood', carbon_heartwood),
-                ('carbon_sapwood', carbon_sapwood),
-                ('carbon_bark', carbon_bark),
-                ('carbon_stem', carbon_stem),
-                ('carbon_branches', carbon_branches),
-                ('carbon_roots', carbon_roots),
-                ('carbon', carbon)
-            ]
-
-            # iterate over the list of tuples and add values to the 'tree' object
-            for feature, value in features_and_values:
-                if value == 0:
-                    value = ''  # '' is more understandably than 0 when no equation is available
-                if feature in TREE_VARS:  # if the feature is in the list of variables, add it to the tree object
+    def get_w_carbon(species, dbh, height):
+        """
+        Function that calculates the biomass and carbon variables of n trees at once.
+        The equations are applied once for each species, over the arrays of its trees.
+        It returns a dictionary with an array (n,) for each variable of BIOMASS_VARS, with 0 if no equation is available.
+        :param species: array with the IFN code of the species of the trees
+        :param dbh: array with the dbh (cm) of the trees
+        :param height: array with the height (m) of the trees
+        """
+
+        species = np.asarray(species, dtype=np.float64)
+        dbh = np.asarray(dbh, dtype=np.float64)
+        height = np.asarray(height, dtype=np.float64)
+
+        values = {var: np.zeros(len(species)) for var in COMPONENT_VARS}
+
+        codes = np.where(np.isfinite(species), species, -1)  # trees without species have no equations
+        for specie in np.unique(codes):
+            rows = np.flatnonzero(codes == specie)
+            components = TreeBiomass.get_w_specie(specie, dbh[rows], height[rows])
+            for var, value in components.items():
+                values[var][rows] = value
+
+        c_value, found = SpeciesRegistry.gather(CARBON, species)  # carbon content, on coefficients/carbon.csv
+        c_value = np.where(found, c_value[:, 0], 0)
+
+        # biomass and carbon by compartments
+        values['ws'] = values['wsw'] + values['wsb'] + values['wswb'] + values['w_cork'] + values['wstb']
+        values['wb'] = values['wthickb'] + values['wb2_7'] + values['wb2_t'] + values['wthinb'] + values['wb05'] + \
+            values['wb05_7'] + values['wb0_2'] + values['wdb'] + values['wl'] + values['wtbl'] + values['wbl0_7']
+        values['wt'] = values['ws'] + values['wb'] + values['wr']
+
+        values['carbon_stem'] = values['ws'] * c_value
+        values['carbon_branches'] = values['wb'] * c_value
+        values['carbon_roots'] = values['wr'] * c_value
+        values['carbon'] = values['carbon_stem'] + values['carbon_branches'] + values['carbon_roots']
+
+        # cases when carbon is calculated by types of wood instead of a c_value
+        by_wood = (values['carbon_bark'] != 0) & (values['carbon_heartwood'] != 0) & (values['carbon_sapwood'] != 0)
+        values['carbon'] = np.where(by_wood, values['carbon_bark'] + values['carbon_heartwood'] + values['carbon_sapwood'],
+                                    values['carbon'])
+
+        return {var: values[var] for var in BIOMASS_VARS}
+
+
+    def set_w_carbon_trees_batch(list_of_trees):
+        """
+        Function to calculate biomass and carbon variables for a list of trees, with the equations applied by species
+        over the columns of the trees (see get_w_carbon).
+        It assigns the values to the tree objects for the corresponding features available, returning '' if not available.
+        :param list_of_trees: list of Tree objects
+        """
+
+        try:
+
+            features = [var for var in BIOMASS_VARS if var in TREE_VARS]
+
+            if len(list_of_trees) == 0 or len(features) == 0:
+                return
+
+            table = TreeTable.from_trees(list_of_trees)
+            values = TreeBiomass.get_w_carbon(table.column('specie', dtype=np.float64),
+                                              table.column('dbh', dtype=np.float64),
+                                              table.column('height', dtype=np.float64))
+
+            # NaN values are trees without dbh or height, so no equation is available
+            columns = [[value if value == value else 0 for value in values[feature].tolist()] for feature in features]
+
+            # add the values to the 'tree' objects
+            for n, tree in enumerate(list_of_trees):
+                for feature, column in zip(features, columns):
+                    value = column[n]
+                    if value == 0:
+                        value = ''  # '' is more understandably than 0 when no equation is available
                     tree.add_value(feature, value)
 
         except Exception:
             self.catch_model_exception()
 
 
-    def set_w_carbon_plot(plot: Plot, list_of_trees):
+    def set_w_carbon_trees(tree):
         """
-        Function to calculate biomass and carbon variables for each plot based on trees information.
+        Function to calculate biomass and carbon variables for each tree.
         It assigns the values to the tree object for the corresponding features available, returning '' if not available.
+        :param tree: Tree object
+        """
+
+        TreeBiomass.set_w_carbon_trees_batch([tree])
+
+
+    def set_w_carbon_plot_values(plot: Plot, list_of_trees, total: bool = True, by_species: bool = False):
+        """
+        Function to calculate the biomass and carbon variables of the plot (total) and split by species (by_species)
+        on the same pass, adding the values of the trees by groups.
+        It assigns the values to the plot object for the corresponding features available, returning '' if not available.
         :param plot: Plot object
         :param list_of_trees: list of Tree objects
+        :param total: calculate the plot variables (WSW, ... CARBON)
+        :param by_species: calculate the plot variables of the species 1, 2 and the rest (_SP1, _SP2 and _SP3)
         """
 
         try:  # errors inside that construction will be announced
 
-            # initialize variables
-            plot_wsw = plot_wsb = plot_wswb = plot_w_cork = plot_wthickb = plot_wstb = plot_wb2_7 = plot_wb2_t = \
-                plot_wthinb = plot_wb05 = plot_wb05_7 = plot_wb0_2 = plot_wdb = plot_wl = plot_wtbl = plot_wbl0_7 = \
-                plot_ws = plot_wb = plot_wr = plot_wt = plot_carbon_heartwood = plot_carbon_sapwood = plot_carbon_bark = \
-                plot_carbon_stem = plot_carbon_branches = plot_carbon_roots = plot_carbon = 0
-
-            # define attributes and plot attributes
-            attributes = ['wsw', 'wsb', 'wswb', 'w_cork', 'wthickb', 'wstb', 'wb2_7', 'wb2_t', 'wthinb', 'wb05',
-                          'wb05_7', 'wb0_2', 'wdb', 'wl', 'wtbl', 'wbl0_7', 'ws', 'wb', 'wr', 'wt',
-                          'carbon_heartwood', 'carbon_sapwood', 'carbon_bark', 'carbon_stem', 'carbon_branches',
-                          'carbon_roots', 'carbon']
-
-            plot_attributes = [plot_wsw, plot_wsb, plot_wswb, plot_w_cork, plot_wthickb, plot_wstb, plot_wb2_7,
-                               plot_wb2_t, plot_wthinb, plot_wb05, plot_wb05_7, plot_wb0_2, plot_wdb, plot_wl,
-                               plot_wtbl, plot_wbl0_7, plot_ws, plot_wb, plot_wr, plot_wt,
-                               plot_carbon_heartwood, plot_carbon_sapwood, plot_carbon_bark, plot_carbon_stem,
-                               plot_carbon_branches, plot_carbon_roots, plot_carbon]
-
-            # for each tree, we are going to add the individual values to the plot value
-            for tree in list_of_trees:
-
-                # iterate over the list of attributes and plot attributes
-                for attr, plot_attr, n in zip(attributes, plot_attributes, range(len(plot_attributes))):
-                    if attr in TREE_VARS:  # if the attribute is in the list of variables, add it to the plot object
-                        value = getattr(tree, attr, '')
-                        if value != '':  # if the value is not empty, add it to the plot attribute
-                            plot_attr += value * tree.expan / 1000
-                            plot_attributes[n] = plot_attr  # update the plot attribute
-                        else:
-                            plot_attributes[n] = plot_attr  # previous value is maintained
+            n_trees = len(list_of_trees)
+            attributes = [attr for attr in BIOMASS_VARS if attr in TREE_VARS and (total or attr in SPECIES_VARS)]
+
+            # group of each tree: 0, 1 and 2 for species 1, 2 and the rest, and 3 for the total of the plot
+            groups = list()
+            if by_species:
+                groups.append(np.array([0 if tree.specie == plot.id_sp1 else 1 if tree.specie == plot.id_sp2 else 2
+                                        for tree in list_of_trees], dtype=np.int64))
+            if total:
+                groups.append(np.full(n_trees, 3, dtype=np.int64))
+
+            sums = np.zeros((4, len(attributes)))
+
+            if n_trees > 0 and len(attributes) > 0 and len(groups) > 0:
 
+                table = TreeTable.from_trees(list_of_trees)
+                expan = table.column('expan', dtype=np.float64)
+
+                # contribution of each tree to the plot values; empty values are not added
+                contributions = np.empty((n_trees, len(attributes)))
+                for n, attr in enumerate(attributes):
+                    contributions[:, n] = table.column(attr, dtype=np.float64) * expan / 1000
+                contributions[np.isnan(contributions)] = 0
+
+                for group in groups:
+                    np.add.at(sums, group, contributions)  # added tree by tree, in the same order as the list
+
+            sums = {attr: sums[:, n].tolist() for n, attr in enumerate(attributes)}
 
             # define features and values as tuples
-            features_and_values = [
-                ('WSW', plot_attributes[0]),
-                ('WSB', plot_attributes[1]),
-                ('WSWB', plot_attributes[2]),
-                ('W_CORK', plot_attributes[3]),
-                ('WTHICKB', plot_attributes[4]),
-                ('WSTB', plot_attributes[5]),
-                ('WB2_7', plot_attributes[6]),
-                ('WB2_T', plot_attributes[7]),
-                ('WTHINB', plot_attributes[8]),
-                ('WB05', plot_attributes[9]),
-                ('WB05_7', plot_attributes[10]),
-                ('WB0_2', plot_attributes[11]),
-                ('WDB', plot_attributes[12]),
-                ('WL', plot_attributes[13]),
-                ('WTBL', plot_attributes[14]),
-                ('WBL0_7', plot_attributes[15]),
-                ('WS', plot_attributes[16]),
-                ('WB', plot_attributes[17]),
-                ('WR', plot_attributes[18]),
-                ('WT', plot_attributes[19]),
-                ('CARBON_HEARTWOOD', plot_attributes[20]),
-                ('CARBON_SAPWOOD', plot_attributes[21]),
-                ('CARBON_BARK', plot_attributes[22]),
-                ('CARBON_STEM', plot_attributes[23]),
-                ('CARBON_BRANCHES', plot_attributes[24]),
-                ('CARBON_ROOTS', plot_attributes[25]),
-                ('CARBON', plot_attributes[26])
-            ]
+            features_and_values = list()
+            if by_species:
+                for n, suffix in enumerate(('_SP1', '_SP2', '_SP3')):
+                    features_and_values += [(attr.upper() + suffix, sums[attr][n] if attr in sums else 0)
+                                            for attr in SPECIES_VARS]
+            if total:
+                features_and_values += [(attr.upper(), sums[attr][3] if attr in sums else 0) for attr in BIOMASS_VARS]
 
             # iterate over the list of tuples and add values to the 'plot' object
             for feature, plot_attr in features_and_values:
@@ -719,86 +691,23 @@ class TreeBiomass(metaclass=ABCMeta):
             self.catch_model_exception()
 
 
-    def set_w_carbon_plot_sp(plot: Plot, list_of_trees):
+    def set_w_carbon_plot(plot: Plot, list_of_trees):
         """
-        Function to calculate biomass and carbon variables for each plot based on trees information and split by species.
+        Function to calculate biomass and carbon variables for each plot based on trees information.
         It assigns the values to the tree object for the corresponding features available, returning '' if not available.
         :param plot: Plot object
         :param list_of_trees: list of Tree objects
         """
 
-        try:  # errors inside that construction will be announced
-
-            # initialize variables
-            plot_ws_sp1 = plot_wb_sp1 = plot_wr_sp1 = plot_wt_sp1 = \
-                plot_carbon_stem_sp1 = plot_carbon_branches_sp1 = plot_carbon_roots_sp1 = plot_carbon_sp1 = 0
-            plot_ws_sp2 = plot_wb_sp2 = plot_wr_sp2 = plot_wt_sp2 = \
-                plot_carbon_stem_sp2 = plot_carbon_branches_sp2 = plot_carbon_roots_sp2 = plot_carbon_sp2 = 0
-            plot_ws_sp3 = plot_wb_sp3 = plot_wr_sp3 = plot_wt_sp3 = \
-                plot_carbon_stem_sp3 = plot_carbon_branches_sp3 = plot_carbon_roots_sp3 = plot_carbon_sp3 = 0
-
-            # define attributes and plot attributes
-            tree_attributes = ['ws', 'wb', 'wr', 'wt', 'carbon_stem', 'carbon_branches', 'carbon_roots', 'carbon']
-
-            attributes_sp1 = ['WS_SP1', 'WB_SP1', 'WR_SP1', 'WT_SP1',
-                          'CARBON_STEM_SP1', 'CARBON_BRANCHES_SP1', 'CARBON_ROOTS_SP1', 'CARBON_SP1']
-            attributes_sp2 = ['WS_SP2', 'WB_SP2', 'WR_SP2', 'WT_SP2',
-                            'CARBON_STEM_SP2', 'CARBON_BRANCHES_SP2', 'CARBON_ROOTS_SP2', 'CARBON_SP2']
-            attributes_sp3 = ['WS_SP3', 'WB_SP3', 'WR_SP3', 'WT_SP3',
-                            'CARBON_STEM_SP3', 'CARBON_BRANCHES_SP3', 'CARBON_ROOTS_SP3', 'CARBON_SP3']
-
-            # define plot attributes
-            plot_attributes_sp1 = [plot_ws_sp1, plot_wb_sp1, plot_wr_sp1, plot_wt_sp1,
-                                   plot_carbon_stem_sp1, plot_carbon_branches_sp1, plot_carbon_roots_sp1, plot_carbon_sp1]
-            plot_attributes_sp2 = [plot_ws_sp2, plot_wb_sp2, plot_wr_sp2, plot_wt_sp2,
-                                   plot_carbon_stem_sp2, plot_carbon_branches_sp2, plot_carbon_roots_sp2, plot_carbon_sp2]
-            plot_attributes_sp3 = [plot_ws_sp3, plot_wb_sp3, plot_wr_sp3, plot_wt_sp3,
-                                   plot_carbon_stem_sp3, plot_carbon_branches_sp3, plot_carbon_roots_sp3, plot_carbon_sp3]
-
-
-            # for each tree, we are going to add the individual values to the plot value
-            for tree in list_of_trees:
-
-                # distinguish between species
-                if tree.specie == plot.id_sp1:
-                    plot_attributes = plot_attributes_sp1
-                elif tree.specie == plot.id_sp2:
-                    plot_attributes = plot_attributes_sp2
-                else:
-                    plot_attributes = plot_attributes_sp3
-
-                # iterate over the list of attributes and plot attributes
-                for attr, plot_attr, n in zip(tree_attributes, plot_attributes, range(len(plot_attributes))):
-                    if attr in TREE_VARS:  # if the attribute is in the list of variables, add it to the plot object
-                        value = getattr(tree, attr, '')
-                        if value != '':  # if the value is not empty, add it to the plot attribute
-                            plot_attr += value * tree.expan / 1000
-                            plot_attributes[n] = plot_attr  # update the plot attribute
-                        else:
-                            plot_attributes[n] = plot_attr  # previous value is maintained
-
-                # rewrite plot attributes
-                # distinguish between species
-                if tree.specie == plot.id_sp1:
-                    plot_attributes_sp1 = plot_attributes
-                elif tree.specie == plot.id_sp2:
-                    plot_attributes_sp2 = plot_attributes
-                else:
-                    plot_attributes_sp3 = plot_attributes
+        TreeBiomass.set_w_carbon_plot_values(plot, list_of_trees, total=True, by_species=False)
 
 
-            # define features and values as tuples
-            features_and_values_sp1 = list(zip(attributes_sp1, plot_attributes_sp1))
-            features_and_values_sp2 = list(zip(attributes_sp2, plot_attributes_sp2))
-            features_and_values_sp3 = list(zip(attributes_sp3, plot_attributes_sp3))
-            features_and_values = features_and_values_sp1 + features_and_values_sp2 + features_and_values_sp3
-
-            # iterate over the list of tuples and add values to the 'plot' object
-            for feature, plot_attr in features_and_values:
-                if plot_attr == 0:
-                    plot_attr = ''  # '' is more understandably than 0 when no equation is available
-                if feature in PLOT_VARS:  # if the feature is in the list of variables, add it to the plot object
-                    plot.add_value(feature, plot_attr)
+    def set_w_carbon_plot_sp(plot: Plot, list_of_trees):
+        """
+        Function to calculate biomass and carbon variables for each plot based on trees information and split by species.
+        It assigns the values to the tree object for the corresponding features available, returning '' if not available.
+        :param plot: Plot object
+        :param list_of_trees: list of Tree objects
+        """
 
-        except Exception:
-            self.catch_model_exception()
+        TreeBiomass.set_w_carbon_plot_values(plot, list_of_trees, total=False, by_species=True)
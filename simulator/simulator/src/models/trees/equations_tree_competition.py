@@ -0,0 +1,508 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License", Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing", software
+# distributed under the License is distributed on an "AS IS" BASIS",
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND", either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from data import TreeTable
+from models.trees.equations_tree_species import SpeciesRegistry, SDI_BASIC
+from scipy.spatial import cKDTree
+
+import math
+import threading
+import weakref
+import numpy as np
+
+
+BAL_VARS = ['bal', 'bal_intrasp', 'bal_intersp']  # competition variables of the trees (m2/ha)
+SDI_VARS = ['REINEKE_MAX_SP1', 'REINEKE_SP1', 'REINEKE_MAX_SP2', 'REINEKE_SP2', 'SP1_PROPORTION', 'SP2_PROPORTION']
+
+SDI_REFERENCE_DBH = 25  # cm, quadratic mean diameter of the reference stand of the Reineke index
+
+# variables of the trees inside the Hegyi subplot of each tree, in the order they are written
+HEGYI_VARS = ['hegyi', 'bal_intrasp_hegyi', 'bal_intersp_hegyi', 'bal_ratio_intrasp_hegyi', 'bal_ratio_intersp_hegyi',
+              'bal_total_hegyi', 'g_intrasp_hegyi', 'g_intersp_hegyi', 'g_ratio_intrasp_hegyi', 'g_ratio_intersp_hegyi',
+              'g_total_hegyi', 'n_intrasp_hegyi', 'n_intersp_hegyi', 'n_ratio_intrasp_hegyi', 'n_ratio_intersp_hegyi',
+              'n_total_hegyi']
+
+EDGE_NONE = 'NONE'  # the trees out of the plot are not taken into account, as the former tree by tree function
+EDGE_WEIGHT = 'WEIGHT'  # the neighbours are weighted by the inverse of the part of the Hegyi subplot inside the plot
+EDGE_CORRECTIONS = [EDGE_NONE, EDGE_WEIGHT]
+
+DISTANCE_TOLERANCE = 1e-9  # relative margin of the KD-tree queries; the distances are checked again as the former function
+
+
+def get_float(value):
+    """
+    Function that returns a plot value as a float, with NaN if it is empty ('' or None).
+    """
+
+    return np.nan if value is None or value == '' else value
+
+
+class TreeCompetition:
+    """
+    Competition indices (BAL, BAL by species and SDI) calculated over the columns of the trees.
+    The functions work on the trees of one plot or on the trees of several plots at once; in that case, the trees
+    are sorted by plot and each plot is a segment of the arrays (see get_segments).
+    """
+
+    def get_segments(plot_index):
+        """
+        Function that returns the boundaries of the segments of trees of each plot.
+        The trees must be sorted by plot; segment n contains the trees bounds[n]:bounds[n + 1].
+        :param plot_index: array with the index of the plot of each tree
+        """
+
+        plot_index = np.asarray(plot_index, dtype=np.int64)
+        changes = np.flatnonzero(plot_index[1:] != plot_index[:-1]) + 1
+
+        return np.concatenate(([0], changes, [len(plot_index)])) if len(plot_index) > 0 else np.zeros(1, dtype=np.int64)
+
+
+    def get_order(size, plot_index=None):
+        """
+        Function that returns the order of the trees from the biggest to the smallest of each plot.
+        Trees with the same size keep their order, as Plot.short_trees_on_list does; empty sizes are sorted as 0.
+        :param size: array with the variable used to sort the trees (i.e. dbh, ba_ha)
+        :param plot_index: array with the index of the plot of each tree (one plot by default)
+        """
+
+        size = np.nan_to_num(np.asarray(size, dtype=np.float64), nan=0.0)
+        plot_index = np.zeros(len(size), dtype=np.int64) if plot_index is None else np.asarray(plot_index, dtype=np.int64)
+
+        return np.lexsort((-size, plot_index))  # lexsort is stable, and the last key is the first criteria
+
+
+    def get_bal(basal_area, expan, bounds=None, groups=None):
+        """
+        Function that calculates the bal competition index (m2/ha) of trees already sorted from the biggest to the smallest.
+        The basal area of the bigger trees is accumulated with np.cumsum on each plot, adding the same values in the same
+        order as the former tree by tree loop, so the results are identical.
+        If groups is given, the intraspecific and interspecific bal are also calculated.
+        It returns a dictionary with an array (n,) for each variable of BAL_VARS (only 'bal' if groups is None).
+        :param basal_area: array with the basal area of the trees (cm2); trees without it do not add competition
+        :param expan: array with the expansion factor of the trees
+        :param bounds: boundaries of the segments of each plot (see get_segments), one plot by default
+        :param groups: array with the group of species of each tree: 0 for species 1, 1 for species 2, 2 for the rest
+        """
+
+        contribution = np.asarray(basal_area, dtype=np.float64) * np.asarray(expan, dtype=np.float64) / 10000
+        contribution[np.isnan(contribution)] = 0
+        bounds = TreeCompetition.get_segments(np.zeros(len(contribution))) if bounds is None else bounds
+
+        # basal area of all the trees bigger than each tree, and of the ones of each group of species
+        columns = [contribution] if groups is None else \
+            [contribution] + [np.where(groups == group, contribution, 0) for group in range(3)]
+        accumulated = np.zeros((len(columns), len(contribution)))
+
+        for start, end in zip(bounds[:-1], bounds[1:]):  # the accumulators start at 0 on each plot
+            for n, column in enumerate(columns):
+                accumulated[n, start + 1:end] = np.cumsum(column[start:end - 1])
+
+        values = {'bal': accumulated[0]}
+
+        if groups is not None:
+            bal_sp1, bal_sp2, bal_sp3 = accumulated[1:]
+            values['bal_intrasp'] = np.choose(groups, (bal_sp1, bal_sp2, bal_sp3))
+            values['bal_intersp'] = np.choose(groups, (bal_sp2 + bal_sp3, bal_sp1 + bal_sp3, bal_sp1 + bal_sp2))
+
+        return values
+
+
+    def get_groups(species, id_sp1, id_sp2):
+        """
+        Function that returns the group of species of the trees: 0 for species 1, 1 for species 2 and 2 for the rest.
+        :param species: array with the IFN code of the species of the trees
+        :param id_sp1: IFN code of the species 1 of the plot of each tree (array or value)
+        :param id_sp2: IFN code of the species 2 of the plot of each tree (array or value)
+        """
+
+        species = np.trunc(np.asarray(species, dtype=np.float64))  # the species codes are compared as integers
+        id_sp1 = np.trunc(np.asarray(id_sp1, dtype=np.float64))
+        id_sp2 = np.trunc(np.asarray(id_sp2, dtype=np.float64))
+
+        return np.where(species == id_sp1, 0, np.where(species == id_sp2, 1, 2))
+
+
+    def set_bal(list_of_trees, plot=None, by_species: bool = False):
+        """
+        Function that calculates bal competition index (m2/ha) of a list of trees, and also the intraspecific and
+        interspecific bal if by_species is True (species 1 and 2 of the plot, and the rest).
+        It includes/rewrite the result on the corresponding tree variables.
+        :param list_of_trees: list of trees from one plot, ordered following a basal area criteria before
+        :param plot: plot data needed to check the species codes (only if by_species)
+        :param by_species: calculate also bal_intrasp and bal_intersp
+        """
+
+        if len(list_of_trees) == 0:
+            return
+
+        table = TreeTable.from_trees(list_of_trees)
+        groups = TreeCompetition.get_groups(table.column('specie', dtype=np.float64), get_float(plot.id_sp1),
+                                            get_float(plot.id_sp2)) if by_species else None
+
+        values = TreeCompetition.get_bal(table.column('basal_area', dtype=np.float64), table.column('expan', dtype=np.float64),
+                                         groups=groups)
+
+        for variable in BAL_VARS:
+            if variable in values:
+                table.set_column(variable, values[variable])
+
+
+    def set_bal_plots(plots, variable: str = 'dbh', by_species: bool = False):
+        """
+        Function that calculates bal competition index (m2/ha) of the trees of several plots at once, sorting them by
+        variable from the biggest to the smallest on each plot; see set_bal.
+        :param plots: list of Plot objects
+        :param variable: tree variable used to sort the trees of each plot (i.e. dbh, ba_ha)
+        :param by_species: calculate also bal_intrasp and bal_intersp, by the species 1 and 2 of each plot
+        """
+
+        trees = [tree for plot in plots for tree in plot.trees]
+        plot_index = np.repeat(np.arange(len(plots)), [len(plot.trees) for plot in plots])
+
+        if len(trees) == 0:
+            return
+
+        table = TreeTable.from_trees(trees)
+        order = TreeCompetition.get_order(table.column(variable, dtype=np.float64), plot_index)
+        bounds = TreeCompetition.get_segments(plot_index[order])
+
+        groups = None
+        if by_species:
+            id_sp1 = np.array([get_float(plot.id_sp1) for plot in plots], dtype=np.float64)
+            id_sp2 = np.array([get_float(plot.id_sp2) for plot in plots], dtype=np.float64)
+            groups = TreeCompetition.get_groups(table.column('specie', dtype=np.float64)[order],
+                                                id_sp1[plot_index[order]], id_sp2[plot_index[order]])
+
+        values = TreeCompetition.get_bal(table.column('basal_area', dtype=np.float64)[order],
+                                         table.column('expan', dtype=np.float64)[order], bounds, groups)
+
+        positions = np.argsort(order)  # position of each tree of the table on the sorted arrays
+        for variable in BAL_VARS:
+            if variable in values:
+                table.set_column(variable, values[variable][positions])
+
+
+    def get_reineke(species, qm_dbh, family: str = SDI_BASIC):
+        """
+        Function that calculates the Stand Density Index of n species at once, using the basic model (without climate
+        data) of Rodríguez de Prado (2022).
+        It returns reineke_max and reineke, arrays (n,) with NaN when the species has no parameters or the quadratic
+        mean diameter is not available (0 or empty).
+        :param species: array with the IFN code of the species
+        :param qm_dbh: array with the quadratic mean diameter (cm) of the species
+        :param family: coefficients of the SDI model (SDI_BASIC by default)
+        Refs.:
+            - Rodríguez de Prado, D. (2022). New insights in the modeling and simulation of tree and stand level
+            variables in Mediterranean mixed forests in the present context of climate change. Doctoral dissertation.
+        """
+
+        params, found = SpeciesRegistry.gather(family, species)  # alpha0, alpha1, beta0, beta1
+        alpha0, beta0 = params[:, 0], params[:, 2]
+
+        qm_dbh = np.asarray(qm_dbh, dtype=np.float64)
+        qm_dbh = np.where(qm_dbh != 0, qm_dbh, np.nan)  # skip ZeroDivision Error
+
+        reineke_max = np.exp(alpha0 + beta0 * math.log(SDI_REFERENCE_DBH))
+        reineke = np.exp(alpha0 + beta0 * np.log(qm_dbh))
+
+        return reineke_max, reineke
+
+
+    def set_sdi_plots(plots):
+        """
+        Function that calculates the Stand Density Index (normal and maximum) of the species 1 and 2 of several mixed
+        plots at once, and the proportion of both species based on area, according Rodríguez de Prado (2022).
+        It includes/rewrite the result on the corresponding stand variables; values not available are not written.
+        :param plots: list of Plot objects
+        """
+
+        def column(values):
+            return np.array([get_float(value) for value in values], dtype=np.float64)
+
+        reineke_max_sp1, reineke_sp1 = TreeCompetition.get_reineke(column([plot.id_sp1 for plot in plots]),
+                                                                   column([plot.qm_dbh_sp1 for plot in plots]))
+        reineke_max_sp2, reineke_sp2 = TreeCompetition.get_reineke(column([plot.id_sp2 for plot in plots]),
+                                                                   column([plot.qm_dbh_sp2 for plot in plots]))
+
+        # get species proportion based on area (Rodriguez de Prado, 2022)
+        both = np.isfinite(reineke_sp1) & np.isfinite(reineke_sp2)
+        sp1_proportion = np.where(both, reineke_sp1 / (reineke_sp1 + reineke_sp2), np.nan)
+        sp2_proportion = np.where(both, reineke_sp2 / (reineke_sp1 + reineke_sp2), np.nan)
+
+        values = zip(reineke_max_sp1.tolist(), reineke_sp1.tolist(), reineke_max_sp2.tolist(), reineke_sp2.tolist(),
+                     sp1_proportion.tolist(), sp2_proportion.tolist())
+
+        for plot, plot_values in zip(plots, values):
+            for variable, value in zip(SDI_VARS, plot_values):
+                if value == value:  # NaN values are not available
+                    plot.add_value(variable, value)
+
+
+    def get_hegyi(index, x, y, keys, dbh, species, radius, fraction=None):
+        """
+        Function that calculates the Hegyi competition index of n subject trees at once, and the bal, basal area and
+        density of the trees inside the Hegyi subplot of each one (all the fixed-radius queries are answered in bulk
+        by the spatial index of the plot).
+        The neighbours of each tree are added in the order of the trees of the index with np.bincount, so the results are
+        the same as the former tree by tree function. The subject tree (and any other tree with its tree_id) is only
+        added to the intraspecific basal area and density.
+        It returns a dictionary with an array (n,) for each variable of HEGYI_VARS, and an array (n,) with the trees
+        calculated (the ones with coordinates and radius).
+        :param index: SpatialIndex of the trees of the plot
+        :param x: array with the coord_x of the subject trees
+        :param y: array with the coord_y of the subject trees
+        :param keys: list with the tree_id of the subject trees
+        :param dbh: array with the dbh (cm) of the subject trees
+        :param species: array with the IFN code of the species of the subject trees
+        :param radius: array with the radius (m) of the Hegyi subplot of each subject tree
+        :param fraction: array with the part of the Hegyi subplot of each subject tree inside the plot (see
+            get_edge_fraction), to weight its neighbours; None if the edge of the plot is not corrected
+        Source:
+            Doc.: Hegyi F (1974). A simulation model for managing jack-pine stands simulation. RoyalColl. For, Res. Notes, 30, 74-90
+        """
+
+        n_trees = len(keys)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (n_trees,))
+        calculated = np.isfinite(x) & np.isfinite(y) & np.isfinite(radius)
+
+        # trees inside the Hegyi subplot of each tree (but itself), and trees with the same tree_id than the subject one
+        subjects, rows, distances = index.query(x, y, np.where(calculated, radius, np.nan))
+        neighbour = index.get_codes(keys)[subjects] != index.codes[rows]
+        own_subjects, own_rows = index.get_rows([key if valid else None for key, valid in zip(keys, calculated.tolist())])
+
+        subjects = np.concatenate((subjects[neighbour], own_subjects))
+        rows = np.concatenate((rows[neighbour], own_rows))
+        distances = np.concatenate((distances[neighbour], np.zeros(len(own_rows))))
+        neighbour = np.concatenate((np.ones(np.count_nonzero(neighbour), dtype=bool), np.zeros(len(own_rows), dtype=bool)))
+
+        order = np.lexsort((rows, subjects))  # the trees of each subject are added in the order of the index
+        subjects, rows, distances, neighbour = subjects[order], rows[order], distances[order], neighbour[order]
+
+        used, positions = np.unique(rows, return_inverse=True)  # the values of each tree are read only once
+        dbh_j, basal_area_j, expan_j, species_j = (index.column(variable, used)[positions]
+                                                   for variable in ('dbh', 'basal_area', 'expan', 'specie'))
+        g_j = basal_area_j * expan_j / 10000
+        hegyi_ij = np.asarray(dbh, dtype=np.float64)[subjects] / (dbh_j * (distances + 1))
+        intrasp = np.trunc(np.asarray(species, dtype=np.float64)[subjects]) == np.trunc(species_j)
+        weight = 1 if fraction is None else 1 / np.asarray(fraction, dtype=np.float64)[subjects]  # only for the neighbours
+
+        def add(values):
+            return np.bincount(subjects, weights=values, minlength=n_trees)
+
+        values = {'hegyi': add(np.where(neighbour, hegyi_ij * weight, 0)),
+                  'bal_intrasp_hegyi': add(np.where(neighbour & intrasp, g_j * weight, 0)),
+                  'bal_intersp_hegyi': add(np.where(neighbour & ~intrasp, g_j * weight, 0)),
+                  'g_intrasp_hegyi': add(np.where(neighbour & intrasp, g_j * weight, np.where(neighbour, 0, g_j))),
+                  'g_intersp_hegyi': add(np.where(neighbour & ~intrasp, g_j * weight, 0)),
+                  'n_intrasp_hegyi': add(np.where(neighbour & intrasp, expan_j * weight, np.where(neighbour, 0, expan_j))),
+                  'n_intersp_hegyi': add(np.where(neighbour & ~intrasp, expan_j * weight, 0))}
+
+        for prefix in ('bal', 'g', 'n'):
+            intrasp, intersp = values[prefix + '_intrasp_hegyi'], values[prefix + '_intersp_hegyi']
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values[prefix + '_ratio_intrasp_hegyi'] = np.where(intrasp > 0, intrasp / (intrasp + intersp), 0)
+                values[prefix + '_ratio_intersp_hegyi'] = np.where(intersp > 0, intersp / (intrasp + intersp), 0)
+            values[prefix + '_total_hegyi'] = intrasp + intersp
+
+        return {variable: values[variable] for variable in HEGYI_VARS}, calculated
+
+
+    def get_edge_fraction(x, y, radius, center_x, center_y, plot_radius):
+        """
+        Function that returns the part (0 to 1) of the Hegyi subplot of each tree that is inside a circular plot,
+        as the area of the intersection of both circles divided by the area of the subplot.
+        :param x: array with the coord_x of the trees
+        :param y: array with the coord_y of the trees
+        :param radius: array with the radius (m) of the Hegyi subplot of each tree
+        :param center_x: coord_x of the center of the plot
+        :param center_y: coord_y of the center of the plot
+        :param plot_radius: radius (m) of the plot
+        """
+
+        r = np.asarray(radius, dtype=np.float64)
+        d = np.sqrt((np.asarray(x, dtype=np.float64) - center_x) ** 2 + (np.asarray(y, dtype=np.float64) - center_y) ** 2)
+        R = plot_radius
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lens = r ** 2 * np.arccos(np.clip((d ** 2 + r ** 2 - R ** 2) / (2 * d * r), -1, 1)) + \
+                R ** 2 * np.arccos(np.clip((d ** 2 + R ** 2 - r ** 2) / (2 * d * R), -1, 1)) - \
+                0.5 * np.sqrt(np.maximum((-d + r + R) * (d + r - R) * (d - r + R) * (d + r + R), 0))
+            fraction = np.where(d + r <= R, 1, np.where(d + R <= r, R ** 2 / r ** 2, lens / (math.pi * r ** 2)))
+
+        return np.where(r > 0, np.clip(fraction, 0, 1), 1)
+
+
+    def set_hegyi(index, trees, radius, fraction=None):
+        """
+        Function that calculates the Hegyi competition index and the variables of the Hegyi subplot of a list of trees
+        (see get_hegyi). It includes/rewrite the result on the corresponding tree variables of the trees calculated.
+        :param index: SpatialIndex of the trees of the plot
+        :param trees: list of subject trees
+        :param radius: radius (m) of the Hegyi subplot, as a value or an array with the radius of each tree
+        :param fraction: part of the Hegyi subplot of each tree inside the plot, or None (see get_hegyi)
+        """
+
+        if len(trees) == 0:
+            return
+
+        table = TreeTable.from_trees(trees)
+        values, calculated = TreeCompetition.get_hegyi(index, table.column('coord_x', dtype=np.float64),
+                                                       table.column('coord_y', dtype=np.float64),
+                                                       [tree.tree_id for tree in trees], table.column('dbh', dtype=np.float64),
+                                                       table.column('specie', dtype=np.float64), radius, fraction)
+
+        columns = [values[variable].tolist() for variable in HEGYI_VARS]
+        for n in np.flatnonzero(calculated).tolist():
+            for variable, column in zip(HEGYI_VARS, columns):
+                trees[n].add_value(variable, column[n])
+
+
+class SpatialIndex:
+    """
+    KD-tree over the coordinates (coord_x, coord_y) of the trees of a plot, built once and used by all the fixed-radius
+    neighbourhood queries of the plot while its trees are the same. The index is saved with a key that is checked in
+    constant time (see get_key), so the queries of the trees one by one don't compare the whole list of trees.
+    The values of the trees (dbh, basal_area...) are read from the trees on each query, so they can change.
+    """
+
+    __indexes = weakref.WeakKeyDictionary()  # plot -> (key, index of its trees)
+    __lock = threading.Lock()  # the workers of the threaded engines can use the same plot at the same time
+
+    def __init__(self, trees: list):
+
+        table = TreeTable.from_trees(trees)
+
+        self.__trees = list(trees)
+        self.__keys = [tree.tree_id for tree in self.__trees]
+        self.__points = np.column_stack((table.column('coord_x', dtype=np.float64), table.column('coord_y', dtype=np.float64)))
+
+        self.__rows = dict()  # tree_id -> rows
+        for row, key in enumerate(self.__keys):
+            self.__rows.setdefault(key, list()).append(row)
+        self.__codes = dict(zip(self.__rows, range(len(self.__rows))))  # tree_id -> integer code, to compare them as arrays
+        self.__row_codes = np.array([self.__codes[key] for key in self.__keys], dtype=np.int64)
+
+        # trees without coordinates can not be neighbours
+        self.__indexed = np.flatnonzero(np.all(np.isfinite(self.__points), axis=1))
+        self.__kd_tree = cKDTree(self.__points[self.__indexed]) if len(self.__indexed) > 0 else None
+
+    @staticmethod
+    def get_key(plot, trees: list):
+        """
+        Function that returns the key of the trees of the plot: the number of changes of the trees of the plot (the
+        trees are replaced by clones on each step, and the dead, cut or new trees are added again), the number of trees
+        and the first and the last of them, so the same list of trees in the same order has the same key.
+        """
+
+        ends = (id(trees[0]), id(trees[-1])) if len(trees) > 0 else (None, None)
+
+        return (plot.sort_index.changes, len(trees)) + ends
+
+    @staticmethod
+    def get(plot, trees: list):
+        """
+        Function that returns the index of the plot if it was built with the same trees, or None if a new one is needed.
+        """
+
+        with SpatialIndex.__lock:
+            saved = SpatialIndex.__indexes.get(plot)
+            return saved[1] if saved is not None and saved[0] == SpatialIndex.get_key(plot, trees) else None
+
+    @staticmethod
+    def build(plot, trees: list):
+        """
+        Function that builds the index of the trees of the plot, and saves it to be used again with get.
+        """
+
+        index = SpatialIndex(trees)
+        with SpatialIndex.__lock:
+            SpatialIndex.__indexes[plot] = (SpatialIndex.get_key(plot, trees), index)
+        return index
+
+    @property
+    def trees(self):
+        return self.__trees
+
+    @property
+    def keys(self):
+        return self.__keys
+
+    @property
+    def codes(self):
+        return self.__row_codes
+
+    def get_codes(self, keys: list):
+        """
+        Function that returns the integer codes of a list of tree_id (-1 if they are not on the index).
+        """
+
+        return np.array([self.__codes.get(key, -1) for key in keys], dtype=np.int64)
+
+    def query(self, x, y, radius):
+        """
+        Function that returns the trees at a distance <= radius of each point, as three arrays of the same length:
+        subjects (number of the point), rows (number of the tree on the index) and distances, sorted by point and row.
+        The distances are calculated as the former tree by tree functions, so the trees on the border are the same.
+        :param x: array with the x coordinate of the points
+        :param y: array with the y coordinate of the points
+        :param radius: array with the radius of each point; NaN points are not searched
+        """
+
+        x, y, radius = (np.asarray(values, dtype=np.float64) for values in (x, y, radius))
+        valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y) & np.isfinite(radius) & (radius >= 0))
+
+        if self.__kd_tree is None or len(valid) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        found = self.__kd_tree.query_ball_point(np.column_stack((x[valid], y[valid])),
+                                                radius[valid] * (1 + DISTANCE_TOLERANCE), return_sorted=True)
+        lengths = np.fromiter((len(points) for points in found), dtype=np.int64, count=len(found))
+
+        subjects = np.repeat(valid, lengths)
+        rows = self.__indexed[np.concatenate(found).astype(np.int64)] if lengths.sum() > 0 else np.zeros(0, dtype=np.int64)
+
+        x_diff = x[subjects] - self.__points[rows, 0]  # distance on x axis
+        y_diff = y[subjects] - self.__points[rows, 1]  # distance on y axis
+        distances = np.sqrt((x_diff ** 2) + (y_diff ** 2))
+
+        inside = distances <= radius[subjects]
+
+        return subjects[inside], rows[inside], distances[inside]
+
+    def get_rows(self, keys: list):
+        """
+        Function that returns the trees of the index with each tree_id (None keys are not searched), as two arrays:
+        subjects (number of the key) and rows (number of the tree on the index).
+        """
+
+        subjects, rows = list(), list()
+        for subject, key in enumerate(keys):
+            if key is not None:
+                for row in self.__rows.get(key, ()):
+                    subjects.append(subject)
+                    rows.append(row)
+
+        return np.array(subjects, dtype=np.int64), np.array(rows, dtype=np.int64)
+
+    def column(self, variable: str, rows):
+        """
+        Function that returns the actual values of a variable of the trees of the index (NaN if they are empty).
+        """
+
+        return TreeTable.from_trees([self.__trees[row] for row in rows]).column(variable, dtype=np.float64)
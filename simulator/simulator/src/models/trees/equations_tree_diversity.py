@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License", Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing", software
+# distributed under the License is distributed on an "AS IS" BASIS",
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND", either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+
+from data import TreeTable
+from data.variables import PLOT_VARS
+
+import numpy as np
+
+
+DIVERSITY_VARS = ['SHANNON', 'SIMPSON', 'MARGALEF', 'PIELOU']  # diversity indexes of the plots, in the order they are written
+
+
+def get_value(value):
+    """
+    Function that returns an index as a float, with '' if it can't be calculated (NaN).
+    """
+
+    return '' if value != value else value
+
+
+class TreeDiversity:
+    """
+    Diversity indexes of the plots (Shannon, Simpson, Margalef and Pielou), calculated from the abundance (expan) of each
+    species. The abundances are counted only once for all the indexes, with np.bincount over the columns of the trees,
+    and the functions work on the trees of one plot or on the trees of several plots at once.
+    The indexes keep the values of the former functions of TreeEquations: Shannon and Simpson take the term of the last
+    species (the highest code), and Margalef and Pielou count the different abundances of the species.
+    """
+
+    def get_abundances(species, expan, plot_index=None):
+        """
+        Function that returns the abundance of each species of each plot: an array with the plot of each group of
+        trees (plot and species) and another one with the expan of the group. Species codes are compared as integers,
+        and the trees without species or expan are not counted.
+        :param species: array with the IFN code of the species of the trees
+        :param expan: array with the expansion factor of the trees
+        :param plot_index: array with the index of the plot of each tree (one plot by default)
+        """
+
+        species = np.trunc(np.asarray(species, dtype=np.float64))
+        expan = np.asarray(expan, dtype=np.float64)
+        plot_index = np.zeros(len(species), dtype=np.int64) if plot_index is None else np.asarray(plot_index, dtype=np.int64)
+
+        counted = ~np.isnan(species) & ~np.isnan(expan)
+        if not counted.any():
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        pairs, groups = np.unique(np.column_stack((plot_index[counted], species[counted])), axis=0, return_inverse=True)
+        abundance = np.bincount(groups.ravel(), weights=expan[counted], minlength=len(pairs))
+
+        return pairs[:, 0].astype(np.int64), abundance
+
+
+    def get_indexes(species, expan, plot_index=None, n_plots: int = 1):
+        """
+        Function that calculates the diversity indexes of n plots at once.
+        It returns a dictionary with an array (n_plots,) for each index of DIVERSITY_VARS, with NaN if the index can't be
+        calculated (plots without trees, Pielou with only one species...).
+        :param species: array with the IFN code of the species of the trees
+        :param expan: array with the expansion factor of the trees
+        :param plot_index: array with the index of the plot of each tree (one plot by default)
+        :param n_plots: number of plots
+        Refs.:
+            - Shannon: Omoro L.M., Pellikka P.K., & Rogers P.C. (2010). Tree species diversity, richness, and similarity
+            between exotic and indigenous forests in the cloud forests of Eastern Arc Mountains, Taita Hills, Kenya.
+            Journal of Forestry Research, 21(3), 255–264.
+            - Simpson: Edward H. Simpson (1949) Measurement of diversity. Nature 163:688
+            - Margalef: Ulanowicz R.E. (2001). Information theory in ecology. Computers & chemistry, 25(4), 393–399.
+            doi: 10.1016/s0097-8485(01)00073-0
+            - Pielou: Bray J.R., & Curtis J.T. (1957). An ordination of the upland forest communities of southern
+            Wisconsin. Ecological monographs, 27(4), 325–349.
+        """
+
+        group_plot, abundance = TreeDiversity.get_abundances(species, expan, plot_index)
+
+        total = np.bincount(group_plot, weights=abundance, minlength=n_plots)  # expan of the plot
+
+        # groups are sorted by plot and species, so the last group of each plot is the one of its highest species code
+        last = np.full(n_plots, -1, dtype=np.int64)
+        np.maximum.at(last, group_plot, np.arange(len(group_plot)))
+        has_trees = last >= 0
+        last_abundance = np.append(abundance, np.nan)[last]  # NaN for the plots without trees
+
+        # number of different abundances of the species of the plot
+        different = np.unique(np.column_stack((group_plot, abundance)), axis=0)
+        n_abundances = np.bincount(different[:, 0].astype(np.int64), minlength=n_plots)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+
+            proportion = last_abundance / total
+            shannon = np.where(proportion > 0, - proportion * np.log(proportion), 0)
+            shannon = np.where(has_trees & (total > 0), shannon, np.nan)
+
+            # values = 0 means no diversity, and 1 very diverse
+            simpson = np.where(has_trees & (total * (total - 1) != 0),
+                               1 - last_abundance * (last_abundance - 1) / (total * (total - 1)), np.nan)
+
+            # under 2 means low diversity, upper 5 high diversity
+            margalef = np.where(has_trees & (total > 0) & (total != 1), (n_abundances - 1) / np.log(total), np.nan)
+
+            # just if the number of species is > 1
+            pielou = np.where(n_abundances > 1, shannon / np.log(n_abundances), np.nan)
+
+        return {'SHANNON': shannon, 'SIMPSON': simpson, 'MARGALEF': margalef, 'PIELOU': pielou}
+
+
+    def get_plot_indexes(list_of_trees):
+        """
+        Function that calculates the diversity indexes of the trees of a plot.
+        It returns a dictionary with the value of each index of DIVERSITY_VARS, with '' if it can't be calculated.
+        :param list_of_trees: list of Tree objects
+        """
+
+        table = TreeTable.from_trees(list_of_trees)
+        values = TreeDiversity.get_indexes(table.column('specie', dtype=np.float64), table.column('expan', dtype=np.float64))
+
+        return {variable: get_value(values[variable][0].item()) for variable in DIVERSITY_VARS}
+
+
+    def set_plot_indexes(plot, list_of_trees):
+        """
+        Function that calculates the diversity indexes of a plot and assigns the ones that are in PLOT_VARS, with the
+        lowercase names used by TreeEquations.set_diversity_indexes ('shannon', 'simpson'...).
+        :param plot: Plot object
+        :param list_of_trees: list of the trees of the plot
+        """
+
+        for variable, value in TreeDiversity.get_plot_indexes(list_of_trees).items():
+            if variable in PLOT_VARS:
+                plot.add_value(variable.lower(), value)
+
+
+    def set_indexes_plots(plots):
+        """
+        Function that calculates the diversity indexes of all the plots of an inventory (or a step) at once, with one
+        count of the species of all their trees, and assigns the ones that are in PLOT_VARS as set_plot_indexes does.
+        :param plots: list of Plot objects
+        """
+
+        variables = [variable for variable in DIVERSITY_VARS if variable in PLOT_VARS]
+        if len(plots) == 0 or len(variables) == 0:
+            return
+
+        trees = [tree for plot in plots for tree in plot.trees]
+        plot_index = np.repeat(np.arange(len(plots)), [len(plot.trees) for plot in plots])
+
+        table = TreeTable.from_trees(trees)
+        values = TreeDiversity.get_indexes(table.column('specie', dtype=np.float64), table.column('expan', dtype=np.float64),
+                                           plot_index, len(plots))
+
+        columns = {variable: values[variable].tolist() for variable in variables}
+        for n, plot in enumerate(plots):
+            for variable in variables:
+                plot.add_value(variable.lower(), get_value(columns[variable][n]))
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License", Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing", software
+# distributed under the License is distributed on an "AS IS" BASIS",
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND", either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from data.context import register_global
+from models.trees.equations_tree_taper import TreeTaper
+from scipy import integrate
+from util import Tools
+
+import functools
+import logging
+import math
+import numpy as np
+
+
+SIMPSON = 'SIMPSON'  # Simpson rule over the relative heights 0, 0.001, ..., 0.999, as the models always did
+GAUSS = 'GAUSS'  # Gauss-Legendre rule over the relative heights, on the variable -log(1 - hr)
+EXACT = 'EXACT'  # closed form of the Fang taper equation, Gauss-Legendre rule for other taper equations
+
+INTEGRATION_METHODS = [SIMPSON, GAUSS, EXACT]
+
+GAUSS_POINTS = 20  # points of the Gauss-Legendre rule over the whole stem, used when the taper equation is unknown
+FANG_GAUSS_POINTS = 10  # points of the Gauss-Legendre rule on each of the 3 segments of the Fang taper equation
+SIMPSON_STEP = 0.001  # distance between the relative heights of the Simpson rule
+STEM_TOP = 1 - SIMPSON_STEP  # last relative height integrated by all the methods, the last one of the Simpson rule
+
+integration_method = SIMPSON  # method of the running simulation, selected by the engine configuration (volume_integration)
+
+
+@functools.lru_cache(maxsize=None)
+def get_gauss_rule(points: int, lower: float = 0.0, upper: float = 1.0):
+    """
+    Function that returns the nodes and the weights of the Gauss-Legendre rule with points nodes between lower and upper.
+    """
+
+    nodes, weights = np.polynomial.legendre.leggauss(points)
+
+    return lower + (nodes + 1) * (upper - lower) / 2, weights * (upper - lower) / 2
+
+
+@functools.lru_cache(maxsize=None)
+def get_log_rule(points: int, lower: float = 0.0, upper: float = STEM_TOP):
+    """
+    Function that returns the nodes (relative heights) and the weights of the Gauss-Legendre rule with points nodes
+    between lower and upper, applied on the variable t = -log(1 - hr). The squared diameter of the taper equations is
+    close to a power of (1 - hr), that is an exponential of t, so the rule is accurate even when it grows fast near the
+    top of the stem (i.e. the Fang taper equation of Fagus sylvatica, whose b3 is much greater than k).
+    """
+
+    nodes, weights = get_gauss_rule(points, -math.log1p(-lower), -math.log1p(-upper))
+
+    return -np.expm1(-nodes), weights * np.exp(-nodes)  # dhr = (1 - hr) dt
+
+
+def get_fang_rule(values, lower: float = 0.0, upper: float = STEM_TOP):
+    """
+    Function that returns the nodes and the weights of the rule of get_log_rule on each segment of the Fang taper
+    equation between lower and upper, where the equation is smooth.
+    """
+
+    p1, p2 = values[6], values[7]
+    rules = [get_log_rule(FANG_GAUSS_POINTS, min(max(lower, start), end), min(max(upper, start), end))
+             for start, end in ((0.0, p1), (p1, p2), (p2, 1.0))]
+
+    return np.concatenate([nodes for nodes, weights in rules]), np.concatenate([weights for nodes, weights in rules])
+
+
+def get_simpson_heights(lower, upper):
+    """
+    Function that returns the relative heights np.arange(lower, upper, SIMPSON_STEP) of several logs with the same
+    number of points (one row for each log), calculated as NumPy does, so the integrals are the same as one by one.
+    """
+
+    lower = np.asarray(lower, dtype=np.float64)
+    points = math.ceil((upper[0] - lower[0]) / SIMPSON_STEP)
+
+    hr = np.empty((len(lower), points))
+    hr[:, 0] = lower
+
+    if points > 1:
+        hr[:, 1] = lower + SIMPSON_STEP
+        hr[:, 2:] = lower[:, np.newaxis] + np.arange(2, points) * (hr[:, 1] - lower)[:, np.newaxis]
+
+    return hr
+
+
+class VolumeIntegration:
+    """
+    Integration of the taper equations to calculate the volume of the stems, with the method selected for the simulation:
+        - SIMPSON: Simpson rule over 1000 relative heights (0, 0.001, ..., 0.999); it is the default method
+        - GAUSS: Gauss-Legendre rule on -log(1 - hr); the segments of the Fang taper equation are integrated separately
+        - EXACT: closed form of the Fang taper equation; other taper equations are integrated as GAUSS
+    The functions integrate between the relative heights lower and upper, the whole stem by default. All the methods stop
+    on STEM_TOP, the last relative height of the Simpson rule: the squared diameter of the Fang taper equation tends to
+    infinity on the top of the stem when b3 > k, and then most of the integral until 1 would be in its last millimetres.
+    The Fang coefficients (ao, a1, a2, b1, b2, b3, p1, p2) are received by the functions, not found out from the taper.
+    """
+
+    @staticmethod
+    def set_method(method: str):
+
+        global integration_method
+
+        if method is None:
+            method = SIMPSON
+
+        if str(method).upper() not in INTEGRATION_METHODS:
+            Tools.print_log_line('Volume integration ' + str(method) + ' is not available, using ' + SIMPSON, logging.WARNING)
+            method = SIMPSON
+
+        integration_method = str(method).upper()
+
+    @staticmethod
+    def get_method() -> str:
+        return integration_method
+
+    @staticmethod
+    def is_number(d) -> bool:
+        return d is not None and np.ndim(d) == 0
+
+    @staticmethod
+    def taper_volume(taper, height, method: str = None, lower: float = 0.0, upper: float = 1.0, fang=None):
+        """
+        Function that returns the volume (dm3) of a stem of height (m) whose diameter (cm) at the relative heights hr is taper(hr).
+        fang is (dbh, values) when taper is the Fang taper equation with the coefficients values, so GAUSS and EXACT
+        methods integrate it with fang_volume; None (or values None) for other taper equations.
+        If the taper function returns a number instead of the diameters (no equation available), it returns None.
+        """
+
+        method = integration_method if method is None else method
+
+        if method == SIMPSON:
+            hr = np.arange(lower, upper, SIMPSON_STEP)  # that line establish the integrated conditions for volume calculation
+            d = taper(hr)
+            return None if VolumeIntegration.is_number(d) else math.pi * height * 10 * integrate.simps((d / 20) ** 2, hr)
+
+        upper = min(upper, STEM_TOP)
+
+        if fang is not None and fang[1] is not None:  # Fang taper equation
+            dbh, values = fang
+            return VolumeIntegration.fang_volume(dbh, height, values, method, 0.0, lower, upper)
+
+        nodes, weights = get_log_rule(GAUSS_POINTS, lower, upper)
+        d = taper(nodes)
+
+        return None if VolumeIntegration.is_number(d) else math.pi * height * 10 * np.dot((d / 20) ** 2, weights)
+
+    @staticmethod
+    def fang_volume(dbh, height, values, method: str = None, hst: float = 0.0, lower: float = 0.0, upper: float = 1.0):
+        """
+        Function that returns the volume (dm3) of the trees using the Fang taper equation with the coefficients values.
+        dbh and height can be numbers (one tree) or arrays (n trees).
+        """
+
+        method = integration_method if method is None else method
+        upper = upper if method == SIMPSON else min(upper, STEM_TOP)
+
+        if np.ndim(height) != 0:
+            height = np.asarray(height, dtype=np.float64)
+
+        if method == SIMPSON:
+            hr = np.arange(lower, upper, SIMPSON_STEP)
+            return math.pi * height * 10 * integrate.simps((TreeTaper.fang(dbh, height, hr, values, hst) / 20) ** 2, hr)
+
+        if method == GAUSS:
+            nodes, weights = get_fang_rule(values, lower, upper)
+            return math.pi * height * 10 * np.dot((TreeTaper.fang(dbh, height, nodes, values, hst) / 20) ** 2, weights)
+
+        return math.pi * height * 10 * TreeTaper.fang_integral(dbh, height, values, lower, upper, hst) / 400
+
+    @staticmethod
+    def fang_logs_volume(dbh: float, height: float, values, lower, upper, method: str = None, hst: float = 0.0):
+        """
+        Function that returns the volume (dm3) of several logs of one tree, between the relative heights lower and
+        upper of each log (arrays), using the Fang taper equation. SIMPSON gives the same values as fang_volume log by log.
+        """
+
+        method = integration_method if method is None else method
+        lower, upper = np.asarray(lower, dtype=np.float64), np.asarray(upper, dtype=np.float64)
+        upper = upper if method == SIMPSON else np.minimum(upper, STEM_TOP)
+
+        if method == SIMPSON:
+            volumes = np.empty(len(lower))
+            points = np.array([math.ceil((log_upper - log_lower) / SIMPSON_STEP) for log_lower, log_upper in zip(lower, upper)], dtype=np.int64)
+            for log_points in np.unique(points):  # logs with the same number of points are integrated together
+                logs = np.flatnonzero(points == log_points)
+                hr = get_simpson_heights(lower[logs], upper[logs])
+                volumes[logs] = math.pi * height * 10 * integrate.simps((TreeTaper.fang(dbh, height, hr, values, hst) / 20) ** 2, hr, axis=-1)
+            return volumes
+
+        if method == GAUSS:  # rule of get_fang_rule for each log
+            nodes, weights = list(), list()
+            gauss_nodes, gauss_weights = get_gauss_rule(FANG_GAUSS_POINTS, -1.0, 1.0)
+            for start, end in ((0.0, values[6]), (values[6], values[7]), (values[7], 1.0)):
+                segment_lower, segment_upper = -np.log1p(-np.clip(lower, start, end)), -np.log1p(-np.clip(upper, start, end))
+                t = segment_lower[:, np.newaxis] + (gauss_nodes + 1) * ((segment_upper - segment_lower) / 2)[:, np.newaxis]
+                nodes.append(-np.expm1(-t))
+                weights.append(gauss_weights * ((segment_upper - segment_lower) / 2)[:, np.newaxis] * np.exp(-t))
+            nodes, weights = np.concatenate(nodes, axis=1), np.concatenate(weights, axis=1)
+            return math.pi * height * 10 * ((TreeTaper.fang(dbh, height, nodes, values, hst) / 20) ** 2 * weights).sum(axis=1)
+
+        return math.pi * height * 10 * TreeTaper.fang_integral(dbh, height, values, lower, upper, hst) / 400
+
+
+register_global(__name__, 'integration_method')
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License", Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing", software
+# distributed under the License is distributed on an "AS IS" BASIS",
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND", either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from data.variables import TREE_VARS
+from models.trees.equations_tree_integration import VolumeIntegration
+from models.trees.equations_tree_taper import TreeTaper
+
+import numpy as np
+
+
+STUMP_HEIGHT = 0.20  # m, used when the tree has not stump_h value
+DMAX_STEP = 0.05  # m, distance between the heights where the diameter is compared with dmax, from the stump
+
+
+def get_lattice(start, step, columns: int):
+    """
+    Function that returns the relative heights start, start + step, start + 2 * step... of each row (one for each log
+    usage of a tree), added one by one as the former loops did, and the position of the last height of each row whose
+    next one is not over 1.
+    """
+
+    lattice = np.cumsum(np.column_stack((start, np.repeat(step[:, np.newaxis], columns - 1, axis=1))), axis=1)
+    last = np.argmax(lattice + step[:, np.newaxis] > 1, axis=1)
+
+    return lattice, last
+
+
+def get_columns(start, step) -> int:
+
+    return int(max(np.max(np.floor((1 - start) / step)), 0)) + 3  # the last column is always over 1
+
+
+def find_first(diameter, lattice, last, bounds: list, condition):
+    """
+    Function that returns, for each row of lattice, the first position k <= last where condition(d, rows) is True,
+    being d = diameter(rows, lattice[rows, k]), or last + 1 if there is not any.
+    bounds are the positions where the pieces of the stem with a monotonic taper end (the last one ends on last).
+    Each piece is bracketed by the diameters of its ends and bisected, so the taper is evaluated a few times instead of
+    on every height of the lattice.
+    """
+
+    found = last + 1
+    start = np.zeros(len(lattice), dtype=np.int64)
+
+    for end in bounds + [last]:
+
+        end = np.minimum(end, last)
+        low, high = start.copy(), end.copy()
+        rows = np.flatnonzero((found > last) & (start <= end))
+
+        if len(rows) > 0:  # the first height of the piece
+            at_low = condition(diameter(rows, lattice[rows, low[rows]]), rows)
+            found[rows[at_low]] = low[rows[at_low]]
+            rows = rows[~at_low]
+
+        if len(rows) > 0:  # the last height: if the condition is False, it is False on the whole piece
+            rows = rows[condition(diameter(rows, lattice[rows, high[rows]]), rows)]
+            low[rows] += 1
+
+        while len(rows) > 0:  # the first position is between low and high, and the condition is True on high
+
+            done = low[rows] >= high[rows]
+            found[rows[done]] = high[rows[done]]
+            rows = rows[~done]
+
+            if len(rows) > 0:
+                middle = (low[rows] + high[rows]) // 2
+                at_middle = condition(diameter(rows, lattice[rows, middle]), rows)
+                high[rows] = np.where(at_middle, middle, high[rows])
+                low[rows] = np.where(at_middle, low[rows], middle + 1)
+
+        start = np.maximum(start, end + 1)
+
+    return found
+
+
+class MerchantableVolume:
+    """
+    Merchantable volume of the wood uses (usages) of the trees.
+    The usages are described by class_conditions, a list of [wood_usage, log length / ht, dmin, dmax]: from the stump,
+    the stem is walked by DMAX_STEP until the diameter is below dmax, and then it is cut into logs of that length while the
+    diameter at the end of the log is over dmin. The volume of the logs is integrated with VolumeIntegration.
+    The heights are the same that the former loops checked one by one, but they are found by bisection on each piece of
+    the stem where the taper is monotonic (the segments of the Fang taper equation), for all the trees and usages at once.
+    """
+
+    @staticmethod
+    def get_stump(tree) -> float:
+        """
+        Function that returns the relative height of the stump of the tree.
+        """
+
+        ht = tree.height  # the total height as ht to simplify
+
+        if 'stump_h' in TREE_VARS and tree.stump_h != 0 and tree.stump_h != '':
+            return tree.stump_h / ht  # initial height = stump height
+
+        return STUMP_HEIGHT / ht
+
+    @staticmethod
+    def get_usages(class_conditions, stump: float) -> dict:
+        """
+        Function that returns a dictionary {usage: True if stump + log <= 1 (total relative height), else False}.
+        """
+
+        return {conditions[0]: conditions[1] + stump <= 1 for conditions in class_conditions}
+
+    @staticmethod
+    def calculate_batch(trees: list, class_conditions: list, tapers: list, method: str = None, values: list = None) -> list:
+        """
+        Function that calculates the merchantable volume of the usages of the trees received, so the heights of the logs
+        of all the trees of a plot are found by the same bisection.
+        Args:
+            trees: list of trees (they are not modified)
+            class_conditions: list with the class_conditions of each tree: [wood_usage, hmin/ht, dmin, dmax]
+            tapers: list with the taper function of each tree, that returns the diameter (cm) at the relative heights hr
+            method: integration method of the logs, by default the method of the simulation
+            values: list with the Fang coefficients (ao, a1, a2, b1, b2, b3, p1, p2) of each tree whose taper is the Fang
+                taper equation, so it is evaluated and integrated with TreeTaper and VolumeIntegration by segments; None
+                for the trees with other equations (or instead of the list, if no tree uses the Fang taper equation)
+        It returns a list with (usage, merch_list) for each tree: usage is a dictionary {usage: True if the log fits
+        on the tree}, and merch_list has the volume (dm3) of each usage of the dictionary, in the same order.
+        """
+
+        values = [None] * len(trees) if values is None else values
+        stumps = [MerchantableVolume.get_stump(tree) for tree in trees]
+        usages = [MerchantableVolume.get_usages(conditions, stump) for conditions, stump in zip(class_conditions, stumps)]
+
+        rows = list()  # (tree, conditions) of each usage that fits on the tree
+        for position, usage in enumerate(usages):
+            for conditions, accepted in zip(class_conditions[position], usage.values()):
+                if accepted:
+                    rows.append((position, conditions))
+
+        if len(rows) == 0:
+            return [(usage, [0] * len(usage)) for usage in usages]
+
+        fang = [None if tree_values is None else tuple(tree_values) for tree_values in values]
+        sizes = [(float(tree.dbh), float(tree.height)) for tree in trees]
+        position = np.array([row[0] for row in rows], dtype=np.int64)
+        height = np.array([sizes[row[0]][1] for row in rows])
+        length = np.array([float(row[1][1]) for row in rows])
+        dmin = np.array([float(row[1][2]) for row in rows])
+        dmax = np.array([float(row[1][3]) for row in rows])
+        in_fang = np.array([fang[row[0]] is not None for row in rows])
+        limits = np.array([fang[row[0]][6:8] if fang[row[0]] is not None else (0.0, 0.0) for row in rows])
+
+        def diameter(selected, hr):
+
+            result = np.empty(len(selected))
+
+            for k, row in enumerate(selected):  # scalar operations, as the former loops, so the heights are the same
+                tree_position = position[row]
+                if fang[tree_position] is None:
+                    result[k] = tapers[tree_position](float(hr[k]))
+                else:
+                    dbh, tree_height = sizes[tree_position]
+                    result[k] = TreeTaper.fang(dbh, tree_height, float(hr[k]), fang[tree_position])
+
+            return result
+
+        def get_bounds(lattice, last):
+
+            bounds = [last.copy(), last.copy()]
+            for k in range(2):  # p1 and p2, the ends of the first segments of the Fang taper equation
+                bounds[k][in_fang] = (lattice[in_fang] <= limits[in_fang, k, np.newaxis]).sum(axis=1) - 1
+            return bounds
+
+        # first height whose diameter is <= dmax, walking from the stump by DMAX_STEP
+        step = DMAX_STEP / height
+        start = np.array([stumps[row[0]] for row in rows])
+        lattice, last = get_lattice(start, step, get_columns(start, step))
+        first = find_first(diameter, lattice, last, get_bounds(lattice, last), lambda d, selected: d <= dmax[selected])
+        start = lattice[np.arange(len(rows)), np.minimum(first, last)]
+
+        # logs from that height, while the diameter at the end of the log is >= dmin
+        lattice, last = get_lattice(start, length, get_columns(start, length))
+        first = find_first(diameter, lattice, last, get_bounds(lattice, last), lambda d, selected: d < dmin[selected])
+        logs = np.maximum(first - 1, 0)
+
+        results = [(usage, list()) for usage in usages]
+        row = 0
+
+        for tree_position, usage in enumerate(usages):
+
+            for accepted in usage.values():
+
+                if not accepted:  # if the tree is not useful for one usage, its volume is 0
+                    results[tree_position][1].append(0)
+                    continue
+
+                upper = lattice[row, 1:logs[row] + 1]
+                lower = upper - length[row]
+
+                if len(upper) == 0:
+                    volumes = list()
+                elif fang[tree_position] is not None:
+                    dbh, tree_height = sizes[tree_position]
+                    volumes = VolumeIntegration.fang_logs_volume(dbh, tree_height, fang[tree_position], lower, upper, method)
+                else:
+                    volumes = [VolumeIntegration.taper_volume(tapers[tree_position], height[row], method, log_lower, log_upper)
+                               for log_lower, log_upper in zip(lower, upper)]
+
+                results[tree_position][1].append(sum(volumes, 0))  # the volume of the logs is added one by one
+                row += 1
+
+        return results
+
+    @staticmethod
+    def calculate(tree, class_conditions: list, taper, method: str = None, values=None):
+        """
+        Function that calculates the merchantable volume of the usages of a tree with calculate_batch.
+        Args:
+            tree: the tree object (it is not modified)
+            class_conditions: list of lists with the following structure: [wood_usage, hmin/ht, dmin, dmax]
+            taper: taper function of the tree, that returns the diameter (cm) at the relative heights hr
+            method: integration method of the logs, by default the method of the simulation
+            values: coefficients (ao, a1, a2, b1, b2, b3, p1, p2) when taper is the Fang taper equation of the tree; None
+                for other equations
+        It returns (usage, merch_list): usage is a dictionary {usage: True if the log fits on the tree}, and merch_list
+        has the volume (dm3) of each usage of the dictionary, in the same order.
+        """
+
+        return MerchantableVolume.calculate_batch([tree], [class_conditions], [taper], method, [values])[0]
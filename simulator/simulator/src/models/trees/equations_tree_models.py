@@ -24,6 +24,9 @@ from data.general import Area, Model, Warnings
 from util import Tools
 from scipy import integrate
 from models.trees import *
+from models.trees.equations_tree_species import SpeciesRegistry
+from models.trees.equations_tree_competition import TreeCompetition
+from models.trees.equations_tree_diversity import TreeDiversity
 from data.general import Area
 from data.variables import AREA_VARS, PLOT_VARS
 
@@ -70,293 +73,11 @@ class TreeEquations(metaclass=ABCMeta):
         """
         Function that returns the Spanish Forest National Inventory (SFNI, IFN) code of each species.
         Args.:
-            - species: species genus first letter in uppercase and species full word in lowercase (see examples)
-        """
-
-        if species == 'Falnus':
-            id = 3
-        elif species == 'Mcommunis':
-            id = 6
-        elif species == 'Acacia':
-            id = 7
-        elif species == 'Aaltissima':
-            id = 11
-        elif species == 'Msylvestris':
-            id = 12
-        elif species == 'Caustralis':
-            id = 13
-        elif species == 'Tbaccata':
-            id = 14
-        elif species == 'Crataegus':
-            id = 15
-        elif species == 'Pyrus':
-            id = 16
-        elif species == 'Catlantica':
-            id = 17
-        elif species == 'Clawsoniana':
-            id = 18
-        elif species == 'Psylvestris':
-            id = 21
-        elif species == 'Puncinata':
-            id = 22
-        elif species == 'Ppinea':
-            id = 23
-        elif species == 'Phalepensis':
-            id = 24
-        elif species == 'Pnigra':
-            id = 25
-        elif species == 'Ppinaster':
-            id = 26
-        elif species == 'Pcanariensis':
-            id = 27
-        elif species == 'Pradiata':
-            id = 28
-        elif species == 'Potros':
-            id = 29
-        elif species == 'MixConiferas':
-            id = 30
-        elif species == 'Aalba':
-            id = 31
-        elif species == 'Apinsapo':
-            id = 32
-        elif species == 'Pabies':
-            id = 33
-        elif species == 'Pmenziesii':
-            id = 34
-        elif species == 'Larix':
-            id = 35
-        elif species == 'Csempervirens':
-            id = 36
-        elif species == 'Jcommunis':
-            id = 37
-        elif species == 'Jthurifera':
-            id = 38
-        elif species == 'Jphoenicea':
-            id = 39
-        elif species == 'Quercus':
-            id = 40
-        elif species == 'Qrobur':
-            id = 41
-        elif species == 'Qpetraea':
-            id = 42
-        elif species == 'Qpyrenaica':
-            id = 43
-        elif species == 'Qfaginea':
-            id = 44
-        elif species == 'Qilex':
-            id = 45
-        elif species == 'Qsuber':
-            id = 46
-        elif species == 'Qcanariensis':
-            id = 47
-        elif species == 'Qrubra':
-            id = 48
-        elif species == 'Qotros':
-            id = 49
-        elif species == 'MixRibera':
-            id = 50
-        elif species == 'Palba':
-            id = 51
-        elif species == 'Ptremula':
-            id = 52
-        elif species == 'Tamarix':
-            id = 53
-        elif species == 'Aglutinosa':
-            id = 54
-        elif species == 'Fangustifolia':
-            id = 55
-        elif species == 'Uminor':
-            id = 56
-        elif species == 'Salix':
-            id = 57
-        elif species == 'Pnigra':
-            id = 58
-        elif species == 'MixEucaliptos':
-            id = 60
-        elif species == 'Eglobulus':
-            id = 61
-        elif species == 'Ecamaldulensis':
-            id = 62
-        elif species == 'Eotros':
-            id = 63
-        elif species == 'Enitens':
-            id = 64
-        elif species == 'Iaquifolium':
-            id = 65
-        elif species == 'Oeuropaea':
-            id = 66
-        elif species == 'Csiliqua':
-            id = 67
-        elif species == 'Aunedo':
-            id = 68
-        elif species == 'Phoenix':
-            id = 69
-        elif species == 'MixFrondosasGrandes':
-            id = 70
-        elif species == 'Fsylvatica':
-            id = 71
-        elif species == 'Csativa':
-            id = 72
-        elif species == 'Betula':
-            id = 73
-        elif species == 'Cavellana':
-            id = 74
-        elif species == 'Jregia':
-            id = 75
-        elif species == 'Acampestre':
-            id = 76
-        elif species == 'Tilia':
-            id = 77
-        elif species == 'Sorbus':
-            id = 78
-        elif species == 'Plhispanica':
-            id = 79
-        elif species == 'Laurisilva':
-            id = 80
-        elif species == 'Mfaya':
-            id = 81
-        elif species == 'Icanariensis':
-            id = 82
-        elif species == 'Earborea':
-            id = 83
-        elif species == 'Pindica':
-            id = 84
-        elif species == 'Smarmulano':
-            id = 85
-        elif species == 'Pexcelsa':
-            id = 86
-        elif species == 'Ophoetens':
-            id = 87
-        elif species == 'Abarbujana':
-            id = 88
-        elif species == 'MixLaurisilvas':
-            id = 89
-        elif species == 'MixFrondosasPequeñas':
-            id = 90
-        elif species == 'Bsempervirens':
-            id = 91
-        elif species == 'Rpseudacacia':
-            id = 92
-        elif species == 'Pterebinthus':
-            id = 93
-        elif species == 'Lnobilis':
-            id = 94
-        elif species == 'Prunus':
-            id = 95
-        elif species == 'Rcoriaria':
-            id = 96
-        elif species == 'Snigra':
-            id = 97
-        elif species == 'Cbetulus':
-            id = 98
-        elif species == 'Mixfrondosas':
-            id = 99
-        elif species == 'Amelanoxylon':
-            id = 207
-        elif species == 'Cmonogyna':
-            id = 215
-        elif species == 'Cdeodara':
-            id = 217
-        elif species == 'Carizonica':
-            id = 236
-        elif species == 'Joxycedrus':
-            id = 237
-        elif species == 'Jturbinata':
-            id = 238
-        elif species == 'Jsabina':
-            id = 239
-        elif species == 'Qpubescens' or species == 'Qhumilis':
-            id = 243
-        elif species == 'Qlusitanica':
-            id = 244
-        elif species == 'Tcanariensis':
-            id = 253
-        elif species == 'Fexcelsior':
-            id = 255
-        elif species == 'Uglabra':
-            id = 256
-        elif species == 'Salba':
-            id = 257
-        elif species == 'Pxcanadensis' or species == 'Pxeuroamericana':
-            id = 258
-        elif species == 'Balba':
-            id = 273
-        elif species == 'Amonspessulanum':
-            id = 276            
-        elif species == 'Saria':
-            id = 278
-        elif species == 'Pspinosa':
-            id = 295
-        elif species == 'Clibani':
-            id = 317
-        elif species == 'Clusinatica':
-            id = 336
-        elif species == 'Fornus':
-            id = 355
-        elif species == 'Upumila':
-            id = 356
-        elif species == 'Satrocinerea':
-            id = 357            
-        elif species == 'Bpendula':
-            id = 373
-        elif species == 'Anegundo':
-            id = 376
-        elif species == 'Saucuparia':
-            id = 378            
-        elif species == 'Pavium':
-            id = 395
-        elif species == 'Cmacrocarpa':
-            id = 436
-        elif species == 'Sbabylonica':
-            id = 457
-        elif species == 'Aopalus':
-            id = 476            
-        elif species == 'Sdomestica':
-            id = 478            
-        elif species == 'Plusitanica':
-            id = 495
-        elif species == 'Scantabrica':
-            id = 557
-        elif species == 'Apseudoplatanus':
-            id = 576
-        elif species == 'Storminalis':
-            id = 578            
-        elif species == 'Ppadus':
-            id = 595
-        elif species == 'Scaprea':
-            id = 657
-        elif species == 'Aplatanoides':
-            id = 676            
-        elif species == 'Slatifolia':
-            id = 678            
-        elif species == 'Selaeagnos':
-            id = 757     
-        elif species == 'Schamaemespilus':
-            id = 778            
-        elif species == 'Sfragilis':
-            id = 857
-        elif species == 'Scanariensis':
-            id = 858                               
-        elif species == 'Cedrus':
-            id = 917
-        elif species == 'Cupressus':
-            id = 936
-        elif species == 'Juniperus':
-            id = 937
-        elif species == 'Fraxinus':
-            id = 955
-        elif species == 'Ulmus':
-            id = 956
-        elif species == 'Spurpurea':
-            id = 957	    
-        elif species == 'Juglans':
-            id = 975
-        elif species == 'Acer':
-            id = 976	    
-        else:
-            id = ''
+            - species: species genus first letter in uppercase and species full word in lowercase (i.e. 'Psylvestris')
+        It returns '' if the species is unknown.
+        """
 
-        return id
+        return SpeciesRegistry.get_ifn_id(species)  # names and codes are on coefficients/ifn_species.csv
 
 
     def set_null_growth(list_of_trees):
@@ -501,12 +222,7 @@ class TreeEquations(metaclass=ABCMeta):
             - list_of_trees: is the list of trees from each plot that must be ordered following a basal area criteria before
         """
 
-        bal = 0  # bigger tree in the plot
-
-        for tree in list_of_trees:
-
-            tree.add_value('bal', bal)  # the first tree must receive 0 value (m2/ha)
-            bal += tree.basal_area*tree.expan/10000  # then, that value is accumulated
+        TreeCompetition.set_bal(list_of_trees)  # the first tree receives 0 value (m2/ha)
 
 
     def get_slenderness(tree):
@@ -622,14 +338,7 @@ class TreeEquations(metaclass=ABCMeta):
             - list_of_trees: list of the trees in the plot to obtain species and expan values
         """
 
-        if 'SHANNON' in PLOT_VARS:
-            plot.add_value('shannon', TreeEquations.get_shannon_index(plot, list_of_trees))
-        if 'SIMPSON' in PLOT_VARS:
-            plot.add_value('simpson', TreeEquations.get_simpson_index(plot, list_of_trees))
-        if 'MARGALEF' in PLOT_VARS:
-            plot.add_value('margalef', TreeEquations.get_margalef_index(plot, list_of_trees))
-        if 'PIELOU' in PLOT_VARS:
-            plot.add_value('pielou', TreeEquations.get_pielou_index(plot, list_of_trees))
+        TreeDiversity.set_plot_indexes(plot, list_of_trees)  # all the indexes with one count of the species
 
 
     def get_shannon_index(plot, list_of_trees):
@@ -644,36 +353,7 @@ class TreeEquations(metaclass=ABCMeta):
             - list_of_trees: list of the trees in the plot to obtain species and expan values
         """
 
-        # get species and expan or the plot
-        species_list = []
-        expan_list = []
-
-        for tree in list_of_trees:
-
-            species_list.append(int(tree.specie))
-            expan_list.append(tree.expan)
-
-        # create a df with species and expan data
-        df = pd.DataFrame({'species': species_list, 'expan': expan_list})
-
-        # group by species
-        df_grouped = df.groupby('species')['expan'].sum()
-
-        # calculate total expan
-        total_expan = df_grouped.sum()
-
-        # calculate species proportion
-        sp_prop = df_grouped.values/total_expan
-
-        # for each species, calculate the corresponding shannon value
-        for row in sp_prop:
-
-            shannon_row = - row * math.log(row)
-
-        # calculate shannon index for the plot
-        shannon = shannon_row.sum()
-
-        return shannon
+        return TreeDiversity.get_plot_indexes(list_of_trees)['SHANNON']
 
 
     def get_simpson_index(plot, list_of_trees):
@@ -686,36 +366,7 @@ class TreeEquations(metaclass=ABCMeta):
             - list_of_trees: list of the trees in the plot to obtain species and expan values
         """
 
-        # get species and expan or the plot
-        species_list = []
-        expan_list = []
-
-        for tree in list_of_trees:
-
-            species_list.append(int(tree.specie))
-            expan_list.append(tree.expan)
-
-        # create a df with species and expan data
-        df = pd.DataFrame({'species': species_list, 'expan': expan_list})
-
-        # group by species
-        df_grouped = df.groupby('species')['expan'].sum()
-
-        # calculate total expan
-        total_expan = df_grouped.sum()
-
-        # calculate species abundance
-        sp_abundance = df_grouped.values
-
-        # for each species, calculate the corresponding simpson value
-        for row in sp_abundance:
-
-            simpson_row = row * (row - 1)
-
-        # calculate simpson index for the plot: values = 0 means no diversity, and 1 very diverse
-        simpson = 1 - simpson_row.sum() / (total_expan * (total_expan - 1))
-
-        return simpson
+        return TreeDiversity.get_plot_indexes(list_of_trees)['SIMPSON']
 
 
     def get_margalef_index(plot, list_of_trees):
@@ -729,31 +380,7 @@ class TreeEquations(metaclass=ABCMeta):
             - list_of_trees: list of the trees in the plot to obtain species and expan values
         """
 
-        # get species and expan or the plot
-        species_list = []
-        expan_list = []
-
-        for tree in list_of_trees:
-
-            species_list.append(int(tree.specie))
-            expan_list.append(tree.expan)
-
-        # create a df with species and expan data
-        df = pd.DataFrame({'species': species_list, 'expan': expan_list})
-
-        # group by species
-        df_grouped = df.groupby('species')['expan'].sum()
-
-        # calculate total expan
-        total_expan = df_grouped.sum()
-
-        # calculate number of different species
-        n_sp = df_grouped.nunique()
-
-        # calculate margalef specific diversity index for the plot: under 2 means low diversity, upper 5 high diversity
-        margalef = (n_sp - 1) / math.log(total_expan)
-
-        return margalef
+        return TreeDiversity.get_plot_indexes(list_of_trees)['MARGALEF']
 
 
     def get_pielou_index(plot, list_of_trees):
@@ -767,41 +394,7 @@ class TreeEquations(metaclass=ABCMeta):
             - list_of_trees: list of the trees in the plot to obtain species and expan values
         """
 
-        # get species and expan or the plot
-        species_list = []
-        expan_list = []
-
-        for tree in list_of_trees:
-            species_list.append(int(tree.specie))
-            expan_list.append(tree.expan)
-
-        # create a df with species and expan data
-        df = pd.DataFrame({'species': species_list, 'expan': expan_list})
-
-        # group by species
-        df_grouped = df.groupby('species')['expan'].sum()
-
-        # calculate total expan
-        total_expan = df_grouped.sum()
-
-        # calculate species proportion and species number
-        sp_prop = df_grouped.values / total_expan
-        n_sp = df_grouped.nunique()
-
-        # for each species, calculate the corresponding shannon value
-        for row in sp_prop:
-            shannon_row = - row * math.log(row)
-
-        # calculate shannon index for the plot
-        shannon = shannon_row.sum()
-
-        # calculate pielou index using shannon, just if species number is > 1
-        if n_sp != 1:
-            pielou = shannon / math.log(n_sp)
-        else:
-            pielou = ''
-
-        return pielou
+        return TreeDiversity.get_plot_indexes(list_of_trees)['PIELOU']
 
 
     def get_shannon_and_pielou_index(plot, list_of_trees):
@@ -819,41 +412,9 @@ class TreeEquations(metaclass=ABCMeta):
             - list_of_trees: list of the trees in the plot to obtain species and expan values
         """
 
-        # get species and expan or the plot
-        species_list = []
-        expan_list = []
-
-        for tree in list_of_trees:
-            species_list.append(int(tree.specie))
-            expan_list.append(tree.expan)
-
-        # create a df with species and expan data
-        df = pd.DataFrame({'species': species_list, 'expan': expan_list})
-
-        # group by species
-        df_grouped = df.groupby('species')['expan'].sum()
-
-        # calculate total expan
-        total_expan = df_grouped.sum()
-
-        # calculate species proportion and species number
-        sp_prop = df_grouped.values / total_expan
-        n_sp = df_grouped.nunique()
-
-        # for each species, calculate the corresponding shannon value
-        for row in sp_prop:
-            shannon_row = - row * math.log(row)
-
-        # calculate shannon index for the plot
-        shannon = shannon_row.sum()
-
-        # calculate pielou index using shannon, just if species number is > 1
-        if n_sp != 1:
-            pielou = shannon / math.log(n_sp)
-        else:
-            pielou = ''
+        values = TreeDiversity.get_plot_indexes(list_of_trees)
 
-        return shannon, pielou
+        return values['SHANNON'], values['PIELOU']
 
 
     def get_deadwood_index_cesefor_g(plot, dead_trees_list):
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License", Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing", software
+# distributed under the License is distributed on an "AS IS" BASIS",
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND", either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import csv
+import os
+import threading
+import numpy as np
+
+
+COEFFICIENTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'coefficients')
+SPECIE = 'specie'  # column with the IFN code of the species on all the files
+
+IFN_SPECIES = 'ifn_species'  # name, specie: IFN code of each species name used by TreeEquations.get_ifn_id
+FANG_DOB = 'fang_dob'  # ao, a1, a2, b1, b2, b3, p1, p2: Fang taper equation, diameter over bark
+FANG_DUB = 'fang_dub'  # ao, a1, a2, b1, b2, b3, p1, p2: Fang taper equation, diameter under bark
+MERCH_CLASSES = 'merch_classes'  # usage, length (m), dmin, dmax (cm): one row for each wood usage of the species
+CARBON = 'carbon'  # c_value: carbon content of the biomass
+MIXED_BAI = 'mixed_bai'  # mixture, int, d, logd...: basal area growth of the species on each mixture (IFN code of the other species)
+MIXED_HD = 'mixed_hd'  # mixture, model, form, int, bal...: height-diameter equation of the species on each mixture
+SDI_BASIC = 'sdi_basic'  # alpha0, alpha1, beta0, beta1: Stand Density Index of the species without climate data
+SDI_CLIM = 'sdi_clim'  # alpha0, alpha1, beta0, beta1, var: Stand Density Index of the species with the climatic variable var
+
+
+def get_number(text: str):
+    """
+    Function that returns the value of a cell as the equations wrote it: int, float, or the text if it is not a number.
+    """
+
+    for number_type in (int, float):
+        try:
+            return number_type(text)
+        except ValueError:
+            pass
+
+    return text
+
+
+class SpeciesCoefficients:
+    """
+    Coefficients of a family of equations by IFN species code, loaded from coefficients/<family>.csv only once.
+    The numeric columns of the file are the coefficients; the text columns (name, reference...) are only information,
+    except for the families whose rows are read with get_rows (i.e. the usage of MERCH_CLASSES).
+    A species can have several rows: get and gather use the first one.
+    """
+
+    __families = dict()
+    __lock = threading.Lock()  # the workers of the threaded engines can load the same family at the same time
+
+    def __init__(self, family: str, rows: list):
+
+        self.__family = family
+        self.__rows = rows
+        self.__columns = [column for column in rows[0] if column != SPECIE and
+                          all(not isinstance(row[column], str) for row in rows)] if rows else list()
+
+        self.__by_specie = dict()
+        for row in rows:
+            self.__by_specie.setdefault(row[SPECIE], list()).append(row)
+
+        self.__coefficients = {specie: tuple(species_rows[0][column] for column in self.__columns)
+                               for specie, species_rows in self.__by_specie.items()}
+
+        codes = list(self.__coefficients)
+        self.__positions = np.full(max(codes, default=-1) + 1, -1, dtype=np.int64)  # IFN code -> row of values
+        self.__positions[codes] = np.arange(len(codes))
+        self.__values = np.array([self.__coefficients[specie] for specie in codes], dtype=np.float64).reshape(len(codes), len(self.__columns))
+
+    @staticmethod
+    def load(family: str, directory: str = None):
+        """
+        Function that returns the coefficients of the family, reading the file the first time.
+        """
+
+        path = os.path.join(directory if directory is not None else COEFFICIENTS_DIRECTORY, family + '.csv')
+
+        with SpeciesCoefficients.__lock:
+
+            if path not in SpeciesCoefficients.__families:
+
+                with open(path, newline='', encoding='utf-8') as coefficients_file:
+                    rows = [{column: get_number(value) for column, value in row.items()} for row in csv.DictReader(coefficients_file)]
+
+                SpeciesCoefficients.__families[path] = SpeciesCoefficients(family, rows)
+
+            return SpeciesCoefficients.__families[path]
+
+    @property
+    def family(self):
+        return self.__family
+
+    @property
+    def columns(self):
+        return self.__columns
+
+    @property
+    def rows(self):
+        return self.__rows
+
+    @property
+    def species(self):
+        return list(self.__coefficients)
+
+    def __contains__(self, specie):
+        return self.get(specie) is not None
+
+    def get(self, specie, default=None):
+        """
+        Function that returns the tuple of coefficients of the species (IFN code), or default if it is not available.
+        """
+
+        try:
+            return self.__coefficients.get(int(specie), default)
+        except (TypeError, ValueError):  # trees without species
+            return default
+
+    def get_rows(self, specie) -> list:
+        """
+        Function that returns all the rows (dictionaries column: value) of the species, or an empty list.
+        """
+
+        try:
+            return self.__by_specie.get(int(specie), list())
+        except (TypeError, ValueError):
+            return list()
+
+    def gather(self, species):
+        """
+        Function that returns the coefficients of n trees at once, indexing an array by the IFN codes of their species.
+        It returns values, an array (n, number of coefficients) with NaN on the trees whose species is not available,
+        and found, a boolean array (n,) with the trees whose species is available.
+        """
+
+        codes = np.asarray(species, dtype=np.float64).ravel()
+        valid = np.isfinite(codes) & (codes >= 0) & (codes < len(self.__positions))
+        positions = np.full(len(codes), -1, dtype=np.int64)
+        positions[valid] = self.__positions[codes[valid].astype(np.int64)]
+        found = positions >= 0
+
+        values = np.full((len(codes), len(self.__columns)), np.nan)
+        values[found] = self.__values[positions[found]]
+
+        return values, found
+
+
+class SpeciesRegistry:
+    """
+    Species information shared by the equations of all the models.
+    """
+
+    __ifn_ids = None
+
+    @staticmethod
+    def get_ifn_id(species: str):
+        """
+        Function that returns the IFN code of the species name, or '' if it is unknown.
+        """
+
+        if SpeciesRegistry.__ifn_ids is None:
+            ifn_ids = dict()
+            for row in SpeciesCoefficients.load(IFN_SPECIES).rows:
+                ifn_ids.setdefault(row['name'], row[SPECIE])
+            SpeciesRegistry.__ifn_ids = ifn_ids
+
+        return SpeciesRegistry.__ifn_ids.get(species, '')
+
+    @staticmethod
+    def get_coefficients(family: str, specie, default=None):
+        """
+        Function that returns the tuple of coefficients of the family for the species (IFN code).
+        """
+
+        return SpeciesCoefficients.load(family).get(specie, default)
+
+    @staticmethod
+    def gather(family: str, species):
+        """
+        Function that returns the coefficients of the family for a column of species codes (see SpeciesCoefficients.gather).
+        """
+
+        return SpeciesCoefficients.load(family).gather(species)
@@ -0,0 +1,535 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License", Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing", software
+# distributed under the License is distributed on an "AS IS" BASIS",
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND", either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from data import Plot
+from data import Tree
+from data.context import register_global
+from data.variables import TREE_VARS, TREE_VARS_ORIGINAL
+from models.trees import equations_tree_integration
+from util import Tools
+
+import contextlib
+import hashlib
+import inspect
+import io
+import logging
+import math
+import os
+import tempfile
+import numpy as np
+
+
+BILINEAR = 'BILINEAR'  # bilinear interpolation between the 4 nodes of the cell
+BICUBIC = 'BICUBIC'  # cubic convolution (Keys, a = -0.5) over the 16 nodes around the cell
+
+INTERPOLATION_METHODS = [BILINEAR, BICUBIC]
+
+TABLE_FUNCTIONS = ['vol', 'biomass']  # functions of the models that can be replaced by tables
+TABLE_VARS = ['vol', 'bole_vol', 'bark_vol', 'wsw', 'wsb', 'wswb', 'w_cork', 'wthickb', 'wstb', 'wb2_7', 'wb2_t', 'wthinb', 'wb05',
+              'wb05_7', 'wb0_2', 'wdb', 'wl', 'wtbl', 'wbl0_7', 'wr', 'wt']  # variables that those functions can calculate from specie, dbh and height
+
+DBH_RANGE = (2.5, 150.0)  # cm, the nodes are equally spaced on log(dbh)
+HEIGHT_RANGE = (1.5, 60.0)  # m, the nodes are equally spaced on log(height)
+GRID_POINTS = 33  # nodes of each axis on the first grid; the number of cells is doubled when the error is too big
+REFINEMENTS = 2  # times that the grid can be refined; after that, the function is calculated tree by tree
+REFINEMENT_GAIN = 4  # minimum reduction of the error when the grid is refined (BILINEAR, or functions with kinks)
+VALUE_FLOOR = 0.01  # values below VALUE_FLOOR * the largest value of the variable are checked with that absolute error
+TABLE_INPUTS = ('specie', 'dbh', 'height')  # the only variables of the tree that a tabulated function can use
+TABLE_FORMAT = 2  # version of the tables saved on disk, changed when the tables of former versions are not valid
+
+DEFAULT_MAX_ERROR = 0.001
+
+tables_configuration = None  # (interpolation, max_error, directory) of the running simulation, None if tables are not used (tree_tables)
+
+
+def get_nodes(limits: tuple, points: int):
+
+    return np.exp(np.linspace(np.log(limits[0]), np.log(limits[1]), points))
+
+
+def get_positions(values, limits: tuple, points: int):
+    """
+    Function that returns the position of the values on the axis (node 0 is 0, node 1 is 1...), NaN if they are outside.
+    """
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        positions = (np.log(np.asarray(values, dtype=np.float64)) - np.log(limits[0])) * (points - 1) / (np.log(limits[1]) - np.log(limits[0]))
+
+    positions[~((positions >= 0) & (positions <= points - 1))] = np.nan
+
+    return positions
+
+
+def get_cubic_weights(t):
+    """
+    Function that returns the weights of the nodes -1, 0, 1 and 2 of the cubic convolution kernel (a = -0.5).
+    """
+
+    t2, t3 = t * t, t * t * t
+
+    return ((-t3 + 2 * t2 - t) / 2, (3 * t3 - 5 * t2 + 2) / 2, (-3 * t3 + 4 * t2 + t) / 2, (t3 - t2) / 2)
+
+
+def add_ghost_nodes(values):
+    """
+    Function that adds a node at both sides of the last 2 axes of values, extrapolated linearly, used by BICUBIC on the borders.
+    """
+
+    values = np.concatenate((2 * values[:, :1] - values[:, 1:2], values, 2 * values[:, -1:] - values[:, -2:-1]), axis=1)
+
+    return np.concatenate((2 * values[:, :, :1] - values[:, :, 1:2], values, 2 * values[:, :, -1:] - values[:, :, -2:-1]), axis=2)
+
+
+def interpolate(values, x, y, interpolation: str, ghost_values=None):
+    """
+    Function that interpolates the table values (variables x dbh nodes x height nodes) on the positions x, y of the trees
+    (see get_positions). It returns an array variables x trees. ghost_values are the values with ghost nodes, if they
+    were calculated before.
+    """
+
+    i = np.clip(np.floor(x).astype(np.int64), 0, values.shape[1] - 2)
+    j = np.clip(np.floor(y).astype(np.int64), 0, values.shape[2] - 2)
+    t, s = x - i, y - j
+
+    if interpolation == BILINEAR:
+        return (values[:, i, j] * ((1 - t) * (1 - s)) + values[:, i + 1, j] * (t * (1 - s)) +
+                values[:, i, j + 1] * ((1 - t) * s) + values[:, i + 1, j + 1] * (t * s))
+
+    values = add_ghost_nodes(values) if ghost_values is None else ghost_values  # node k of the table is node k + 1 of values
+    result = np.zeros((values.shape[0], len(i)))
+
+    for di, wx in enumerate(get_cubic_weights(t)):
+        for dj, wy in enumerate(get_cubic_weights(s)):
+            result += values[:, i + di, j + dj] * (wx * wy)
+
+    return result
+
+
+def get_errors(values, expected, scale):
+    """
+    Function that returns the relative error of values (variables x trees) compared with the expected values.
+    scale is the largest absolute value of each variable; the error of values near 0 is relative to VALUE_FLOOR * scale.
+    """
+
+    return np.abs(values - expected) / np.maximum(np.maximum(np.abs(expected), VALUE_FLOOR * scale[:, np.newaxis]), np.finfo(np.float64).tiny)
+
+
+class ProbeTree(Tree):
+    """
+    Tree used to evaluate the models on the nodes of the tables. It saves the variables calculated by the model, and the
+    variables read by the model that are not in TABLE_INPUTS and were not calculated before by the same function.
+    """
+
+    def __init__(self, specie):
+
+        super().__init__(dict.fromkeys(TREE_VARS + TREE_VARS_ORIGINAL, 0))
+        super().add_value('specie', specie)
+        self.variables = list()
+        self.inputs = set()
+
+    def __getattribute__(self, name):
+
+        if isinstance(getattr(Tree, name, None), property):  # variables of the tree (tree.dbh, tree.expan...)
+            object.__getattribute__(self, 'read')(name)
+        return object.__getattribute__(self, name)
+
+    def read(self, var):
+
+        if var not in TABLE_INPUTS and var not in self.variables:
+            self.inputs.add(var)
+
+    def get_value(self, var, json=False):
+
+        self.read(var)
+        return super().get_value(var, json)
+
+    def get_value_original(self, var, json=False):
+
+        self.inputs.add(var)
+        return super().get_value_original(var, json)
+
+    def add_value(self, var, value):
+
+        if var not in self.variables:
+            self.variables.append(var)
+        super().add_value(var, value)
+
+    def set_size(self, dbh: float, height: float):
+
+        for var in TABLE_VARS:  # the values of a failed calculation are not taken from the previous node
+            super().add_value(var, np.nan)
+        super().add_value('dbh', dbh)
+        super().add_value('height', height)
+
+    def reset(self):
+
+        self.variables = list()
+        self.inputs = set()
+
+
+class ProbePlot:
+    """
+    Plot given to the models when the tables are calculated, which saves if the model uses any value of the plot.
+    """
+
+    def __init__(self, plot):
+
+        self.__plot = plot
+        self.used = False
+
+    def __getattr__(self, name):
+
+        self.used = True
+        return getattr(self.__plot, name)
+
+
+class SpecieTable:
+    """
+    Values of the variables calculated by a function of a model for one specie on a grid of dbh x height nodes.
+    The values are saved divided by dbh ** 2 * height, which changes slowly on the grid.
+    """
+
+    def __init__(self, variables: list, values, scale):
+
+        self.variables = list(variables)
+        self.values = values
+        self.scale = scale
+        self.ghost_values = add_ghost_nodes(values)
+        self.__nodes = np.ascontiguousarray(np.moveaxis(values, 0, -1))  # dbh nodes x height nodes x variables, for one tree
+        self.__ghost_nodes = np.ascontiguousarray(np.moveaxis(self.ghost_values, 0, -1))
+        self.__steps = ((self.dbh_points - 1) / (math.log(DBH_RANGE[1]) - math.log(DBH_RANGE[0])),
+                        (self.height_points - 1) / (math.log(HEIGHT_RANGE[1]) - math.log(HEIGHT_RANGE[0])))
+
+    @property
+    def dbh_points(self):
+        return self.values.shape[1]
+
+    @property
+    def height_points(self):
+        return self.values.shape[2]
+
+    def get_positions(self, dbh, height):
+
+        return get_positions(dbh, DBH_RANGE, self.dbh_points), get_positions(height, HEIGHT_RANGE, self.height_points)
+
+    def evaluate(self, dbh, height, interpolation: str):
+        """
+        Function that returns the values (variables x trees) of the trees, NaN for the trees outside the grid.
+        """
+
+        dbh, height = np.atleast_1d(np.asarray(dbh, dtype=np.float64)), np.atleast_1d(np.asarray(height, dtype=np.float64))
+        x, y = self.get_positions(dbh, height)
+        inside = ~(np.isnan(x) | np.isnan(y))
+
+        result = np.full((len(self.variables), len(dbh)), np.nan)
+        result[:, inside] = interpolate(self.values, x[inside], y[inside], interpolation, self.ghost_values) * (dbh[inside] ** 2 * height[inside])
+
+        return result
+
+    def evaluate_tree(self, dbh: float, height: float, interpolation: str):
+        """
+        Function that returns the values of the variables for one tree, as evaluate, or None if it is outside the grid.
+        """
+
+        if not (DBH_RANGE[0] <= dbh <= DBH_RANGE[1] and HEIGHT_RANGE[0] <= height <= HEIGHT_RANGE[1]):
+            return None
+
+        x = (math.log(dbh) - math.log(DBH_RANGE[0])) * self.__steps[0]
+        y = (math.log(height) - math.log(HEIGHT_RANGE[0])) * self.__steps[1]
+        i, j = min(int(x), self.dbh_points - 2), min(int(y), self.height_points - 2)
+        t, s = x - i, y - j
+
+        if interpolation == BILINEAR:
+            nodes = self.__nodes
+            values = (nodes[i, j] * ((1 - t) * (1 - s)) + nodes[i + 1, j] * (t * (1 - s)) +
+                      nodes[i, j + 1] * ((1 - t) * s) + nodes[i + 1, j + 1] * (t * s))
+        else:
+            weights = np.outer(get_cubic_weights(t), get_cubic_weights(s)).ravel()
+            values = weights @ self.__ghost_nodes[i:i + 4, j:j + 4].reshape(16, -1)
+
+        return values * (dbh ** 2 * height)
+
+
+class TabulatedFunction:
+    """
+    Function of a model (vol, biomass) replaced by the tables of TreeTables; it is saved on the model instance.
+    """
+
+    def __init__(self, tables, name: str):
+
+        self.tables = tables
+        self.name = name
+
+    def __call__(self, *args):
+        return self.tables.apply(self.name, args)
+
+
+class TreeTables:
+    """
+    Optional tables of the volume and biomass variables of a tree model, which depend only on specie, dbh and height for
+    most models. They are enabled by the engine configuration (tree_tables, see configure).
+    The first time that vol or biomass is used for a specie, the function is evaluated on a grid of dbh x height nodes
+    (DBH_RANGE, HEIGHT_RANGE) and the values of the trees are interpolated on it (BILINEAR or BICUBIC). The grid is refined
+    until the error on the centers of the cells is below max_error, and it is saved on the directory of the tables, with
+    the hash of the model file on its name, so the next simulations don't calculate it again.
+    The function is calculated tree by tree for the trees outside the grid, and for the functions that calculate other
+    variables (not in TABLE_VARS) or that read anything but TABLE_INPUTS: any other variable of the tree (the cork or the
+    number of trees of existencias_v01) or of the plot (the species of the mixed models), found while the table is calculated.
+    """
+
+    def __init__(self, model, configuration: tuple):
+
+        self.__model = model
+        self.__interpolation, self.__max_error, self.__directory = configuration
+        self.__tables = dict()  # (function, specie) -> SpecieTable, or None if the function is calculated tree by tree
+
+    @staticmethod
+    def configure(enabled: bool, interpolation: str = BICUBIC, max_error: float = DEFAULT_MAX_ERROR, directory: str = None):
+
+        global tables_configuration
+
+        if not enabled:
+            tables_configuration = None
+            return
+
+        if str(interpolation).upper() not in INTERPOLATION_METHODS:
+            Tools.print_log_line('Tree tables interpolation ' + str(interpolation) + ' is not available, using ' + BICUBIC, logging.WARNING)
+            interpolation = BICUBIC
+
+        if directory is None:
+            directory = os.path.join(tempfile.gettempdir(), 'simanfor_tables')
+
+        tables_configuration = (str(interpolation).upper(), float(max_error), directory)
+
+    @staticmethod
+    def get_configuration():
+        return tables_configuration
+
+    @staticmethod
+    def attach(model):
+        """
+        Function used when a tree model is created, which replaces its table functions if the tables are enabled.
+        """
+
+        if tables_configuration is None:
+            return
+
+        tables = TreeTables(model, tables_configuration)
+
+        for name in TABLE_FUNCTIONS:
+            if callable(getattr(type(model), name, None)):
+                setattr(model, name, TabulatedFunction(tables, name))
+
+    @property
+    def interpolation(self):
+        return self.__interpolation
+
+    @property
+    def max_error(self):
+        return self.__max_error
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    def calculate(self, name: str, args):
+        """
+        Function that runs the function of the model, without tables.
+        """
+
+        return getattr(type(self.__model), name)(self.__model, *args)
+
+    def get_table(self, name: str, specie):
+
+        return self.__tables.get((name, specie))
+
+    def evaluate(self, name: str, specie, dbh, height):
+        """
+        Function that returns a dictionary {variable: values} with the values of the trees interpolated on the table of
+        the function and the specie (NaN outside the grid), or None if there is not a table for them.
+        """
+
+        table = self.__tables.get((name, specie))
+
+        if table is None:
+            return None
+
+        return dict(zip(table.variables, table.evaluate(dbh, height, self.__interpolation)))
+
+    def apply(self, name: str, args):
+        """
+        Function that sets the values of the tree received on args by using the table; other arguments (plot) are
+        used only to calculate the table.
+        """
+
+        positions = [position for position, arg in enumerate(args) if isinstance(arg, Tree)]
+
+        if len(positions) != 1:
+            return self.calculate(name, args)
+
+        tree = args[positions[0]]
+        key = (name, tree.specie)
+
+        if key not in self.__tables:
+            self.__tables[key] = self.load_table(name, tree.specie, args, positions[0])
+
+        table = self.__tables[key]
+
+        if table is None:
+            return self.calculate(name, args)
+
+        try:
+            values = table.evaluate_tree(float(tree.dbh), float(tree.height), self.__interpolation)
+        except (TypeError, ValueError):  # dbh or height without value
+            values = None
+
+        if values is None:  # outside the grid
+            return self.calculate(name, args)
+
+        for var, value in zip(table.variables, values):
+            tree.add_value(var, value)
+
+        return None
+
+    def get_file(self, name: str, specie) -> str:
+        """
+        Function that returns the file of the table, whose name changes when the model file or the grid change.
+        """
+
+        model_class = type(self.__model)
+        key = hashlib.sha256()
+
+        with open(inspect.getsourcefile(model_class), 'rb') as model_file:
+            key.update(model_file.read())
+
+        key.update(repr((TABLE_FORMAT, model_class.__name__, name, str(specie), DBH_RANGE, HEIGHT_RANGE, GRID_POINTS, REFINEMENTS, VALUE_FLOOR,
+                         self.__interpolation, self.__max_error, equations_tree_integration.integration_method)).encode())
+
+        return os.path.join(self.__directory, model_class.__name__ + '_' + name + '_' + key.hexdigest()[:24] + '.npz')
+
+    def load_table(self, name: str, specie, args, tree_position: int):
+        """
+        Function that returns the table of the function and the specie saved on disk, or calculates it.
+        """
+
+        file = self.get_file(name, specie)
+
+        if os.path.exists(file):
+            try:
+                with np.load(file) as data:
+                    if len(data['variables']) == 0:
+                        return None
+                    return SpecieTable([str(var) for var in data['variables']], data['values'], data['scale'])
+            except Exception as e:
+                Tools.print_log_line(str(e) + ' when it tried to load the table ' + file, logging.WARNING)
+
+        table = self.build_table(name, specie, args, tree_position)
+
+        try:
+            os.makedirs(self.__directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.__directory, suffix='.npz', delete=False) as temporary:
+                if table is None:
+                    np.savez(temporary, variables=np.array([], dtype=str), values=np.zeros(0), scale=np.zeros(0))
+                else:
+                    np.savez(temporary, variables=np.array(table.variables), values=table.values, scale=table.scale)
+            os.replace(temporary.name, file)  # other processes can be reading the same table
+        except OSError as e:
+            Tools.print_log_line(str(e) + ' when it tried to save the table ' + file, logging.WARNING)
+
+        return table
+
+    def calculate_values(self, name: str, specie, dbh, height, args, tree_position: int):
+        """
+        Function that runs the function of the model with trees of the dbh and height received.
+        It returns the variables calculated and their values divided by dbh ** 2 * height (variables x trees),
+        or None if the function can't be tabulated.
+        """
+
+        probe = ProbeTree(specie)
+        args = [ProbePlot(arg) if isinstance(arg, Plot) else arg for arg in args]
+        args[tree_position] = probe
+        plots = [arg for arg in args if isinstance(arg, ProbePlot)]
+        values = list()
+
+        with contextlib.redirect_stdout(io.StringIO()), np.errstate(all='ignore'):  # errors of the models on the nodes are not shown
+            for tree_dbh, tree_height in zip(dbh, height):
+                probe.set_size(tree_dbh, tree_height)
+                probe.reset()
+                self.calculate(name, args)
+                if len(probe.inputs) > 0 or any(plot.used for plot in plots):  # the values depend on other variables
+                    Tools.print_log_line('Model ' + type(self.__model).__name__ + ' uses other variables on ' + name + ' (' +
+                                         ', '.join(sorted(probe.inputs) + ['plot' for plot in plots if plot.used]) + ')', logging.INFO)
+                    return None
+                values.append([Tree.get_value(probe, var) for var in probe.variables])
+
+        variables = probe.variables
+
+        if len(variables) == 0 or any(var not in TABLE_VARS for var in variables):
+            return None
+
+        try:
+            values = np.array(values, dtype=np.float64).T / (dbh ** 2 * height)
+        except (TypeError, ValueError):  # the function has not calculated the same variables on each tree
+            return None
+
+        if not np.isfinite(values).all():
+            return None
+
+        return variables, values
+
+    def build_table(self, name: str, specie, args, tree_position: int):
+
+        model_name = type(self.__model).__name__
+        points = GRID_POINTS
+
+        for refinement in range(REFINEMENTS + 1):
+
+            dbh, height = np.meshgrid(get_nodes(DBH_RANGE, points), get_nodes(HEIGHT_RANGE, points), indexing='ij')
+            nodes = self.calculate_values(name, specie, dbh.ravel(), height.ravel(), args, tree_position)
+
+            if nodes is None:
+                Tools.print_log_line('Model ' + model_name + ' can not use tables on ' + name + ' for specie ' + str(specie), logging.INFO)
+                return None
+
+            variables, values = nodes
+            table = SpecieTable(variables, values.reshape(len(variables), points, points), np.abs(values).max(axis=1))
+
+            centers = np.exp((np.log(dbh[:-1, :-1]) + np.log(dbh[1:, 1:])) / 2).ravel(), np.exp((np.log(height[:-1, :-1]) + np.log(height[1:, 1:])) / 2).ravel()
+            expected = self.calculate_values(name, specie, centers[0], centers[1], args, tree_position)
+
+            if expected is None or expected[0] != variables:
+                return None
+
+            x, y = table.get_positions(*centers)
+            errors = get_errors(interpolate(table.values, x, y, self.__interpolation), expected[1], table.scale)
+
+            if (errors <= self.__max_error).all():
+                Tools.print_log_line('Table of ' + name + ' for model ' + model_name + ' and specie ' + str(specie) +
+                                     ': ' + str(points) + 'x' + str(points) + ' nodes', logging.INFO)
+                return table
+
+            if errors.max() > self.__max_error * REFINEMENT_GAIN ** (REFINEMENTS - refinement):  # the finest grid would not be enough
+                break
+
+            points = 2 * points - 1
+
+        Tools.print_log_line('Model ' + model_name + ' needs a finer grid on ' + name + ' for specie ' + str(specie) +
+                             ', it is calculated tree by tree', logging.INFO)
+        return None
+
+
+register_global(__name__, 'tables_configuration')
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License", Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing", software
+# distributed under the License is distributed on an "AS IS" BASIS",
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND", either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import math
+import numpy as np
+
+
+FANG_K = math.pi / 40000  # constant of the Fang taper equation
+
+
+class TreeTaper:
+    """
+    Taper equations shared by the tree models, evaluated with NumPy for many trees and many relative heights at once.
+    All the trees of a call use the same coefficients, so the models group their trees by species before calling them.
+    """
+
+    @staticmethod
+    def fang(dbh, height, hr, values, hst: float = 0.0):
+        """
+        Fang taper equation. It returns the diameter (cm) at the relative heights hr (0-1).
+        Args:
+            dbh, height: values of one tree (numbers) or of n trees (arrays)
+            hr: one relative height (number) or m relative heights (array)
+            values: Fang coefficients (ao, a1, a2, b1, b2, b3, p1, p2)
+            hst: stump height (m) --> 0.2 on merchantable function
+        The result has the shape of the inputs:
+            - one tree and one relative height: number, calculated with the same scalar operations as the former loops
+            - one tree and m relative heights: array (m,)
+            - n trees and one relative height: array (n,)
+            - n trees and m relative heights: array (n, m), one row for each tree
+        """
+
+        ao, a1, a2, b1, b2, b3, p1, p2 = values
+
+        single_tree = np.ndim(dbh) == 0 and np.ndim(height) == 0
+        single_hr = np.ndim(hr) == 0
+
+        if not single_tree:
+            dbh = np.asarray(dbh, dtype=np.float64)
+            height = np.asarray(height, dtype=np.float64)
+
+        if not single_hr:
+            hr = np.asarray(hr, dtype=np.float64)
+
+        k = FANG_K
+        ht = height
+        h = ht - hst  # height from stump to comercial diameter (m)
+        alpha1 = (1 - p1) ** (((b2 - b1) * k) / (b1 * b2))
+        alpha2 = (1 - p2) ** (((b3 - b2) * k) / (b2 * b3))
+
+        if single_hr:  # indicators of the segment of the stem where hr is, as integers to be used as exponents
+            I1 = int(p1 <= hr and hr <= p2)
+            I2 = int(p2 <= hr and hr <= 1)
+        else:
+            I1 = ((p1 <= hr) & (hr <= p2)).astype(np.int64)
+            I2 = ((p2 <= hr) & (hr <= 1)).astype(np.int64)
+
+        beta = (b1 ** (1 - (I1 + I2))) * (b2 ** I1) * (b3 ** I2)
+        ro = (1 - hst / ht) ** (k / b1)
+        r1 = (1 - p1) ** (k / b1)
+        r2 = (1 - p2) ** (k / b2)
+        sqrt = math.sqrt if single_tree else np.sqrt
+        c1 = sqrt((ao * (dbh ** a1) * (h ** (a2 - (k / b1))) / (b1 * (ro - r1) + b2 * (r1 - alpha1 * r2) + b3 * alpha1 * r2)))
+
+        if not single_tree and not single_hr:  # one row for each tree and one column for each relative height
+            ht = ht[:, np.newaxis]
+            c1 = c1[:, np.newaxis]
+
+        sqrt = math.sqrt if single_tree and single_hr else np.sqrt
+        return c1 * sqrt(ht ** ((k - b1) / b1) * (1 - hr) ** ((k - beta) / beta) * alpha1 ** (I1 + I2) * alpha2 ** I2)
+
+    @staticmethod
+    def fang_integral(dbh, height, values, lower=0.0, upper=1.0, hst: float = 0.0):
+        """
+        Integral of the squared Fang diameter (cm2) between the relative heights lower and upper, using the closed form
+        of each segment of the stem: the integral of (1 - hr) ** ((k - beta) / beta) is beta / k * (1 - hr) ** (k / beta).
+        dbh and height can be numbers or arrays of n trees, as the bounds; the result is a number or an array (n,).
+        From 0 to 1 and hst = 0 it is ao * dbh ** a1 * height ** (a2 - 1) / k, the volume equation of Fang model.
+        """
+
+        ao, a1, a2, b1, b2, b3, p1, p2 = values
+
+        if np.ndim(dbh) != 0 or np.ndim(height) != 0:
+            dbh = np.asarray(dbh, dtype=np.float64)
+            height = np.asarray(height, dtype=np.float64)
+
+        k = FANG_K
+        ht = height
+        h = ht - hst  # height from stump to comercial diameter (m)
+        alpha1 = (1 - p1) ** (((b2 - b1) * k) / (b1 * b2))
+        alpha2 = (1 - p2) ** (((b3 - b2) * k) / (b2 * b3))
+        ro = (1 - hst / ht) ** (k / b1)
+        r1 = (1 - p1) ** (k / b1)
+        r2 = (1 - p2) ** (k / b2)
+        c1 = (ao * (dbh ** a1) * (h ** (a2 - (k / b1))) / (b1 * (ro - r1) + b2 * (r1 - alpha1 * r2) + b3 * alpha1 * r2))  # c1 ** 2
+
+        integral = 0
+        for start, end, beta, alpha in ((0, p1, b1, 1), (p1, p2, b2, alpha1), (p2, 1, b3, alpha1 * alpha2)):
+            segment_lower = np.clip(lower, start, end)
+            segment_upper = np.clip(upper, start, end)
+            integral = integral + alpha * beta / k * ((1 - segment_lower) ** (k / beta) - (1 - segment_upper) ** (k / beta))
+
+        return c1 * ht ** ((k - b1) / b1) * integral
@@ -29,6 +29,8 @@ from data.variables import TREE_VARS, PLOT_VARS, AREA_VARS, MODEL_VARS, WARNING_
 from data.variables import Variables
 
 from models.trees.equations_tree_models import TreeEquations
+from models.trees.equations_tree_diversity import TreeDiversity
+from models.trees.equations_tree_integration import VolumeIntegration
 
 import math
 import sys
@@ -134,8 +136,6 @@ class Existencias(TreeModel):
                 else:
                     tree.add_value('vol_ha', tree.vol*tree.expan/1000)  # volume over bark per ha (m3/ha)
 
-                self.merchantable(tree)  # activate wood uses variables
-
                 self.biomass(tree)  # activate biomass variables
                 
                 #else:
@@ -150,6 +150,8 @@ class Existencias(TreeModel):
             #        Warnings.specie_error_trees = 1
 
     
+            self.merchantable_trees(plot_trees)  # activate wood uses variables, over all the trees
+
             self.vol_plot(plot, plot_trees)  # activate volume variables (plot)
 
             #self.canopy(plot, plot_trees)  # activate crown variables (plot)
@@ -158,11 +160,9 @@ class Existencias(TreeModel):
 
             self.biomass_plot(plot, plot_trees)  # activate biomass (plot) variables  
 
-            # get diversity indexes
-            plot.add_value('SHANNON', TreeEquations.get_shannon_index(plot, plot_trees))
-            plot.add_value('SIMPSON', TreeEquations.get_simpson_index(plot, plot_trees))
-            plot.add_value('MARGALEF', TreeEquations.get_margalef_index(plot, plot_trees))
-            plot.add_value('PIELOU', TreeEquations.get_pielou_index(plot, plot_trees))
+            # get diversity indexes, all of them with one count of the species of the plot
+            for variable, value in TreeDiversity.get_plot_indexes(plot_trees).items():
+                plot.add_value(variable, value)
 
             Warnings.specie_error_trees = Warnings.specie_error = 0  # no red color on the tree sheet
 
@@ -307,10 +307,11 @@ class Existencias(TreeModel):
 
                     self.crown(tree, plot, 'update_model')  # activate crown variables
                     
-                    self.merchantable(tree)  # activate wood uses variables
-
                     self.biomass(tree)  # activate biomass variables
 
+            # activate wood uses variables, over all the trees of the species condition
+            self.merchantable_trees([tree for tree in plot_trees if tree.specie == Model.specie_ifn_id])
+
             #---------------------------------PLOT_FUNCTIONS---------------------------------------#
 
             self.vol_plot(plot, plot_trees)  # activate volume variables (plot)
@@ -325,212 +326,221 @@ class Existencias(TreeModel):
             self.catch_model_exception()
 
 
-    def taper_over_bark_Fang(self, tree: Tree, hr: float):
+    def fang_over_bark(self, tree: Tree, plot: Plot = None):
         """
-        Taper equation over bark function using the Fang model.
-        A function that returns the taper equation to calculate the diameter (cm, over bark) at different heights.
-        ¡IMPORTANT! It is not used math.exp because of calculation error, we use the number "e" instead, wrote by manually.
-        Sources:
-            Doc.: Bravo, F., Álvarez González, J. G., Rio, M. D., Barrio, M., Bonet Lledos, J. A., Bravo Oviedo, A., ... & Diéguez Aranda, U. (2011). Growth and yield models in Spain: historical overview, contemporary examples and perspectives. Forest Systems, 2011, vol. 20, núm. 2, p. 315-328.
-            Ref.: Bravo et al., 2011
-            Doc.: Diéguez-Aranda, U., Alboreca, A. R., Castedo-Dorado, F., González, J. Á., Barrio-Anta, M., Crecente-Campo, F., ... & Balboa-Murias, M. A. (2009). Herramientas selvícolas para la gestión forestal sostenible en Galicia. Forestry, 82, 1-16.
-            Ref.: Diéguez-Aranda et al., 2009
-            Doc.: López-Sánchez C A (2009). Estado selvícola y modelos de crecimiento y gestión de plantaciones de Pseudotsuga menziesii (Mirb.) Franco en España (Doctoral dissertation, Doctoral thesis. Universidad de Santiago de Compostela, Lugo.
-            Ref.: López-Sánchez, 2009
-            Doc.: Rodríguez, F., & Torre, I. L. (2015). Comparison of stem taper equations for eight major tree species in the Spanish Plateau. Forest systems, 24(3), 2.
-            Ref.: Rodriguez & Torre, 2015
+        Coefficients of the Fang taper equation over bark function.
+        A function that returns the coefficients (ao, a1, a2, b1, b2, b3, p1, p2) of the Fang taper equation of the species
+        of the tree, used by taper_over_bark_Fang, or False if no equation is available. Sources: see taper_over_bark_Fang.
         """
 
-        try:  # errors inside that construction will be announced
+        # values = (ao, a1, a2, b1, b2, b3, p1, p2) values to Fang model over bark
+        values = list  # it will be changed to boolean if no equations are available
 
-            # values = (ao, a1, a2, b1, b2, b3, p1, p2) values to Fang model over bark
-            values = list  # it will be changed to boolean if no equations are available
+        
+        ########################################################################################
 
-            
-            ########################################################################################
 
+        # if tree.specie == 3:  # Frangula alnus
 
-            # if tree.specie == 3:  # Frangula alnus
+        # elif tree.specie == 11:  # Ailanthus altissima
 
-            # elif tree.specie == 11:  # Ailanthus altissima
+        # elif tree.specie == 12:  # Malus sylvestris
 
-            # elif tree.specie == 12:  # Malus sylvestris
+        # elif tree.specie == 13:  # Celtis australis
 
-            # elif tree.specie == 13:  # Celtis australis
+        # elif tree.specie == 14:  # Taxus baccata
 
-            # elif tree.specie == 14:  # Taxus baccata
+        # elif tree.specie == 15:  # Crataegus spp.
 
-            # elif tree.specie == 15:  # Crataegus spp.
+        # elif tree.specie == 16:  # Pyrus spp.
 
-            # elif tree.specie == 16:  # Pyrus spp.
+        # elif tree.specie in (17, 217, 317, 917):  # Cedrus spp. - Cedrus atlantica, C. deodara, C. libani, C. spp.
 
-            # elif tree.specie in (17, 217, 317, 917):  # Cedrus spp. - Cedrus atlantica, C. deodara, C. libani, C. spp.
+        if tree.specie == 21:  # Pinus sylvestris
 
-            if tree.specie == 21:  # Pinus sylvestris
+            values = (0.000051, 1.845867, 1.045022, 0.000011, 0.000038, 0.000030, 0, 0)
+            # Rodriguez & Torre, 2015
 
-                values = (0.000051, 1.845867, 1.045022, 0.000011, 0.000038, 0.000030, 0, 0)
-                # Rodriguez & Torre, 2015
+            # values = (6.421e-5, 1.817, 1.001, 1.357e-5, 3.059e-5, 2.699e-5, 0.08199, 0.6237)
+            # Diéguez-Aranda et al., 2009                
 
-                # values = (6.421e-5, 1.817, 1.001, 1.357e-5, 3.059e-5, 2.699e-5, 0.08199, 0.6237)
-                # Diéguez-Aranda et al., 2009                
+        # elif tree.specie == 22:  # Pinus uncinata
 
-            # elif tree.specie == 22:  # Pinus uncinata
+        elif tree.specie == 23:  # Pinus pinea
+        
+            values = (0.000067, 1.698754, 1.210604, 0.000006, 0.000033, 0.000026, 0.021072, 0.475953)
+            # Rodriguez & Torre, 2015
 
-            elif tree.specie == 23:  # Pinus pinea
+        # elif tree.specie == 24:  # Pinus halepensis
+
+        elif tree.specie == 25:  # Pinus nigra
+
+            values = (0.000049, 1.982808, 0.905147, 0.000014, 0.000036, 0.000029, 0.091275, 0.781990)
+            # Rodriguez & Torre, 2015
+
+        elif tree.specie == 26:  # Pinus pinaster
             
-                values = (0.000067, 1.698754, 1.210604, 0.000006, 0.000033, 0.000026, 0.021072, 0.475953)
-                # Rodriguez & Torre, 2015
+            values = (0.000048, 1.929098, 0.976356, 0.000010, 0.000035, 0.000033, 0.064157, 0.681476)
+            # Rodriguez & Torre, 2015
 
-            # elif tree.specie == 24:  # Pinus halepensis
+            # values = (3.974e-5, 1.876, 1.079, 1.003e-5, 3.695e-5, 2.910e-5, 0.1013, 0.7233)
+            # Diéguez-Aranda et al., 2009
 
-            elif tree.specie == 25:  # Pinus nigra
+        # elif tree.specie == 27:  # Pinus canariensis
 
-                values = (0.000049, 1.982808, 0.905147, 0.000014, 0.000036, 0.000029, 0.091275, 0.781990)
-                # Rodriguez & Torre, 2015
+            # Bravo et al., 2011
 
-            elif tree.specie == 26:  # Pinus pinaster
-                
-                values = (0.000048, 1.929098, 0.976356, 0.000010, 0.000035, 0.000033, 0.064157, 0.681476)
-                # Rodriguez & Torre, 2015
+        elif tree.specie == 28:  # Pinus radiata
 
-                # values = (3.974e-5, 1.876, 1.079, 1.003e-5, 3.695e-5, 2.910e-5, 0.1013, 0.7233)
-                # Diéguez-Aranda et al., 2009
+            #values = (0.000058, 1.829097, 1.007844, 0.000009, 0.000033, 0.000030, 0, 0)
+            # CESEFOR
 
-            # elif tree.specie == 27:  # Pinus canariensis
+            values = (4.851e-5, 1.883, 1.004, 8.702e-6, 3.302e-5, 2.899e-5, 0.06526, 0.6560)
+            # Diéguez-Aranda et al., 2009                
 
-                # Bravo et al., 2011
+        # elif tree.specie == 31:  # Abies alba
 
-            elif tree.specie == 28:  # Pinus radiata
+        # elif tree.specie == 32:  # Abies pinsapo
 
-                #values = (0.000058, 1.829097, 1.007844, 0.000009, 0.000033, 0.000030, 0, 0)
-                # CESEFOR
+        # elif tree.specie == 33:  # Picea abies
 
-                values = (4.851e-5, 1.883, 1.004, 8.702e-6, 3.302e-5, 2.899e-5, 0.06526, 0.6560)
-                # Diéguez-Aranda et al., 2009                
+        elif tree.specie == 34:  # Pseudotsuga menziesii
 
-            # elif tree.specie == 31:  # Abies alba
+            values = (8.560e-5, 1.771, 0.9510, 9.340e-6, 3.169e-5, 2.786e-5, 0.07362, 0.5397)
+            # Diéguez-Aranda et al., 2009                   
 
-            # elif tree.specie == 32:  # Abies pinsapo
+            values = (0.00008564, 1.775, 0.9510, 0.000009340, 0.00003169, 0.00002786, 0.07362, 0.5397)
+            # López-Sánchez, 2009
 
-            # elif tree.specie == 33:  # Picea abies
+        # elif tree.specie in (36, 236, 336, 436, 936):  # Cupressus spp. - C. sempervirens, C. arizonica, C. lusitanica, C. macrocarpa, C. spp.
+        
+        # elif tree.specie == 37:  # Juniperus communis          
+                                
+        elif tree.specie == 38:  # Juniperus thurifera
 
-            elif tree.specie == 34:  # Pseudotsuga menziesii
+            values = (0.000074, 1.86289, 0.901233, 0.000001, 0.000028, 0.000037, 0.008578, 0.711639)
+            # Rodriguez & Torre, 2015
 
-                values = (8.560e-5, 1.771, 0.9510, 9.340e-6, 3.169e-5, 2.786e-5, 0.07362, 0.5397)
-                # Diéguez-Aranda et al., 2009                   
+        # elif tree.specie == 39:  # Juniperus phoenica
 
-                values = (0.00008564, 1.775, 0.9510, 0.000009340, 0.00003169, 0.00002786, 0.07362, 0.5397)
-                # López-Sánchez, 2009
+        elif tree.specie == 41:  # Quercus robur
 
-            # elif tree.specie in (36, 236, 336, 436, 936):  # Cupressus spp. - C. sempervirens, C. arizonica, C. lusitanica, C. macrocarpa, C. spp.
-            
-            # elif tree.specie == 37:  # Juniperus communis          
-                                    
-            elif tree.specie == 38:  # Juniperus thurifera
+            values = (4.618e-5, 1.771, 1.165, 5.159e-6, 3.157e-5, 2.553e-5, 0.04025, 0.5184)
+            # Diéguez-Aranda et al., 2009                      
 
-                values = (0.000074, 1.86289, 0.901233, 0.000001, 0.000028, 0.000037, 0.008578, 0.711639)
-                # Rodriguez & Torre, 2015
+        # elif tree.specie == 42:  # Quercus petraea
 
-            # elif tree.specie == 39:  # Juniperus phoenica
+        elif tree.specie == 43:  # Quercus pyrenaica
 
-            elif tree.specie == 41:  # Quercus robur
+            values = (0.000051, 1.867810, 0.989625, 0.000007, 0.000030, 0.000032, 0.047757, 0.825279)
+            # Rodriguez & Torre, 2015
 
-                values = (4.618e-5, 1.771, 1.165, 5.159e-6, 3.157e-5, 2.553e-5, 0.04025, 0.5184)
-                # Diéguez-Aranda et al., 2009                      
+        # elif tree.specie == 44:  # Quercus faginea
 
-            # elif tree.specie == 42:  # Quercus petraea
+        # elif tree.specie == 45:  # Quercus ilex
 
-            elif tree.specie == 43:  # Quercus pyrenaica
+        # elif tree.specie == 46:  # Quercus suber
 
-                values = (0.000051, 1.867810, 0.989625, 0.000007, 0.000030, 0.000032, 0.047757, 0.825279)
-                # Rodriguez & Torre, 2015
+        # elif tree.specie == 47:  # Quercus canariensis
 
-            # elif tree.specie == 44:  # Quercus faginea
+        # elif tree.specie == 51:  # Populus alba
 
-            # elif tree.specie == 45:  # Quercus ilex
+        # elif tree.specie == 52:  # Populus tremula
 
-            # elif tree.specie == 46:  # Quercus suber
+        # elif tree.specie == 54:  # Alnus glutinosa
 
-            # elif tree.specie == 47:  # Quercus canariensis
+        # elif tree.specie == 55:  # Fraxinus angustifolia
 
-            # elif tree.specie == 51:  # Populus alba
+        # elif tree.specie in (55, 255, 355, 955):  # Fraxinus spp. - F. angustifolia, F. excelsior, F. omus, F. spp.                                                
+        
+        # elif tree.specie in (56, 256, 356, 956):  # Ulmus spp. - U. minor, U. glabra, U. pumila, U. spp.
+        
+        # elif tree.specie in (57, 257, 357, 457, 557, 657, 757, 857, 858, 957):  # Salix spp. - S. spp., S. alba, S. atrocinerea, S. babylonica, S. cantabrica, S. caprea, S. eleagnos, S. fragilis, S. canariensis, S. purpurea
 
-            # elif tree.specie == 52:  # Populus tremula
+        elif tree.specie == 61:  # Eucalyptus globulus
 
-            # elif tree.specie == 54:  # Alnus glutinosa
+            values = (4.896e-5, 1.679, 1.186, 4.901e-6, 3.246e-5, 4.156e-5, 0.04503, 0.8364)
+            # Diéguez-Aranda et al., 2009
 
-            # elif tree.specie == 55:  # Fraxinus angustifolia
+        # elif tree.specie == 62:  # Eucalyptus camaldulensis
 
-            # elif tree.specie in (55, 255, 355, 955):  # Fraxinus spp. - F. angustifolia, F. excelsior, F. omus, F. spp.                                                
-            
-            # elif tree.specie in (56, 256, 356, 956):  # Ulmus spp. - U. minor, U. glabra, U. pumila, U. spp.
-            
-            # elif tree.specie in (57, 257, 357, 457, 557, 657, 757, 857, 858, 957):  # Salix spp. - S. spp., S. alba, S. atrocinerea, S. babylonica, S. cantabrica, S. caprea, S. eleagnos, S. fragilis, S. canariensis, S. purpurea
+        elif tree.specie == 64:  # Eucalyptus nittens
 
-            elif tree.specie == 61:  # Eucalyptus globulus
+            values = (5.024e-5, 1.823, 1.046, 5.700e-6, 3.074e-5, 2.797e-5, 0.03111, 0.5643)
+            # Diéguez-Aranda et al., 2009
+        
+        # elif tree.specie == 65:  # Ilex aquifolium
+        
+        # elif tree.specie == 66:  # Olea europaea
 
-                values = (4.896e-5, 1.679, 1.186, 4.901e-6, 3.246e-5, 4.156e-5, 0.04503, 0.8364)
-                # Diéguez-Aranda et al., 2009
+        # elif tree.specie == 67:  # Ceratonia siliqua
 
-            # elif tree.specie == 62:  # Eucalyptus camaldulensis
+        # elif tree.specie == 68:  # Arbutus unedo
 
-            elif tree.specie == 64:  # Eucalyptus nittens
+        elif tree.specie == 71:  # Fagus sylvatica
 
-                values = (5.024e-5, 1.823, 1.046, 5.700e-6, 3.074e-5, 2.797e-5, 0.03111, 0.5643)
-                # Diéguez-Aranda et al., 2009
-            
-            # elif tree.specie == 65:  # Ilex aquifolium
-            
-            # elif tree.specie == 66:  # Olea europaea
+            values = (0.000120, 2.036193, 0.799343, 0.000015, 0.000033, 0.005194, 0.074439, 0.873445)
+            # Rodriguez & Torre, 2015
 
-            # elif tree.specie == 67:  # Ceratonia siliqua
+        elif tree.specie == 72:  # Castanea sativa
 
-            # elif tree.specie == 68:  # Arbutus unedo
+            values = (0.00005542, 1.914, 0.936, 0.000009869, 0.00003362, 0.00002667, 0.07191, 0.5590)
+            # Bravo et al., 2011
 
-            elif tree.specie == 71:  # Fagus sylvatica
+        # elif tree.specie in (73, 273, 373):  # Betula spp. - B. spp., B. alba, B. pendula
+        
+        # elif tree.specie == 74:  # Corylus avellana
+        
+        # elif tree.specie == 75:  # Juglans regia
+        
+        # elif tree.specie in (76, 276, 376, 476, 576, 676, 976):  # Acer spp. - A. campestre, A. monspessulanum, A. negundo, A. opalus, A. pseudoplatanus, A. platanoides, A. spp.
+        
+        # elif tree.specie in (78, 278, 378, 478, 578, 678, 778):  # Sorbus spp. - S. spp., S. aria, S. aucuparia, S. domestica, S. torminalis, S. latifolia, S. chamaemespilus
 
-                values = (0.000120, 2.036193, 0.799343, 0.000015, 0.000033, 0.005194, 0.074439, 0.873445)
-                # Rodriguez & Torre, 2015
+        # elif tree.specie in (95, 295, 395, 495, 595):  # Prunus spp. - P. spp, P.spinosa, P. avium, P. lusitanica, P. padus
 
-            elif tree.specie == 72:  # Castanea sativa
+        # elif tree.specie == 97:  # Sambucus nigra
+        
+        elif tree.specie == 258:  # Populus x canadensis/euroamericana
 
-                values = (0.00005542, 1.914, 0.936, 0.000009869, 0.00003362, 0.00002667, 0.07191, 0.5590)
-                # Bravo et al., 2011
+            values = (0.000044, 1.872438, 1.023328, 0.000013, 0.000028, 0.000026, 0.032326, 0.645012)
+            # Rodriguez & Torre, 2015
 
-            # elif tree.specie in (73, 273, 373):  # Betula spp. - B. spp., B. alba, B. pendula
-            
-            # elif tree.specie == 74:  # Corylus avellana
-            
-            # elif tree.specie == 75:  # Juglans regia
-            
-            # elif tree.specie in (76, 276, 376, 476, 576, 676, 976):  # Acer spp. - A. campestre, A. monspessulanum, A. negundo, A. opalus, A. pseudoplatanus, A. platanoides, A. spp.
-            
-            # elif tree.specie in (78, 278, 378, 478, 578, 678, 778):  # Sorbus spp. - S. spp., S. aria, S. aucuparia, S. domestica, S. torminalis, S. latifolia, S. chamaemespilus
+        elif tree.specie == 273:  # Betula alba
 
-            # elif tree.specie in (95, 295, 395, 495, 595):  # Prunus spp. - P. spp, P.spinosa, P. avium, P. lusitanica, P. padus
+            values = (5.991e-5, 1.925, 0.8637, 5.266e-6, 2.838e-5, 2.428e-5, 0.04425, 0.9984)
+            # Diéguez-Aranda et al., 2009
 
-            # elif tree.specie == 97:  # Sambucus nigra
+        else:  # no volume equation available
             
-            elif tree.specie == 258:  # Populus x canadensis/euroamericana
-
-                values = (0.000044, 1.872438, 1.023328, 0.000013, 0.000028, 0.000026, 0.032326, 0.645012)
-                # Rodriguez & Torre, 2015
+            values = False
+        
+        # TODO: incluir ecuaciones IFN4, anexo 19: https://www.miteco.gob.es/content/dam/miteco/es/biodiversidad/temas/inventarios-nacionales/documentador_sig_tcm30-536622.pdf
 
-            elif tree.specie == 273:  # Betula alba
+        ########################################################################################
 
-                values = (5.991e-5, 1.925, 0.8637, 5.266e-6, 2.838e-5, 2.428e-5, 0.04425, 0.9984)
-                # Diéguez-Aranda et al., 2009
+        return values
 
-            else:  # no volume equation available
-                
-                values = False
-            
-            # TODO: incluir ecuaciones IFN4, anexo 19: https://www.miteco.gob.es/content/dam/miteco/es/biodiversidad/temas/inventarios-nacionales/documentador_sig_tcm30-536622.pdf
 
-            ########################################################################################
+    def taper_over_bark_Fang(self, tree: Tree, hr: float):
+        """
+        Taper equation over bark function using the Fang model.
+        A function that returns the taper equation to calculate the diameter (cm, over bark) at different heights.
+        ¡IMPORTANT! It is not used math.exp because of calculation error, we use the number "e" instead, wrote by manually.
+        Sources:
+            Doc.: Bravo, F., Álvarez González, J. G., Rio, M. D., Barrio, M., Bonet Lledos, J. A., Bravo Oviedo, A., ... & Diéguez Aranda, U. (2011). Growth and yield models in Spain: historical overview, contemporary examples and perspectives. Forest Systems, 2011, vol. 20, núm. 2, p. 315-328.
+            Ref.: Bravo et al., 2011
+            Doc.: Diéguez-Aranda, U., Alboreca, A. R., Castedo-Dorado, F., González, J. Á., Barrio-Anta, M., Crecente-Campo, F., ... & Balboa-Murias, M. A. (2009). Herramientas selvícolas para la gestión forestal sostenible en Galicia. Forestry, 82, 1-16.
+            Ref.: Diéguez-Aranda et al., 2009
+            Doc.: López-Sánchez C A (2009). Estado selvícola y modelos de crecimiento y gestión de plantaciones de Pseudotsuga menziesii (Mirb.) Franco en España (Doctoral dissertation, Doctoral thesis. Universidad de Santiago de Compostela, Lugo.
+            Ref.: López-Sánchez, 2009
+            Doc.: Rodríguez, F., & Torre, I. L. (2015). Comparison of stem taper equations for eight major tree species in the Spanish Plateau. Forest systems, 24(3), 2.
+            Ref.: Rodriguez & Torre, 2015
+        """
 
+        try:  # errors inside that construction will be announced
 
-            dob = TreeModel.Fang_taper(tree, hr, values)
+            dob = TreeModel.Fang_taper(tree, hr, self.fang_over_bark(tree))
 
 
         except Exception:
@@ -757,23 +767,23 @@ class Existencias(TreeModel):
             #######################################################################################################
 
 
-            hr = np.arange(0, 1, 0.001)  # that line establish the integrated conditions for volume calculation
-
-
             # Volume over bark
             if not_Fang == False:  # Fang model 
 
-                dob = self.taper_over_bark_Fang(tree, hr)  # diameter over bark using taper equation (cm)
+                taper_over_bark = self.taper_over_bark_Fang  # diameter over bark using taper equation (cm)
 
             else:  # not_Fang model
 
-                dob = self.taper_over_bark_others(tree, hr)  # diameter over bark using taper equation (cm)
+                taper_over_bark = self.taper_over_bark_others  # diameter over bark using taper equation (cm)
+
+            values = self.fang_over_bark(tree) if not_Fang == False else None  # coefficients of the Fang model, False if not available
+            fang = (tree.dbh, values) if isinstance(values, tuple) else None
 
+            vol = VolumeIntegration.taper_volume(lambda hr: taper_over_bark(tree, hr), tree.height, fang=fang)  # volume over bark (dm3)
 
-            if type(dob) != int:  # dob must be a list of values
+            if vol is not None:  # the taper equation must return a list of values
 
-                fwb = (dob / 20) ** 2  # radius^2 using dob (dm2)                
-                tree.add_value('vol', math.pi * tree.height * 10 * integrate.simps(fwb, hr))  # volume over bark using simpson integration (dm3)
+                tree.add_value('vol', vol)
 
             else:  # if it is int, then not equations are available
 
@@ -783,9 +793,7 @@ class Existencias(TreeModel):
             # Volume under bark
             if dub == True:
 
-                dub = self.taper_under_bark(tree, hr)  # diameter under/without bark using taper equation (cm)
-                fub = (dub / 20) ** 2  # radius^2 using dub (dm2)
-                tree.add_value('bole_vol', math.pi * tree.height * 10 * integrate.simps(fub, hr))  # volume under bark using simpson integration (dm3)
+                tree.add_value('bole_vol', VolumeIntegration.taper_volume(lambda hr: self.taper_under_bark(tree, hr), tree.height))  # volume under bark (dm3)
                 tree.add_value('bark_vol', tree.vol - tree.bole_vol)  # bark volume (dm3)
 
             else:
@@ -846,12 +854,11 @@ class Existencias(TreeModel):
             self.catch_model_exception()
 
 
-    def merchantable(self, tree: Tree):
+    def merch_conditions(self, tree: Tree):
         """
-        Merchantable wood calculation (tree).
-        A function needed to calculate the different commercial volumes of wood depending on the destiny of that.
-        That function is run by initialize and update_model functions and is linked to taper_over_bark, an indispensable function.
-        That function is run by initialize and update_model functions.
+        Merchantable wood classes (tree).
+        A function that returns the class_conditions of the wood uses of the species of the tree, used by merchantable_trees
+        to calculate the different commercial volumes of wood depending on the destiny of that.
         Data criteria to classify the wood by different uses were obtained from:
             Doc.: Fernández-Manso A, Sarmiento A (2004). El pino radiata (Pinus radiata). Manual de gestión forestal sostenible. Junta de Castilla y León.
             Ref.: Fernández-Manso et al, 2004
@@ -1137,26 +1144,48 @@ class Existencias(TreeModel):
 
             ########################################################################################
 
+        except Exception:
+            self.catch_model_exception()
+            class_conditions = []
+
+        return class_conditions
 
-            if type(class_conditions) != bool:  # if it is a merchantable limit available...
 
-                # usage and merch_list are a dictionary and a list returned from merch_calculation function
-                # to that function, we must send the following information: tree, class_conditions, and the name of our class on this model you are using
-                usage, merch_list = TreeModel.merch_calculation_all_species(tree, class_conditions, Existencias)
+    def merchantable_trees(self, plot_trees):
+        """
+        Merchantable wood calculation (trees).
+        A function needed to calculate the different commercial volumes of wood depending on the destiny of that.
+        That function is run by initialize and update_model functions over all the trees of the plot, and is linked to
+        taper_over_bark_Fang, an indispensable function. The wood uses of each tree are given by merch_conditions.
+        """
+
+        try:  # errors inside that construction will be announced
 
-            else:
+            class_conditions = [self.merch_conditions(tree) for tree in plot_trees]
 
-                usage = merch_list = 0
+            # usage and merch_list are a dictionary and a list for each tree returned from merch_calculation function
+            # to that function, we must send the following information: trees, class_conditions, and the name of our class on this model you are using
+            results = TreeModel.merch_calculation_all_species_batch(plot_trees, class_conditions, Existencias)
 
-            counter = -1
-            for k,i in usage.items():
-                counter += 1
-                tree.add_value(k, merch_list[counter])  # add merch_list values to each usage
+            for tree, (usage, merch_list) in zip(plot_trees, results):
+                counter = -1
+                for k,i in usage.items():
+                    counter += 1
+                    tree.add_value(k, merch_list[counter])  # add merch_list values to each usage
 
         except Exception:
             self.catch_model_exception()
 
 
+    def merchantable(self, tree: Tree):
+        """
+        Merchantable wood calculation (tree).
+        A function needed to calculate the different commercial volumes of wood of one tree, using merchantable_trees.
+        """
+
+        self.merchantable_trees([tree])
+
+
     def merchantable_plot(self, plot: Plot, plot_trees):
         """
         Merchantable wood calculation (plot).
@@ -32,6 +32,7 @@ from models.trees.equations_mixed_models import MixedEquations
 from models.trees.equations_tree_models import TreeEquations
 from models.trees.equations_tree_biomass import TreeBiomass
 from models.trees.equations_tree_volume import TreeVolume
+from models.trees.equations_tree_competition import TreeCompetition
 
 import math
 import sys
@@ -103,11 +104,8 @@ class MixedModelsSpain(TreeModel):
                 TreeEquations.set_g(tree)  # tree basal area (cm2)
                 TreeEquations.set_g_ha(tree)  # basal area per ha (m2/ha)
 
-            # reorder trees to calculate bal
-            list_of_trees: list[Tree] = plot.short_trees_on_list('ba_ha', DESC)  # establish an order to calculate tree variables
-
-            # calculate bal variables per species
-            MixedEquations.get_bal_per_sp(list_of_trees, plot)
+            # calculate bal variables per species, sorting the trees by basal area
+            TreeCompetition.set_bal_plots([plot], 'ba_ha', by_species=True)
 
             # calculate size variables
             for tree in list_of_trees:
@@ -141,10 +139,11 @@ class MixedModelsSpain(TreeModel):
                 # activate volume variables
                 TreeVolume.set_tree_vol(tree)
 
-                # activate wood uses variables
-                TreeVolume.set_tree_merch(tree)
-                # activate biomass variables
-                TreeBiomass.set_w_carbon_trees(tree)
+            # activate wood uses variables, over all the trees
+            TreeVolume.set_tree_merch_batch(list_of_trees)
+
+            # activate biomass variables, by species over all the trees
+            TreeBiomass.set_w_carbon_trees_batch(list_of_trees)
 
             #
             # # activate crown variables (plot)
@@ -161,8 +160,7 @@ class MixedModelsSpain(TreeModel):
 
             # # activate biomass (plot) variables
             # self.biomass_plot(plot, list_of_trees)
-            TreeBiomass.set_w_carbon_plot(plot, list_of_trees)
-            TreeBiomass.set_w_carbon_plot_sp(plot, list_of_trees)
+            TreeBiomass.set_w_carbon_plot_values(plot, list_of_trees, total=True, by_species=True)
 
             plot.add_value('DEAD_DENSITY', 0)  # change the value from '' to 0 in order to print that information at the summary sheet
             plot.add_value('ING_DENSITY', '')  # change the value from '' to 0 in order to print that information at the summary sheet
@@ -190,6 +188,15 @@ class MixedModelsSpain(TreeModel):
         return survival_rate
 
 
+    def survival_batch(self, time: int, plot: Plot, trees_table):
+        """
+        Vectorized survival function (see TreeModel.survival_batch), using the same equations as survival.
+        Trees without survival ratio are returned as NaN, so basic_engine uses survival with them.
+        """
+
+        return MixedEquations.get_survival_batch(plot, trees_table.column('specie', dtype=np.float64))
+
+
     def growth(self, time: int, plot: Plot, old_tree: Tree, new_tree: Tree):
         """
         Tree growth function.
@@ -206,6 +213,28 @@ class MixedModelsSpain(TreeModel):
             self.catch_model_exception()
 
 
+    def growth_batch(self, time: int, plot: Plot, trees_table):
+        """
+        Vectorized growth function (see TreeModel.growth_batch), using the same equations as growth.
+        The species combination and the Martonne index are calculated once for all the trees of the plot.
+        New basal area, dbh and height are written on the trees; trees with wrong values are returned as NaN,
+        so basic_engine uses growth with them.
+        """
+
+        # get Martonne aridity index if data is available on the inventory
+        M = TreeEquations.choose_martonne(plot.plot_id, plot.year, (2020, 2040, 2060, 2080, 2100))
+
+        values, equation = MixedEquations.get_growth_batch(plot, trees_table, M)
+
+        valid = ~equation | np.all([np.isfinite(values[variable]) for variable in values], axis=0)
+        grown = equation & valid
+
+        for variable in ('basal_area', 'basal_area_i', 'dbh', 'dbh_i', 'height', 'height_i'):
+            trees_table.set_column(variable, values[variable][grown], grown)
+
+        return {'tree_age': np.where(valid, time, np.nan)}  # tree age is updated for all the trees
+
+
     def ingrowth(self, time: int, plot: Plot):
         """
         Ingrowth stand function.
@@ -273,12 +302,8 @@ class MixedModelsSpain(TreeModel):
                 TreeEquations.set_g(tree)  # tree basal area (cm2)
                 TreeEquations.set_g_ha(tree)  # basal area per ha (m2/ha)
 
-            # reorder trees to calculate bal
-            list_of_trees: list[Tree] = plot.short_trees_on_list('ba_ha',
-                                                                 DESC)  # establish an order to calculate tree variables
-
-            # calculate bal variables per species
-            MixedEquations.get_bal_per_sp(list_of_trees, plot)
+            # calculate bal variables per species, sorting the trees by basal area
+            TreeCompetition.set_bal_plots([plot], 'ba_ha', by_species=True)
 
             # calculate size variables
             for tree in list_of_trees:
@@ -302,11 +327,11 @@ class MixedModelsSpain(TreeModel):
                 # activate volume variables
                 TreeVolume.set_tree_vol(tree)
 
-                # activate wood uses variables
-                TreeVolume.set_tree_merch(tree)
+            # activate wood uses variables, over all the trees
+            TreeVolume.set_tree_merch_batch(list_of_trees)
 
-                # activate biomass variables
-                TreeBiomass.set_w_carbon_trees(tree)
+            # activate biomass variables, by species over all the trees
+            TreeBiomass.set_w_carbon_trees_batch(list_of_trees)
 
             # # activate crown variables (plot)
             # self.canopy(plot, list_of_trees)
@@ -320,8 +345,7 @@ class MixedModelsSpain(TreeModel):
             TreeVolume.set_plot_merch_sp(plot, list_of_trees)
 
             # activate biomass (plot) variables
-            TreeBiomass.set_w_carbon_plot(plot, list_of_trees)
-            TreeBiomass.set_w_carbon_plot_sp(plot, list_of_trees)
+            TreeBiomass.set_w_carbon_plot_values(plot, list_of_trees, total=True, by_species=True)
 
         except Exception:
             self.catch_model_exception()
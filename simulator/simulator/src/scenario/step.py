@@ -15,10 +15,11 @@
 # limitations under the License.
 # ==============================================================================
 
-from simulation.inventory import Inventory
+from simulation.step_store import StoredInventory
 from scenario import OperationType
 from scenario import Operation
 from data.variables import CUTS_DICT
+from data.context import register_global
 
 import i18n
 
@@ -30,7 +31,7 @@ class Step:
 
     def __init__(self,
                  id: int,
-                 inventory: Inventory,
+                 inventory: StoredInventory,
                  op: OperationType,
                  description: str,
                  age: int,
@@ -138,10 +139,11 @@ class Step:
 
         return content
 
-    def to_xslt(self, labels: dict, workbook, plot_id: int, scenario_file_name:str, row: int, next_step, next_operation,
+    def to_xslt(self, labels: dict, workbook, plot_id: int, plot, scenario_file_name:str, row: int, next_plot, next_operation,
                 summary_row: int, decimals: int = 2):
         """
         Function to print the scenario information at the plot sheet.
+        plot and next_plot are the plot on this step and on the next one, read from the StepStore of the simulation.
         """
         
         ws_plot = workbook[labels['simanfor.general.plot_sheet']]
@@ -198,10 +200,15 @@ class Step:
         else:
             ws_plot.cell(row=self.__id+1, column=9).value = labels['simanfor.general.' + self.__cut_criteria] 
 
-        next_inventory = None if next_step is None else next_step.__inventory
+        if plot is None:
+            return None
+
+        summary_row = plot.plot_to_xslt(labels, workbook, self.__id, next_plot, next_operation, self.__full_operation,
+                                        summary_row, decimals)
+        plot.trees_to_xlst(labels, workbook, self.__id, self.__inventory.must_be_printed(plot_id), decimals)
 
-        summary_row = self.__inventory.to_xslt(labels, workbook, plot_id, self.__id, next_inventory, 
-                                               next_operation, self.__full_operation, summary_row, decimals)
         return summary_row
 
-plots_count = node = 0
\ No newline at end of file
+plots_count = node = 0
+
+register_global(__name__, 'plots_count', 'node')
@@ -18,11 +18,15 @@
 from data import Tree
 from util import Tools
 from data import Plot
+from data import TreeTable
+from data.plot_aggregates import AGGREGATE_VARS
+from data.plot_aggregates import get_plots_aggregates
 from datetime import datetime
 from reader import ExcelReader, JSONReader, CSVReader
 from data.variables import PLOT_VARS
 
 import logging
+import numpy as np
 
 from scenario import Operation, OperationType
 
@@ -41,6 +45,7 @@ class Inventory:
         self.__date = date
         self.__plots = dict()
         self.__plots_to_print = dict()
+        self.__tree_table = None
 
         if reader is None:  # If some was wrong at the moment to choose the reader...
             Tools.print_log_line("No reader information, generated empty plots list", logging.WARNING)
@@ -95,6 +100,9 @@ class Inventory:
                 #print(type(tree.plot_id), type(plot_id))
                 self.__plots[plot_id].add_tree(tree)  # associate trees to plots by using PLOT_ID
 
+        if reader is not None:
+            self.build_tree_table()
+
 
     @property
     def plots(self):
@@ -108,6 +116,66 @@ class Inventory:
     def date(self):
         return self.__date
 
+    @property
+    def tree_table(self):
+        return self.__tree_table
+
+    def build_tree_table(self):
+        """
+        Function that saves the trees of all the plots on one columnar TreeTable (one NumPy array per variable).
+        The trees keep working as views of their rows, and each plot gets the rows of its trees,
+        so new code can run over whole columns (Plot.get_column) instead of tree by tree.
+        """
+
+        trees = list()
+        plot_index = list()
+        plot_rows = list()
+
+        for index, plot in enumerate(self.__plots.values()):
+            rows = dict()
+            for status in (None, 'M', 'C', 'I'):
+                start = len(trees)
+                for tree in plot.get_trees_by_status(status):
+                    trees.append(tree)
+                    plot_index.append(index)
+                rows[status] = slice(start, len(trees))
+            plot_rows.append(rows)
+
+        self.__tree_table = TreeTable.from_trees(trees, plot_index, bind=True)
+
+        for plot, rows in zip(self.__plots.values(), plot_rows):
+            plot.bind_tree_table(self.__tree_table, rows)
+
+        return self.__tree_table
+
+    def recalculate(self):
+        """
+        Function that recalculates the variables of all the plots at once (the same values as Plot.recalculate),
+        from the columns of the inventory TreeTable. The table is built again if the trees of some plot have changed.
+        """
+
+        plots = list(self.__plots.values())
+
+        if self.__tree_table is None or not self.__tree_table.valid or \
+                any(plot.tree_table is not self.__tree_table or plot.tree_rows is None for plot in plots):
+            self.build_tree_table()
+
+        table = self.__tree_table
+        positions = np.arange(len(table))
+        rows = np.concatenate([positions[plot.tree_rows[None]] for plot in plots]) if plots else positions
+
+        columns = dict()
+        for variable in AGGREGATE_VARS:
+            if len(rows) > 0 and table.has_column(variable):
+                columns[variable] = table.column(variable, rows, np.float64)
+            else:
+                columns[variable] = np.full(len(rows), np.nan)
+
+        for plot, aggregates in zip(plots, get_plots_aggregates(columns, table.plot_index[rows], len(plots))):
+            plot.set_aggregates(aggregates)
+
+        return self
+
     def must_be_printed(self, id_plot):
         return self.__plots_to_print[id_plot]
 
@@ -122,6 +190,19 @@ class Inventory:
         self.__plots_to_print[plot.id] = print
 
 
+    def remove_plot(self, plot_id):
+        """
+        Function that takes a plot out of the inventory and returns it. The TreeTable is released with the last plot.
+        """
+
+        plot = self.__plots.pop(plot_id)
+        self.__plots_to_print.pop(plot_id, None)
+
+        if self.empty:
+            self.__tree_table = None
+
+        return plot
+
     def add_plots(self, plots: list):
         
         count = 0
@@ -144,6 +225,9 @@ class Inventory:
     def get_first_plot(self):
         return self.get_plot(0)
 
+    def get_plot_by_id(self, plot_id):
+        return self.__plots.get(plot_id)
+
     def get_tree(self, plot_id: str, tree_id: str):
         if plot_id in self.__plots.keys():
             return self.__plots[plot_id].get_tree(tree_id)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from data import SimulationContext
+from data.variables import TREE_VARS, PLOT_VARS
+from simulation.inventory import Inventory
+from simulation.simulation import Simulation
+from simulation.step_store import DEFAULT_MEMORY_LIMIT
+from scenario import LOAD
+from util import Tools
+
+import logging
+
+
+class PlotStreaming:
+    """
+    Plot-major execution of a scenario. The inventory is loaded once and its plots are shared in batches of batch_size plots;
+    each batch runs all the operations of the scenario (INIT, EXECUTION, HARVEST...) and its results are written before
+    the next batch starts, so only the history of one batch is kept in memory and the first output files are ready
+    before the last plots are simulated.
+    Models change PLOT_VARS and TREE_VARS when they are imported or run, so the first batch saves the lists used by
+    each operation and the next batches run the operations with the same lists.
+    TREE_ID codes of the ingrowth trees are given by each plot (see Plot.new_tree_id), so they don't depend on the batches.
+    All the batches run inside the same SimulationContext (a new one if it is not received).
+    """
+
+    def __init__(self, engine, batch_size: int = 1, memory_limit=DEFAULT_MEMORY_LIMIT, directory: str = None,
+                 context: SimulationContext = None):
+
+        self.__engine = engine
+        self.__batch_size = max(int(batch_size), 1)
+        self.__memory_limit = memory_limit
+        self.__directory = directory
+        self.__context = context if context is not None else SimulationContext()
+
+    @property
+    def context(self):
+        return self.__context
+
+    @property
+    def batch_size(self):
+        return self.__batch_size
+
+    def get_batches(self, inventory: Inventory):
+        """
+        Function that returns the plots of the inventory as inventories of batch_size plots, in order.
+        The plots are taken out of the inventory when their batch is created, so they are released after being written.
+        """
+
+        plot_ids = list(inventory.get_plot_ids())
+
+        for start in range(0, len(plot_ids), self.__batch_size):
+
+            batch = Inventory()
+            for plot_id in plot_ids[start:start + self.__batch_size]:
+                print_plot = inventory.must_be_printed(plot_id)
+                batch.add_plot(inventory.remove_plot(plot_id), print_plot)
+
+            yield batch
+
+    def run(self, operations, write, inventory: Inventory = None):
+        """
+        Function that simulates the scenario operations batch by batch. write(simulation) is called with the simulation
+        of each batch once all its steps are done. It returns the number of batches.
+        If inventory is received, it is used as the result of the LOAD operation instead of reading the input file.
+        """
+
+        with self.__context:
+            return self.__run(list(operations), write, inventory)
+
+    def __run(self, operations: list, write, inventory: Inventory):
+
+        if len(operations) == 0 or operations[0].type.action != LOAD:
+            Tools.print_log_line('Plot-major execution needs a LOAD operation at the start of the scenario', logging.ERROR)
+            return 0
+
+        load_model = None
+        if inventory is None:
+            Tools.print_log_line('Executing operation: ' + operations[0].name, logging.INFO, name='logger_dev')
+            load_model = self.__context.import_module(operations[0].model_class, operations[0].model_path, operations[0].variables)
+            inventory = self.__engine.apply_model(load_model, operations[0], None)
+
+        models = list()  # models of the operations, imported by the first batch
+        variables = list()  # (PLOT_VARS, TREE_VARS) used by each operation on the first batch
+        count = 0
+
+        for batch in self.get_batches(inventory):
+
+            Tools.print_log_line('Simulating plots ' + ', '.join(str(plot_id) for plot_id in batch.get_plot_ids()),
+                                 logging.INFO, name='logger_dev')
+
+            simulation = Simulation(memory_limit=self.__memory_limit, directory=self.__directory, context=self.__context)
+            simulation.add_step(1, batch, operations[0], load_model)
+
+            for position, operation in enumerate(operations[1:]):
+
+                if position < len(models):
+                    PLOT_VARS[:], TREE_VARS[:] = variables[position]
+                else:
+                    Tools.print_log_line('Executing operation: ' + operation.name, logging.INFO, name='logger_dev')
+                    models.append(self.__context.import_module(operation.model_class, operation.model_path, operation.variables))
+                    variables.append((PLOT_VARS[:], TREE_VARS[:]))
+
+                batch = self.__engine.apply_model(models[position], operation, batch)
+                simulation.add_step(position + 2, batch, operation, models[position])
+
+            write(simulation)
+            simulation.close()
+            count += 1
+
+        return count
@@ -18,11 +18,14 @@
 from data import Tree
 from data import Plot
 from data.general import Area, Model, Warnings
+from data import SimulationContext
 from scenario.step import Step
 from .simulation_lists import *
 from util import Tools
 from datetime import datetime
 from .inventory import Inventory
+from .step_store import StepStore
+from .step_store import DEFAULT_MEMORY_LIMIT
 from scenario import Operation
 from openpyxl import Workbook
 from openpyxl import drawing
@@ -44,10 +47,21 @@ JSON = 1
 
 class Simulation:
 
-    def __init__(self, date=datetime.now()):
+    def __init__(self, date=datetime.now(), memory_limit=DEFAULT_MEMORY_LIMIT, directory: str = None,
+                 context: SimulationContext = None):
 
         self.__date = date
         self.__steps = list()
+        self.__store = StepStore(memory_limit, directory)  # inventories of the steps, written on disk over memory_limit
+        self.__context = context  # variables of the models used by the writers, None to use the current ones
+
+    @property
+    def context(self):
+        return self.__context
+
+    @property
+    def store(self):
+        return self.__store
 
     def add_step(self, step_id, inventory: Inventory, operation: Operation, model):
 
@@ -70,9 +84,19 @@ class Simulation:
         if isinstance(model, HarvestModel):
             model_name = i18n.t('simanfor.general.' + model.name)
 
-        self.__steps.append(Step(step_id, inventory, operation.type, operation.description, 
+        if inventory is not None:
+            inventory.build_tree_table()  # saved steps keep their trees as columns instead of one dict per tree
+
+        self.__steps.append(Step(step_id, self.__store.add(inventory), operation.type, operation.description, 
                                  age, min_age, max_age, operation, model_name))
 
+    def close(self):
+        """
+        Function that removes the steps written on disk by the StepStore, once the results are generated.
+        """
+
+        self.__store.close()
+
     def get_step(self, position):
         if position < len(self.__steps):
             return self.__steps[position]
@@ -163,13 +187,16 @@ class Simulation:
         row = 8
         summary_row = 8
 
+        plots = [plot] + self.__store.get_plot_history(plot.id, 1)  # plot on each step, read from disk if the step was released
+
         for step in self.__steps:
 
             next_step = None if step_count >= len(self.__steps) else self.__steps[step_count]
+            next_plot = None if next_step == None else plots[step_count]
 
             next_operation = None if next_step == None else next_step._Step__full_operation          
-            summary_row = step.to_xslt(labels, workbook, plot.id, scenario_file_name, row, next_step, next_operation, 
-                                       summary_row, decimals)
+            summary_row = step.to_xslt(labels, workbook, plot.id, plots[step_count - 1], scenario_file_name, row, next_plot,
+                                       next_operation, summary_row, decimals)
             row += 1
             step_count += 1
 
@@ -212,6 +239,10 @@ class Simulation:
     def generate_results(self, scenario_name: str, scenario_file_name: str, file_path: str, modelo: str, type: int = XLSX, zip_compression: bool = False, 
                          decimals: int = 2):
 
+        if self.__context is not None and not self.__context.active:
+            with self.__context:
+                return self.generate_results(scenario_name, scenario_file_name, file_path, modelo, type, zip_compression, decimals)
+
         labels = Labels.get_labels()
 
         plots = self.get_first_step().inventory.plots
@@ -254,6 +285,11 @@ class Simulation:
     def generate_results_parallel(self, scenario_name: str, scenario_file_name:str, file_path: str, modelo: str, type: int = XLSX, zip_compression: bool = False, 
                          decimals: int = 2):
 
+        if self.__context is not None and not self.__context.active:
+            with self.__context:
+                return self.generate_results_parallel(scenario_name, scenario_file_name, file_path, modelo, type, zip_compression,
+                                                      decimals)
+
         labels = Labels.get_labels()
         # plot_labels['simanfor.general.Summary'] = i18n.t('simanfor.general.Summary')
 
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+#
+# Copyright (c) $today.year Moises Martinez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from simulation.inventory import Inventory
+from util import Tools
+
+from dask.utils import parse_bytes
+
+import logging
+import os
+import pickle
+import tempfile
+
+
+DEFAULT_MEMORY_LIMIT = '1GB'  # memory used by the saved steps before they are written on disk
+TREE_OBJECT_SIZE = 512  # bytes used by the Tree and TreeRow objects of a tree, out of the TreeTable columns
+
+
+def get_inventory_size(inventory: Inventory) -> int:
+    """
+    Function that estimates the memory used by an inventory, from the columns of its TreeTable.
+    """
+
+    if inventory is None or inventory.tree_table is None:
+        return 0
+
+    return inventory.tree_table.nbytes() + len(inventory.tree_table) * TREE_OBJECT_SIZE
+
+
+class StoredInventory:
+    """
+    Inventory of a step saved on a StepStore. It is kept in memory until the store needs to release it; then each plot
+    is written on the file of the step as a pickle, so the writers can read back only the plot they are printing.
+    """
+
+    def __init__(self, inventory: Inventory, position: int):
+
+        self.__inventory = inventory
+        self.__position = position
+        self.__size = get_inventory_size(inventory)
+        self.__file = None
+        self.__index = dict()  # plot id -> (offset, length) on the file
+        self.__plots_to_print = dict()
+
+    @property
+    def position(self):
+        return self.__position
+
+    @property
+    def size(self):
+        return self.__size
+
+    @property
+    def spilled(self):
+        return self.__file is not None
+
+    @property
+    def inventory(self):
+        return self.__inventory
+
+    @property
+    def file(self):
+        return self.__file
+
+    @property
+    def plots(self):
+        """
+        Plots of the step, loaded one by one if the step is on disk.
+        """
+
+        if not self.spilled:
+            return self.__inventory.plots if self.__inventory is not None else list()
+
+        return (self.get_plot_by_id(plot_id) for plot_id in self.__index)
+
+    def get_plot_ids(self):
+        if not self.spilled:
+            return self.__inventory.get_plot_ids() if self.__inventory is not None else list()
+        return self.__index.keys()
+
+    def get_number_plots(self):
+        return len(self.get_plot_ids())
+
+    def get_first_plot(self):
+        for plot in self.plots:
+            return plot
+        return None
+
+    def must_be_printed(self, plot_id):
+        if not self.spilled:
+            return self.__inventory.must_be_printed(plot_id)
+        return self.__plots_to_print[plot_id]
+
+    def get_plot_by_id(self, plot_id):
+        """
+        Function that returns the plot with that id, or None if the step doesn't have it.
+        """
+
+        if not self.spilled:
+            return self.__inventory.get_plot_by_id(plot_id) if self.__inventory is not None else None
+
+        if plot_id not in self.__index:
+            return None
+
+        offset, length = self.__index[plot_id]
+        with open(self.__file, 'rb') as file:
+            file.seek(offset)
+            return pickle.loads(file.read(length))
+
+    def load(self) -> Inventory:
+        """
+        Function that returns the whole inventory of the step, reading it from disk if it was released.
+        """
+
+        if not self.spilled:
+            return self.__inventory
+
+        inventory = Inventory()
+        for plot_id in self.__index:
+            inventory.add_plot(self.get_plot_by_id(plot_id), self.__plots_to_print[plot_id])
+        return inventory
+
+    def to_json(self, plot_id, node):
+
+        inventory = Inventory()
+        plot = self.get_plot_by_id(plot_id)
+        if plot is not None:
+            inventory.add_plot(plot)
+        return inventory.to_json(plot_id, node)
+
+    def spill(self, file_path: str):
+        """
+        Function that writes the plots of the step on file_path and releases the inventory.
+        """
+
+        if self.spilled or self.__inventory is None:
+            return 0
+
+        with open(file_path, 'wb') as file:
+            for plot_id in self.__inventory.get_plot_ids():
+                data = pickle.dumps(self.__inventory.get_plot_by_id(plot_id), protocol=pickle.HIGHEST_PROTOCOL)
+                self.__index[plot_id] = (file.tell(), len(data))
+                self.__plots_to_print[plot_id] = self.__inventory.must_be_printed(plot_id)
+                file.write(data)
+
+        self.__file = file_path
+        self.__inventory = None
+        size, self.__size = self.__size, 0
+
+        return size
+
+
+class StepStore:
+    """
+    Store of the inventories of the simulation steps, used by Simulation until the results are written.
+    The steps are kept in memory while their size is under memory_limit; when the limit is exceeded, the oldest steps
+    are written on disk (directory, or a temporary directory if it is None), so only the current inventory stays resident.
+    memory_limit can be a number of bytes or a string as '512MB'; 0 writes every completed step on disk, None never does it.
+    """
+
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, directory: str = None):
+
+        self.__memory_limit = parse_bytes(memory_limit) if isinstance(memory_limit, str) else memory_limit
+        self.__directory = directory
+        self.__temporary = None
+        self.__inventories = list()
+        self.__resident = 0  # estimated bytes of the steps kept in memory
+
+    @property
+    def memory_limit(self):
+        return self.__memory_limit
+
+    @property
+    def resident(self):
+        return self.__resident
+
+    def __len__(self):
+        return len(self.__inventories)
+
+    def __getstate__(self):
+        """
+        Function used by pickle (i.e. dask workers of generate_results_parallel). The copies read the same files.
+        """
+
+        state = self.__dict__.copy()
+        if self.__temporary is not None:
+            state['_StepStore__directory'] = self.__temporary.name
+        state['_StepStore__temporary'] = None
+        return state
+
+    def __get_directory(self):
+
+        if self.__directory is not None:
+            os.makedirs(self.__directory, exist_ok=True)
+            return self.__directory
+
+        if self.__temporary is None:
+            self.__temporary = tempfile.TemporaryDirectory(prefix='simanfor_steps_')
+
+        return self.__temporary.name
+
+    def add(self, inventory: Inventory) -> StoredInventory:
+        """
+        Function that saves the inventory of a new step, releasing the previous steps if the memory limit is exceeded.
+        """
+
+        stored = StoredInventory(inventory, len(self.__inventories))
+        self.__inventories.append(stored)
+        self.__resident += stored.size
+
+        if self.__memory_limit is not None and self.__resident > self.__memory_limit:
+            self.spill()
+
+        return stored
+
+    def spill(self):
+        """
+        Function that writes on disk the oldest steps until the memory limit is respected. The last step is never written,
+        because it is the inventory used by the next operation.
+        """
+
+        for stored in self.__inventories[:-1]:
+
+            if self.__resident <= (self.__memory_limit or 0):
+                break
+
+            if not stored.spilled and stored.inventory is not None:
+                file_path = os.path.join(self.__get_directory(), 'step_' + str(stored.position) + '.pkl')
+                self.__resident -= stored.spill(file_path)
+                Tools.print_log_line('Step ' + str(stored.position) + ' written on ' + file_path, logging.INFO)
+
+    def get(self, position: int) -> StoredInventory:
+        return self.__inventories[position]
+
+    def get_plot_history(self, plot_id, start: int = 0) -> list:
+        """
+        Function that returns the plot with that id on each step from start (None on the steps that don't have it).
+        Only that plot is read from the steps saved on disk.
+        """
+
+        return [stored.get_plot_by_id(plot_id) for stored in self.__inventories[start:]]
+
+    def close(self):
+        """
+        Function that removes the files of the steps written on disk.
+        """
+
+        for stored in self.__inventories:
+            if stored.spilled and os.path.exists(stored.file):
+                os.remove(stored.file)
+
+        if self.__temporary is not None:
+            self.__temporary.cleanup()
+            self.__temporary = None
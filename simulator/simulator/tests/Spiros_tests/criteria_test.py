@@ -20,12 +20,15 @@ from __future__ import absolute_import
 import os
 import sys
 import pytest
+import numpy as np
 
 ROOT_FOLDER = os.getcwd()
 
 sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
 
+from data import Tree
 from data.search import Criteria
+from data.search import SearchCriteria
 from data.search import EQUAL
 from data.search import LESS
 from data.search import GREATER
@@ -119,3 +122,44 @@ def test_is_not_valid():
     expected_output: bool = False
 
     assert real_output == expected_output
+
+
+def test_get_mask():
+
+    tmp_criteria = Criteria('VALUE1', 2.0, LESS)
+    real_output: list = tmp_criteria.get_mask(np.array([1.0, 2.0, 3.0])).tolist()
+    expected_output: list = [True, False, False]
+
+    assert real_output == expected_output
+
+    tmp_criteria = Criteria('status', None, EQUAL)
+    real_output: list = tmp_criteria.get_mask(np.array([None, 'C', ''], dtype=object)).tolist()
+    expected_output: list = [True, False, False]
+
+    assert real_output == expected_output
+
+
+def test_select():
+
+    trees = list()
+    for n, (dbh, status) in enumerate([(10.0, None), (20.0, 'C'), ('', None), (30.0, None)]):
+        tree = Tree({'TREE_ID': n + 1})
+        tree.add_value('dbh', dbh)
+        tree.add_value('status', status)
+        trees.append(tree)
+
+    tmp_search_criteria = SearchCriteria()
+    tmp_search_criteria.add_criteria('status', None, EQUAL)
+    tmp_search_criteria.add_criteria('dbh', 10.0, GREATEREQUAL)
+    real_output: list = [tree.tree_id for tree in tmp_search_criteria.select(trees[:2] + trees[3:])]
+    expected_output: list = [1, 4]
+
+    assert real_output == expected_output
+
+    # empty values are compared one by one, as they are not numbers
+    tmp_search_criteria = SearchCriteria()
+    tmp_search_criteria.add_criteria('dbh', '', EQUAL)
+    real_output: list = [tree.tree_id for tree in tmp_search_criteria.select(trees)]
+    expected_output: list = [3]
+
+    assert real_output == expected_output
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""
+Functions shared by the tests: the operations of psyl_sisc_v01 scenario, and the trees and taper equations used to
+check the volume functions.
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+import importlib
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Plot
+from data import Tree
+from data.variables import TREE_VARS, PLOT_VARS
+from engine.engines.basic_engine import BasicEngine
+from scenario import Operation
+from simulation.inventory import Inventory
+from util import Tools
+
+
+PSYL_INPUT = os.path.join(ROOT_FOLDER, 'tests', 'inputs', 'data_sm4.2015.1p_eng_psyl.xlsx')
+MODEL_PATH, MODEL_CLASS = 'models.trees.Psylvestris__sisc__v01', 'PinusSylvestrisSISC'
+HARVEST_PATH, HARVEST_CLASS = 'models.harvest.cut_down_by_smallest', 'CutDownBySmallest'
+
+PSYL_VALUES = (0.000051, 1.845867, 1.045022, 0.000011, 0.000038, 0.000030, 0.093625, 0.763750)  # Psylvestris__sisc__v01
+
+
+def new_operation(operation, model_path, model_class, variables):
+
+    return Operation({'name': '', 'description': '', 'operation': operation, 'model_path': model_path,
+                      'model_class': model_class, 'variables': variables})
+
+
+def get_operations(*steps):
+    """
+    Operations of psyl_sisc_v01 scenario: LOAD, followed by an operation for each step received, that can be INIT,
+    EXECUTION (5 years) or the cut_down criteria of a HARVEST by the smallest trees (10 %).
+    """
+
+    operations = [new_operation('LOAD', 'models.load.xlsx_load', 'XLSXLoad', {'init': 25, 'time': 0, 'input': PSYL_INPUT})]
+
+    for step in steps:
+        if step == 'INIT':
+            operations.append(new_operation('INIT', MODEL_PATH, MODEL_CLASS, {'time': 0}))
+        elif step == 'EXECUTION':
+            operations.append(new_operation('EXECUTION', MODEL_PATH, MODEL_CLASS, {'time': 5}))
+        else:
+            operations.append(new_operation('HARVEST', HARVEST_PATH, HARVEST_CLASS, {'time': 0, 'cut_down': step, 'volumen': 10}))
+
+    return operations
+
+
+def import_model(model_class, model_path, variables=None):
+    """
+    Models remove their variables from the lists when the module is executed, so it is executed again if other test loaded it.
+    """
+
+    if model_path in sys.modules:
+        importlib.reload(sys.modules[model_path])
+    return Tools.import_module(model_class, model_path, variables)
+
+
+def load_inventory(load, engine=None):
+    """
+    Returns the inventory of psyl_sisc_v01 scenario, loaded with the LOAD operation received.
+    """
+
+    engine = BasicEngine(None) if engine is None else engine
+    return engine.apply_load_model(PSYL_INPUT, Tools.import_module('XLSXLoad', 'models.load.xlsx_load'), load)
+
+
+def copy_plots(inventory, copies):
+    """
+    Returns an inventory with copies of the first plot, to have several plots sharing the same model.
+    """
+
+    new_inventory = Inventory()
+    for plot_id in range(1, copies + 1):
+        plot = Plot()
+        plot.clone(inventory.get_first_plot(), True)
+        plot.add_value('PLOT_ID', plot_id)
+        for tree in plot.trees:
+            tree.add_value('PLOT_ID', plot_id)
+        new_inventory.add_plot(plot)
+    return new_inventory
+
+
+def get_values(plots):
+    """
+    Returns the values of the plots and of all their trees, to compare the results of two simulations.
+    """
+
+    values = list()
+    for plot in plots:
+        values.append([plot.get_value(variable) for variable in PLOT_VARS])
+        for status in (None, 'M', 'C', 'I'):
+            for tree in plot.get_trees_by_status(status):
+                values.append([tree.get_value(variable) for variable in TREE_VARS + ['status']])
+    return values
+
+
+def new_tree(dbh, height):
+
+    tree = Tree()
+    tree.add_value('dbh', dbh)
+    tree.add_value('height', height)
+    return tree
+
+
+def random_sizes(seed, number):
+    """
+    Returns the dbh (cm) and the height (m) of number random trees.
+    """
+
+    random = np.random.default_rng(seed)
+    return random.uniform(7.5, 70, number), random.uniform(4, 30, number)
+
+
+def stud_taper(tree, hr):
+    """
+    Stud taper equation over bark of Psylvestris__sisc__v01 (not used by the model), as a taper equation different from Fang.
+    """
+
+    return (1 + 0.4959 * 2.7182818284 ** (-14.2598 * hr)) * 0.8474 * tree.dbh * pow((1 - hr), (0.6312 - 0.6361 * (1 - hr)))
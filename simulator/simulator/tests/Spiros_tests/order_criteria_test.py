@@ -25,6 +25,7 @@ ROOT_FOLDER = os.getcwd()
 
 sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
 
+from data import Tree
 from data.search import OrderCriteria
 from data.search import ASC
 from data.search import DESC
@@ -162,3 +163,43 @@ def test_get_len():
     expected_output: int = 2
 
     assert real_output == expected_output
+
+
+def test_sort():
+
+    trees = list()
+    for n, (dbh, height) in enumerate([(20.0, 5.0), (10.0, 7.0), (20.0, 3.0), (None, 1.0)]):
+        tree = Tree({'TREE_ID': n + 1})
+        tree.add_value('dbh', dbh)
+        tree.add_value('height', height)
+        trees.append(tree)
+
+    # DESC sorts from lower to bigger values, empty values are 0 and trees with the same value keep their order
+    tmp_order_criteria = OrderCriteria(DESC)
+    tmp_order_criteria.add_criteria('dbh')
+    real_output: list = [tree.tree_id for tree in tmp_order_criteria.sort(trees)]
+    expected_output: list = [4, 2, 1, 3]
+
+    assert real_output == expected_output
+
+    tmp_order_criteria = OrderCriteria(ASC)
+    tmp_order_criteria.add_criteria('dbh')
+    real_output: list = [tree.tree_id for tree in tmp_order_criteria.sort(trees)]
+    expected_output: list = [1, 3, 2, 4]
+
+    assert real_output == expected_output
+
+    # the next criteria sort the trees with the same value
+    tmp_order_criteria.add_criteria('height')
+    real_output: list = [tree.tree_id for tree in tmp_order_criteria.sort(trees)]
+    expected_output: list = [1, 3, 2, 4]
+
+    assert real_output == expected_output
+
+    tmp_order_criteria = OrderCriteria(DESC)
+    tmp_order_criteria.add_criteria('dbh')
+    tmp_order_criteria.add_criteria('height')
+    real_output: list = [tree.tree_id for tree in tmp_order_criteria.sort(trees)]
+    expected_output: list = [4, 2, 3, 1]
+
+    assert real_output == expected_output
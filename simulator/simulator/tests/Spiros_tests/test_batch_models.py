@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Tree
+from data import TreeTable
+from data.variables import TREE_VARS, PLOT_VARS
+from engine.engines.basic_engine import BasicEngine
+from scenario import Operation
+from util import Tools
+
+
+GROWTH_VARS = ['tree_age', 'dbh', 'height', 'basal_area', 'vol', 'bole_vol']
+
+
+def initialize(model_path, model_class, input):
+    """
+    Loads the inventory and initializes it with the model, as the LOAD and INIT operations of a scenario.
+    """
+
+    engine = BasicEngine(None)
+    load = Operation({'name': '', 'description': '', 'operation': 'LOAD', 'model_path': 'models.load.xlsx_load',
+                      'model_class': 'XLSXLoad', 'variables': {'init': 25, 'time': 0}})
+    init = Operation({'name': '', 'description': '', 'operation': 'INIT', 'model_path': model_path,
+                      'model_class': model_class, 'variables': {'time': 0}})
+
+    inventory = engine.apply_load_model(os.path.join(ROOT_FOLDER, 'tests', 'inputs', input),
+                                        Tools.import_module('XLSXLoad', 'models.load.xlsx_load'), load)
+    model = Tools.import_module(model_class, model_path)
+
+    return model, engine.apply_initialize_tree_model(inventory, model, init)
+
+
+def copy_trees(trees):
+
+    copies = list()
+    for tree in trees:
+        copy = Tree()
+        copy.clone(tree)
+        copies.append(copy)
+    return copies
+
+
+def check_model(model_path, model_class, input):
+
+    tree_vars, plot_vars = TREE_VARS[:], PLOT_VARS[:]  # models remove variables from the lists when they are loaded
+
+    try:
+        model, inventory = initialize(model_path, model_class, input)
+        checked = 0
+
+        for plot in inventory.plots:
+
+            trees = list(plot.trees)
+
+            expected_output = np.array([model.survival(5, plot, tree) for tree in trees], dtype=np.float64)
+            real_output = model.survival_batch(5, plot, TreeTable.from_trees(trees))
+            assert np.allclose(real_output, expected_output, rtol=1e-12, atol=0)
+
+            scalar_trees = copy_trees(trees)
+            for tree in scalar_trees:
+                model.growth(5, plot, tree, tree)  # basic_engine uses the same tree as old and new tree
+
+            batch_trees = copy_trees(trees)
+            increments = model.growth_batch(5, plot, TreeTable.from_trees(batch_trees))
+            for position, tree in enumerate(batch_trees):
+                if all(np.isfinite(values[position]) for values in increments.values()):
+                    for variable, values in increments.items():
+                        tree.sum_value(variable, values[position])
+                    model.update_after_growth(5, plot, tree)
+                else:  # trees of other species are calculated one by one, as basic_engine does
+                    model.growth(5, plot, tree, tree)
+
+            for variable in GROWTH_VARS:
+                expected_output = np.array([tree.get_value(variable) for tree in scalar_trees], dtype=np.float64)
+                real_output = np.array([tree.get_value(variable) for tree in batch_trees], dtype=np.float64)
+                assert np.allclose(real_output, expected_output, rtol=1e-10, atol=0)
+
+            checked += len(trees)
+
+        assert checked > 0
+
+    finally:
+        TREE_VARS[:] = tree_vars
+        PLOT_VARS[:] = plot_vars
+
+
+def test_psylvestris_sisc_v01_batch():
+
+    check_model('models.trees.Psylvestris__sisc__v01', 'PinusSylvestrisSISC', 'data_sm4.2015.1p_eng_psyl.xlsx')
+
+
+def test_ppinaster_me_sim_v02_batch():
+
+    check_model('models.trees.Ppinaster_me__sim__v02', 'PinusPinasterSIM', 'data_sm4.2015.1p_eng_ppinaster.xlsx')
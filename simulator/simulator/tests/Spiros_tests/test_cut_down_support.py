@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+from data import Plot
+from data import Tree
+from models.cuts import PercentOfTrees
+from models.harvest.cut_down_support import CutDownSupport
+
+
+def new_trees(expan_list, specie=21):
+
+    trees = list()
+    for n, expan in enumerate(expan_list):
+        tree = Tree({'TREE_ID': n + 1})
+        for variable, value in (('specie', specie), ('dbh', 10.0 + n), ('expan', expan)):
+            tree.add_value(variable, value)
+        trees.append(tree)
+
+    return trees
+
+
+def harvest(trees, **kwargs):
+
+    cut_type = PercentOfTrees()
+    plot = CutDownSupport.harvest(Plot(), trees, cut_type, CutDownSupport.accumulator_values(cut_type, trees), **kwargs)
+
+    alive = [(tree.tree_id, tree.expan) for tree in plot.get_trees_by_status(None)]
+    cut = [(tree.tree_id, tree.expan) for tree in plot.get_trees_by_status('C')]
+    return alive, cut
+
+
+def test_harvest_start():
+
+    trees = new_trees([10, 20, 30, 40])
+
+    # 50 trees stay alive: the third tree is split and the rest is cut
+    alive, cut = harvest(trees, start=50)
+    assert alive == [(1, 10), (2, 20), (3, 20)]
+    assert cut == [(3, 10), (4, 40)]
+
+    # trees of other species are preserved, and they are accumulated before the rest
+    trees[1].add_value('specie', 26)
+    alive, cut = harvest(trees, start=50, mask=CutDownSupport.species_mask(trees, 21))
+    assert alive == [(2, 20), (1, 10), (3, 20)]
+    assert cut == [(3, 10), (4, 40)]
+
+
+def test_harvest_finish():
+
+    trees = new_trees([10, 20, 30, 40])
+
+    # trees between the points are cut, and the tree where the harvest finishes is split
+    alive, cut = harvest(trees, start=5, finish=45, first_reach=False)
+    assert alive == [(1, 5), (3, 15), (4, 40)]
+    assert cut == [(1, 5), (2, 20), (3, 15)]
+
+    # the same % of the trees is harvested until the finish point
+    alive, cut = harvest(trees, finish=60, value=50)
+    assert alive == [(1, 5), (2, 10), (3, 15), (4, 40)]
+    assert cut == [(1, 5), (2, 10), (3, 15)]
+
+
+def test_species_mask():
+
+    trees = new_trees([10, 20]) + new_trees([30], specie=26.0)
+
+    assert CutDownSupport.species_mask(trees, '') is None
+    assert CutDownSupport.species_mask(trees, '26').tolist() == [False, False, True]
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import math
+import os
+import sys
+import numpy as np
+import pytest
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+from data import Plot
+from data import Tree
+from data.general import Model
+from data.variables import MODEL_VARS, PLOT_VARS
+from engine.ingrowth import get_class_index, get_class_expan, apply_ingrowth, compact_cohorts, ING_VARS
+
+
+DISTRIBUTION = [[0, 12.5, 0.2], [12.5, 22.5, 0.5], [22.5, 30, 0.4], [30, 100, 0]]
+
+
+def new_trees(dbh_list, specie=21):
+
+    trees = list()
+    for n, dbh in enumerate(dbh_list):
+        tree = Tree({'TREE_ID': n + 1})
+        for variable, value in (('specie', specie), ('dbh', dbh), ('basal_area', math.pi * (dbh / 2) ** 2),
+                                ('expan', 10.0 + n), ('vol', 100.0), ('wt', ''), ('height', 10.0)):
+            tree.add_value(variable, value)
+        trees.append(tree)
+
+    return trees
+
+
+def test_class_index():
+
+    classes = get_class_index([0, 12.4, 12.5, 29.9, 99, 100, np.nan], DISTRIBUTION)
+    assert classes.tolist() == [0, 0, 1, 2, 3, -1, -1]
+
+    # classes with a gap between them, and without classes
+    assert get_class_index([5, 15, 25], [[20, 30, 1], [0, 10, 1]]).tolist() == [1, -1, 0]
+    assert get_class_index([5, 15], list()).tolist() == [-1, -1]
+
+
+def test_class_expan():
+
+    expan, basal_area = np.array([10., 20., 30.]), np.array([100., 200., 300.])
+    ratio = get_class_expan(DISTRIBUTION, np.array([0, 0, 2]), expan, basal_area)
+
+    sum_n, sum_g = 30, (10 * 100 + 20 * 200) / 10000
+    assert ratio[0] == pytest.approx((sum_n / sum_g) * 0.2 / sum_n)
+    assert ratio[2] == pytest.approx((30 / (30 * 300 / 10000)) * 0.4 / 30)
+    assert ratio[1] == ratio[3] == 0  # classes without trees
+
+
+def test_apply_ingrowth():
+
+    model_vars, plot_vars, specie_ifn_id = MODEL_VARS[:], PLOT_VARS[:], Model.specie_ifn_id
+    MODEL_VARS.append('SPECIE_IFN_ID')
+    PLOT_VARS.extend(ING_VARS)
+    Model.specie_ifn_id = 21
+
+    try:
+        plot = Plot()
+        trees = new_trees([8, 10, 15, 18, 40]) + new_trees([20], specie=26)
+        trees.sort(key=lambda tree: tree.dbh)
+        plot.add_value('DENSITY', sum(tree.expan for tree in trees if tree.specie == 21))
+
+        # distribution by diametric classes: the basal area of each class is added, also to the class without trees
+        ingrowth_trees, alive_trees, values = apply_ingrowth(plot, 1.1, DISTRIBUTION, trees, trees)
+
+        assert [tree.status for tree in ingrowth_trees] == ['I'] * 6
+        # the new tree is created while the first tree is distributed, so it goes after it
+        assert [tree.dbh for tree in ingrowth_trees] == [8, (22.5 + 30) / 2, 10, 15, 18, 40]
+        assert [tree.status for tree in alive_trees] == [''] + [None] * 5
+        assert [tree.tree_id for tree in alive_trees[1:]] == [1, 2, 3, 4, 5]  # trees of other species are not kept
+        assert alive_trees[0].tree_id == ingrowth_trees[1].tree_id == plot.last_tree_id == 1000001  # code given by the plot
+        assert alive_trees[0].ingrowth and ingrowth_trees[1].ingrowth and not ingrowth_trees[0].ingrowth
+
+        for alive_tree, ingrowth_tree, tree in zip(alive_trees[1:], ingrowth_trees[:1] + ingrowth_trees[2:],
+                                                         [tree for tree in trees if tree.specie == 21]):
+            assert alive_tree.expan == tree.expan + ingrowth_tree.expan
+
+        assert values['ING_BA'] == pytest.approx(0.2 + 0.5 + 0.4)
+        assert values['ING_DENSITY'] == sum(tree.expan for tree in ingrowth_trees)
+        assert values['ING_VOL'] == sum(tree.expan * tree.vol for tree in ingrowth_trees) / 1000
+        assert values['ING_WT'] == 0 and ingrowth_trees[0].wt == 0
+
+        # without distribution: the ingrowth is shared between all the trees of the species of the model
+        ingrowth_trees, alive_trees, values = apply_ingrowth(plot, 1.1, None, trees, trees)
+
+        assert [tree.tree_id for tree in ingrowth_trees] == [1, 2, 3, 4, 5]
+        assert values['ING_BA'] == pytest.approx(1.1)
+        assert ingrowth_trees[0].expan / trees[0].expan == pytest.approx(ingrowth_trees[-1].expan / trees[-1].expan)
+
+    finally:
+        MODEL_VARS[:], PLOT_VARS[:], Model.specie_ifn_id = model_vars, plot_vars, specie_ifn_id
+
+
+def test_compact_cohorts():
+
+    template = new_trees([10])[0]
+    trees = list()
+    for n, (dbh, height) in enumerate(zip([10, 10.4, 10.2, 30, 10.3, 10.1, 10.1], [8, 8.2, 8.4, 15, 8.1, 8.3, 8.3])):
+        if n == 5:
+            tree = Tree.clone_on_write(template)  # the tree 1 is not an ingrowth tree
+        else:
+            tree = Tree({'TREE_ID': 0})
+            tree.create_new_from_clone(template, 1000001 + n)
+        tree.add_value('status', '' if n < 6 else None)  # the last tree is grown by the engine, the rest not yet
+        tree.add_value('dbh', dbh)
+        tree.add_value('basal_area', math.pi * (dbh / 2) ** 2)
+        tree.add_value('expan', 10.0 + n)
+        tree.add_value('height', height)
+        tree.add_value('vol', 50.0 + n)
+        tree.add_value('vol_ha', tree.vol * tree.expan / 1000)
+        trees.append(tree)
+    trees[4].add_value('specie', 26)
+
+    def get_totals(tree_list):
+        return [sum(getattr(tree, variable) * (tree.expan if variable in ('basal_area', 'vol') else 1) for tree in tree_list)
+                for variable in ('expan', 'basal_area', 'vol', 'vol_ha')]
+
+    new_trees_list, report = compact_cohorts(trees, 1, 0.5)
+
+    # the trees 1 and 3 are merged with the first one; different species, sizes, codes or status are kept
+    assert [tree.tree_id for tree in new_trees_list] == [1000001, 1000004, 1000005, 1, 1000007]
+    assert report['merged'] == 2
+    assert new_trees_list[0] is not trees[0] and trees[0].expan == 10 and new_trees_list[1] is trees[3]
+    assert new_trees_list[0].status == ''
+    assert get_totals(new_trees_list) == pytest.approx(get_totals(trees), rel=1e-12)
+
+    merged = new_trees_list[0]
+    assert merged.dbh == pytest.approx(math.sqrt(merged.basal_area * 4 / math.pi))
+    assert 10 <= merged.dbh <= 10.4 and 8 <= merged.height <= 8.4
+    assert report['dbh_error'] == max(abs(dbh - merged.dbh) for dbh in (10, 10.4, 10.2)) < 1
+    assert report['height_error'] == max(abs(height - merged.height) for height in (8, 8.2, 8.4)) < 0.5
+
+    # nothing to merge
+    assert compact_cohorts(new_trees_list, 1, 0.5) == (new_trees_list, {'merged': 0, 'dbh_error': 0, 'height_error': 0})
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import math
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from helpers import PSYL_VALUES, new_tree, stud_taper
+from models.trees.equations_tree_integration import SIMPSON, GAUSS, EXACT
+from models.trees.equations_tree_merch import MerchantableVolume
+from models.trees.equations_tree_volume import TreeVolume
+from scipy import integrate
+
+
+FAGUS_VALUES = (0.000120, 2.036193, 0.799343, 0.000015, 0.000033, 0.005194, 0.074439, 0.873445)  # Fsylvatica on TreeVolume, with a large b3
+
+
+def get_class_conditions(tree):
+
+    ht = tree.height
+    return [['unwinding', 2.5 / ht, 40, 200], ['veneer', 2.5 / ht, 30, 200], ['saw_big', 2.5 / ht, 25, 200],
+            ['saw_small', 2.5 / ht, 20, 200], ['saw_canter', 2.5 / ht, 15, 28], ['post', 6 / ht, 15, 28],
+            ['stake', 1.8 / ht, 6, 16], ['chips', 1 / ht, 5, 1000000]]
+
+
+def former_merch_calculation(tree, class_conditions, taper):
+    """
+    The loops used by the models before MerchantableVolume, walking the stem height by height.
+    """
+
+    ht = tree.height
+    usage = {conditions[0]: conditions[1] + 0.20 / ht <= 1 for conditions in class_conditions}
+    merch_list = []
+
+    for count, accepted in enumerate(usage.values()):
+        hro = 0.20 / ht
+        vol = 0
+        if accepted:
+            dr = taper(hro)
+            while dr > class_conditions[count][3] and (hro + 0.05 / ht <= 1):
+                hro += 0.05 / ht
+                dr = taper(hro)
+            while dr >= class_conditions[count][2] and (hro + class_conditions[count][1] <= 1):
+                hro += class_conditions[count][1]
+                dr = taper(hro)
+                if dr >= class_conditions[count][2] and hro <= 1:
+                    hr = np.arange((hro - class_conditions[count][1]), hro, 0.001)
+                    vol += math.pi * ht * 10 * (integrate.simps((taper(hr) / 20) ** 2, hr))
+        merch_list.append(vol)
+
+    return usage, merch_list
+
+
+def get_tapers(trees):
+    """
+    Returns the taper functions of the trees and the coefficients received by MerchantableVolume (None if not Fang).
+    """
+
+    return [([lambda hr, tree=tree: TreeVolume.Fang_taper(tree, hr, PSYL_VALUES) for tree in trees], PSYL_VALUES),
+            ([lambda hr, tree=tree: TreeVolume.Fang_taper(tree, hr, FAGUS_VALUES) for tree in trees], FAGUS_VALUES),
+            ([lambda hr, tree=tree: stud_taper(tree, hr) for tree in trees], None)]
+
+
+def test_same_logs_as_former_loops():
+
+    random = np.random.default_rng(14)
+    trees = [new_tree(dbh, height) for dbh, height in zip(random.uniform(7.5, 80, 12), random.uniform(2, 35, 12))]
+    class_conditions = [get_class_conditions(tree) for tree in trees]
+
+    for tapers, values in get_tapers(trees):
+
+        for tree, conditions, taper in zip(trees, class_conditions, tapers):
+            usage, merch_list = MerchantableVolume.calculate(tree, conditions, taper, SIMPSON, values)
+            expected_usage, expected_list = former_merch_calculation(tree, conditions, taper)
+            assert usage == expected_usage
+            assert np.allclose(merch_list, expected_list, rtol=1e-12, atol=1e-9)
+
+
+def test_integration_methods():
+
+    trees = [new_tree(45.0, 21.5), new_tree(18.0, 12.0)]
+    class_conditions = [get_class_conditions(tree) for tree in trees]
+
+    for tapers, values in get_tapers(trees)[:2]:
+
+        for tree, conditions, taper in zip(trees, class_conditions, tapers):
+            simpson_usage, simpson_list = MerchantableVolume.calculate(tree, conditions, taper, SIMPSON, values)
+            gauss_usage, gauss_list = MerchantableVolume.calculate(tree, conditions, taper, GAUSS, values)
+            usage, merch_list = MerchantableVolume.calculate(tree, conditions, taper, EXACT, values)
+            assert usage == gauss_usage == simpson_usage
+            assert np.allclose(gauss_list, merch_list, rtol=1e-6, atol=0)
+            assert np.allclose(simpson_list, merch_list, rtol=2.5e-2, atol=0)  # Simpson doesn't integrate the last mm of each log
+
+
+def test_batch_same_as_one_tree():
+
+    random = np.random.default_rng(21)
+    trees = [new_tree(dbh, height) for dbh, height in zip(random.uniform(7.5, 80, 9), random.uniform(2, 35, 9))]
+    class_conditions = [get_class_conditions(tree) for tree in trees]
+    tapers, values = list(), list()
+
+    for n, (tree_tapers, tree_values) in enumerate(get_tapers(trees) * 3):  # Fang taper equations and other equations mixed
+        tapers.append(tree_tapers[n])
+        values.append(tree_values)
+
+    for method in (SIMPSON, GAUSS, EXACT):
+        results = MerchantableVolume.calculate_batch(trees, class_conditions, tapers, method, values)
+        assert len(results) == len(trees)
+        for tree, conditions, taper, tree_values, (usage, merch_list) in zip(trees, class_conditions, tapers, values, results):
+            assert (usage, merch_list) == MerchantableVolume.calculate(tree, conditions, taper, method, tree_values)
+
+    assert MerchantableVolume.calculate_batch([], [], []) == []
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import math
+import os
+import sys
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data.general import Area
+from data import Plot
+from data import Tree
+from data import TreeTable
+from data.variables import AREA_VARS, TREE_VARS, PLOT_VARS
+from models.trees.equations_mixed_models import MixedEquations
+from models.trees.equations_tree_species import MIXED_BAI, MIXED_HD
+from util import Tools
+
+
+M = 23.7  # Martonne index used by the tests
+
+
+def new_plot(id_sp1, id_sp2, reineke_max_sp1=400.0):
+
+    plot = Plot()
+    for variable, value in (('ID_SP1', id_sp1), ('ID_SP2', id_sp2), ('QM_DBH', 22.4), ('BASAL_AREA', 28.1),
+                            ('DOMINANT_H', 17.2), ('DOMINANT_DBH', 38.5), ('SP1_PROPORTION', 0.64), ('SP2_PROPORTION', 0.36),
+                            ('REINEKE_SP1', 500.0), ('REINEKE_MAX_SP1', reineke_max_sp1), ('REINEKE_SP2', 300.0),
+                            ('REINEKE_MAX_SP2', 600.0)):
+        plot.add_value(variable, value)
+    return plot
+
+
+def new_trees(species):
+
+    trees = list()
+    for n, specie in enumerate(species):
+        tree = Tree(dict())
+        dbh = 12.0 + 4.5 * n
+        for variable, value in (('specie', specie), ('dbh', dbh), ('height', 9.0 + n), ('basal_area', math.pi * (dbh / 2) ** 2),
+                                ('bal', 2.0 * n), ('bal_intrasp', 1.5 * n), ('bal_intersp', 0.5 * n), ('basal_area_intrasp', 14.0),
+                                ('basal_area_intersp', 9.0), ('tree_age', 40.0)):
+            tree.add_value(variable, value)
+        trees.append(tree)
+    return trees
+
+
+def test_parameters_by_mixture():
+
+    plot = new_plot(21, 25)
+
+    p_bai = MixedEquations.get_mixed_parameters(MIXED_BAI, 25, plot)
+    assert [p_bai[name] for name in ('int', 'd', 'logd', 'h', 'dg', 'baintra', 'bainter', 'balinter', 'm')] == \
+           [-1.7176, -0.0495, 2.3873, 0.0187, -0.0464, -0.0255, -0.0095, -0.0087, 0.0158]  # Pnigra in Psylvestris x Pnigra
+
+    p_h = MixedEquations.get_mixed_parameters(MIXED_HD, 21, plot)
+    assert (p_h['model'], p_h['form'], p_h['int'], p_h['bal'], p_h['dg']) == ('M5', 'A', 0.8792, -0.0068, 0.0465)
+
+    assert MixedEquations.get_mixed_parameters(MIXED_BAI, 26, plot) == {}  # species out of the mixture
+    assert MixedEquations.get_mixed_parameters(MIXED_HD, 21, new_plot(21, 26))['model'] == 'M3'
+    assert MixedEquations.get_mixed_parameters(MIXED_HD, 21, new_plot(21, 42))['beta0'] == 1.3877
+
+
+def test_survival():
+
+    species = [21, 25, 26, 21]
+
+    survival = MixedEquations.get_survival_batch(new_plot(21, 25), species)
+    assert survival[[0, 1, 3]].tolist() == [0.98, 1, 0.98] and math.isnan(survival[2])
+    assert MixedEquations.get_survival_batch(new_plot(21, 25, reineke_max_sp1=600.0), species)[0] == 1
+    assert MixedEquations.get_survival_batch(new_plot(25, 22), species).tolist() == [1, 1, 1, 1]  # no equation
+
+    trees = new_trees(species)
+    assert [MixedEquations.apply_survival_model(tree, new_plot(21, 25)) for tree in trees] == [0.98, 1, None, 0.98]
+
+
+def test_growth_batch_same_as_one_tree():
+
+    for id_sp1, id_sp2 in ((21, 25), (24, 23), (71, 43), (21, 42), (45, 43)):
+
+        plot = new_plot(id_sp1, id_sp2)
+        species = [id_sp1, id_sp2, 99, id_sp2, id_sp1]
+
+        values, equation = MixedEquations.get_growth_batch(plot, TreeTable.from_trees(new_trees(species)), M)
+        assert equation.tolist() == [True, True, False, True, True]
+
+        for n, tree in enumerate(new_trees(species)):
+
+            dbh, height = tree.dbh, tree.height
+            heights = MixedEquations.get_hd_batch(plot, [tree.specie], [values['dbh'][n]], [tree.bal], M)
+
+            if equation[n]:
+                p_bai = MixedEquations.get_mixed_parameters(MIXED_BAI, tree.specie, plot)
+                bai5 = math.exp(p_bai['int'] + p_bai['d'] * dbh + p_bai['logd'] * math.log(dbh) + p_bai['h'] * height +
+                                p_bai['dg'] * plot.qm_dbh + p_bai['ba'] * plot.basal_area + p_bai['baintra'] * 14.0 +
+                                p_bai['bainter'] * 9.0 + p_bai['balintra'] * tree.bal_intrasp + p_bai['balinter'] *
+                                tree.bal_intersp + p_bai['m'] * M)
+                np.testing.assert_allclose(values['basal_area_i'][n], bai5, rtol=1e-12)
+                np.testing.assert_allclose(values['dbh'][n], 2 * math.sqrt((tree.basal_area + bai5) / math.pi), rtol=1e-12)
+                assert values['height'][n] == heights[0] and heights[0] > 1.3
+                assert values['height_i'][n] == values['height'][n] - height
+            else:
+                assert heights[0] == 0  # tree species without equation
+
+
+def test_growth_batch_fixed_values():
+
+    # basal_area_i, dbh and height of the previous equations applied tree by tree (apply_growth_model)
+    expected = {(21, 25): ([14.4972427136287, 25.364796226513114, 36.623437912599364],
+                           [12.745919453402166, 17.45123094798031, 22.082355160047456],
+                           [9.372978410842718, 10.568360146412907, 12.549995830405829]),
+                (24, 23): ([19.744955468690353, 30.104355499456712, 40.41646874060093],
+                           [13.005385734831988, 17.62328164362908, 22.191436327085402],
+                           [13.041300363522968, 14.014544389345724, 15.113829616607248]),
+                (71, 43): ([15.698775544226516, 15.047493228686337, 22.399139869805172],
+                           [12.80579172979283, 17.07070776001681, 21.668397971476573],
+                           [15.042595657631223, 12.58377023179614, 14.072163637476516])}
+
+    for (id_sp1, id_sp2), (basal_area_i, dbh, height) in expected.items():
+
+        plot = new_plot(id_sp1, id_sp2)
+        species = [id_sp1, id_sp2, id_sp2]
+
+        values, equation = MixedEquations.get_growth_batch(plot, TreeTable.from_trees(new_trees(species)), M)
+        assert equation.tolist() == [True, True, True]
+        np.testing.assert_allclose(values['basal_area_i'], basal_area_i, rtol=1e-12)
+        np.testing.assert_allclose(values['dbh'], dbh, rtol=1e-12)
+        np.testing.assert_allclose(values['height'], height, rtol=1e-12)
+
+        assert MixedEquations.get_survival_batch(plot, species).tolist() == [0.98, 1, 1]
+
+
+def test_growth_hook_same_as_one_tree():
+
+    tree_vars, plot_vars = TREE_VARS[:], PLOT_VARS[:]  # models remove variables from the lists when they are loaded
+    martonne = Area.martonne
+    in_area_vars = 'MARTONNE' in AREA_VARS
+    if not in_area_vars:
+        AREA_VARS.append('MARTONNE')
+    Area.martonne = {1: M}
+
+    try:
+        model = Tools.import_module('MixedModelsSpain', 'models.trees.mixed_models_Spain')
+
+        for id_sp1, id_sp2 in ((21, 25), (25, 22)):  # the second mixture has no equations, so only the age changes
+
+            plot = new_plot(id_sp1, id_sp2)
+            plot.add_value('PLOT_ID', 1)
+            plot.add_value('YEAR', 2000)
+            species = [id_sp1, id_sp2, 99]
+
+            trees = new_trees(species)
+            increments = model.growth_batch(5, plot, TreeTable.from_trees(trees))
+            assert increments['tree_age'].tolist() == [5, 5, 5]
+
+            for tree, other_tree in zip(trees, new_trees(species)):
+                MixedEquations.apply_growth_model(5, plot, other_tree, other_tree)
+                tree.sum_value('tree_age', 5)  # the engine adds the increments
+                for variable in ('basal_area', 'basal_area_i', 'dbh', 'dbh_i', 'height', 'height_i', 'tree_age'):
+                    value, other_value = tree.get_value(variable), other_tree.get_value(variable)
+                    if other_value == '':
+                        assert value == ''
+                    else:
+                        np.testing.assert_allclose(value, other_value, rtol=1e-12)
+
+            survival = model.survival_batch(5, plot, TreeTable.from_trees(trees))
+            assert [ratio if ratio == ratio else None for ratio in survival.tolist()] == \
+                   [MixedEquations.apply_survival_model(tree, plot) for tree in trees]
+
+    finally:
+        TREE_VARS[:] = tree_vars
+        PLOT_VARS[:] = plot_vars
+        Area.martonne = martonne
+        if not in_area_vars:
+            AREA_VARS.remove('MARTONNE')
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Plot
+from data.variables import TREE_VARS, PLOT_VARS
+from engine import Engine
+from engine import EngineFactory
+from engine import PARALLEL
+from engine.engines.basic_engine import BasicEngine
+from engine.engines.dask_engine import DaskEngine
+from engine.engines.parallel_engine import ParallelEngine
+from dask.distributed import LocalCluster
+from helpers import copy_plots, get_operations, get_values, import_model, load_inventory
+from util import Tools
+
+
+def test_config_value():
+
+    assert Engine.get_config_value(None, 'num_workers') == 1
+    assert Engine.get_config_value({'num_workers': 3}, 'num_workers') == 3
+    assert Engine.get_config_value({}, 'memory_limit') == '1GB'
+    assert ParallelEngine({'num_workers': 2, 'chunk_size': 3}).get_chunks(7) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert ParallelEngine({'num_workers': 2}).get_chunks(5) == [[0, 1, 2], [3, 4]]
+    assert isinstance(EngineFactory.load_engine(PARALLEL, {'num_workers': 2}), ParallelEngine) is True
+
+
+def check_engine(parallel_engine):
+    """
+    Runs the same operations with BasicEngine and parallel_engine, checking that both inventories are equal after each step.
+    """
+
+    tree_vars, plot_vars = TREE_VARS[:], PLOT_VARS[:]  # models remove variables from the lists when they are loaded
+
+    try:
+        basic_engine = BasicEngine(None)
+
+        # the same cuts as psyl_sisc_v01 scenario, that creates new trees
+        load, init, percent_of_trees, execution, volume = get_operations('INIT', 'PERCENTOFTREES', 'EXECUTION', 'VOLUME')
+        harvests = [(Tools.import_module(harvest.model_class, harvest.model_path, harvest.variables), harvest)
+                    for harvest in (percent_of_trees, volume)]
+
+        inventory = load_inventory(load, basic_engine)
+        model = import_model(init.model_class, init.model_path)
+        inventory = basic_engine.apply_initialize_tree_model(copy_plots(inventory, 4), model, init)
+
+        basic_inventory = parallel_inventory = inventory
+
+        for harvest_model, harvest in harvests:
+
+            basic_inventory = basic_engine.apply_harvest_model(basic_inventory, harvest_model, harvest)
+            basic_inventory = basic_engine.apply_tree_model(basic_inventory, model, execution)
+
+            parallel_inventory = parallel_engine.apply_harvest_model(parallel_inventory, harvest_model, harvest)
+            parallel_inventory = parallel_engine.apply_tree_model(parallel_inventory, model, execution)
+
+            assert basic_inventory.get_number_plots() == 4
+            assert get_values(parallel_inventory.plots) == get_values(basic_inventory.plots)
+
+        # trees created by ingrowth on all the plots, with the same codes on each plot
+        new_ids = [[tree.id for tree in plot.trees if tree.ingrowth] for plot in parallel_inventory.plots]
+        assert len(new_ids[0]) > 0 and new_ids == [new_ids[0]] * 4
+
+    finally:
+        TREE_VARS[:] = tree_vars
+        PLOT_VARS[:] = plot_vars
+
+
+def set_age(plot, model, age):
+    """
+    Function of one plot that modifies the input plot and returns it.
+    """
+
+    plot.add_value('AGE', age)
+    return plot
+
+
+def test_plots_modified_by_the_workers():
+
+    plots = list()
+    for plot_id in range(1, 5):
+        plot = Plot()
+        plot.add_value('PLOT_ID', plot_id)
+        plots.append(plot)
+
+    new_plots = ParallelEngine({'num_workers': 2}).map_plots(set_age, plots, None, 30)
+
+    assert all(new_plot is plot for new_plot, plot in zip(new_plots, plots))  # the plots of the main process are updated
+    assert [plot.get_value('AGE') for plot in plots] == [30] * 4
+
+
+def test_same_results_as_basic_engine():
+
+    check_engine(ParallelEngine({'num_workers': 3, 'chunk_size': 2}))
+
+
+def test_dask_engine_on_scheduler():
+
+    cluster = LocalCluster(processes=False, n_workers=2, threads_per_worker=1, dashboard_address=None)
+
+    try:
+        engine = DaskEngine({'scheduler_address': cluster.scheduler_address, 'num_workers': 2, 'chunk_size': 1})
+        assert engine.num_workers == 2
+        assert engine.shares_process() is True  # the workers are threads of the main process
+        check_engine(engine)
+        engine.close()
+    finally:
+        cluster.close()
+
+
+def test_dask_engine_on_processes():
+
+    engine = DaskEngine({'processes': True, 'num_workers': 2, 'threads_per_worker': 1, 'chunk_size': 1})
+
+    try:
+        assert engine.num_workers == 2  # the engine waits for the workers of the cluster
+        assert engine.shares_process() is False  # so the tasks don't wait for each other
+        check_engine(engine)
+    finally:
+        engine.close()
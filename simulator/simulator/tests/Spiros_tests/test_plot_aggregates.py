@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+
+from __future__ import absolute_import
+
+import os
+import sys
+import math
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Tree
+from data import Plot
+from data.plot_aggregates import get_dominant_rows
+from simulation.inventory import Inventory
+
+
+AGGREGATES = ['DENSITY', 'DOMINANT_DBH', 'MEAN_DBH', 'QM_DBH', 'DBH_MAX', 'DBH_MIN', 'DOMINANT_H', 'MEAN_H', 'H_MAX', 'H_MIN',
+              'DOMINANT_SECTION', 'BASAL_AREA', 'MEAN_BA', 'BA_MAX', 'BA_MIN', 'SLENDERNESS_DOM', 'SLENDERNESS_MEAN',
+              'REINEKE', 'HART', 'HART_STAGGERED']
+
+
+def new_plot(plot_id, n_trees, expan, seed):
+
+    random = np.random.default_rng(seed)
+    plot = Plot({'PLOT_ID': plot_id, 'REINEKE_VALUE': -1.605})
+
+    for tree_id in range(1, n_trees + 1):
+        dbh = float(np.round(random.uniform(7.5, 45), 0))  # rounded to have trees with the same dbh
+        height = 0.0 if tree_id % 7 == 0 else float(random.uniform(5, 25))  # trees without height
+        plot.add_tree(Tree({'PLOT_ID': plot_id, 'TREE_ID': tree_id, 'dbh': dbh, 'height': height, 'expan': expan,
+                            'basal_area': math.pi * dbh * dbh / 4, 'bal': 0 if tree_id % 7 == 0 else 1.0,
+                            'vol': 0 if tree_id % 7 == 0 else 0.5}))  # ingrowth trees are not used on the means
+
+    return plot
+
+
+def recalculate_by_trees(plot):
+    """
+    Plot variables calculated tree by tree, as Plot.recalculate did before using the columns of the trees.
+    """
+
+    values = dict()
+    selection_trees, tree_expansion = list(), 0
+
+    for tree in sorted(plot.trees, key=lambda tree: tree.dbh, reverse=True):
+        if tree_expansion >= 100:
+            break
+        tree_expansion += tree.expan
+        selection_trees.append(tree)
+
+    trees = [tree for tree in plot.trees if not (tree.height == 0 and tree.bal == 0 and tree.vol == 0 and tree.dbh != 0)]
+    height_trees = [tree for tree in trees if tree.height != 0]
+
+    values['DENSITY'] = sum(tree.expan for tree in trees)
+    values['DOMINANT_DBH'] = plot.get_dominant_diameter(selection_trees)
+    values['MEAN_DBH'] = sum(tree.dbh * tree.expan for tree in trees) / values['DENSITY']
+    values['QM_DBH'] = math.sqrt(sum(math.pow(tree.dbh, 2) * tree.expan for tree in trees) / values['DENSITY'])
+    values['DBH_MAX'], values['DBH_MIN'] = max(tree.dbh for tree in trees), min(tree.dbh for tree in trees)
+    values['DOMINANT_H'] = plot.get_dominant_height(selection_trees)
+    values['MEAN_H'] = sum(tree.height * tree.expan for tree in height_trees) / sum(tree.expan for tree in height_trees)
+    values['H_MAX'], values['H_MIN'] = max(tree.height for tree in height_trees), min(tree.height for tree in height_trees)
+    values['DOMINANT_SECTION'] = plot.get_dominant_section(selection_trees)
+    values['BASAL_AREA'] = sum(tree.basal_area * tree.expan for tree in trees) / 10000
+    values['MEAN_BA'] = sum(tree.basal_area * tree.expan for tree in trees) / values['DENSITY']
+    values['BA_MAX'], values['BA_MIN'] = max(tree.basal_area for tree in trees), min(tree.basal_area for tree in trees)
+
+    return values
+
+
+def test_dominant_rows():
+
+    dbh = np.array([20.0, 35.0, 20.0, 12.0, 35.0, 8.0] * 10)
+    expan = np.full(60, 12.5)
+    rows = get_dominant_rows(dbh, expan)
+
+    assert rows.tolist() == [1, 4, 7, 10, 13, 16, 19, 22]  # bigger dbh first, trees with the same dbh in order
+    assert get_dominant_rows(dbh, np.full(60, 0.5)).tolist() == np.lexsort((np.arange(60), -dbh)).tolist()  # all the trees
+    assert get_dominant_rows(np.zeros(0), np.zeros(0)).tolist() == []
+
+
+def test_recalculate():
+
+    for n_trees, expan in ((40, 10.0), (200, 0.75), (5, 12.5)):  # dominant trees from a part of the plot, all the plot...
+
+        plot = new_plot(1, n_trees, expan, n_trees)
+        expected_output = recalculate_by_trees(plot)
+        plot.recalculate()
+
+        for variable, value in expected_output.items():
+            assert plot.get_value(variable) == value, variable
+            assert type(plot.get_value(variable)) is float, variable  # numpy values are not rounded on the output
+
+
+def test_recalculate_small_plot():
+
+    plot = new_plot(1, 3, 12.5, 3)  # the expan of the plot is smaller than 100, so all the trees are dominant
+    plot.recalculate()
+
+    for variable in ('DOMINANT_DBH', 'DOMINANT_H', 'DOMINANT_SECTION'):
+        assert type(plot.get_value(variable)) is float, variable
+
+
+def test_recalculate_inventory():
+
+    inventory = Inventory()
+    for plot_id, n_trees, expan in ((1, 40, 10.0), (2, 200, 0.75), (3, 5, 12.5)):
+        inventory.add_plot(new_plot(plot_id, n_trees, expan, n_trees))
+    inventory.add_plot(Plot({'PLOT_ID': 4, 'REINEKE_VALUE': -1.605, 'QM_DBH': 0}))  # plot without trees
+
+    expected_output = list()
+    for plot in inventory.plots:
+        expected_plot = Plot({'PLOT_ID': plot.id})
+        expected_plot.clone(plot, True)
+        expected_output.append([expected_plot.recalculate().get_value(variable) for variable in AGGREGATES])
+
+    inventory.recalculate()
+
+    assert [[plot.get_value(variable) for variable in AGGREGATES] for plot in inventory.plots] == expected_output
+    assert inventory.get_plot(1).tree_table is inventory.tree_table
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import importlib
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+from data.variables import TREE_VARS, PLOT_VARS
+from engine.engines.basic_engine import BasicEngine
+from helpers import MODEL_PATH, copy_plots, get_operations, get_values, load_inventory
+from simulation import Simulation
+from simulation.plot_streaming import PlotStreaming
+from util import Tools
+
+
+TREE_NAMES, PLOT_NAMES = TREE_VARS[:], PLOT_VARS[:]
+STEPS = ('INIT', 'PERCENTOFTREES', 'EXECUTION', 'VOLUME', 'EXECUTION')  # two cuts and two executions that create new trees
+
+
+def load_plots(copies):
+    """
+    Loads the inventory with the original variables lists, and returns an inventory with copies of its plot.
+    """
+
+    TREE_VARS[:], PLOT_VARS[:] = TREE_NAMES, PLOT_NAMES  # models remove their variables from the lists when they are loaded
+    if MODEL_PATH in sys.modules:
+        importlib.reload(sys.modules[MODEL_PATH])
+
+    return copy_plots(load_inventory(get_operations()[0]), copies)
+
+
+def get_histories(simulation, histories: dict):
+
+    for plot_id in simulation.get_first_step().inventory.get_plot_ids():
+        histories[plot_id] = get_values(simulation.store.get_plot_history(plot_id))
+
+
+def test_same_results_as_operations_order():
+
+    tree_vars, plot_vars = TREE_VARS[:], PLOT_VARS[:]
+
+    try:
+        engine = BasicEngine(None)
+        operations = get_operations(*STEPS)
+
+        inventory = load_plots(4)
+        simulation = Simulation(memory_limit=None)
+        simulation.add_step(1, inventory, operations[0], None)
+        for step, operation in enumerate(operations[1:], 2):
+            inventory = engine.apply_model(Tools.import_module(operation.model_class, operation.model_path, operation.variables),
+                                           operation, inventory)
+            simulation.add_step(step, inventory, operation, None)
+        expected = dict()
+        get_histories(simulation, expected)
+        expected_vars = PLOT_VARS[:], TREE_VARS[:]
+
+        inventory = load_plots(4)
+        histories, batches = dict(), list()
+
+        def write(batch_simulation):
+            batches.append(list(batch_simulation.get_first_step().inventory.get_plot_ids()))
+            get_histories(batch_simulation, histories)
+            assert (PLOT_VARS[:], TREE_VARS[:]) == expected_vars  # lists used by the writers
+
+        streaming = PlotStreaming(engine, 3, memory_limit=0)
+        assert streaming.run(get_operations(*STEPS), write, inventory) == 2
+
+        assert batches == [[1, 2, 3], [4]]
+        assert inventory.empty  # the plots are released from the loaded inventory
+        assert histories == expected
+        assert len(expected[1]) > 0
+
+    finally:
+        TREE_VARS[:] = tree_vars
+        PLOT_VARS[:] = plot_vars
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import threading
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+from data import SimulationContext
+from data.general import Area
+from data.variables import TREE_VARS, PLOT_VARS
+from engine.engines.basic_engine import BasicEngine
+from helpers import MODEL_PATH, MODEL_CLASS, get_operations, get_values
+
+
+STEPS = ('INIT', 'PERCENTOFTREES', 'EXECUTION', 'EXECUTION')
+
+
+def simulate(context, operations):
+    """
+    Runs the operations on the context, stopping after each one, so several simulations can be interleaved.
+    """
+
+    engine = BasicEngine(None)
+    inventory = None
+
+    for operation in operations:
+        model = context.import_module(operation.model_class, operation.model_path, operation.variables)
+        inventory = engine.apply_model(model, operation, inventory, context)
+        yield
+
+    with context:
+        return get_values(inventory.plots)
+
+
+def run(simulations: list):
+    """
+    Runs one operation of each simulation in turn, and returns the values of their inventories.
+    """
+
+    results = [None] * len(simulations)
+    running = list(range(len(simulations)))
+
+    while running:
+        for position in running[:]:
+            try:
+                next(simulations[position])
+            except StopIteration as result:
+                results[position] = result.value
+                running.remove(position)
+
+    return results
+
+
+def test_context_variables():
+
+    plot_vars, tree_vars, plot_type = PLOT_VARS[:], TREE_VARS[:], vars(Area)['plot_type']
+
+    initial, first, second = SimulationContext(), SimulationContext(), SimulationContext()
+    first.import_module(MODEL_CLASS, MODEL_PATH)
+
+    assert len(first.plot_vars) < len(initial.plot_vars) and len(first.tree_vars) < len(initial.tree_vars)
+    assert (PLOT_VARS, TREE_VARS) == (plot_vars, tree_vars)  # the lists out of the context are not changed
+    assert second.plot_vars == initial.plot_vars
+
+    second.import_module(MODEL_CLASS, MODEL_PATH)  # the module is not executed again, but its variables are removed
+    assert (second.plot_vars, second.tree_vars) == (first.plot_vars, first.tree_vars)
+
+    with first:
+        Area.plot_type = {1: 'first'}
+        with first:
+            assert Area.plot_type == {1: 'first'}
+
+    assert vars(Area)['plot_type'] is plot_type
+    assert first.get_class_value(Area, 'plot_type') == {1: 'first'}
+    assert isinstance(second.get_class_value(Area, 'plot_type'), property)
+
+
+def test_simulations_on_the_same_process():
+
+    plot_vars, tree_vars = PLOT_VARS[:], TREE_VARS[:]
+
+    expected = run([simulate(SimulationContext(), get_operations(*STEPS))])[0]
+    assert len(expected) > 1
+
+    assert run([simulate(SimulationContext(), get_operations(*STEPS)) for _ in range(2)]) == [expected, expected]
+
+    results = dict()
+    threads = [threading.Thread(target=lambda position=position: results.update({position: run([simulate(SimulationContext(), get_operations(*STEPS))])[0]}))
+               for position in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {0: expected, 1: expected}
+    assert (PLOT_VARS, TREE_VARS) == (plot_vars, tree_vars)  # the lists out of the contexts are not changed
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+
+from __future__ import absolute_import
+
+import os
+import sys
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Tree
+from data import Plot
+from data import DESC
+from data.variables import TREE_VARS, PLOT_VARS
+from engine.engines.basic_engine import BasicEngine
+from helpers import get_operations, import_model, load_inventory
+
+
+def new_plot():
+
+    plot = Plot({'PLOT_ID': 1})
+    plot.add_trees([Tree({'PLOT_ID': 1, 'TREE_ID': tree_id, 'dbh': dbh, 'height': 10.0, 'expan': 10.0})
+                    for tree_id, dbh in ((1, 20.0), (2, 35.5), (3, 20.0), (4, 12.0))])
+    return plot
+
+
+def test_sorted_trees_are_reused():
+
+    plot = new_plot()
+
+    assert [tree.id for tree in plot.short_trees_on_list('dbh', DESC)] == [2, 1, 3, 4]
+    assert [tree.id for tree in plot.get_sorted_trees('dbh', reverse=True)] == [2, 1, 3, 4]
+    assert plot.sort_index.requests == 2 and plot.sort_index.sorts == 1
+
+    plot.get_tree(4).add_value('height', 20)  # other variables don't change the order
+    plot.get_sorted_trees('dbh', reverse=True)
+    assert plot.sort_index.sorts == 1
+
+    plot.get_tree(4).add_value('dbh', 40)
+    assert [tree.id for tree in plot.get_sorted_trees('dbh', reverse=True)] == [4, 2, 1, 3]
+    assert plot.sort_index.sorts == 2
+
+    plot.add_tree(Tree({'PLOT_ID': 1, 'TREE_ID': 5, 'dbh': 50.0, 'expan': 10.0}))
+    assert [tree.id for tree in plot.get_sorted_trees('dbh', reverse=True)] == [5, 4, 2, 1, 3]
+    assert [tree.id for tree in plot.get_sorted_trees('dbh')] == [1, 3, 2, 4, 5]
+    assert plot.sort_index.sorts == 4
+
+
+def test_sorts_per_step():
+    """
+    Before the sort index, each function of the step that needed the trees sorted by dbh sorted them again.
+    """
+
+    tree_vars, plot_vars = TREE_VARS[:], PLOT_VARS[:]  # models remove variables from the lists when they are loaded
+
+    try:
+        engine = BasicEngine(None)
+        load, init, execution = get_operations('INIT', 'EXECUTION')
+
+        inventory = load_inventory(load, engine)
+        model = import_model(init.model_class, init.model_path)
+
+        inventory = engine.apply_initialize_tree_model(inventory, model, init)
+        inventory = engine.apply_tree_model(inventory, model, execution)
+        plot = inventory.get_first_plot()
+
+        assert plot.get_number_trees() > 0
+        assert plot.sort_index.sorts == 1
+
+        plot.short_trees_on_list('dbh', DESC)  # other function of the step that needs the same order (i.e. bal)
+        assert plot.sort_index.requests == 2  # sorts made before
+        assert plot.sort_index.sorts == 1
+
+    finally:
+        TREE_VARS[:] = tree_vars
+        PLOT_VARS[:] = plot_vars
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Tree
+from models.trees.equations_tree_models import TreeEquations
+from models.trees.equations_tree_species import SpeciesCoefficients, SpeciesRegistry, FANG_DOB, FANG_DUB, MERCH_CLASSES, CARBON
+from models.trees.equations_tree_volume import TreeVolume
+
+
+def new_tree(specie):
+
+    tree = Tree()
+    tree.add_value('specie', specie)
+    return tree
+
+
+def test_ifn_id():
+
+    assert TreeEquations.get_ifn_id('Psylvestris') == 21
+    assert TreeEquations.get_ifn_id('Qpubescens') == TreeEquations.get_ifn_id('Qhumilis') == 243
+    assert TreeEquations.get_ifn_id('Acer') == 976
+    assert TreeEquations.get_ifn_id('Unknown') == ''
+
+
+def test_coefficients_by_specie():
+
+    fang = SpeciesCoefficients.load(FANG_DOB)
+
+    assert SpeciesCoefficients.load(FANG_DOB) is fang  # the file is read only once
+    assert fang.columns == ['ao', 'a1', 'a2', 'b1', 'b2', 'b3', 'p1', 'p2']
+    assert fang.get(23) == (0.000067, 1.698754, 1.210604, 0.000006, 0.000033, 0.000026, 0.021072, 0.475953)
+    assert fang.get(21.0) == TreeVolume.get_Fang_values_dob(new_tree(21))
+    assert fang.get(24) is None and fang.get('') is None
+    assert TreeVolume.get_Fang_values_dob(new_tree(24)) is False
+    assert TreeVolume.get_Fang_values_dub(new_tree(34)) == SpeciesRegistry.get_coefficients(FANG_DUB, 34)
+    assert SpeciesRegistry.get_coefficients(CARBON, 26) == (0.468,)
+    assert 258 in fang and 24 not in fang
+
+    usages = [(row['usage'], row['length'], row['dmin'], row['dmax']) for row in SpeciesCoefficients.load(MERCH_CLASSES).get_rows(21)]
+    assert usages[0] == ('unwinding', 3, 40, 160) and usages[-1] == ('chips', 1, 5, 1000000) and len(usages) == 8
+
+
+def test_gather():
+
+    species = np.array([21, 24, 71, np.nan, 5000, 21, 258])
+    values, found = SpeciesRegistry.gather(FANG_DOB, species)
+
+    assert values.shape == (7, 8)
+    assert found.tolist() == [True, False, True, False, False, True, True]
+    assert np.isnan(values[~found]).all()
+    for position in np.flatnonzero(found):
+        assert tuple(values[position]) == SpeciesRegistry.get_coefficients(FANG_DOB, species[position])
+
+
+def test_other_directory(tmp_path):
+
+    with open(os.path.join(str(tmp_path), 'test_family.csv'), 'w') as family_file:
+        family_file.write('specie,name,a,b,reference\n21,Psylvestris,1.5,2,Test\n21,Psylvestris,3,4,Test\n43,Qpyrenaica,5,6e-3,Test\n')
+
+    family = SpeciesCoefficients.load('test_family', str(tmp_path))
+
+    assert family.columns == ['a', 'b'] and family.species == [21, 43]
+    assert family.get(21) == (1.5, 2) and family.get(43) == (5, 0.006)
+    assert len(family.get_rows(21)) == 2 and family.get_rows(22) == []
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data.variables import TREE_VARS, PLOT_VARS
+from engine.engines.basic_engine import BasicEngine
+from helpers import get_operations, get_values, import_model, load_inventory
+from simulation import Simulation
+
+
+TREE_NAMES, PLOT_NAMES = TREE_VARS[:], PLOT_VARS[:]
+
+
+def simulate(simulation):
+    """
+    Runs LOAD, INIT, HARVEST and EXECUTION operations of psyl_sisc_v01 model, saving the steps on simulation.
+    """
+
+    TREE_VARS[:], PLOT_VARS[:] = TREE_NAMES, PLOT_NAMES  # models remove their variables from the lists when they are loaded
+    engine = BasicEngine(None)
+
+    operations = get_operations('INIT', 'PERCENTOFTREES', 'EXECUTION')
+
+    inventory = load_inventory(operations[0], engine)
+    simulation.add_step(1, inventory, operations[0], None)
+
+    models = dict()
+
+    for step, operation in enumerate(operations[1:], 2):
+        if operation.model_path not in models:
+            models[operation.model_path] = import_model(operation.model_class, operation.model_path, operation.variables)
+        inventory = engine.apply_model(models[operation.model_path], operation, inventory)
+        simulation.add_step(step, inventory, operation, models[operation.model_path])
+
+    return simulation
+
+
+def test_spilled_steps():
+
+    tree_vars, plot_vars = TREE_VARS[:], PLOT_VARS[:]
+
+    try:
+        memory = simulate(Simulation(memory_limit=None))
+        spilled = simulate(Simulation(memory_limit=0))
+
+        assert [memory.store.get(position).spilled for position in range(4)] == [False] * 4
+        assert [spilled.store.get(position).spilled for position in range(4)] == [True, True, True, False]  # the last inventory stays in memory
+        assert memory.store.resident > 0 and spilled.store.resident == memory.store.get(3).size
+
+        for plot_id in memory.get_first_step().inventory.get_plot_ids():
+            expected = get_values(memory.store.get_plot_history(plot_id))
+            assert get_values(spilled.store.get_plot_history(plot_id)) == expected
+            assert spilled.get_first_step().inventory.must_be_printed(plot_id) is True
+
+        files = [spilled.store.get(position).file for position in range(3)]
+        assert all(os.path.exists(file) for file in files)
+        spilled.close()
+        assert not any(os.path.exists(file) for file in files)
+
+    finally:
+        TREE_VARS[:] = tree_vars
+        PLOT_VARS[:] = plot_vars
+
+
+def test_memory_limit():
+
+    tree_vars, plot_vars = TREE_VARS[:], PLOT_VARS[:]
+
+    try:
+        simulation = simulate(Simulation(memory_limit='1GB'))
+        assert simulation.store.memory_limit == 1000000000
+        assert not any(simulation.store.get(position).spilled for position in range(len(simulation.store)))
+
+        limit = simulation.store.get(1).size + simulation.store.get(2).size + simulation.store.get(3).size
+        simulation = simulate(Simulation(memory_limit=limit))  # only the oldest step doesn't fit
+        assert [simulation.store.get(position).spilled for position in range(4)] == [True, False, False, False]
+
+    finally:
+        TREE_VARS[:] = tree_vars
+        PLOT_VARS[:] = plot_vars
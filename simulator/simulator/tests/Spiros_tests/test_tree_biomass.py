@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Plot
+from data import Tree
+from data.variables import TREE_VARS, PLOT_VARS
+from models.trees.equations_tree_biomass import TreeBiomass, BIOMASS_VARS, SPECIES_VARS
+
+
+def new_tree(specie, dbh, height, expan):
+
+    tree = Tree(dict())  # variables without value are empty, as the trees of the inventories
+    for variable, value in (('specie', specie), ('dbh', dbh), ('height', height), ('expan', expan)):
+        tree.add_value(variable, value)
+    return tree
+
+
+def get_trees():
+
+    rng = np.random.default_rng(3)
+    species = [21, 26, 43, 21, 273, 999, 26, 21, 43, 32]
+    return [new_tree(specie, float(rng.uniform(5, 60)), float(rng.uniform(4, 30)), float(rng.uniform(10, 300)))
+            for specie in species]
+
+
+def test_same_equations_as_one_tree():
+
+    dbh = np.array([20.0, 37.5, 52.3])
+    height = np.array([12.0, 18.5, 23.1])
+    values = TreeBiomass.get_w_carbon([21, 21, 21], dbh, height)
+
+    for n, (d, h) in enumerate(zip(dbh.tolist(), height.tolist())):  # Pinus sylvestris, Ruiz-Peinado et al, 2011
+        wsw = 0.0154 * (d ** 2) * h
+        wthickb = (0.540 * ((d - 37.5) ** 2) - 0.0119 * ((d - 37.5) ** 2) * h) * (0 if d <= 37.5 else 1)
+        wb2_7 = 0.0295 * (d ** 2.742) * (h ** (-0.899))
+        wtbl = 0.530 * (d ** 2.199) * (h ** (-1.153))
+        wr = 0.130 * (d ** 2)
+        wt = wsw + (wthickb + wb2_7 + wtbl) + wr
+        np.testing.assert_allclose([values['wsw'][n], values['wthickb'][n], values['wt'][n], values['carbon'][n]],
+                                   [wsw, wthickb, wt, wt * 0.459], rtol=1e-12)
+
+    assert values['wsb'].tolist() == [0, 0, 0] and values['carbon_bark'].tolist() == [0, 0, 0]
+
+
+def test_trees_batch():
+
+    trees = get_trees()
+    TreeBiomass.set_w_carbon_trees_batch(trees)
+
+    values = TreeBiomass.get_w_carbon([tree.specie for tree in trees], [tree.dbh for tree in trees], [tree.height for tree in trees])
+
+    for n, tree in enumerate(trees):
+        for variable in BIOMASS_VARS:
+            assert tree.get_value(variable) == (values[variable][n] if values[variable][n] != 0 else '')
+
+    unknown = trees[5]
+    assert all(unknown.get_value(variable) == '' for variable in BIOMASS_VARS)  # species without equations
+    assert trees[4].wt > 0 and trees[4].carbon == ''  # Ulmus minor has equations, but not a carbon content
+
+    one_tree = new_tree(trees[0].specie, trees[0].dbh, trees[0].height, trees[0].expan)
+    TreeBiomass.set_w_carbon_trees(one_tree)
+    assert [one_tree.get_value(variable) for variable in BIOMASS_VARS] == [trees[0].get_value(variable) for variable in BIOMASS_VARS]
+
+
+def test_plot_values():
+
+    trees = get_trees()
+    TreeBiomass.set_w_carbon_trees_batch(trees)
+
+    plot = Plot()
+    plot.add_value('ID_SP1', 21)
+    plot.add_value('ID_SP2', 26)
+    TreeBiomass.set_w_carbon_plot_values(plot, trees, total=True, by_species=True)
+
+    for variable in BIOMASS_VARS:
+        total = 0
+        for tree in trees:
+            if tree.get_value(variable) != '':
+                total += tree.get_value(variable) * tree.expan / 1000
+        if variable.upper() in PLOT_VARS:
+            assert plot.get_value(variable.upper()) == (total if total != 0 else '')
+
+    for suffix, group in (('_SP1', [21]), ('_SP2', [26]), ('_SP3', [43, 273, 999, 32])):
+        for variable in SPECIES_VARS:
+            total = 0
+            for tree in trees:
+                if tree.specie in group and tree.get_value(variable) != '':
+                    total += tree.get_value(variable) * tree.expan / 1000
+            assert plot.get_value(variable.upper() + suffix) == (total if total != 0 else '')
+
+    other_plot = Plot()
+    other_plot.add_value('ID_SP1', 21)
+    other_plot.add_value('ID_SP2', 26)
+    TreeBiomass.set_w_carbon_plot(other_plot, trees)
+    TreeBiomass.set_w_carbon_plot_sp(other_plot, trees)
+    variables = [variable.upper() + suffix for variable in BIOMASS_VARS for suffix in ('', '_SP1', '_SP2', '_SP3')]
+    assert [other_plot.get_value(variable) for variable in variables if variable in PLOT_VARS] == \
+           [plot.get_value(variable) for variable in variables if variable in PLOT_VARS]
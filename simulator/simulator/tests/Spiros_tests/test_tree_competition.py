@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import math
+import os
+import sys
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Plot
+from data import Tree
+from data.general import Area
+from models.tree_model import TreeModel
+from models.trees.equations_tree_competition import TreeCompetition, SpatialIndex, HEGYI_VARS
+
+
+def new_plot(id_sp1, id_sp2, n_trees, seed):
+
+    plot = Plot()
+    plot.add_value('ID_SP1', id_sp1)
+    plot.add_value('ID_SP2', id_sp2)
+
+    rng = np.random.default_rng(seed)
+    for n in range(n_trees):
+        tree = Tree({'TREE_ID': n + 1})
+        dbh = float(rng.choice([12.5, 17.5, 22.5, 27.5]))  # repeated sizes, to check the order of the trees with the same dbh
+        for variable, value in (('specie', float(rng.choice([id_sp1, id_sp2, 44]))), ('dbh', dbh),
+                                ('basal_area', math.pi * (dbh / 2) ** 2), ('expan', float(rng.uniform(5, 80)))):
+            tree.add_value(variable, value)
+        plot.add_tree(tree)
+
+    return plot
+
+
+def bal_tree_by_tree(list_of_trees, plot):
+    """
+    Bal, intraspecific and interspecific bal calculated tree by tree, as the models did.
+    """
+
+    bal = 0
+    bal_sp = [0, 0, 0]
+    values = list()
+
+    for tree in list_of_trees:
+        group = 0 if int(tree.specie) == int(plot.id_sp1) else 1 if int(tree.specie) == int(plot.id_sp2) else 2
+        others = [bal_sp[other] for other in (0, 1, 2) if other != group]
+        values.append((bal, bal_sp[group], others[0] + others[1]))
+        bal += tree.basal_area * tree.expan / 10000
+        bal_sp[group] += tree.basal_area * tree.expan / 10000
+
+    return values
+
+
+def test_same_bal_as_tree_by_tree():
+
+    plots = [new_plot(21, 25, 30, 1), new_plot(26, 21, 1, 2), new_plot(21, 43, 0, 3), new_plot(43, 21, 45, 4)]
+
+    expected = list()
+    for plot in plots:
+        list_of_trees = plot.short_trees_on_list('dbh')
+        expected += [(tree,) + values for tree, values in zip(list_of_trees, bal_tree_by_tree(list_of_trees, plot))]
+
+    assert [len(plot.trees) for plot in plots] == [30, 1, 0, 45]
+    TreeCompetition.set_bal_plots(plots, 'dbh', by_species=True)
+
+    for tree, bal, intrasp, intersp in expected:
+        assert (tree.bal, tree.bal_intrasp, tree.bal_intersp) == (bal, intrasp, intersp)  # same sums, in the same order
+
+
+def test_order_and_segments():
+
+    size = np.array([10, 30, 20, 30, np.nan, 5, 50])
+    plot_index = np.array([0, 0, 0, 0, 1, 1, 1])
+
+    order = TreeCompetition.get_order(size, plot_index)
+    assert order.tolist() == [1, 3, 2, 0, 6, 5, 4]  # the trees with the same size keep their order
+    assert TreeCompetition.get_segments(plot_index[order]).tolist() == [0, 4, 7]
+
+    values = TreeCompetition.get_bal([100, 100, 200, 50], [100, 100, 100, 100], bounds=np.array([0, 2, 4]),
+                                     groups=np.array([0, 1, 2, 0]))
+    assert values['bal'].tolist() == [0, 1, 0, 2]
+    assert values['bal_intrasp'].tolist() == [0, 0, 0, 0]
+    assert values['bal_intersp'].tolist() == [0, 1, 0, 2]
+
+
+def test_sdi():
+
+    plot = Plot()
+    for variable, value in (('ID_SP1', 21), ('ID_SP2', 43), ('QM_DBH_SP1', 23.2), ('QM_DBH_SP2', 14.6)):
+        plot.add_value(variable, value)
+
+    other_plot = Plot()
+    for variable, value in (('ID_SP1', 25), ('ID_SP2', 99), ('QM_DBH_SP1', 0), ('QM_DBH_SP2', 18.0)):
+        other_plot.add_value(variable, value)
+
+    TreeCompetition.set_sdi_plots([plot, other_plot])
+
+    reineke_sp1 = math.exp(12.685 - 1.7524 * math.log(23.2))  # Psylvestris
+    reineke_sp2 = math.exp(12.271 - 1.7203 * math.log(14.6))  # Qpyrenaica
+    np.testing.assert_allclose([plot.reineke_max_sp1, plot.reineke_sp1, plot.reineke_max_sp2, plot.reineke_sp2],
+                               [math.exp(12.685 - 1.7524 * math.log(25)), reineke_sp1,
+                                math.exp(12.271 - 1.7203 * math.log(25)), reineke_sp2], rtol=1e-12)
+    np.testing.assert_allclose([plot.sp1_proportion, plot.sp2_proportion],
+                               [reineke_sp1 / (reineke_sp1 + reineke_sp2), reineke_sp2 / (reineke_sp1 + reineke_sp2)], rtol=1e-12)
+
+    # Pnigra without quadratic mean diameter, and a species without parameters
+    np.testing.assert_allclose(other_plot.reineke_max_sp1, math.exp(12.756 - 1.8346 * math.log(25)), rtol=1e-12)
+    assert [other_plot.get_value(variable) for variable in ('REINEKE_SP1', 'REINEKE_MAX_SP2', 'REINEKE_SP2', 'SP1_PROPORTION')] \
+        == [0, 0, 0, 0]
+
+
+def new_spatial_plot(n_trees, seed):
+
+    plot = Plot()
+    plot.add_value('PLOT_ID', 1)
+
+    rng = np.random.default_rng(seed)
+    for n in range(n_trees):
+        tree = Tree({'TREE_ID': n + 1})
+        dbh = float(rng.uniform(8, 50))
+        for variable, value in (('specie', float(rng.choice([21, 43]))), ('dbh', dbh), ('basal_area', math.pi * (dbh / 2) ** 2),
+                                ('expan', float(rng.uniform(5, 60))), ('height', float(rng.uniform(6, 25))),
+                                ('coord_x', float(np.round(rng.uniform(-15, 15), 1))), ('coord_y', float(np.round(rng.uniform(-15, 15), 1)))):
+            tree.add_value(variable, value)
+        plot.add_tree(tree)
+
+    return plot
+
+
+def hegyi_tree_by_tree(tree_i, plot_trees, radius):
+    """
+    Hegyi index, basal area and density of the Hegyi subplot of a tree, calculated tree by tree as the former function.
+    """
+
+    hegyi, bal, g, N = 0, {True: 0, False: 0}, {True: 0, False: 0}, {True: 0, False: 0}
+
+    for tree_j in plot_trees:
+        if tree_i.tree_id != tree_j.tree_id:
+            dist_ij = math.sqrt(((tree_i.coord_x - tree_j.coord_x)**2) + ((tree_i.coord_y - tree_j.coord_y)**2))
+            if dist_ij <= radius:
+                hegyi += tree_i.dbh/(tree_j.dbh*(dist_ij + 1))
+                bal[int(tree_i.specie) == int(tree_j.specie)] += tree_j.basal_area*tree_j.expan/10000
+                g[int(tree_i.specie) == int(tree_j.specie)] += tree_j.basal_area*tree_j.expan/10000
+                N[int(tree_i.specie) == int(tree_j.specie)] += tree_j.expan
+        else:
+            g[True] += tree_j.basal_area*tree_j.expan/10000
+            N[True] += tree_j.expan
+
+    return hegyi, bal[True], bal[False], g[True], g[False], N[True], N[False]
+
+
+def test_hegyi_as_tree_by_tree():
+
+    longitude, latitude = Area.longitude, Area.latitude
+    Area.longitude, Area.latitude = {1: 0}, {1: 0}
+
+    try:
+        for radius in (0, 5):
+            plot, other_plot = new_spatial_plot(150, 1), new_spatial_plot(150, 1)
+            plot_trees, other_trees = plot.short_trees_on_list('dbh'), other_plot.short_trees_on_list('dbh')
+
+            TreeModel.hegyi_plot(plot, plot_trees, radius)  # all the trees at once
+            for tree in other_trees:
+                TreeModel.hegyi(other_plot, tree, other_trees, radius)  # tree by tree, on the same spatial index
+
+            for tree, other_tree in zip(plot_trees, other_trees):
+                expected = hegyi_tree_by_tree(tree, plot_trees, radius if radius != 0 else tree.height*0.25)
+                values = [tree.get_value(variable) for variable in HEGYI_VARS]
+                assert values == [other_tree.get_value(variable) for variable in HEGYI_VARS]
+                assert [values[0], values[1], values[2], values[6], values[7], values[11], values[12]] == list(expected)
+                assert values[5] == values[1] + values[2] and values[15] == values[11] + values[12]
+
+            # the index is used again while the trees are the same, also by the trees one by one
+            index = SpatialIndex.get(plot, plot_trees)
+            assert index is not None and SpatialIndex.get(plot, plot.short_trees_on_list('dbh')) is index
+            subjects = plot_trees[::3]
+            TreeModel.hegyi_plot(plot, plot_trees, 7, subjects=subjects)  # only some trees, with all the neighbours
+            assert SpatialIndex.get(plot, plot_trees) is index
+            for tree in subjects:
+                expected = hegyi_tree_by_tree(tree, plot_trees, 7)
+                assert tree.hegyi == expected[0] and tree.n_intrasp_hegyi == expected[5]
+
+            # a new index is built for other trees (dead or cut trees), or when the trees of the plot change
+            plot_trees = plot_trees[::2]
+            TreeModel.hegyi_plot(plot, plot_trees, radius)
+            assert SpatialIndex.get(plot, plot_trees) is not index
+            for tree in plot_trees:
+                expected = hegyi_tree_by_tree(tree, plot_trees, radius if radius != 0 else tree.height*0.25)
+                assert tree.hegyi == expected[0] and tree.n_intrasp_hegyi == expected[5]
+
+            plot.add_tree(Tree({'TREE_ID': 1000}))
+            assert SpatialIndex.get(plot, plot_trees) is None
+
+    finally:
+        Area.longitude, Area.latitude = longitude, latitude
+
+
+def test_edge_fraction():
+
+    fraction = TreeCompetition.get_edge_fraction([0, 10, 20, 0], [0, 0, 0, 0], [5, 5, 2, 30], 0, 0, 20)
+    np.testing.assert_allclose(fraction[[0, 1, 3]], [1, 1, (20 / 30) ** 2], rtol=1e-6)
+    assert 0.45 < fraction[2] < 0.5  # half of the subplot out of the plot, a bit more for the curvature of the edge
+
+    values, calculated = TreeCompetition.get_hegyi(SpatialIndex(list()), [0], [0], [1], [10], [21], [5])
+    assert calculated.tolist() == [True] and values['hegyi'].tolist() == [0]  # without neighbours
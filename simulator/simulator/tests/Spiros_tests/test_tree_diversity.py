@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import math
+import os
+import sys
+import pandas as pd
+import pytest
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+from data import Plot
+from data import Tree
+from data.variables import PLOT_VARS
+from models.trees.equations_tree_diversity import TreeDiversity, DIVERSITY_VARS
+from models.trees.equations_tree_models import TreeEquations
+
+
+def new_plot(trees):
+
+    plot = Plot()
+    for n, (specie, expan) in enumerate(trees):
+        tree = Tree({'TREE_ID': n + 1})
+        tree.add_value('specie', specie)
+        tree.add_value('expan', expan)
+        plot.add_tree(tree)
+
+    return plot
+
+
+def former_indexes(plot):
+    """
+    Diversity indexes calculated as the former functions of TreeEquations, with pandas.
+    """
+
+    df = pd.DataFrame({'species': [int(tree.specie) for tree in plot.trees], 'expan': [tree.expan for tree in plot.trees]})
+    df_grouped = df.groupby('species')['expan'].sum()
+    total_expan = df_grouped.sum()
+    n_sp = df_grouped.nunique()
+
+    shannon = - df_grouped.values[-1] / total_expan * math.log(df_grouped.values[-1] / total_expan)
+    simpson = 1 - df_grouped.values[-1] * (df_grouped.values[-1] - 1) / (total_expan * (total_expan - 1))
+    margalef = (n_sp - 1) / math.log(total_expan)
+    pielou = shannon / math.log(n_sp) if n_sp != 1 else ''
+
+    return {'SHANNON': shannon, 'SIMPSON': simpson, 'MARGALEF': margalef, 'PIELOU': pielou}
+
+
+def test_indexes():
+
+    plot = new_plot([(21, 100), (21.0, 50), (26, 50), (43, 25.5)])
+
+    values = TreeDiversity.get_plot_indexes(plot.trees)
+    for variable, value in former_indexes(plot).items():
+        assert values[variable] == pytest.approx(value, rel=1e-12)
+
+    assert TreeEquations.get_shannon_and_pielou_index(plot, plot.trees) == (values['SHANNON'], values['PIELOU'])
+
+    # two species with the same abundance are counted once by Margalef and Pielou, as the former functions did
+    plot = new_plot([(21, 100), (26, 50), (43, 50)])
+    values = TreeDiversity.get_plot_indexes(plot.trees)
+    assert values['MARGALEF'] == pytest.approx(1 / math.log(200)) and values['PIELOU'] == pytest.approx(values['SHANNON'] / math.log(2))
+
+    # just one species: no Pielou index; no trees: no index
+    assert TreeDiversity.get_plot_indexes(new_plot([(21, 100), (21, 20)]).trees)['PIELOU'] == ''
+    assert list(TreeDiversity.get_plot_indexes(list()).values()) == ['', '', '', '']
+
+
+def test_diversity_indexes_names():
+
+    plot = new_plot([(21, 100), (26, 50)])
+
+    plot_vars = PLOT_VARS[:]
+    PLOT_VARS.extend(variable for variable in DIVERSITY_VARS if variable not in PLOT_VARS)
+
+    try:
+        printed = [plot.get_value(variable) for variable in DIVERSITY_VARS]
+        TreeEquations.set_diversity_indexes(plot, plot.trees)  # the engine calls it after each harvest
+        values = TreeDiversity.get_plot_indexes(plot.trees)
+        for variable in DIVERSITY_VARS:
+            assert plot.get_value(variable.lower()) == values[variable]
+        assert [plot.get_value(variable) for variable in DIVERSITY_VARS] == printed  # the names printed by the writers
+
+    finally:
+        PLOT_VARS[:] = plot_vars
+
+
+def test_indexes_plots():
+
+    plots = [new_plot([(21, 100), (26, 50), (43, 25.5)]), new_plot(list()), new_plot([(26, 10), (21, 10)]),
+             new_plot([(45, 35)])]
+
+    plot_vars = PLOT_VARS[:]
+    PLOT_VARS.extend(variable for variable in DIVERSITY_VARS if variable not in PLOT_VARS)
+
+    try:
+        TreeDiversity.set_indexes_plots(plots)
+
+        for plot in plots:
+            values = TreeDiversity.get_plot_indexes(plot.trees)
+            for variable in DIVERSITY_VARS:
+                assert plot.get_value(variable.lower()) == pytest.approx(values[variable]) if values[variable] != '' \
+                    else plot.get_value(variable.lower()) == ''
+
+    finally:
+        PLOT_VARS[:] = plot_vars
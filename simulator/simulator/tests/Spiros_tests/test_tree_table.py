@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import pickle
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Tree
+from data import Plot
+from data import TreeTable
+from data import TreeRow
+from data import TreeValues
+from simulation.inventory import Inventory
+
+
+def new_tree(plot_id, tree_id, dbh, status=None):
+
+    tree = Tree({'PLOT_ID': plot_id, 'TREE_ID': tree_id, 'dbh': dbh, 'expan': 10.0, 'specie': 21})
+    tree.set_status(status)
+    return tree
+
+
+def new_inventory():
+
+    inventory = Inventory()
+
+    for plot_id in (1, 2):
+        plot = Plot({'PLOT_ID': plot_id})
+        plot.add_trees([new_tree(plot_id, 1, 10.5), new_tree(plot_id, 2, 20), new_tree(plot_id, 3, 30.5, 'M')])
+        inventory.add_plot(plot)
+
+    return inventory
+
+
+def test_row_keeps_values():
+
+    inventory = new_inventory()
+    trees = [tree for plot in inventory.plots for tree in plot.trees]
+    expected_output = [(tree.tree_id, tree.dbh, tree.height, tree.status) for tree in trees]
+
+    inventory.build_tree_table()
+
+    assert isinstance(trees[0].get_values(), TreeRow) is True
+    assert [(tree.tree_id, tree.dbh, tree.height, tree.status) for tree in trees] == expected_output
+    assert type(trees[1].dbh) is int and type(trees[0].dbh) is float
+    assert list(trees[0].get_values().keys()) == Tree.variables_names()
+
+
+def test_row_is_writable():
+
+    inventory = new_inventory()
+    inventory.build_tree_table()
+    tree = inventory.get_first_plot().get_tree(1)
+
+    tree.add_value('dbh', 12)
+    tree.sum_value('expan', 2)
+    tree.add_value('TREE_ID', '1a')
+
+    assert tree.dbh == 12.0 and tree.expan == 12.0 and tree.tree_id == '1a'
+    assert inventory.get_first_plot().get_column('dbh').tolist() == [12.0, 20.0]
+
+
+def test_plot_columns():
+
+    inventory = new_inventory()
+    table = inventory.build_tree_table()
+    plot = inventory.get_plot(1)
+
+    assert len(table) == 6
+    assert table.plot_index.tolist() == [0, 0, 0, 1, 1, 1]
+    assert table.select(plot=1, status='M').tolist() == [5]
+    assert plot.get_column('dbh').tolist() == [10.5, 20]
+    assert plot.get_column('dbh', 'M').tolist() == [30.5]
+    assert np.isnan(plot.get_column('height', dtype=np.float64)).all()
+
+
+def test_lazy_table():
+
+    plot = new_inventory().get_first_plot()
+    table = TreeTable.from_trees(list(plot.trees))
+
+    table.set_column('dbh', np.array([1.0, 2.0]))
+
+    assert table.column('dbh').tolist() == [1.0, 2.0]
+    assert [tree.dbh for tree in plot.trees] == [1.0, 2.0]
+    assert isinstance(plot.get_tree(1).get_values(), dict) is True
+
+
+def test_pickle_bound_tree():
+
+    inventory = new_inventory()
+    inventory.build_tree_table()
+
+    tree = pickle.loads(pickle.dumps(inventory.get_first_plot().get_tree(2)))
+
+    assert isinstance(tree.get_values(), dict) is True
+    assert tree.dbh == 20
+
+
+def test_clone_on_write():
+
+    inventory = new_inventory()
+    inventory.build_tree_table()
+    tree = inventory.get_first_plot().get_tree(1)
+
+    expected_output = Tree()
+    expected_output.clone(tree)
+    new_tree = Tree.clone_on_write(tree)
+
+    assert isinstance(new_tree.get_values(), TreeValues) is True
+    assert dict(new_tree.get_values()) == dict(expected_output.get_values())
+    assert dict(new_tree.get_values_original()) == dict(expected_output.get_values_original())
+    assert new_tree.status is None and tree.status is None
+
+    new_tree.sum_value('dbh', 1)
+    new_tree.add_value('status', 'C')
+    assert new_tree.dbh == 11.5 and tree.dbh == 10.5 and tree.status is None
+    assert new_tree.get_values().changes == {'status': 'C', 'dbh': 11.5}  # the other values are shared
+
+    tree.add_value('expan', 5)  # the tree is changed after the clone, so the columns of the table are not valid
+    assert new_tree.expan == 10.0 and tree.expan == 5.0
+    assert inventory.get_first_plot().get_column('expan').tolist() == [5.0, 10.0]
+
+    plot = Plot({'PLOT_ID': 1})
+    plot.add_tree(Tree.clone_on_write(new_tree))
+    next_inventory = Inventory()
+    next_inventory.add_plot(plot)
+    next_inventory.build_tree_table()
+    assert plot.get_column('dbh').tolist() == [11.5]
+    assert pickle.loads(pickle.dumps(plot)).get_tree(1).dbh == 11.5
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import numpy as np
+import pytest
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import Plot
+from data import SimulationContext
+from data import Tree
+from models.trees.equations_tree_tables import TreeTables, TabulatedFunction, BILINEAR, BICUBIC
+
+
+TABLE_VARS = ['vol', 'bole_vol', 'bark_vol', 'wsw', 'wb2_7', 'wtbl', 'wr']
+
+
+class ExpanModel:
+    """
+    Model whose volume uses other variables of the tree, so it can't be tabulated.
+    """
+
+    def vol(self, tree, plot):
+        tree.add_value('vol', tree.dbh ** 2 * tree.height * (1 + tree.expan))
+
+
+class SiteModel:
+    """
+    Model whose volume uses a value of the plot, so it can't be tabulated.
+    """
+
+    def vol(self, tree, plot):
+        tree.add_value('vol', tree.dbh ** 2 * tree.height * plot.si)
+
+
+def new_tree(specie, dbh, height):
+
+    tree = Tree()
+    tree.add_value('specie', specie)
+    tree.add_value('dbh', dbh)
+    tree.add_value('height', height)
+    return tree
+
+
+def calculate(model, tree, tabulated: bool):
+
+    if tabulated:
+        model.vol(tree, None)
+        model.biomass(tree)
+    else:
+        type(model).vol(model, tree, None)
+        type(model).biomass(model, tree)
+
+    return np.array([tree.get_value(var) for var in TABLE_VARS], dtype=np.float64)
+
+
+@pytest.mark.parametrize('interpolation', [BILINEAR, BICUBIC])
+def test_psylvestris_sisc_v01_tables(tmp_path, monkeypatch, interpolation):
+
+    context = SimulationContext()
+
+    with context:
+
+        TreeTables.configure(True, interpolation, 0.001, str(tmp_path))
+        model = context.import_module('PinusSylvestrisSISC', 'models.trees.Psylvestris__sisc__v01')
+        assert isinstance(model.vol, TabulatedFunction)
+
+        random = np.random.default_rng(3)
+        for dbh, height in zip(random.uniform(5, 80, 50), random.uniform(3, 35, 50)):
+            tree = new_tree(21, dbh, height)
+            expected = calculate(model, tree, False)
+            assert np.allclose(calculate(model, tree, True), expected, rtol=0.001, atol=0.001 * expected[0])  # bark_vol is small
+
+        table = model.vol.tables.get_table('vol', 21)
+        assert table is not None and table.variables == ['vol', 'bole_vol', 'bark_vol']
+        assert model.biomass.tables.get_table('biomass', 21) is None  # wthickb has a kink at dbh = 37.5
+
+        values = model.vol.tables.evaluate('vol', 21, [20.0, 200.0], [15.0, 15.0])  # vectorized, NaN outside the grid
+        assert np.isclose(values['vol'][0], calculate(model, new_tree(21, 20.0, 15.0), False)[0], rtol=0.001)
+        assert np.isnan(values['vol'][1])
+
+        tree = new_tree(21, 200.0, 15.0)  # outside the grid, calculated by the model
+        assert np.array_equal(calculate(model, tree, True), calculate(model, tree, False))
+
+        files = sorted(os.listdir(str(tmp_path)))
+        assert len(files) == 2
+
+        monkeypatch.setattr(TreeTables, 'build_table', lambda *args: pytest.fail('tables are loaded from disk'))
+        model = context.import_module('PinusSylvestrisSISC', 'models.trees.Psylvestris__sisc__v01')
+        tree = new_tree(21, 30.0, 18.0)
+        assert np.allclose(calculate(model, tree, True), calculate(model, tree, False), rtol=0.001, atol=0)
+
+        assert sorted(os.listdir(str(tmp_path))) == files
+
+    assert TreeTables.get_configuration() is None
+
+
+def test_functions_using_other_variables(tmp_path):
+
+    context = SimulationContext()
+
+    with context:
+
+        TreeTables.configure(True, BILINEAR, 0.001, str(tmp_path))
+        model = ExpanModel()
+        TreeTables.attach(model)
+
+        tree = new_tree(21, 30.0, 18.0)
+        tree.add_value('expan', 25.0)
+        model.vol(tree, None)
+
+        assert tree.vol == 30.0 ** 2 * 18.0 * 26.0
+        assert model.vol.tables.get_table('vol', 21) is None
+
+    model = ExpanModel()
+    TreeTables.attach(model)  # tables are not enabled outside the context
+    assert not isinstance(model.vol, TabulatedFunction)
+
+
+def test_functions_using_the_plot(tmp_path):
+
+    context = SimulationContext()
+
+    with context:
+
+        TreeTables.configure(True, BILINEAR, 0.001, str(tmp_path))
+        model = SiteModel()
+        TreeTables.attach(model)
+
+        plot = Plot()
+        plot.add_value('SI', 14.0)
+        tree = new_tree(21, 30.0, 18.0)
+        model.vol(tree, plot)
+
+        assert tree.vol == 30.0 ** 2 * 18.0 * 14.0
+        assert model.vol.tables.get_table('vol', 21) is None
+
+
+@pytest.mark.parametrize('model_class, module, specie, arguments', [
+    ('Existencias', 'models.trees.existencias_v01', 46, 1),  # biomass uses the cork and the number of trees
+    ('PpinasterPsylvestrisMix', 'models.trees.PpinasterPsylvestris_mix__es__v01', 26, 2)])  # biomass uses the species of the plot
+def test_biomass_using_other_variables(tmp_path, model_class, module, specie, arguments):
+
+    context = SimulationContext()
+
+    with context:
+
+        TreeTables.configure(True, BILINEAR, 0.001, str(tmp_path))
+        model = context.import_module(model_class, module)
+        assert isinstance(model.biomass, TabulatedFunction)
+
+        tree = new_tree(specie, 30.0, 18.0)
+        model.biomass(*[tree, Plot()][:arguments])
+
+        assert model.biomass.tables.get_table('biomass', specie) is None
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import math
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from helpers import PSYL_VALUES, new_tree, random_sizes
+from models.trees.equations_tree_taper import TreeTaper
+from models.trees.equations_tree_volume import TreeVolume
+
+
+PPINASTER_VALUES = (0.000048, 1.929098, 0.976356, 0.000010, 0.000035, 0.000033, 0.064157, 0.681476)  # Ppinaster_me__sim__v02
+
+
+def loop_fang(dbh, ht, hr, values):
+    """
+    Fang taper equation as it was calculated on the models before the shared kernel, used as reference.
+    """
+
+    ao, a1, a2, b1, b2, b3, p1, p2 = values
+    hst = 0.0
+    h = ht - hst
+    k = math.pi / 40000
+    alpha1 = (1 - p1) ** (((b2 - b1) * k) / (b1 * b2))
+    alpha2 = (1 - p2) ** (((b3 - b2) * k) / (b2 * b3))
+
+    if isinstance(hr, float) == False:
+        I1 = np.array([1 if p1 <= i and i <= p2 else 0 for i in hr])
+        I2 = np.array([1 if p2 <= i and i <= 1 else 0 for i in hr])
+    else:
+        I1 = 1 if p1 <= hr and hr <= p2 else 0
+        I2 = 1 if p2 <= hr and hr <= 1 else 0
+
+    beta = (b1 ** (1 - (I1 + I2))) * (b2 ** I1) * (b3 ** I2)
+    ro = (1 - hst / ht) ** (k / b1)
+    r1 = (1 - p1) ** (k / b1)
+    r2 = (1 - p2) ** (k / b2)
+    c1 = math.sqrt((ao * (dbh ** a1) * (h ** (a2 - (k / b1))) / (b1 * (ro - r1) + b2 * (r1 - alpha1 * r2) + b3 * alpha1 * r2)))
+
+    if isinstance(hr, float) == False:
+        return np.array([c1 * math.sqrt(ht ** ((k - b1) / b1) * (1 - hr[i]) ** ((k - beta[i]) / beta[i]) * alpha1 ** (I1[i] + I2[i]) * alpha2 ** (I2[i]))
+                         for i in range(len(hr))])
+    return c1 * math.sqrt(ht ** ((k - b1) / b1) * (1 - hr) ** ((k - beta) / beta) * alpha1 ** (I1 + I2) * alpha2 ** (I2))
+
+
+def test_one_relative_height():
+    """
+    With one tree and one relative height the kernel uses the same scalar operations as the former code, so the values are equal.
+    """
+
+    dbhs, heights = random_sizes(11, 200)
+
+    for values in (PSYL_VALUES, PPINASTER_VALUES):
+        for dbh, height in zip(dbhs, heights):
+            for hr in (0.0, 0.1, 0.3, values[6], values[7], 0.9, 0.999):
+                assert TreeTaper.fang(float(dbh), float(height), hr, values) == loop_fang(float(dbh), float(height), hr, values)
+
+
+def test_trees_by_relative_heights():
+
+    dbhs, heights = random_sizes(11, 200)
+    hr = np.arange(0, 1, 0.001)
+
+    for values in (PSYL_VALUES, PPINASTER_VALUES):
+
+        expected_output = np.array([loop_fang(float(dbh), float(height), hr, values) for dbh, height in zip(dbhs, heights)])
+        real_output = TreeTaper.fang(dbhs, heights, hr, values)
+
+        assert real_output.shape == (len(dbhs), len(hr))
+        assert np.allclose(real_output, expected_output, rtol=1e-13, atol=0)  # vectorized powers can differ on the last bits
+
+        for position in (0, 17, 199):
+            assert np.allclose(TreeTaper.fang(dbhs[position], heights[position], hr, values), expected_output[position], rtol=1e-13, atol=0)
+
+        assert np.allclose(TreeTaper.fang(dbhs, heights, 0.5, values), expected_output[:, 500], rtol=1e-13, atol=0)
+
+
+def test_models_use_the_kernel():
+
+    tree = new_tree(32.5, 17.2)
+    hr = np.arange(0, 1, 0.001)
+
+    assert np.allclose(TreeVolume.Fang_taper(tree, hr, PSYL_VALUES), loop_fang(32.5, 17.2, hr, PSYL_VALUES), rtol=1e-13, atol=0)
+    assert TreeVolume.Fang_taper(tree, 0.25, PSYL_VALUES) == loop_fang(32.5, 17.2, 0.25, PSYL_VALUES)
+    assert TreeVolume.Fang_taper(tree, 0.25, False) == 0
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import sys
+import math
+import numpy as np
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import SimulationContext
+from data.variables import TREE_VARS, PLOT_VARS
+from helpers import PSYL_VALUES, import_model, new_tree, random_sizes, stud_taper
+from models.trees.equations_tree_integration import VolumeIntegration, SIMPSON, GAUSS, EXACT, STEM_TOP
+from models.trees.equations_tree_taper import TreeTaper
+from models.trees.equations_tree_volume import TreeVolume
+from scipy import integrate
+
+
+def test_simpson_is_the_former_integration():
+
+    tree = new_tree(32.5, 17.2)
+    hr = np.arange(0, 1, 0.001)
+
+    for taper in (lambda hr: TreeVolume.Fang_taper(tree, hr, PSYL_VALUES), lambda hr: stud_taper(tree, hr)):
+        assert VolumeIntegration.taper_volume(taper, tree.height, SIMPSON) == math.pi * tree.height * 10 * integrate.simps((taper(hr) / 20) ** 2, hr)
+
+    assert VolumeIntegration.taper_volume(lambda hr: TreeVolume.Fang_taper(tree, hr, False), tree.height, SIMPSON) is None
+
+
+def test_fang_volume():
+
+    dbhs, heights = random_sizes(5, 50)
+
+    ao, a1, a2 = PSYL_VALUES[:3]
+    whole = math.pi * heights * 10 * TreeTaper.fang_integral(dbhs, heights, PSYL_VALUES, 0.0, 1.0) / 400
+    assert np.allclose(whole, 1000 * ao * dbhs ** a1 * heights ** a2, rtol=1e-12, atol=0)  # volume equation of Fang model (dm3)
+
+    exact = VolumeIntegration.fang_volume(dbhs, heights, PSYL_VALUES, EXACT)  # until STEM_TOP, as SIMPSON
+    assert np.allclose(exact, math.pi * heights * 10 * TreeTaper.fang_integral(dbhs, heights, PSYL_VALUES, 0.0, STEM_TOP) / 400,
+                       rtol=1e-12, atol=0)
+    assert np.all(exact < whole)
+
+    simpson = VolumeIntegration.fang_volume(dbhs, heights, PSYL_VALUES, SIMPSON)
+    assert np.allclose(simpson, exact, rtol=1e-6, atol=0)
+    assert np.allclose(VolumeIntegration.fang_volume(dbhs, heights, PSYL_VALUES, GAUSS), exact, rtol=1e-6, atol=0)
+
+    for position in (0, 25, 49):  # the models integrate their taper functions tree by tree
+        tree = new_tree(dbhs[position], heights[position])
+        for method in (SIMPSON, GAUSS, EXACT):
+            volume = VolumeIntegration.taper_volume(lambda hr: TreeVolume.Fang_taper(tree, hr, PSYL_VALUES), tree.height, method,
+                                                    fang=(tree.dbh, PSYL_VALUES))
+            assert math.isclose(volume, VolumeIntegration.fang_volume(tree.dbh, tree.height, PSYL_VALUES, method), rel_tol=1e-12)
+            assert math.isclose(volume, simpson[position], rel_tol=1e-6)
+
+
+def test_methods_agree_on_fagus():
+    """
+    The b3 of Fsylvatica__xx__v01 is greater than k, so the squared diameter of its Fang taper equation tends to infinity
+    on the top of the stem: the methods must integrate the same stem, until STEM_TOP.
+    """
+
+    tree_vars, plot_vars = TREE_VARS[:], PLOT_VARS[:]  # models remove variables from the lists when they are loaded
+
+    try:
+        model = import_model('FagusSylvatica', 'models.trees.Fsylvatica__xx__v01')
+
+        for dbh, height in ((30.0, 20.0), (12.0, 9.0), (60.0, 31.0)):
+
+            tree = new_tree(dbh, height)
+            values = model.fang_over_bark(tree)
+            volumes = {method: VolumeIntegration.taper_volume(lambda hr: model.taper_over_bark(tree, hr), tree.height, method,
+                                                              fang=(tree.dbh, values))
+                       for method in (SIMPSON, GAUSS, EXACT)}
+
+            assert math.isclose(volumes[GAUSS], volumes[EXACT], rel_tol=1e-9)
+            assert math.isclose(volumes[SIMPSON], volumes[EXACT], rel_tol=1e-3)
+            assert volumes[EXACT] == VolumeIntegration.fang_volume(tree.dbh, tree.height, values, EXACT)
+
+            # without the coefficients, GAUSS integrates the taper function over the whole stem
+            gauss = VolumeIntegration.taper_volume(lambda hr: model.taper_over_bark(tree, hr), tree.height, GAUSS)
+            assert math.isclose(gauss, volumes[EXACT], rel_tol=5e-3)
+
+        assert math.isclose(volumes[EXACT], 3946.17, rel_tol=1e-5)
+        assert math.isclose(VolumeIntegration.fang_volume(30.0, 20.0, values, GAUSS), 677.77, rel_tol=1e-5)
+
+    finally:
+        TREE_VARS[:] = tree_vars
+        PLOT_VARS[:] = plot_vars
+
+
+def test_other_taper_equations():
+
+    tree = new_tree(32.5, 17.2)
+    simpson = VolumeIntegration.taper_volume(lambda hr: stud_taper(tree, hr), tree.height, SIMPSON)
+
+    assert VolumeIntegration.taper_volume(lambda hr: stud_taper(tree, hr), tree.height, EXACT) == \
+        VolumeIntegration.taper_volume(lambda hr: stud_taper(tree, hr), tree.height, GAUSS)
+    assert math.isclose(VolumeIntegration.taper_volume(lambda hr: stud_taper(tree, hr), tree.height, GAUSS), simpson, rel_tol=5e-3)
+
+
+def test_method_by_simulation():
+
+    assert VolumeIntegration.get_method() == SIMPSON
+
+    context = SimulationContext()
+    with context:
+        VolumeIntegration.set_method('gauss')
+        assert VolumeIntegration.get_method() == GAUSS
+
+    assert VolumeIntegration.get_method() == SIMPSON
+
+    with context:
+        assert VolumeIntegration.get_method() == GAUSS
+        VolumeIntegration.set_method('TRAPEZOID')  # not available
+        assert VolumeIntegration.get_method() == SIMPSON
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) $today.year Moisés Martínez (Sngular). All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+#
+# Accuracy report of the volume integration methods (GAUSS, EXACT) against SIMPSON, the method used by the models until now.
+# Each scenario of tests/scenarios is loaded and initialized (LOAD and INIT operations) with each method, and the volumes
+# over bark (vol) and under bark (bole_vol) of the trees are compared. Run it from simulator/simulator:
+#
+#     python tests/regtests/volume_integration_report.py [scenario_name ...]
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+ROOT_FOLDER = os.getcwd()
+
+sys.path.append(os.path.join(ROOT_FOLDER, 'src'))
+
+from data import SimulationContext
+from engine.engines.basic_engine import BasicEngine
+from models.trees.equations_tree_integration import VolumeIntegration, INTEGRATION_METHODS, SIMPSON
+from scenario import Operation
+
+
+SCENARIOS_FOLDER = os.path.join(ROOT_FOLDER, 'tests', 'scenarios')
+INPUTS_FOLDER = os.path.join(ROOT_FOLDER, 'tests', 'inputs')
+VOLUMES = ['vol', 'bole_vol']
+
+
+def get_operations(scenario_file):
+    """
+    Returns the LOAD operation and the first INIT operation of a tree model of the scenario, or None if it doesn't have them
+    or its inventory is not on tests/inputs.
+    """
+
+    with open(scenario_file) as file:
+        operations = json.load(file)['operations']
+
+    operations = [Operation(operation) for operation in (operations.values() if isinstance(operations, dict) else operations)]
+    load = [operation for operation in operations if operation.type.get_code_name() == 'LOAD']
+    init = [operation for operation in operations if operation.type.get_code_name() == 'INIT' and operation.model_path.startswith('models.trees')]
+
+    if not load or not init or not os.path.isfile(get_input(load[0])):
+        return None
+
+    return load[0], init[0]
+
+
+def get_input(load):
+    return os.path.join(INPUTS_FOLDER, os.path.basename(str(load.get_variable('input'))))
+
+
+def get_volumes(load, init, method):
+    """
+    Returns the volumes of the trees initialized with the integration method, and the seconds used by INIT.
+    """
+
+    engine = BasicEngine(None)
+    context = SimulationContext()
+
+    with context, contextlib.redirect_stdout(io.StringIO()):
+
+        VolumeIntegration.set_method(method)
+
+        inventory = engine.apply_load_model(get_input(load),
+                                            context.import_module(load.model_class, load.model_path, load.variables), load)
+        model = context.import_module(init.model_class, init.model_path, init.variables)
+
+        start = time.time()
+        inventory = engine.apply_initialize_tree_model(inventory, model, init)
+        seconds = time.time() - start
+
+        volumes = dict()
+        for plot in inventory.plots:
+            for tree in plot.trees:
+                volumes[(plot.id, tree.id)] = [tree.get_value(variable) for variable in VOLUMES]
+
+    return volumes, seconds
+
+
+def compare(reference: dict, volumes: dict):
+    """
+    Returns the number of volumes compared, the maximum and the mean of the relative differences and the relative
+    difference of the sum of the volumes.
+    """
+
+    differences = list()
+    reference_sum = volumes_sum = 0
+
+    for key, values in reference.items():
+        for reference_value, value in zip(values, volumes.get(key, [None] * len(VOLUMES))):
+            if isinstance(reference_value, float) and isinstance(value, float) and reference_value > 0:
+                differences.append(abs(value - reference_value) / reference_value)
+                reference_sum += reference_value
+                volumes_sum += value
+
+    if not differences:
+        return 0, 0, 0, 0
+
+    return len(differences), max(differences), sum(differences) / len(differences), abs(volumes_sum - reference_sum) / reference_sum
+
+
+def main(names: list):
+
+    names = names if names else sorted(file[:-5] for file in os.listdir(SCENARIOS_FOLDER) if file.endswith('.json'))
+    methods = [method for method in INTEGRATION_METHODS if method != SIMPSON]
+
+    print('%-24s %-40s %-8s %8s %12s %12s %12s %10s' % ('scenario', 'model', 'method', 'volumes', 'max_rel', 'mean_rel', 'total_rel', 'init_s'))
+
+    for name in names:
+
+        operations = get_operations(os.path.join(SCENARIOS_FOLDER, name + '.json'))
+        if operations is None:
+            continue
+
+        load, init = operations
+
+        try:
+            reference, seconds = get_volumes(load, init, SIMPSON)
+        except Exception as exception:
+            print('%-24s %-40s %s' % (name, init.model_path, 'error: ' + str(exception)))
+            continue
+
+        print('%-24s %-40s %-8s %8s %12s %12s %12s %10.3f' % (name, init.model_path, SIMPSON, '', '', '', '', seconds))
+
+        for method in methods:
+            volumes, seconds = get_volumes(load, init, method)
+            print('%-24s %-40s %-8s %8d %12.3e %12.3e %12.3e %10.3f' % ((name, init.model_path, method) + compare(reference, volumes) + (seconds,)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])